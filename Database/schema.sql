@@ -103,3 +103,13 @@ CREATE TABLE IF NOT EXISTS "RecipeComments" (
 	FOREIGN KEY ("Recipes.id") REFERENCES "Recipes"("id"),
 	FOREIGN KEY ("Persons.id") REFERENCES "Persons"("id")
 );
+
+-- Secondary indexes (tables added by later migrations get theirs from Source/database/migrations.py)
+CREATE INDEX IF NOT EXISTS "ix_Persons_lower_email" ON "Persons" (lower("email"));
+CREATE INDEX IF NOT EXISTS "ix_Lists_Persons_id_name" ON "Lists" ("Persons.id", "name");
+CREATE INDEX IF NOT EXISTS "ix_Ingredients_Persons_id_name" ON "Ingredients" ("Persons.id", "name");
+CREATE INDEX IF NOT EXISTS "ix_ListIngredients_Lists_id" ON "ListIngredients" ("Lists.id", "is_deleted");
+CREATE INDEX IF NOT EXISTS "ix_ListIngredients_Ingredients_id" ON "ListIngredients" ("Ingredients.id");
+CREATE INDEX IF NOT EXISTS "ix_InventoryIngredients_Ingredients_id" ON "InventoryIngredients" ("Ingredients.id", "is_deleted");
+CREATE INDEX IF NOT EXISTS "ix_Recipes_Persons_id_title" ON "Recipes" ("Persons.id", "is_deleted", "title");
+CREATE INDEX IF NOT EXISTS "ix_RecipeComments_Recipes_id" ON "RecipeComments" ("Recipes.id", "created_at");
@@ -4,95 +4,70 @@
 from User import User
 from werkzeug.security import generate_password_hash, check_password_hash
 
-import os
-import sqlite3
+from sqlalchemy import func, insert, select
 
+from database import session_scope, Persons
+from database.identity_cache import UserRecord, user_cache
 
-# ————————————————————————————————————————————————————— Database ————————————————————————————————————————————————————— #
-
-def _get_db_path():
-	"""Get SQLite database path from env or default."""
-	path = os.getenv("GROCERY_GURU_DB_PATH")
-	if path:
-		return path
-	from pathlib import Path
-	project_root = Path(__file__).resolve().parent.parent
-	return str(project_root / "Database" / "grocery_guru.db")
 
+# ————————————————————————————————————————————————————— Database ————————————————————————————————————————————————————— #
 
-def close(*connections) -> None:
-	"""Closes all passed connections/cursors."""
-	for obj in connections:
-		obj.close()
+# Users are read and written through database.session_scope(): inside a request they share the
+# request's session (and its pooled connection) with every other query the page makes.
+# The database path is configured once, in database/__init__.py (GROCERY_GURU_DB_PATH).
 
+def _to_user(person) -> User:
+	return User(person.id, person.email, person.name, person.password)
 
-def connect(function: callable) -> callable:
-	"""
-	Wraps functions to create a SQLite connection, pass a dict cursor, and close when done.
-	"""
 
-	def inner(*args, **kwargs):
-		connection = sqlite3.connect(_get_db_path())
-		connection.row_factory = sqlite3.Row  # dict-like access via row["col"]
-		cursor = connection.cursor()
+# ————————————————————————————————————————————————— Users/Logging In ————————————————————————————————————————————————— #
 
-		try:
-			result = function(cursor, *args, **kwargs)
-			connection.commit()
-			close(cursor, connection)
-			return result
-		except Exception as error:
-			connection.rollback()
-			close(cursor, connection)
-			raise error
+def Persons_email_exists(email: str) -> bool:
+	"""Checks whether a Persons's email exists."""
+	with session_scope() as session:
+		return session.execute(select(Persons.id).where(Persons.email == email)).first() is not None
 
-	inner.__name__ = function.__name__
-	return inner
 
+def get_user_by_id(user_id):
+	with session_scope() as session:
+		person = session.get(Persons, int(user_id))
 
-# ————————————————————————————————————————————————— Users/Logging In ————————————————————————————————————————————————— #
+	if person is None:
+		raise Exception("This account does not exist.")
+	return _to_user(person)
 
-@connect
-def Persons_email_exists(cursor, email: str) -> bool:
-	"""Checks whether a Persons's email exists."""
-	cursor.execute('SELECT 1 FROM "Persons" WHERE "email" = ?;', (email,))
-	return cursor.fetchone() is not None
 
+def _load_user_record(user_id: int):
+	"""Slim identity record for the cache: no password hash."""
+	with session_scope() as session:
+		row = session.execute(
+			select(Persons.id, Persons.email, Persons.name).where(Persons.id == user_id)
+		).first()
+	return UserRecord(*row) if row is not None else None
 
-@connect
-def get_user_by_id(cursor, user_id):
-	query = 'SELECT * FROM "Persons" WHERE "id" = ?;'
-	cursor.execute(query, (user_id,))
-	user_info = cursor.fetchone()
 
-	if user_info is None:
+def get_cached_user(user_id):
+	"""User for Flask-Login's user loader, read through the identity cache.
+	The returned User has no password hash; use login_user to check credentials."""
+	record = user_cache.get(int(user_id), _load_user_record)
+	if record is None:
 		raise Exception("This account does not exist.")
-
-	user_info = dict(user_info)
-	current_user = User(
-		user_info["id"], user_info["email"], user_info["name"], user_info["password"]
-	)
-	return current_user
+	return User(record.id, record.email, record.name, None)
 
 
-@connect
-def get_user_by_email(cursor, email: str):
+def get_user_by_email(email: str):
 	"""Return User for the given email, or None if not found."""
 	email = (email or "").strip().lower()
 	if not email:
 		return None
-	cursor.execute('SELECT * FROM "Persons" WHERE LOWER("email") = ?;', (email,))
-	user_info = cursor.fetchone()
-	if user_info is None:
+	with session_scope() as session:
+		person = session.scalars(select(Persons).where(func.lower(Persons.email) == email)).first()
+	if person is None:
 		return None
-	user_info = dict(user_info)
-	return User(
-		user_info["id"], user_info["email"], user_info["name"], user_info["password"]
-	)
+	return _to_user(person)
 
 
-@connect
-def add_new_user(cursor, request):
+def add_new_user(request):
 	"""Attempts to add a new user to the database."""
 	email = request.form["email"]
 	if Persons_email_exists(email):
@@ -102,21 +77,16 @@ def add_new_user(cursor, request):
 		raise Exception("The password and confirmed password do not match. Please try again.")
 
 	password_hash = generate_password_hash(request.form["pass"], method="pbkdf2:sha256")
-	query = '''
-		INSERT INTO "Persons" ("email", "name", "password") VALUES (?, ?, ?);
-	'''
-	cursor.execute(query, (email, request.form["name"], password_hash))
-	user_id = cursor.lastrowid
+	with session_scope() as session:
+		stmt = insert(Persons).values(email=email, name=request.form["name"], password=password_hash)
+		user_id = session.execute(stmt).inserted_primary_key[0]
+		if user_id:
+			user_cache.invalidate_on_commit(session, user_id)
 
 	if not user_id:
 		raise Exception("DB Error while attempting to add new user to DB")
 
-	cursor.execute('SELECT * FROM "Persons" WHERE "id" = ?;', (user_id,))
-	user_info = dict(cursor.fetchone())
-	current_user = User(
-		user_info["id"], user_info["email"], user_info["name"], user_info["password"]
-	)
-	return current_user
+	return User(user_id, email, request.form["name"], password_hash)
 
 
 def _verify_password(stored_hash: str, password: str) -> bool:
@@ -124,21 +94,15 @@ def _verify_password(stored_hash: str, password: str) -> bool:
 	return check_password_hash(stored_hash, password)
 
 
-@connect
-def login_user(cursor, request):
+def login_user(request):
 	"""Attempts to login user to the website."""
-	query = 'SELECT * FROM "Persons" WHERE "email" = ?;'
-	cursor.execute(query, (request.form["email"],))
-	user_info = cursor.fetchone()
+	with session_scope() as session:
+		person = session.scalars(select(Persons).where(Persons.email == request.form["email"])).first()
 
-	if user_info is None:
+	if person is None:
 		raise Exception("This email does not exist. Please try again.")
 
-	user_info = dict(user_info)
-	if not _verify_password(user_info["password"], request.form["pass"]):
+	if not _verify_password(person.password, request.form["pass"]):
 		raise Exception("The entered password does not match the email. Please try again.")
 
-	current_user = User(
-		user_info["id"], user_info["email"], user_info["name"], user_info["password"]
-	)
-	return current_user
+	return _to_user(person)
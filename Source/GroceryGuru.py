@@ -19,7 +19,7 @@ import werkzeug
 import database
 from database import (
 	create_user, create_list, create_ingredient, create_list_ingredient, get_user_count,
-	get_or_create_list, get_or_create_ingredient, create_inventory_ingredient,
+	get_or_create_list, get_or_create_ingredient, suggest_ingredients, add_ingredients_to_list, create_inventory_ingredient,
 	find_matching_inventory_item, add_inventory_count,
 	update_inventory_ingredient, soft_delete_inventory_ingredient,
 	update_list_ingredient, soft_delete_list_ingredient,
@@ -32,6 +32,8 @@ from database import (
 	dismiss_notification,
 )
 import recipe_extractor
+import pantry_matcher
+from database import bulk_import, import_jobs, recipe_ranking, result_sets
 
 
 app = Flask(__name__, static_url_path="/static")
@@ -41,6 +43,9 @@ login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = "login"
 
+# One database unit of work per request: helpers share a Session that is committed at teardown
+app.teardown_appcontext(database.close_request_session)
+
 
 @app.context_processor
 def inject_current_year():
@@ -48,30 +53,13 @@ def inject_current_year():
 
 
 @app.context_processor
-def inject_notifications():
-	"""Inject pending friend request count, recipe shares, and total for bell icon (logged-in users only)."""
+def inject_navbar():
+	"""Inject the bell count and the nav dropdown lists (logged-in users only) with one query.
+	The notification rows themselves are only loaded by the notifications page."""
 	if current_user.is_authenticated:
-		pending = database.Select.get_pending_friend_requests_for_user(current_user.id)
-		recipe_shares = database.Select.get_recipe_shares_for_recipient(current_user.id)
-		total = len(pending) + len(recipe_shares)
-		return {
-			"notification_count": total,
-			"pending_friend_requests": pending,
-			"recipe_share_notifications": recipe_shares,
-		}
-	return {"notification_count": 0, "pending_friend_requests": [], "recipe_share_notifications": []}
-
-
-@app.context_processor
-def inject_user_lists():
-	"""Inject user lists for nav dropdown (Grocery list first, then custom lists alphabetically)."""
-	if current_user.is_authenticated:
-		lists = database.Select.get_Lists_by_Persons_id(current_user.id)
-		grocery = next((l for l in lists if l.name == "Grocery list"), None)
-		custom = sorted([l for l in lists if l.name != "Grocery list"], key=lambda l: l.name)
-		ordered = ([grocery] if grocery else []) + custom
-		return {"user_lists": ordered}
-	return {"user_lists": []}
+		notification_count, user_lists = database.Select.get_navbar_summary(current_user.id)
+		return {"notification_count": notification_count, "user_lists": user_lists}
+	return {"notification_count": 0, "user_lists": []}
 
 
 @app.template_filter("date_str")
@@ -85,7 +73,7 @@ def date_str_filter(d):
 @login_manager.user_loader
 def load_user(user_id):
 	try:
-		active_user = Functions.get_user_by_id(user_id)
+		active_user = Functions.get_cached_user(user_id)
 	except Exception as error:
 		traceback.print_exc()							###########
 		print(error)									###########
@@ -473,6 +461,15 @@ def add_list_item(user_id: int = None):
 	return render_template("AddListItem.j2", user_id=user_id, dest_options=dest_options, default_destination=default_destination, current_page="add_items")
 
 
+@app.route("/Ingredients/Suggest")
+@login_required
+def suggest_ingredients_route():
+	"""Existing ingredients the typed name probably means, for the add-item forms: ?q=name."""
+	query = request.args.get("q", "").strip()
+	suggestions = suggest_ingredients(query, current_user.id) if len(query) >= 2 else []
+	return jsonify({"suggestions": [{"id": s.id, "name": s.name, "score": round(s.score, 3)} for s in suggestions]})
+
+
 # ————————————————————————————————— Scan pantry item (barcode) ———————————————————————————————— #
 @app.route("/ScanPantryItem", methods=["GET"])
 @login_required
@@ -530,51 +527,18 @@ def add_pantry_item():
 
 # ————————————————————————————————— Recipes ———————————————————————————————— #
 RECIPE_CATEGORIES = ["Desserts", "Dinners", "Breakfasts"]
+# Find Recipe ranking: "stored" reads RecipePantryScore; "matrix" scores with the per-user
+# incidence matrix in database/recipe_matrix.py
+RANKING_BACKEND = os.getenv("GROCERY_GURU_RANKING_BACKEND", "stored")
+# Recipe lines with no exact pantry match still count as owned when they contain this share of a
+# pantry name's trigrams ("breast of chicken" for "chicken breast"); 0 turns fuzzy flags off
+FUZZY_MATCH_THRESHOLD = float(os.getenv("GROCERY_GURU_FUZZY_MATCH_THRESHOLD", "0.75"))
 
 
 def _get_pantry_ingredient_names(user_id: int):
-	"""Return set of lowercase pantry ingredient names for matching."""
+	"""Return set of canonical pantry ingredient names for matching."""
 	rows = database.Select.get_InventoryIngredients_by_Persons_id(user_id)
-	return {ing.name.strip().lower() for _, ing in rows if ing and ing.name}
-
-
-def _count_pantry_matches(recipe_ingredients_text: str, pantry_names: set) -> int:
-	"""Count how many pantry ingredients appear in recipe ingredient lines. Each pantry item counted at most once."""
-	lines = [ln.strip() for ln in (recipe_ingredients_text or "").splitlines() if ln.strip()]
-	line_lower = " ".join(lines).lower()
-	matched = 0
-	for name in pantry_names:
-		if len(name) < 2:  # Skip very short names
-			continue
-		if name in line_lower:
-			matched += 1
-	return matched
-
-
-def _recipe_ingredient_in_pantry(ingredient_line: str, pantry_names: set) -> bool:
-	"""Check if a recipe ingredient line matches any pantry ingredient."""
-	line_lower = (ingredient_line or "").strip().lower()
-	if not line_lower:
-		return False
-	for name in pantry_names:
-		if len(name) >= 2 and name in line_lower:
-			return True
-	return False
-
-
-def _get_recipes_sorted_by_pantry_match(user_id: int, category: str = None):
-	"""Return list of (recipe, match_count) sorted by match_count descending. category can be '' for Others, None for Any."""
-	recipes = database.Select.get_Recipes_by_Persons_id(user_id)
-	if category and str(category).strip():
-		cat = category.strip()
-		if cat.lower() == "others":
-			recipes = [r for r in recipes if not (r.category or "").strip()]
-		else:
-			recipes = [r for r in recipes if (r.category or "").strip() == cat]
-	pantry_names = _get_pantry_ingredient_names(user_id)
-	scored = [(r, _count_pantry_matches(r.ingredients or "", pantry_names)) for r in recipes]
-	scored.sort(key=lambda x: -x[1])  # Descending by match count
-	return scored
+	return {ing.canonical_name for _, ing in rows if ing and ing.canonical_name}
 
 
 @app.route("/Recipes")
@@ -606,59 +570,12 @@ def add_recipe():
 		steps = request.form.get("steps", "")
 		special_notes = request.form.get("special_notes", "")
 		category = request.form.get("category", "").strip()
-		# Import from URL when URL is provided and no manual title (user expects auto-import)
-		if source_url and not title:
-			try:
-				from urllib.parse import urlparse
-				parsed = urlparse(source_url)
-				if not parsed.scheme:
-					source_url = "https://" + source_url
-				data = recipe_extractor.extract_recipe_from_url(source_url)
-				if data:
-					rid = create_recipe(
-						title=data["title"],
-						Persons_id=current_user.id,
-						ingredients=data.get("ingredients", ""),
-						steps=data.get("steps", ""),
-						special_notes=data.get("special_notes", ""),
-						source_url=data.get("source_url", source_url),
-						category=data.get("category", ""),
-						image_url=data.get("image_url", ""),
-					)
-					return redirect(url_for("recipe_detail", recipe_id=rid))
-				# Extraction failed: show form with error and pre-filled URL
-				return render_template(
-					"AddRecipe.j2",
-					error="Could not extract recipe from this URL. Add it manually below.",
-					source_url=source_url,
-					title="",
-					ingredients="",
-					steps="",
-					special_notes="",
-					category="",
-					image_url="",
-					current_page="recipes",
-				)
-			except Exception as e:
-				traceback.print_exc()
-				return render_template(
-					"AddRecipe.j2",
-					error=f"Could not fetch URL: {e}.",
-					source_url=source_url,
-					title="",
-					ingredients="",
-					steps="",
-					special_notes="",
-					category="",
-					image_url="",
-					current_page="recipes",
-				)
-		# Manual add
 		image_url = request.form.get("image_url", "").strip()
-		if not title:
+
+		def form_error(error):
 			return render_template(
 				"AddRecipe.j2",
-				error="Recipe title is required.",
+				error=error,
 				source_url=source_url,
 				ingredients=ingredients,
 				steps=steps,
@@ -667,6 +584,21 @@ def add_recipe():
 				image_url=image_url or "",
 				current_page="recipes",
 			), 400
+
+		# Import from URL when URL is provided and no manual title (user expects auto-import):
+		# queued for a background worker; the job page polls until the recipe exists
+		if source_url and not title:
+			if "://" not in source_url:
+				source_url = "https://" + source_url
+			try:
+				job_id = import_jobs.submit(current_user.id, source_url)
+			except ValueError as e:
+				return form_error(str(e))
+			import_jobs.workers.start()
+			return redirect(url_for("recipe_import", job_id=job_id))
+		# Manual add
+		if not title:
+			return form_error("Recipe title is required.")
 		rid = create_recipe(
 			title=title,
 			Persons_id=current_user.id,
@@ -678,7 +610,83 @@ def add_recipe():
 			image_url=image_url or None,
 		)
 		return redirect(url_for("recipe_detail", recipe_id=rid))
-	return render_template("AddRecipe.j2", current_page="recipes")
+	return render_template("AddRecipe.j2", source_url=request.args.get("source_url", ""), current_page="recipes")
+
+
+def _import_job_json(job):
+	return {
+		"id": job.id,
+		"status": job.status,
+		"attempts": job.attempts,
+		"error": job.error,
+		"recipe_url": url_for("recipe_detail", recipe_id=job.recipe_id) if job.recipe_id else None,
+	}
+
+
+@app.route("/Recipes/Import/<int:job_id>")
+@login_required
+def recipe_import(job_id):
+	"""Progress of a URL import: polls the status endpoint, then opens the recipe."""
+	job = import_jobs.get(job_id, current_user.id)
+	if job is None:
+		abort(404)
+	if job.status == "done":
+		return redirect(url_for("recipe_detail", recipe_id=job.recipe_id))
+	import_jobs.workers.start()
+	return render_template("ImportRecipe.j2", job=job, current_page="recipes")
+
+
+@app.route("/Recipes/Import/<int:job_id>/Status")
+@login_required
+def recipe_import_status(job_id):
+	"""JSON status of a URL import job, for its page to poll."""
+	job = import_jobs.get(job_id, current_user.id)
+	if job is None:
+		abort(404)
+	if job.status in ("queued", "running"):
+		import_jobs.workers.start()  # e.g. after a restart, for jobs queued before it
+	return jsonify(_import_job_json(job))
+
+
+@app.route("/Recipes/BulkImport", methods=["GET", "POST"])
+@login_required
+def bulk_import_recipes():
+	"""Import many recipe URLs at once (one per line), as a batch of background import jobs."""
+	if request.method == "POST":
+		urls = request.form.get("urls", "")
+		if not urls.strip():
+			return render_template("BulkImport.j2", error="Paste at least one recipe URL.", current_page="recipes"), 400
+		batch = bulk_import.submit(current_user.id, urls.splitlines())
+		import_jobs.workers.start()
+		return redirect(url_for("bulk_import_report", batch=batch))
+	return render_template("BulkImport.j2", max_urls=bulk_import.BULK_IMPORT_MAX_URLS, current_page="recipes")
+
+
+@app.route("/Recipes/BulkImport/<batch>")
+@login_required
+def bulk_import_report(batch):
+	"""Per-URL outcome of a bulk import; polls its status endpoint until every job has finished."""
+	jobs = import_jobs.batch_jobs(batch, current_user.id)
+	if not jobs:
+		abort(404)
+	if any(job.status in ("queued", "running") for job in jobs):
+		import_jobs.workers.start()
+	return render_template("BulkImportReport.j2", batch=batch, jobs=jobs, current_page="recipes")
+
+
+@app.route("/Recipes/BulkImport/<batch>/Status")
+@login_required
+def bulk_import_status(batch):
+	"""JSON status of every job of a bulk import, in input order, with counts per status."""
+	jobs = import_jobs.batch_jobs(batch, current_user.id)
+	if not jobs:
+		abort(404)
+	counts = {status: 0 for status in ("queued", "running", "done", "failed", "skipped")}
+	for job in jobs:
+		counts[job.status] += 1
+	if counts["queued"] or counts["running"]:
+		import_jobs.workers.start()
+	return jsonify({"counts": counts, "jobs": [dict(_import_job_json(job), url=job.url) for job in jobs]})
 
 
 @app.route("/FindRecipe", methods=["GET", "POST"])
@@ -687,54 +695,56 @@ def find_recipe():
 	"""Find a Recipe questionnaire: user selects recipe type, then we find best matches by pantry."""
 	if request.method == "POST":
 		recipe_type = request.form.get("recipe_type", "").strip()
-		scored = _get_recipes_sorted_by_pantry_match(current_user.id, recipe_type or None)
-		recipe_ids = [r.id for r, _ in scored]
-		if not recipe_ids:
+		total, ranked = recipe_ranking.search(current_user.id, recipe_type or None, result_sets.RESULT_PAGE_SIZE, RANKING_BACKEND)
+		if not ranked:
 			return render_template(
 				"FindRecipe.j2",
 				error="No recipes match your criteria. Add some recipes first, or try a different category.",
 				current_page="recipes",
 			)
-		# Redirect to results with ids and start at index 0
-		ids_param = ",".join(str(i) for i in recipe_ids)
-		return redirect(url_for("find_recipe_results", ids=ids_param, i=0))
+		# Store the first page of the ranking; results pages look up one rank of it by token and
+		# rank further pages only when they are reached
+		token = result_sets.create(
+			current_user.id, [(r.id, r.matched) for r in ranked], _get_destination_options(current_user.id),
+			total=total, category=recipe_type or None,
+		)
+		return redirect(url_for("find_recipe_results", rs=token, i=0))
 	return render_template("FindRecipe.j2", current_page="recipes")
 
 
 @app.route("/FindRecipe/Results")
 @login_required
 def find_recipe_results():
-	"""Display recipe results with circular prev/next browsing. ids=comma-separated recipe IDs, i=current index."""
-	ids_param = request.args.get("ids", "")
-	idx_param = request.args.get("i", "0")
+	"""Display recipe results with circular prev/next browsing. rs=result set token, i=current index."""
 	try:
-		recipe_ids = [int(x.strip()) for x in ids_param.split(",") if x.strip()]
-		idx = int(idx_param)
+		idx = int(request.args.get("i", "0"))
 	except (ValueError, TypeError):
 		return redirect(url_for("find_recipe"))
-	if not recipe_ids:
+	token = request.args.get("rs", "")
+	page = result_sets.get_page(token, current_user.id, idx, RANKING_BACKEND)
+	if page is None:
+		# Unknown or expired result set: start a new search
 		return redirect(url_for("find_recipe"))
-	# Circular index
-	n = len(recipe_ids)
-	idx = ((idx % n) + n) % n
-	recipe_id = recipe_ids[idx]
+	idx, n, recipe_id = page.index, page.total, page.recipe_id
 	recipe = database.Select.get_Recipe_by_id(recipe_id, current_user.id)
 	if recipe is None:
 		return "Recipe not found.", 404
-	ingredients_list = [ln.strip() for ln in (recipe.ingredients or "").splitlines() if ln.strip()]
 	steps_list = [ln.strip() for ln in (recipe.steps or "").splitlines() if ln.strip()]
-	pantry_names = _get_pantry_ingredient_names(current_user.id)
-	match_count = _count_pantry_matches(recipe.ingredients or "", pantry_names)
-	# For each ingredient, mark if in pantry
-	ingredients_with_pantry = [(line, _recipe_ingredient_in_pantry(line, pantry_names)) for line in ingredients_list]
+	ingredient_rows = database.Select.get_recipe_ingredients(recipe_id)
+	flags = page.pantry_flags
+	if flags is None or len(flags) != len(ingredient_rows):
+		# First view of this recipe: one pass marks each ingredient line found in the pantry
+		_, line_matches = pantry_matcher.compile_pantry(_get_pantry_ingredient_names(current_user.id)).match_lines(
+			((row.raw_text, row.name) for row in ingredient_rows), fuzzy=FUZZY_MATCH_THRESHOLD,
+		)
+		flags = "".join("1" if names else "0" for _, names in line_matches)
+		result_sets.save_pantry_flags(token, idx, flags)
+	ingredients_list = [row.raw_text for row in ingredient_rows]
+	ingredients_with_pantry = [(row.raw_text, flag == "1") for row, flag in zip(ingredient_rows, flags)]
 	recipe_images = database.Select.get_recipe_images(recipe_id)
 	recipe_images_data = [{"url": url_for("static", filename=img.file_path), "id": img.id} for img in recipe_images]
 	if not recipe_images_data and getattr(recipe, "image_url", None):
 		recipe_images_data = [{"url": recipe.image_url, "id": None}]
-	dest_options = _get_destination_options(current_user.id)
-	prev_idx = (idx - 1) % n
-	next_idx = (idx + 1) % n
-	ids_param = ",".join(str(rid) for rid in recipe_ids)
 	return render_template(
 		"FindRecipeResults.j2",
 		recipe=recipe,
@@ -742,13 +752,13 @@ def find_recipe_results():
 		ingredients_with_pantry=ingredients_with_pantry,
 		steps_list=steps_list,
 		recipe_images_data=recipe_images_data,
-		match_count=match_count,
-		recipe_ids=recipe_ids,
-		ids_param=ids_param,
+		match_count=page.matched,
+		result_count=n,
+		result_token=token,
 		idx=idx,
-		prev_idx=prev_idx,
-		next_idx=next_idx,
-		dest_options=dest_options,
+		prev_idx=(idx - 1) % n,
+		next_idx=(idx + 1) % n,
+		dest_options=page.destinations,
 		current_page="recipes",
 	)
 
@@ -766,21 +776,14 @@ def find_recipe_add_to_list():
 	recipe = database.Select.get_Recipe_by_id(recipe_id, current_user.id)
 	if recipe is None:
 		return "Recipe not found.", 404
-	ingredients_list = [ln.strip() for ln in (recipe.ingredients or "").splitlines() if ln.strip()]
-	pantry_names = _get_pantry_ingredient_names(current_user.id)
+	ingredient_rows = database.Select.get_recipe_ingredients(recipe.id)
+	_, line_matches = pantry_matcher.compile_pantry(_get_pantry_ingredient_names(current_user.id)).match_lines(
+		((row.raw_text, row.name) for row in ingredient_rows), fuzzy=FUZZY_MATCH_THRESHOLD,
+	)
 	user_id = current_user.id
-	now = datetime.utcnow()
-	added = 0
-	for line in ingredients_list:
-		if not line:
-			continue
-		in_pantry = _recipe_ingredient_in_pantry(line, pantry_names)
-		if not include_owned and in_pantry:
-			continue
-		ingredient_id = get_or_create_ingredient(line, user_id)
-		list_id = get_or_create_list(destination, user_id)
-		create_list_ingredient(1, now, ingredient_id, list_id)
-		added += 1
+	lines = [line for line, names in line_matches if line and (include_owned or not names)]
+	# The list keeps the recipe's wording (with its amount), so match the exact lines
+	add_ingredients_to_list(lines, destination, user_id, date_added=datetime.utcnow(), canonical=False)
 	return redirect(url_for("display_ingredients", user_id=user_id, list_name=destination))
 
 
@@ -841,7 +844,7 @@ def recipe_detail(recipe_id: int):
 	recipe = database.Select.get_Recipe_by_id(recipe_id, current_user.id)
 	if recipe is None:
 		return redirect(url_for("recipes_index"))
-	ingredients_list = [ln.strip() for ln in (recipe.ingredients or "").splitlines() if ln.strip()]
+	ingredients_list = [row.raw_text for row in database.Select.get_recipe_ingredients(recipe_id)]
 	steps_list = [ln.strip() for ln in (recipe.steps or "").splitlines() if ln.strip()]
 	avg_rating = database.Select.get_recipe_average_rating(recipe_id)
 	rating_count = database.Select.get_recipe_rating_count(recipe_id)
@@ -997,13 +1000,34 @@ def unfriend_route(friend_id: int):
 	return redirect(url_for("friends_list"))
 
 
+NOTIFICATIONS_PAGE_SIZE = 20
+
+
+def _encode_feed_cursor(cursor) -> str | None:
+	"""(created_at, kind, id) -> "created_at|kind|id" for the ?before= query argument."""
+	return "|".join(str(part) for part in cursor) if cursor else None
+
+
+def _decode_feed_cursor(value: str):
+	"""Inverse of _encode_feed_cursor; None (first page) for a missing or malformed value."""
+	try:
+		created_at, kind, notification_id = (value or "").rsplit("|", 2)
+		return (created_at, kind, int(notification_id))
+	except ValueError:
+		return None
+
+
 @app.route("/Friends/Notifications")
 @login_required
 def notifications():
-	"""Notifications page: pending friend requests and recipe shares."""
-	pending = database.Select.get_pending_friend_requests_for_user(current_user.id)
-	recipe_shares = database.Select.get_recipe_shares_for_recipient(current_user.id)
-	return render_template("Notifications.j2", pending_requests=pending, recipe_shares=recipe_shares)
+	"""Notifications page: pending friend requests and recipe shares, newest first, one page at a time."""
+	before = _decode_feed_cursor(request.args.get("before"))
+	feed, next_cursor = database.Select.get_notification_feed(
+		current_user.id, limit=NOTIFICATIONS_PAGE_SIZE, before=before,
+	)
+	return render_template(
+		"Notifications.j2", feed=feed, next_cursor=_encode_feed_cursor(next_cursor), is_first_page=before is None,
+	)
 
 
 @app.route("/Notifications/Dismiss", methods=["POST"])
@@ -1038,7 +1062,7 @@ def shared_recipe_detail(share_id: int):
 			return redirect(url_for("recipe_detail", recipe_id=new_id))
 		else:
 			flash("Could not add recipe.", "error")
-	ingredients_list = [ln.strip() for ln in (recipe.ingredients or "").splitlines() if ln.strip()]
+	ingredients_list = [row.raw_text for row in database.Select.get_recipe_ingredients(recipe_id)]
 	steps_list = [ln.strip() for ln in (recipe.steps or "").splitlines() if ln.strip()]
 	recipe_images = database.Select.get_recipe_images(recipe_id)
 	recipe_images_data = [{"url": url_for("static", filename=img.file_path), "id": img.id} for img in recipe_images]
@@ -1,36 +1,34 @@
-from sqlalchemy.orm import Session
-
 
 def get_ListIngredients_by_Persons_id(Persons_id: int):
 	"""Return (ListIngredients, Ingredients) tuples for a user's list items."""
-	from database import engine, Persons, Ingredients, ListIngredients
-	with Session(engine) as session:
+	from database import session_scope, Persons, Ingredients, ListIngredients
+	with session_scope() as session:
 		return session.query(ListIngredients, Ingredients).join(
-			Ingredients, getattr(ListIngredients, "Ingredients.id") == Ingredients.id
-		).filter(getattr(Ingredients, "Persons.id") == Persons_id).all()
+			Ingredients, ListIngredients.ingredient_id == Ingredients.id
+		).filter(Ingredients.person_id == Persons_id).all()
 
 
 def get_InventoryIngredients_by_Persons_id(Persons_id: int):
 	"""Return (InventoryIngredients, Ingredients) tuples for a user's pantry items."""
-	from database import engine, Ingredients, InventoryIngredients
-	with Session(engine) as session:
+	from database import session_scope, Ingredients, InventoryIngredients
+	with session_scope() as session:
 		return session.query(InventoryIngredients, Ingredients).join(
-			Ingredients, getattr(InventoryIngredients, "Ingredients.id") == Ingredients.id
+			Ingredients, InventoryIngredients.ingredient_id == Ingredients.id
 		).filter(
-			getattr(Ingredients, "Persons.id") == Persons_id,
+			Ingredients.person_id == Persons_id,
 			InventoryIngredients.is_deleted == False,
 		).all()
 
 
 def get_InventoryIngredient_by_id(inventory_id: int, Persons_id: int):
 	"""Return (InventoryIngredients, Ingredients) for a pantry item if it belongs to the user, else None."""
-	from database import engine, Ingredients, InventoryIngredients
-	with Session(engine) as session:
+	from database import session_scope, Ingredients, InventoryIngredients
+	with session_scope() as session:
 		row = session.query(InventoryIngredients, Ingredients).join(
-			Ingredients, getattr(InventoryIngredients, "Ingredients.id") == Ingredients.id
+			Ingredients, InventoryIngredients.ingredient_id == Ingredients.id
 		).filter(
 			InventoryIngredients.id == inventory_id,
-			getattr(Ingredients, "Persons.id") == Persons_id,
+			Ingredients.person_id == Persons_id,
 			InventoryIngredients.is_deleted == False,
 		).first()
 		return row
@@ -38,46 +36,46 @@ def get_InventoryIngredient_by_id(inventory_id: int, Persons_id: int):
 
 def get_Lists_by_Persons_id(Persons_id: int):
 	"""Return all Lists for a user, ordered by name."""
-	from database import engine, Lists
-	with Session(engine) as session:
+	from database import session_scope, Lists
+	with session_scope() as session:
 		return session.query(Lists).filter(
-			getattr(Lists, "Persons.id") == Persons_id
+			Lists.person_id == Persons_id
 		).order_by(Lists.name).all()
 
 
 def get_List_by_id(list_id: int, Persons_id: int):
 	"""Return a List by id if it belongs to the user, else None."""
-	from database import engine, Lists
-	with Session(engine) as session:
+	from database import session_scope, Lists
+	with session_scope() as session:
 		return session.query(Lists).filter(
 			Lists.id == list_id,
-			getattr(Lists, "Persons.id") == Persons_id,
+			Lists.person_id == Persons_id,
 		).first()
 
 
 def get_ListIngredients_by_Lists_id(list_id: int, Persons_id: int):
 	"""Return (ListIngredients, Ingredients) tuples for a specific list, only if list belongs to user.
 	Excludes soft-deleted list ingredients."""
-	from database import engine, Persons, Ingredients, ListIngredients, Lists
-	with Session(engine) as session:
+	from database import session_scope, Persons, Ingredients, ListIngredients, Lists
+	with session_scope() as session:
 		return session.query(ListIngredients, Ingredients).join(
-			Ingredients, getattr(ListIngredients, "Ingredients.id") == Ingredients.id
-		).join(Lists, getattr(ListIngredients, "Lists.id") == Lists.id).filter(
-			getattr(Lists, "Persons.id") == Persons_id,
-			getattr(ListIngredients, "Lists.id") == list_id,
+			Ingredients, ListIngredients.ingredient_id == Ingredients.id
+		).join(Lists, ListIngredients.list_id == Lists.id).filter(
+			Lists.person_id == Persons_id,
+			ListIngredients.list_id == list_id,
 			ListIngredients.is_deleted == False,
 		).all()
 
 
 def get_ListIngredient_by_id(list_ingredient_id: int, Persons_id: int):
 	"""Return (ListIngredients, Ingredients, Lists) for a list item if it belongs to the user, else None."""
-	from database import engine, Ingredients, ListIngredients, Lists
-	with Session(engine) as session:
+	from database import session_scope, Ingredients, ListIngredients, Lists
+	with session_scope() as session:
 		row = session.query(ListIngredients, Ingredients, Lists).join(
-			Ingredients, getattr(ListIngredients, "Ingredients.id") == Ingredients.id
-		).join(Lists, getattr(ListIngredients, "Lists.id") == Lists.id).filter(
+			Ingredients, ListIngredients.ingredient_id == Ingredients.id
+		).join(Lists, ListIngredients.list_id == Lists.id).filter(
 			ListIngredients.id == list_ingredient_id,
-			getattr(Lists, "Persons.id") == Persons_id,
+			Lists.person_id == Persons_id,
 			ListIngredients.is_deleted == False,
 		).first()
 		return row
@@ -87,25 +85,25 @@ def get_ListIngredient_by_id(list_ingredient_id: int, Persons_id: int):
 
 def get_Recipes_by_Persons_id(Persons_id: int):
 	"""Return all non-deleted recipes for a user, ordered by title."""
-	from database import engine, Recipes
-	with Session(engine) as session:
+	from database import session_scope, Recipes
+	with session_scope() as session:
 		return session.query(Recipes).filter(
-			getattr(Recipes, "Persons.id") == Persons_id,
+			Recipes.person_id == Persons_id,
 			Recipes.is_deleted == False,
 		).order_by(Recipes.title).all()
 
 
 def get_Recipes_by_category(Persons_id: int, category: str):
 	"""Return recipes for a user in the given category. Use 'Others' or '' for uncategorized (NULL/empty)."""
-	from database import engine, Recipes
+	from database import session_scope, Recipes
 	from sqlalchemy import or_
-	with Session(engine) as session:
+	with session_scope() as session:
 		if not category or str(category).strip().lower() == "others":
 			cat_filter = or_(Recipes.category == None, Recipes.category == "")
 		else:
 			cat_filter = Recipes.category == category.strip()
 		return session.query(Recipes).filter(
-			getattr(Recipes, "Persons.id") == Persons_id,
+			Recipes.person_id == Persons_id,
 			Recipes.is_deleted == False,
 			cat_filter,
 		).order_by(Recipes.title).all()
@@ -113,63 +111,110 @@ def get_Recipes_by_category(Persons_id: int, category: str):
 
 def get_Recipe_by_id(recipe_id: int, Persons_id: int):
 	"""Return Recipe for a recipe if it belongs to the user, else None."""
-	from database import engine, Recipes
-	with Session(engine) as session:
+	from database import session_scope, Recipes
+	with session_scope() as session:
 		return session.query(Recipes).filter(
 			Recipes.id == recipe_id,
-			getattr(Recipes, "Persons.id") == Persons_id,
+			Recipes.person_id == Persons_id,
 			Recipes.is_deleted == False,
 		).first()
 
 
+def get_Recipes_ranked_by_pantry_score(Persons_id: int, category: str = None, limit: int = None):
+	"""Return (Recipes, matched) for a user's recipes, most pantry matches first, then by title.
+	category: None or '' for all, 'Others' for uncategorized (NULL/empty), else that category."""
+	from database import session_scope, Recipes, RecipePantryScore
+	from sqlalchemy import or_
+	with session_scope() as session:
+		query = session.query(Recipes, RecipePantryScore.matched).join(
+			RecipePantryScore, RecipePantryScore.recipe_id == Recipes.id,
+		).filter(
+			RecipePantryScore.person_id == Persons_id,
+			Recipes.is_deleted == False,
+		)
+		if category and str(category).strip():
+			if category.strip().lower() == "others":
+				query = query.filter(or_(Recipes.category == None, Recipes.category == ""))
+			else:
+				query = query.filter(Recipes.category == category.strip())
+		query = query.order_by(RecipePantryScore.matched.desc(), Recipes.title)
+		if limit is not None:
+			query = query.limit(limit)
+		return [(recipe, matched) for recipe, matched in query.all()]
+
+
+def get_recipe_ingredients(recipe_id: int):
+	"""Return (position, raw_text, name) rows of a recipe's parsed ingredient lines, in recipe order."""
+	from database import session_scope, RecipeIngredients
+	with session_scope() as session:
+		return session.query(
+			RecipeIngredients.position, RecipeIngredients.raw_text, RecipeIngredients.name,
+		).filter(
+			RecipeIngredients.recipe_id == recipe_id,
+		).order_by(RecipeIngredients.position).all()
+
+
+def get_recipe_ingredient_names_by_Persons_id(Persons_id: int):
+	"""Return (recipe_id, name) for every parsed ingredient line of a user's non-deleted recipes,
+	ordered by recipe and position."""
+	from database import session_scope, Recipes, RecipeIngredients
+	with session_scope() as session:
+		return session.query(RecipeIngredients.recipe_id, RecipeIngredients.name).join(
+			Recipes, Recipes.id == RecipeIngredients.recipe_id,
+		).filter(
+			Recipes.person_id == Persons_id,
+			Recipes.is_deleted == False,
+		).order_by(RecipeIngredients.recipe_id, RecipeIngredients.position).all()
+
+
 def get_recipe_average_rating(recipe_id: int) -> float | None:
 	"""Return average rating (1-5) for a recipe, or None if no ratings."""
-	from database import engine, RecipeRatings
+	from database import session_scope, RecipeRatings
 	from sqlalchemy import func
-	with Session(engine) as session:
+	with session_scope() as session:
 		row = session.query(func.avg(RecipeRatings.rating)).filter(
-			getattr(RecipeRatings, "Recipes.id") == recipe_id,
+			RecipeRatings.recipe_id == recipe_id,
 		).scalar()
 		return round(float(row), 1) if row is not None else None
 
 
 def get_recipe_rating_count(recipe_id: int) -> int:
 	"""Return number of ratings for a recipe."""
-	from database import engine, RecipeRatings
-	with Session(engine) as session:
+	from database import session_scope, RecipeRatings
+	with session_scope() as session:
 		return session.query(RecipeRatings).filter(
-			getattr(RecipeRatings, "Recipes.id") == recipe_id,
+			RecipeRatings.recipe_id == recipe_id,
 		).count()
 
 
 def get_user_recipe_rating(recipe_id: int, Persons_id: int) -> int | None:
 	"""Return the current user's rating (1-5) for a recipe, or None."""
-	from database import engine, RecipeRatings
-	with Session(engine) as session:
+	from database import session_scope, RecipeRatings
+	with session_scope() as session:
 		row = session.query(RecipeRatings).filter(
-			getattr(RecipeRatings, "Recipes.id") == recipe_id,
-			getattr(RecipeRatings, "Persons.id") == Persons_id,
+			RecipeRatings.recipe_id == recipe_id,
+			RecipeRatings.person_id == Persons_id,
 		).first()
 		return row.rating if row else None
 
 
 def get_recipe_comments(recipe_id: int):
 	"""Return (RecipeComments, Persons) tuples for a recipe, newest first."""
-	from database import engine, RecipeComments, Persons
-	with Session(engine) as session:
+	from database import session_scope, RecipeComments, Persons
+	with session_scope() as session:
 		return session.query(RecipeComments, Persons).join(
-			Persons, getattr(RecipeComments, "Persons.id") == Persons.id
+			Persons, RecipeComments.person_id == Persons.id
 		).filter(
-			getattr(RecipeComments, "Recipes.id") == recipe_id,
+			RecipeComments.recipe_id == recipe_id,
 		).order_by(RecipeComments.created_at.desc()).all()
 
 
 def get_recipe_images(recipe_id: int):
 	"""Return RecipeImages for a recipe, ordered by sort_order."""
-	from database import engine, RecipeImages
-	with Session(engine) as session:
+	from database import session_scope, RecipeImages
+	with session_scope() as session:
 		return session.query(RecipeImages).filter(
-			getattr(RecipeImages, "Recipes.id") == recipe_id,
+			RecipeImages.recipe_id == recipe_id,
 		).order_by(RecipeImages.sort_order).all()
 
 
@@ -177,39 +222,30 @@ def get_recipe_images(recipe_id: int):
 
 def get_Person_by_email(email: str):
 	"""Return Persons row for the given email, or None if not found."""
-	from database import engine, Persons
-	with Session(engine) as session:
+	from database import session_scope, Persons
+	with session_scope() as session:
 		return session.query(Persons).filter(Persons.email == (email or "").strip()).first()
 
 
 def get_pending_friend_requests_for_user(addressee_id: int):
 	"""Return pending FriendRequests where addressee_id is the user, excluding dismissed. Each row has requester info."""
-	from database import engine, FriendRequests, Persons, DismissedNotifications
-	with Session(engine) as session:
-		dismissed_ids = {
-			row[0]
-			for row in session.query(DismissedNotifications.notification_id).filter(
-				DismissedNotifications.user_id == addressee_id,
-				DismissedNotifications.notification_type == "friend_request",
-			).all()
-		}
-		query = session.query(FriendRequests, Persons).join(
+	from database import session_scope, FriendRequests, Persons
+	from database.notification_counters import not_dismissed
+	with session_scope() as session:
+		return session.query(FriendRequests, Persons).join(
 			Persons, FriendRequests.requester_id == Persons.id,
 		).filter(
 			FriendRequests.addressee_id == addressee_id,
 			FriendRequests.status == "pending",
-		)
-		if dismissed_ids:
-			query = query.filter(FriendRequests.id.notin_(dismissed_ids))
-		rows = query.order_by(FriendRequests.created_at.desc()).all()
-		return rows
+			not_dismissed(addressee_id, "friend_request", FriendRequests.id),
+		).order_by(FriendRequests.created_at.desc()).all()
 
 
 def get_friends(Persons_id: int):
 	"""Return list of Persons who are friends with the given user. Uses email and name (username) from Persons."""
-	from database import engine, FriendRequests, Persons
+	from database import session_scope, FriendRequests, Persons
 	from sqlalchemy import or_
-	with Session(engine) as session:
+	with session_scope() as session:
 		friend_ids = set()
 		for fr in session.query(FriendRequests).filter(
 			FriendRequests.status == "accepted",
@@ -233,8 +269,8 @@ def get_friend_count(Persons_id: int) -> int:
 
 def get_friend_request_by_id(request_id: int, addressee_id: int):
 	"""Return (FriendRequests, Persons) for a pending request if addressee matches, else None."""
-	from database import engine, FriendRequests, Persons
-	with Session(engine) as session:
+	from database import session_scope, FriendRequests, Persons
+	with session_scope() as session:
 		return session.query(FriendRequests, Persons).join(
 			Persons, FriendRequests.requester_id == Persons.id,
 		).filter(
@@ -248,34 +284,112 @@ def get_friend_request_by_id(request_id: int, addressee_id: int):
 
 def get_recipe_shares_for_recipient(recipient_id: int):
 	"""Return (RecipeShares, Recipes, Persons) for shares received by user, excluding dismissed, newest first."""
-	from database import engine, RecipeShares, Recipes, Persons, DismissedNotifications
-	with Session(engine) as session:
-		dismissed_ids = {
-			row[0]
-			for row in session.query(DismissedNotifications.notification_id).filter(
-				DismissedNotifications.user_id == recipient_id,
-				DismissedNotifications.notification_type == "recipe_share",
-			).all()
-		}
-		query = session.query(RecipeShares, Recipes, Persons).join(
-			Recipes, getattr(RecipeShares, "Recipes.id") == Recipes.id,
+	from database import session_scope, RecipeShares, Recipes, Persons
+	from database.notification_counters import not_dismissed
+	with session_scope() as session:
+		return session.query(RecipeShares, Recipes, Persons).join(
+			Recipes, RecipeShares.recipe_id == Recipes.id,
 		).join(
 			Persons, RecipeShares.sharer_id == Persons.id,
 		).filter(
 			RecipeShares.recipient_id == recipient_id,
 			Recipes.is_deleted == False,
-		)
-		if dismissed_ids:
-			query = query.filter(RecipeShares.id.notin_(dismissed_ids))
-		return query.order_by(RecipeShares.created_at.desc()).all()
+			not_dismissed(recipient_id, "recipe_share", RecipeShares.id),
+		).order_by(RecipeShares.created_at.desc()).all()
+
+
+def get_notification_feed(Persons_id: int, limit: int = 20, before: tuple = None):
+	"""One page of the user's undismissed notifications, newest first: pending friend requests and
+	shares of non-deleted recipes merged by created_at. Returns (items, next_cursor).
+
+	items are rows with kind ("friend_request" or "recipe_share"), id, created_at, actor_id,
+	actor_name, actor_email, message (friend requests) and recipe_title (shares). Pages are keyset
+	based: pass the returned next_cursor, a (created_at, kind, id) tuple, as `before` to get the
+	following page; it is None on the last page. Each branch reads at most limit + 1 rows from its
+	(recipient, created_at) index, so a page costs the same however long the history is."""
+	from database import session_scope, FriendRequests, RecipeShares, Recipes, Persons
+	from database.notification_counters import not_dismissed
+	from sqlalchemy import literal, null, select, tuple_, union_all
+
+	def _page(kind, created_at, id_column, query):
+		"""Apply the cursor and the per-branch limit; SQLite needs a subquery for a LIMIT inside UNION ALL."""
+		if before is not None:
+			query = query.where(tuple_(created_at, literal(kind), id_column) < tuple_(*before))
+		return select(query.order_by(created_at.desc(), id_column.desc()).limit(limit + 1).subquery())
+
+	friend_requests = _page("friend_request", FriendRequests.created_at, FriendRequests.id, select(
+		literal("friend_request").label("kind"),
+		FriendRequests.id,
+		FriendRequests.created_at,
+		Persons.id.label("actor_id"),
+		Persons.name.label("actor_name"),
+		Persons.email.label("actor_email"),
+		FriendRequests.message,
+		null().label("recipe_title"),
+	).join(Persons, FriendRequests.requester_id == Persons.id).where(
+		FriendRequests.addressee_id == Persons_id,
+		FriendRequests.status == "pending",
+		not_dismissed(Persons_id, "friend_request", FriendRequests.id),
+	))
+	recipe_shares = _page("recipe_share", RecipeShares.created_at, RecipeShares.id, select(
+		literal("recipe_share").label("kind"),
+		RecipeShares.id,
+		RecipeShares.created_at,
+		Persons.id.label("actor_id"),
+		Persons.name.label("actor_name"),
+		Persons.email.label("actor_email"),
+		null().label("message"),
+		Recipes.title.label("recipe_title"),
+	).join(Recipes, RecipeShares.recipe_id == Recipes.id).join(
+		Persons, RecipeShares.sharer_id == Persons.id,
+	).where(
+		RecipeShares.recipient_id == Persons_id,
+		Recipes.is_deleted == False,
+		not_dismissed(Persons_id, "recipe_share", RecipeShares.id),
+	))
+	feed = union_all(friend_requests, recipe_shares)
+	stmt = feed.order_by(
+		feed.selected_columns.created_at.desc(), feed.selected_columns.kind.desc(), feed.selected_columns.id.desc(),
+	).limit(limit + 1)
+	with session_scope() as session:
+		rows = session.execute(stmt).all()
+	items = rows[:limit]
+	next_cursor = (items[-1].created_at, items[-1].kind, items[-1].id) if len(rows) > limit else None
+	return items, next_cursor
+
+
+def get_navbar_summary(Persons_id: int):
+	"""Everything the navbar needs, in one statement: (notification_count, lists).
+	notification_count is read from the user's NotificationCounters row (undismissed pending friend
+	requests plus undismissed shares of non-deleted recipes); lists are rows with .id and .name,
+	"Grocery list" first, then by name."""
+	from database import session_scope, Persons, Lists, NotificationCounters
+	from sqlalchemy import case, func, select
+	# Driven by the user's Persons row (a primary-key lookup) outer-joined to their counters (also by
+	# primary key) and their lists, so a user without lists or notifications still gets one row.
+	stmt = select(
+		func.coalesce(NotificationCounters.friend_requests + NotificationCounters.recipe_shares, 0).label("notification_count"),
+		Lists.id,
+		Lists.name,
+	).select_from(Persons).outerjoin(
+		NotificationCounters, NotificationCounters.user_id == Persons.id,
+	).outerjoin(Lists, Lists.person_id == Persons.id).where(
+		Persons.id == Persons_id,
+	).order_by(case((Lists.name == "Grocery list", 0), else_=1), Lists.name)
+	with session_scope() as session:
+		rows = session.execute(stmt).all()
+	if not rows:
+		return 0, []
+	lists = [row for row in rows if row.id is not None]
+	return rows[0].notification_count, lists
 
 
 def get_recipe_share_by_id(share_id: int, recipient_id: int):
 	"""Return (RecipeShares, Recipes, Persons) for a share if recipient matches, else None."""
-	from database import engine, RecipeShares, Recipes, Persons
-	with Session(engine) as session:
+	from database import session_scope, RecipeShares, Recipes, Persons
+	with session_scope() as session:
 		return session.query(RecipeShares, Recipes, Persons).join(
-			Recipes, getattr(RecipeShares, "Recipes.id") == Recipes.id,
+			Recipes, RecipeShares.recipe_id == Recipes.id,
 		).join(
 			Persons, RecipeShares.sharer_id == Persons.id,
 		).filter(
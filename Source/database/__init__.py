@@ -1,251 +1,123 @@
 import os
+import string
+from contextlib import contextmanager
 from pathlib import Path
+from flask import g, has_app_context
 from werkzeug.security import generate_password_hash
-from sqlalchemy import select, insert, update, delete
-from sqlalchemy.ext.automap import automap_base
-from sqlalchemy.orm import Session
-from sqlalchemy import create_engine
+from sqlalchemy import select, insert, update, delete, exists, func
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 
-from database import Select
+import ingredient_names
+from database import Select, migrations
+from database.identity_cache import user_cache
+from database.models import (
+	Base, Persons, Lists, Ingredients, ListIngredients, InventoryIngredients,
+	Recipes, RecipeRatings, RecipeComments, RecipeImages,
+	FriendRequests, RecipeShares, DismissedNotifications, NotificationCounters, RecipeIngredients,
+	RecipePantryScore,
+)
 
 
 # SQLite: use env var or default to Database/grocery_guru.db in project root
-_db_path = os.getenv("GROCERY_GURU_DB_PATH")
-if not _db_path:
-	_project_root = Path(__file__).resolve().parent.parent.parent
-	_db_path = str(_project_root / "Database" / "grocery_guru.db")
+_db_path = migrations.default_db_path()
 _engine_url = f"sqlite:///{_db_path}"
-engine = create_engine(_engine_url, connect_args={"check_same_thread": False})
-
-
-def _init_schema_if_needed():
-	"""Create database file and tables if they don't exist."""
-	import sqlite3
-	Path(_db_path).parent.mkdir(parents=True, exist_ok=True)
-	schema_path = Path(_db_path).parent / "schema.sql"
-	if not schema_path.exists():
-		return
-	with sqlite3.connect(_db_path) as raw:
-		cur = raw.execute(
-			"SELECT name FROM sqlite_master WHERE type='table' AND name='Persons'"
-		)
-		if cur.fetchone() is None:
-			raw.executescript(schema_path.read_text())
-
 
-def _migrate_add_notes_if_needed():
-	"""Add notes column to InventoryIngredients if it doesn't exist."""
-	import sqlite3
-	if not Path(_db_path).exists():
-		return
-	with sqlite3.connect(_db_path) as raw:
-		cur = raw.execute("PRAGMA table_info(InventoryIngredients)")
-		cols = [row[1] for row in cur.fetchall()]
-		if "notes" not in cols:
-			raw.execute("ALTER TABLE InventoryIngredients ADD COLUMN notes TEXT")
-
-
-def _migrate_recipes_table_if_needed():
-	"""Create Recipes table if it doesn't exist."""
-	import sqlite3
-	if not Path(_db_path).exists():
-		return
-	with sqlite3.connect(_db_path) as raw:
-		cur = raw.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='Recipes'")
-		if cur.fetchone() is None:
-			raw.execute("""
-				CREATE TABLE "Recipes" (
-					"id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
-					"title" TEXT NOT NULL,
-					"ingredients" TEXT NOT NULL DEFAULT '',
-					"steps" TEXT NOT NULL DEFAULT '',
-					"special_notes" TEXT DEFAULT '',
-					"source_url" TEXT,
-					"category" TEXT DEFAULT '',
-					"image_url" TEXT,
-					"Persons.id" INTEGER NOT NULL,
-					"is_deleted" INTEGER NOT NULL DEFAULT 0,
-					"date_added" TEXT NOT NULL DEFAULT (datetime('now')),
-					FOREIGN KEY ("Persons.id") REFERENCES "Persons"("id")
-				)
-			""")
+# SQLite tuning applied to every pooled connection. WAL lets readers proceed while a writer holds
+# the lock; busy_timeout makes writers wait instead of failing under several workers.
+SQLITE_PRAGMAS = {
+	"busy_timeout": int(os.getenv("GROCERY_GURU_DB_BUSY_TIMEOUT", "5000")),  # milliseconds
+	"journal_mode": os.getenv("GROCERY_GURU_DB_JOURNAL_MODE", "WAL"),
+	"synchronous": os.getenv("GROCERY_GURU_DB_SYNCHRONOUS", "NORMAL"),
+	"cache_size": int(os.getenv("GROCERY_GURU_DB_CACHE_SIZE", "-20000")),  # negative = KiB
+	"mmap_size": int(os.getenv("GROCERY_GURU_DB_MMAP_SIZE", str(128 * 1024 * 1024))),  # bytes
+	"temp_store": "MEMORY",
+}
 
 
-def _migrate_recipes_image_url_if_needed():
-	"""Add image_url column to Recipes if it doesn't exist."""
-	import sqlite3
-	if not Path(_db_path).exists():
-		return
-	with sqlite3.connect(_db_path) as raw:
-		cur = raw.execute("PRAGMA table_info(Recipes)")
-		cols = [row[1] for row in cur.fetchall()]
-		if "image_url" not in cols:
-			raw.execute("ALTER TABLE Recipes ADD COLUMN image_url TEXT")
+def apply_sqlite_pragmas(dbapi_connection, pragmas: dict = None):
+	"""Run PRAGMA name=value for each entry (default SQLITE_PRAGMAS) on a raw sqlite3 connection."""
+	cursor = dbapi_connection.cursor()
+	try:
+		for name, value in (SQLITE_PRAGMAS if pragmas is None else pragmas).items():
+			cursor.execute(f"PRAGMA {name}={value}")
+	finally:
+		cursor.close()
 
 
-def _migrate_recipe_ratings_if_needed():
-	"""Create RecipeRatings table if it doesn't exist."""
-	import sqlite3
-	if not Path(_db_path).exists():
-		return
-	with sqlite3.connect(_db_path) as raw:
-		cur = raw.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='RecipeRatings'")
-		if cur.fetchone() is None:
-			raw.execute("""
-				CREATE TABLE "RecipeRatings" (
-					"id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
-					"Recipes.id" INTEGER NOT NULL,
-					"Persons.id" INTEGER NOT NULL,
-					"rating" INTEGER NOT NULL CHECK (rating >= 1 AND rating <= 5),
-					"created_at" TEXT NOT NULL DEFAULT (datetime('now')),
-					UNIQUE ("Recipes.id", "Persons.id"),
-					FOREIGN KEY ("Recipes.id") REFERENCES "Recipes"("id"),
-					FOREIGN KEY ("Persons.id") REFERENCES "Persons"("id")
-				)
-			""")
+engine = create_engine(_engine_url, connect_args={"check_same_thread": False})
 
 
-def _migrate_recipe_comments_if_needed():
-	"""Create RecipeComments table if it doesn't exist."""
-	import sqlite3
-	if not Path(_db_path).exists():
-		return
-	with sqlite3.connect(_db_path) as raw:
-		cur = raw.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='RecipeComments'")
-		if cur.fetchone() is None:
-			raw.execute("""
-				CREATE TABLE "RecipeComments" (
-					"id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
-					"Recipes.id" INTEGER NOT NULL,
-					"Persons.id" INTEGER NOT NULL,
-					"body" TEXT NOT NULL,
-					"created_at" TEXT NOT NULL DEFAULT (datetime('now')),
-					FOREIGN KEY ("Recipes.id") REFERENCES "Recipes"("id"),
-					FOREIGN KEY ("Persons.id") REFERENCES "Persons"("id")
-				)
-			""")
+@event.listens_for(engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+	apply_sqlite_pragmas(dbapi_connection)
 
 
-def _migrate_recipe_images_if_needed():
-	"""Create RecipeImages table for multiple images per recipe."""
-	import sqlite3
-	if not Path(_db_path).exists():
-		return
-	with sqlite3.connect(_db_path) as raw:
-		cur = raw.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='RecipeImages'")
-		if cur.fetchone() is None:
-			raw.execute("""
-				CREATE TABLE "RecipeImages" (
-					"id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
-					"Recipes.id" INTEGER NOT NULL,
-					"file_path" TEXT NOT NULL,
-					"sort_order" INTEGER NOT NULL DEFAULT 0,
-					FOREIGN KEY ("Recipes.id") REFERENCES "Recipes"("id")
-				)
-			""")
+# expire_on_commit=False: rows returned by helpers stay readable after their session commits
+SessionLocal = sessionmaker(engine, expire_on_commit=False)
 
 
-def _migrate_friend_requests_if_needed():
-	"""Create FriendRequests table for friend requests and friendships."""
-	import sqlite3
-	if not Path(_db_path).exists():
+@contextmanager
+def session_scope():
+	"""Yield the Session helpers should use.
+	Inside a Flask app context every helper shares one request-scoped Session, committed once by
+	close_request_session at teardown. An unexpected exception leaving a helper rolls back the
+	request's whole unit of work at once, so a view that catches it does not have a half-done write
+	committed at teardown. ValueError is the helpers' validation error: they raise it before writing
+	anything, so it leaves the unit of work as it was and a caller that catches it (sharing with
+	several friends, say) keeps its other writes. Outside an app context (scripts, tests) a
+	short-lived Session is committed when the block exits.
+	"""
+	if has_app_context():
+		session = g.get("db_session")
+		if session is None:
+			session = g.db_session = SessionLocal()
+		try:
+			yield session
+		except ValueError:
+			raise
+		except Exception:
+			session.rollback()
+			raise
 		return
-	with sqlite3.connect(_db_path) as raw:
-		cur = raw.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='FriendRequests'")
-		if cur.fetchone() is None:
-			raw.execute("""
-				CREATE TABLE "FriendRequests" (
-					"id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
-					"requester_id" INTEGER NOT NULL,
-					"addressee_id" INTEGER NOT NULL,
-					"message" TEXT DEFAULT '',
-					"status" TEXT NOT NULL DEFAULT 'pending',
-					"created_at" TEXT NOT NULL DEFAULT (datetime('now')),
-					FOREIGN KEY ("requester_id") REFERENCES "Persons"("id"),
-					FOREIGN KEY ("addressee_id") REFERENCES "Persons"("id"),
-					UNIQUE ("requester_id", "addressee_id")
-				)
-			""")
+	with SessionLocal() as session:
+		yield session
+		session.commit()
 
 
-def _migrate_recipe_shares_if_needed():
-	"""Create RecipeShares table for recipe sharing between friends."""
-	import sqlite3
-	if not Path(_db_path).exists():
+def close_request_session(error=None):
+	"""Teardown hook: commit the request's unit of work, or roll it back if the request failed or
+	its transaction can no longer commit."""
+	session = g.pop("db_session", None)
+	if session is None:
 		return
-	with sqlite3.connect(_db_path) as raw:
-		cur = raw.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='RecipeShares'")
-		if cur.fetchone() is None:
-			raw.execute("""
-				CREATE TABLE "RecipeShares" (
-					"id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
-					"Recipes.id" INTEGER NOT NULL,
-					"sharer_id" INTEGER NOT NULL,
-					"recipient_id" INTEGER NOT NULL,
-					"created_at" TEXT NOT NULL DEFAULT (datetime('now')),
-					FOREIGN KEY ("Recipes.id") REFERENCES "Recipes"("id"),
-					FOREIGN KEY ("sharer_id") REFERENCES "Persons"("id"),
-					FOREIGN KEY ("recipient_id") REFERENCES "Persons"("id")
-				)
-			""")
-
+	try:
+		if error is None and session.is_active:
+			session.commit()
+		else:
+			session.rollback()
+	finally:
+		session.close()
+
+
+# Apply pending schema migrations. With GROCERY_GURU_AUTO_MIGRATE=0 (run
+# `python3 Source/database/migrations.py` before starting workers instead) a stale file is an error.
+if os.getenv("GROCERY_GURU_AUTO_MIGRATE", "1") != "0":
+	migrations.migrate(_db_path)
+else:
+	_schema_version = migrations.current_version(_db_path)
+	if _schema_version < migrations.LATEST_VERSION:
+		raise RuntimeError(
+			f"Database {_db_path} is at schema version {_schema_version}, expected "
+			f"{migrations.LATEST_VERSION}. Run: python3 Source/database/migrations.py"
+		)
 
-def _migrate_dismissed_notifications_if_needed():
-	"""Create DismissedNotifications table for tracking dismissed notifications."""
-	import sqlite3
-	if not Path(_db_path).exists():
-		return
-	with sqlite3.connect(_db_path) as raw:
-		cur = raw.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='DismissedNotifications'")
-		if cur.fetchone() is None:
-			raw.execute("""
-				CREATE TABLE "DismissedNotifications" (
-					"id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
-					"user_id" INTEGER NOT NULL,
-					"notification_type" TEXT NOT NULL,
-					"notification_id" INTEGER NOT NULL,
-					"dismissed_at" TEXT NOT NULL DEFAULT (datetime('now')),
-					UNIQUE ("user_id", "notification_type", "notification_id"),
-					FOREIGN KEY ("user_id") REFERENCES "Persons"("id")
-				)
-			""")
-
-
-_init_schema_if_needed()
-_migrate_add_notes_if_needed()
-_migrate_recipes_table_if_needed()
-_migrate_recipes_image_url_if_needed()
-_migrate_recipe_ratings_if_needed()
-_migrate_recipe_comments_if_needed()
-_migrate_recipe_images_if_needed()
-_migrate_friend_requests_if_needed()
-_migrate_recipe_shares_if_needed()
-_migrate_dismissed_notifications_if_needed()
-
-# reflect the tables
-Base = automap_base()
-Base.prepare(autoload_with=engine)
-
-
-# mapped classes are now created with names by default
-# matching that of the table name.
-Persons = Base.classes.Persons
-Lists = Base.classes.Lists
-Ingredients = Base.classes.Ingredients
-ListIngredients = Base.classes.ListIngredients
-InventoryIngredients = Base.classes.InventoryIngredients
-Recipes = Base.classes.Recipes
-RecipeRatings = Base.classes.RecipeRatings
-RecipeComments = Base.classes.RecipeComments
-RecipeImages = Base.classes.RecipeImages
-FriendRequests = Base.classes.FriendRequests
-RecipeShares = Base.classes.RecipeShares
-DismissedNotifications = Base.classes.DismissedNotifications
 
 
 def get_user_count():
-	with Session(engine) as session:
+	with session_scope() as session:
 		return session.query(Persons.id).count()
 
 
@@ -253,48 +125,44 @@ def create_user(email, name, password):
 	password_hash = generate_password_hash(password, method="pbkdf2:sha256")
 	test_person = Persons(email=email, name=name, password=password_hash)
 	
-	with Session(engine) as session:
+	with session_scope() as session:
 		session.add(test_person)  # insert
-		session.commit()  # commit
-		session.refresh(test_person)
+		session.flush()  # assigns test_person.id
+		user_cache.invalidate_on_commit(session, test_person.id)
 		return test_person.id
 
 
 def create_list(name, Persons_id):
-	# Use Core insert: SQLAlchemy ORM forbids **kwargs with dotted column names like "Persons.id"
-	with Session(engine) as session:
-		stmt = insert(Lists.__table__).values(**{"name": name, "Persons.id": Persons_id})
+	with session_scope() as session:
+		stmt = insert(Lists).values(name=name, person_id=Persons_id)
 		result = session.execute(stmt)
-		session.commit()
 		return result.inserted_primary_key[0]
 
 
 def create_ingredient(name, Persons_id):
-	with Session(engine) as session:
-		stmt = insert(Ingredients.__table__).values(**{"name": name, "Persons.id": Persons_id})
+	with session_scope() as session:
+		stmt = insert(Ingredients).values(name=name, canonical_name=ingredient_names.canonical(name), person_id=Persons_id)
 		result = session.execute(stmt)
-		session.commit()
 		return result.inserted_primary_key[0]
 
 
 def create_list_ingredient(quantity, date_added, Ingredients_id, Lists_id):
-	with Session(engine) as session:
-		stmt = insert(ListIngredients.__table__).values(**{
-			"quantity": quantity,
-			"date_added": date_added,
-			"Ingredients.id": Ingredients_id,
-			"Lists.id": Lists_id,
-		})
+	with session_scope() as session:
+		stmt = insert(ListIngredients).values(
+			quantity=quantity,
+			date_added=date_added,
+			ingredient_id=Ingredients_id,
+			list_id=Lists_id,
+		)
 		result = session.execute(stmt)
-		session.commit()
 		return result.inserted_primary_key[0]
 
 
 def get_or_create_list(name: str, Persons_id: int) -> int:
 	"""Get first list by name for user, or create it. Returns list id."""
-	with Session(engine) as session:
+	with session_scope() as session:
 		stmt = select(Lists).where(
-			getattr(Lists, "Persons.id") == Persons_id,
+			Lists.person_id == Persons_id,
 			Lists.name == name,
 		)
 		row = session.execute(stmt).scalars().first()
@@ -303,35 +171,135 @@ def get_or_create_list(name: str, Persons_id: int) -> int:
 		return create_list(name, Persons_id)
 
 
-def get_or_create_ingredient(name: str, Persons_id: int) -> int:
-	"""Get first non-deleted ingredient by name for user, or create it. Returns ingredient id."""
-	with Session(engine) as session:
-		stmt = select(Ingredients).where(
-			getattr(Ingredients, "Persons.id") == Persons_id,
-			Ingredients.name == name,
-			Ingredients.is_deleted == False,
-		)
-		row = session.execute(stmt).scalars().first()
-		if row:
-			return row.id
-		return create_ingredient(name, Persons_id)
+# SQLite's lower() only folds ASCII; lookups keyed in Python must fold the same way
+_SQL_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def _get_or_create_ingredient_ids(session, names: list[str], Persons_id: int, canonical: bool) -> list[int]:
+	"""Ingredient ids for names, in order, creating the missing ones. At most three statements:
+	  1. one IN query for the user's first live ingredient per canonical name (canonical=True) or
+	     per lower(name) (canonical=False); when every name exists this is the only statement
+	  2. one batched INSERT ... ON CONFLICT DO NOTHING RETURNING for the rest; the partial unique
+	     index on ("Persons.id", lower(name)) turns a concurrent or case-variant insert into a no-op
+	  3. one IN query on lower(name) for the names whose insert was such a no-op
+	"""
+	def lookup(column, keys):
+		found = {}
+		for ingredient_id, key in session.execute(
+			select(Ingredients.id, column).where(
+				Ingredients.person_id == Persons_id,
+				column.in_(keys),
+				Ingredients.is_deleted == False,
+			).order_by(Ingredients.id)
+		):
+			found.setdefault(key, ingredient_id)
+		return found
+
+	def lowered(name):
+		return name.translate(_SQL_LOWER)
+
+	if canonical:
+		keys = {name: ingredient_names.canonical(name) for name in names}
+		by_key = lookup(Ingredients.canonical_name, set(keys.values()) - {""})
+		found = {name: by_key[key] for name, key in keys.items() if key in by_key}
+	else:
+		by_lower = lookup(func.lower(Ingredients.name), {lowered(name) for name in names})
+		found = {name: by_lower[lowered(name)] for name in names if lowered(name) in by_lower}
+	pending = {}  # lower(name) -> first spelling
+	for name in names:
+		if name not in found:
+			pending.setdefault(lowered(name), name)
+	if pending:
+		by_lower = {
+			lowered(name): ingredient_id
+			for ingredient_id, name in session.execute(
+				sqlite_insert(Ingredients).on_conflict_do_nothing().returning(Ingredients.id, Ingredients.name),
+				[
+					{"name": name, "canonical_name": ingredient_names.canonical(name), "person_id": Persons_id}
+					for name in pending.values()
+				],
+			)
+		}
+		conflicted = pending.keys() - by_lower.keys()
+		if conflicted:
+			by_lower.update(lookup(func.lower(Ingredients.name), conflicted))
+		found.update((name, by_lower[lowered(name)]) for name in names if name not in found)
+	return [found[name] for name in names]
+
+
+def get_or_create_ingredient(name: str, Persons_id: int, canonical: bool = True) -> int:
+	"""Get the user's first non-deleted ingredient with the same canonical name ("Eggs" finds "egg"),
+	or create it. canonical=False matches the name case-insensitively instead, for text that is more
+	than the ingredient (a recipe line with its amount). Returns ingredient id."""
+	with session_scope() as session:
+		return _get_or_create_ingredient_ids(session, [name], Persons_id, canonical)[0]
+
+
+def suggest_ingredients(name: str, Persons_id: int, limit: int = 5, threshold: float = None):
+	"""The user's existing ingredients that name probably means ("chiken breast" -> "Chicken breast"),
+	as (id, name, score) Suggestions, most similar first (see database/ingredient_suggestions.py)."""
+	from database import ingredient_suggestions
+	with session_scope() as session:
+		return ingredient_suggestions.suggest(session, Persons_id, name, limit, threshold)
+
+
+def get_or_create_ingredients(names: list[str], Persons_id: int, canonical: bool = True) -> list[int]:
+	"""get_or_create_ingredient for many names in one transaction. Returns ids in the order of names."""
+	if not names:
+		return []
+	with session_scope() as session:
+		return _get_or_create_ingredient_ids(session, list(names), Persons_id, canonical)
+
+
+def add_ingredients_to_list(names: list[str], list_name: str, Persons_id: int, quantity: int = 1, date_added=None, canonical: bool = True) -> list[int]:
+	"""Add one list item per name to the user's list called list_name, in one transaction.
+	The list is resolved (or created) once, the ingredients are resolved as get_or_create_ingredients
+	does and the list items are inserted with one batched insert. Returns the new ListIngredients ids,
+	in order."""
+	names = [name for name in names if name]
+	if not names:
+		return []
+	with session_scope() as session:
+		list_id = session.execute(
+			select(Lists.id).where(Lists.person_id == Persons_id, Lists.name == list_name).order_by(Lists.id)
+		).scalars().first()
+		if list_id is None:
+			list_id = session.execute(insert(Lists).values(name=list_name, person_id=Persons_id)).inserted_primary_key[0]
+		ingredient_ids = _get_or_create_ingredient_ids(session, names, Persons_id, canonical)
+		dated = {"date_added": date_added} if date_added else {}  # else the column default (now)
+		# Executemany with RETURNING runs as batched multi-row INSERTs. The RETURNING order is not
+		# guaranteed, but rowids are assigned in row order, so the sorted ids line up with the rows.
+		return sorted(session.execute(
+			insert(ListIngredients).returning(ListIngredients.id),
+			[
+				{"quantity": quantity, "ingredient_id": ingredient_id, "list_id": list_id, **dated}
+				for ingredient_id in ingredient_ids
+			],
+		).scalars().all())
 
 
 def create_inventory_ingredient(count: int, date_purchased, date_expires, Ingredients_id: int, ListIngredients_id=None):
-	"""Add an item to the user's pantry (inventory)."""
-	with Session(engine) as session:
+	"""Add an item to the user's pantry (inventory). A new pantry name rescores the owner's recipes containing it."""
+	from database import pantry_scores
+	with session_scope() as session:
+		ingredient = session.execute(
+			select(Ingredients.person_id, Ingredients.canonical_name).where(Ingredients.id == Ingredients_id)
+		).first()
+		names_before = pantry_scores.pantry_names(session, ingredient.person_id) if ingredient else set()
 		values = {
 			"count": count,
 			"date_purchased": date_purchased,
 			"date_expires": date_expires if date_expires else None,
-			"Ingredients.id": Ingredients_id,
-			"ListIngredients.id": ListIngredients_id,
+			"ingredient_id": Ingredients_id,
+			"list_ingredient_id": ListIngredients_id,
 			"is_deleted": False,
 		}
-		stmt = insert(InventoryIngredients.__table__).values(**values)
-		result = session.execute(stmt)
-		session.commit()
-		return result.inserted_primary_key[0]
+		stmt = insert(InventoryIngredients).values(**values)
+		inventory_id = session.execute(stmt).inserted_primary_key[0]
+		name = ingredient.canonical_name if ingredient else ""
+		if name and name not in names_before:
+			pantry_scores.pantry_name_added(session, ingredient.person_id, name)
+		return inventory_id
 
 
 def _norm_expires(val):
@@ -350,13 +318,13 @@ def find_matching_inventory_item(Ingredients_id: int, date_expires) -> int | Non
 	Match: both have no expiration, or both have the same expiration date.
 	"""
 	norm_new = _norm_expires(date_expires)
-	with Session(engine) as session:
+	with session_scope() as session:
 		stmt = select(InventoryIngredients).where(
-			getattr(InventoryIngredients, "Ingredients.id") == Ingredients_id,
+			InventoryIngredients.ingredient_id == Ingredients_id,
 			InventoryIngredients.is_deleted == False,
 		)
 		for inv in session.scalars(stmt):
-			norm_existing = _norm_expires(getattr(inv, "date_expires", None))
+			norm_existing = _norm_expires(inv.date_expires)
 			if norm_existing == norm_new:
 				return inv.id
 	return None
@@ -364,58 +332,56 @@ def find_matching_inventory_item(Ingredients_id: int, date_expires) -> int | Non
 
 def add_inventory_count(inventory_id: int, add_count: int):
 	"""Add add_count to the existing inventory item's count."""
-	tbl = InventoryIngredients.__table__
-	with Session(engine) as session:
+	with session_scope() as session:
 		stmt = (
-			update(tbl)
-			.where(tbl.c.id == inventory_id)
-			.values(count=tbl.c.count + add_count)
+			update(InventoryIngredients)
+			.where(InventoryIngredients.id == inventory_id)
+			.values(count=InventoryIngredients.count + add_count)
 		)
 		session.execute(stmt)
-		session.commit()
 
 
 def update_inventory_ingredient(inventory_id: int, count: int, date_expires=None, notes: str = None):
 	"""Update an inventory item's fields. Pass None for date_expires or notes to clear them."""
-	tbl = InventoryIngredients.__table__
 	values = {
 		"count": max(1, count),
 		"date_expires": date_expires,
 		"notes": (notes or "").strip() or None,
 	}
-	col_names = {c.name for c in tbl.c}
-	values = {k: v for k, v in values.items() if k in col_names}
-	with Session(engine) as session:
-		stmt = update(tbl).where(tbl.c.id == inventory_id).values(**values)
+	with session_scope() as session:
+		stmt = update(InventoryIngredients).where(InventoryIngredients.id == inventory_id).values(**values)
 		session.execute(stmt)
-		session.commit()
 
 
 def soft_delete_inventory_ingredient(inventory_id: int):
-	"""Soft-delete an inventory item by setting is_deleted=True."""
-	tbl = InventoryIngredients.__table__
-	with Session(engine) as session:
-		stmt = update(tbl).where(tbl.c.id == inventory_id).values(is_deleted=True)
+	"""Soft-delete an inventory item by setting is_deleted=True. If it was the last pantry item with its
+	name, the owner's recipes containing that name are rescored."""
+	from database import pantry_scores
+	with session_scope() as session:
+		ingredient = session.execute(
+			select(Ingredients.person_id, Ingredients.canonical_name).join(
+				InventoryIngredients, InventoryIngredients.ingredient_id == Ingredients.id,
+			).where(InventoryIngredients.id == inventory_id, InventoryIngredients.is_deleted == False)
+		).first()
+		stmt = update(InventoryIngredients).where(InventoryIngredients.id == inventory_id).values(is_deleted=True)
 		session.execute(stmt)
-		session.commit()
+		name = ingredient.canonical_name if ingredient else ""  # None: missing or already deleted
+		if name and name not in pantry_scores.pantry_names(session, ingredient.person_id):
+			pantry_scores.pantry_name_removed(session, ingredient.person_id, name)
 
 
 def update_list_ingredient(list_ingredient_id: int, quantity: int):
 	"""Update a list item's quantity."""
-	tbl = ListIngredients.__table__
-	with Session(engine) as session:
-		stmt = update(tbl).where(tbl.c.id == list_ingredient_id).values(quantity=max(1, quantity))
+	with session_scope() as session:
+		stmt = update(ListIngredients).where(ListIngredients.id == list_ingredient_id).values(quantity=max(1, quantity))
 		session.execute(stmt)
-		session.commit()
 
 
 def soft_delete_list_ingredient(list_ingredient_id: int):
 	"""Soft-delete a list item by setting is_deleted=True."""
-	tbl = ListIngredients.__table__
-	with Session(engine) as session:
-		stmt = update(tbl).where(tbl.c.id == list_ingredient_id).values(is_deleted=True)
+	with session_scope() as session:
+		stmt = update(ListIngredients).where(ListIngredients.id == list_ingredient_id).values(is_deleted=True)
 		session.execute(stmt)
-		session.commit()
 
 
 def update_list(list_id: int, new_name: str, Persons_id: int) -> bool:
@@ -426,10 +392,8 @@ def update_list(list_id: int, new_name: str, Persons_id: int) -> bool:
 	new_name = (new_name or "").strip()
 	if not new_name:
 		return False
-	tbl = Lists.__table__
-	with Session(engine) as session:
-		session.execute(update(tbl).where(tbl.c.id == list_id).values(name=new_name))
-		session.commit()
+	with session_scope() as session:
+		session.execute(update(Lists).where(Lists.id == list_id).values(name=new_name))
 	return True
 
 
@@ -438,40 +402,55 @@ def delete_list(list_id: int, Persons_id: int) -> bool:
 	lst = Select.get_List_by_id(list_id, Persons_id)
 	if not lst:
 		return False
-	li_tbl = ListIngredients.__table__
-	l_tbl = Lists.__table__
-	with Session(engine) as session:
-		session.execute(delete(li_tbl).where(li_tbl.c["Lists.id"] == list_id))
-		session.execute(delete(l_tbl).where(l_tbl.c.id == list_id))
-		session.commit()
+	with session_scope() as session:
+		session.execute(delete(ListIngredients).where(ListIngredients.list_id == list_id))
+		session.execute(delete(Lists).where(Lists.id == list_id))
 	return True
 
 
 # ————————————————————————————————— Recipes ———————————————————————————————— #
 
+def _insert_recipe(session, title: str, Persons_id: int, ingredients: str = "", steps: str = "", special_notes: str = None, source_url: str = None, category: str = None, image_url: str = None) -> int:
+	"""Insert one recipe with its RecipeIngredients rows and RecipePantryScore in session."""
+	from database import pantry_scores, recipe_ingredients, recipe_matrix
+	values = {
+		"title": title,
+		"ingredients": ingredients or "",
+		"steps": steps or "",
+		"special_notes": (special_notes or "").strip() or None,
+		"source_url": (source_url or "").strip() or None,
+		"category": (category or "").strip() or None,
+		"image_url": (image_url or "").strip() or None,
+		"person_id": Persons_id,
+	}
+	recipe_id = session.execute(insert(Recipes).values(**values)).inserted_primary_key[0]
+	recipe_ingredients.replace_lines(session, recipe_id, values["ingredients"])
+	pantry_scores.refresh_recipe(session, recipe_id)
+	recipe_matrix.recipes_changed(session, Persons_id)
+	return recipe_id
+
+
 def create_recipe(title: str, Persons_id: int, ingredients: str = "", steps: str = "", special_notes: str = None, source_url: str = None, category: str = None, image_url: str = None):
-	"""Create a new recipe."""
-	with Session(engine) as session:
-		values = {
-			"title": title,
-			"ingredients": ingredients or "",
-			"steps": steps or "",
-			"special_notes": (special_notes or "").strip() or None,
-			"source_url": (source_url or "").strip() or None,
-			"category": (category or "").strip() or None,
-			"Persons.id": Persons_id,
-		}
-		if hasattr(Recipes.__table__.c, "image_url"):
-			values["image_url"] = (image_url or "").strip() or None
-		stmt = insert(Recipes.__table__).values(**values)
-		result = session.execute(stmt)
-		session.commit()
-		return result.inserted_primary_key[0]
+	"""Create a new recipe with its RecipeIngredients rows and RecipePantryScore."""
+	with session_scope() as session:
+		recipe_id = _insert_recipe(
+			session, title, Persons_id, ingredients, steps, special_notes, source_url, category, image_url,
+		)
+	return recipe_id
+
+
+def create_recipes(Persons_id: int, recipes: list[dict]) -> list[int]:
+	"""Create several recipes (dicts of create_recipe's keyword arguments, without Persons_id) in one
+	transaction. Returns their ids, in order."""
+	with session_scope() as session:
+		recipe_ids = [_insert_recipe(session, Persons_id=Persons_id, **recipe) for recipe in recipes]
+	return recipe_ids
 
 
 def update_recipe(recipe_id: int, title: str = None, ingredients: str = None, steps: str = None, special_notes: str = None, source_url: str = None, category: str = None, image_url: str = None):
-	"""Update recipe fields. Pass None to leave unchanged."""
-	tbl = Recipes.__table__
+	"""Update recipe fields. Pass None to leave unchanged. New ingredients text also replaces the
+	recipe's RecipeIngredients rows and rescores it."""
+	from database import pantry_scores, recipe_ingredients, recipe_matrix
 	updates = {}
 	if title is not None:
 		updates["title"] = title
@@ -485,50 +464,64 @@ def update_recipe(recipe_id: int, title: str = None, ingredients: str = None, st
 		updates["source_url"] = (source_url or "").strip() or None
 	if category is not None:
 		updates["category"] = (category or "").strip() or None
-	if image_url is not None and hasattr(tbl.c, "image_url"):
+	if image_url is not None:
 		updates["image_url"] = (image_url or "").strip() or None
 	if not updates:
 		return
-	with Session(engine) as session:
-		stmt = update(tbl).where(tbl.c.id == recipe_id).values(**updates)
-		session.execute(stmt)
-		session.commit()
+	with session_scope() as session:
+		stmt = update(Recipes).where(Recipes.id == recipe_id).values(**updates)
+		if session.execute(stmt).rowcount and ingredients is not None:
+			recipe_ingredients.replace_lines(session, recipe_id, ingredients)
+			pantry_scores.refresh_recipe(session, recipe_id)
+			recipe_matrix.recipes_changed(session, session.get(Recipes, recipe_id).person_id)
 
 
 def soft_delete_recipe(recipe_id: int):
-	"""Soft-delete a recipe."""
-	tbl = Recipes.__table__
-	with Session(engine) as session:
-		stmt = update(tbl).where(tbl.c.id == recipe_id).values(is_deleted=True)
-		session.execute(stmt)
-		session.commit()
+	"""Soft-delete a recipe. Its undismissed shares stop counting as unread notifications and its
+	RecipePantryScore row is dropped."""
+	from database import notification_counters, pantry_scores, recipe_matrix
+	with session_scope() as session:
+		stmt = update(Recipes).where(Recipes.id == recipe_id, Recipes.is_deleted == False).values(is_deleted=True)
+		if session.execute(stmt).rowcount == 0:
+			return  # missing or already deleted
+		pantry_scores.remove_recipe(session, recipe_id)
+		recipe_matrix.recipes_changed(session, session.get(Recipes, recipe_id).person_id)
+		unread_by_recipient = session.query(RecipeShares.recipient_id, func.count()).filter(
+			RecipeShares.recipe_id == recipe_id,
+			~exists().where(
+				DismissedNotifications.user_id == RecipeShares.recipient_id,
+				DismissedNotifications.notification_type == "recipe_share",
+				DismissedNotifications.notification_id == RecipeShares.id,
+			),
+		).group_by(RecipeShares.recipient_id).all()
+		for recipient_id, n in unread_by_recipient:
+			notification_counters.adjust(session, recipient_id, recipe_shares=-n)
 
 
 def upsert_recipe_rating(recipe_id: int, Persons_id: int, rating: int):
 	"""Set or update a user's rating (1-5) for a recipe. Uses INSERT OR REPLACE for SQLite."""
 	rating = max(1, min(5, int(rating)))
-	with Session(engine) as session:
+	with session_scope() as session:
 		existing = session.execute(
 			select(RecipeRatings).where(
-				getattr(RecipeRatings, "Recipes.id") == recipe_id,
-				getattr(RecipeRatings, "Persons.id") == Persons_id,
+				RecipeRatings.recipe_id == recipe_id,
+				RecipeRatings.person_id == Persons_id,
 			)
 		).scalar_one_or_none()
 		if existing:
 			session.execute(
-				update(RecipeRatings.__table__)
-				.where(getattr(RecipeRatings.__table__.c, "id") == existing.id)
+				update(RecipeRatings)
+				.where(RecipeRatings.id == existing.id)
 				.values(rating=rating)
 			)
 		else:
 			session.execute(
-				insert(RecipeRatings.__table__).values(**{
-					"Recipes.id": recipe_id,
-					"Persons.id": Persons_id,
-					"rating": rating,
-				})
+				insert(RecipeRatings).values(
+					recipe_id=recipe_id,
+					person_id=Persons_id,
+					rating=rating,
+				)
 			)
-		session.commit()
 
 
 def create_recipe_comment(recipe_id: int, Persons_id: int, body: str) -> int:
@@ -536,50 +529,46 @@ def create_recipe_comment(recipe_id: int, Persons_id: int, body: str) -> int:
 	body = (body or "").strip()
 	if not body:
 		raise ValueError("Comment body cannot be empty")
-	with Session(engine) as session:
-		stmt = insert(RecipeComments.__table__).values(**{
-			"Recipes.id": recipe_id,
-			"Persons.id": Persons_id,
-			"body": body,
-		})
+	with session_scope() as session:
+		stmt = insert(RecipeComments).values(
+			recipe_id=recipe_id,
+			person_id=Persons_id,
+			body=body,
+		)
 		result = session.execute(stmt)
-		session.commit()
 		return result.inserted_primary_key[0]
 
 
 def create_recipe_image(recipe_id: int, file_path: str) -> int:
 	"""Add an image to a recipe. file_path is relative to static (e.g. uploads/recipes/xxx.jpg). Returns image id."""
-	with Session(engine) as session:
+	with session_scope() as session:
 		# Get max sort_order
 		from sqlalchemy import func
 		result = session.query(func.coalesce(func.max(RecipeImages.sort_order), -1)).filter(
-			getattr(RecipeImages, "Recipes.id") == recipe_id,
+			RecipeImages.recipe_id == recipe_id,
 		).scalar()
 		max_order = -1 if result is None else result
-		stmt = insert(RecipeImages.__table__).values(**{
-			"Recipes.id": recipe_id,
-			"file_path": file_path,
-			"sort_order": max_order + 1,
-		})
+		stmt = insert(RecipeImages).values(
+			recipe_id=recipe_id,
+			file_path=file_path,
+			sort_order=max_order + 1,
+		)
 		result = session.execute(stmt)
-		session.commit()
 		return result.inserted_primary_key[0]
 
 
 def delete_recipe_image(recipe_id: int, image_id: int) -> bool:
 	"""Delete a recipe image. Returns True if deleted, False if not found or not owned."""
 	from sqlalchemy import delete as sql_delete
-	tbl = RecipeImages.__table__
-	with Session(engine) as session:
+	with session_scope() as session:
 		row = session.query(RecipeImages).filter(
 			RecipeImages.id == image_id,
-			getattr(RecipeImages, "Recipes.id") == recipe_id,
+			RecipeImages.recipe_id == recipe_id,
 		).first()
 		if not row:
 			return False
 		file_path = row.file_path
-		session.execute(sql_delete(tbl).where(tbl.c.id == image_id))
-		session.commit()
+		session.execute(sql_delete(RecipeImages).where(RecipeImages.id == image_id))
 	# Remove file from disk
 	full_path = Path(__file__).resolve().parent / "static" / file_path
 	if full_path.exists():
@@ -594,10 +583,11 @@ def delete_recipe_image(recipe_id: int, image_id: int) -> bool:
 
 def create_friend_request(requester_id: int, addressee_id: int, message: str = "") -> int:
 	"""Create a friend request. Raises ValueError if duplicate or invalid. Returns request id."""
+	from database import notification_counters
 	if requester_id == addressee_id:
 		raise ValueError("You cannot send a friend request to yourself.")
 	message = (message or "").strip()
-	with Session(engine) as session:
+	with session_scope() as session:
 		# Check reverse: if addressee already sent us a pending request, accept it instead
 		reverse = session.query(FriendRequests).filter(
 			FriendRequests.requester_id == addressee_id,
@@ -606,7 +596,7 @@ def create_friend_request(requester_id: int, addressee_id: int, message: str = "
 		).first()
 		if reverse:
 			reverse.status = "accepted"
-			session.commit()
+			_unread_friend_request_resolved(session, reverse)
 			return reverse.id  # Return the request we accepted
 
 		existing = session.query(FriendRequests).filter(
@@ -621,22 +611,30 @@ def create_friend_request(requester_id: int, addressee_id: int, message: str = "
 			# Declined before: allow new request by updating
 			existing.status = "pending"
 			existing.message = message
-			session.commit()
+			if not notification_counters.is_dismissed(session, addressee_id, "friend_request", existing.id):
+				notification_counters.adjust(session, addressee_id, friend_requests=1)
 			return existing.id
-		stmt = insert(FriendRequests.__table__).values(
+		stmt = insert(FriendRequests).values(
 			requester_id=requester_id,
 			addressee_id=addressee_id,
 			message=message,
 			status="pending",
 		)
 		result = session.execute(stmt)
-		session.commit()
+		notification_counters.adjust(session, addressee_id, friend_requests=1)
 		return result.inserted_primary_key[0]
 
 
+def _unread_friend_request_resolved(session, request):
+	"""A pending request was accepted or declined: it no longer counts as unread for its addressee."""
+	from database import notification_counters
+	if not notification_counters.is_dismissed(session, request.addressee_id, "friend_request", request.id):
+		notification_counters.adjust(session, request.addressee_id, friend_requests=-1)
+
+
 def accept_friend_request(request_id: int, addressee_id: int) -> bool:
 	"""Accept a friend request. Addressee must be the recipient. Returns True if accepted."""
-	with Session(engine) as session:
+	with session_scope() as session:
 		row = session.query(FriendRequests).filter(
 			FriendRequests.id == request_id,
 			FriendRequests.addressee_id == addressee_id,
@@ -645,13 +643,13 @@ def accept_friend_request(request_id: int, addressee_id: int) -> bool:
 		if not row:
 			return False
 		row.status = "accepted"
-		session.commit()
+		_unread_friend_request_resolved(session, row)
 		return True
 
 
 def decline_friend_request(request_id: int, addressee_id: int) -> bool:
 	"""Decline a friend request. Returns True if declined."""
-	with Session(engine) as session:
+	with session_scope() as session:
 		row = session.query(FriendRequests).filter(
 			FriendRequests.id == request_id,
 			FriendRequests.addressee_id == addressee_id,
@@ -660,7 +658,7 @@ def decline_friend_request(request_id: int, addressee_id: int) -> bool:
 		if not row:
 			return False
 		row.status = "declined"
-		session.commit()
+		_unread_friend_request_resolved(session, row)
 		return True
 
 
@@ -668,7 +666,7 @@ def unfriend(user_id: int, friend_id: int) -> bool:
 	"""Remove friendship between user_id and friend_id. Returns True if removed."""
 	from sqlalchemy import delete as sql_delete
 	from sqlalchemy import or_, and_
-	with Session(engine) as session:
+	with session_scope() as session:
 		row = session.query(FriendRequests).filter(
 			FriendRequests.status == "accepted",
 			or_(
@@ -678,8 +676,7 @@ def unfriend(user_id: int, friend_id: int) -> bool:
 		).first()
 		if not row:
 			return False
-		session.execute(sql_delete(FriendRequests.__table__).where(FriendRequests.__table__.c.id == row.id))
-		session.commit()
+		session.execute(sql_delete(FriendRequests).where(FriendRequests.id == row.id))
 		return True
 
 
@@ -687,32 +684,33 @@ def unfriend(user_id: int, friend_id: int) -> bool:
 
 def create_recipe_share(recipe_id: int, sharer_id: int, recipient_id: int) -> int:
 	"""Create a recipe share. Returns share id. Raises ValueError if invalid."""
+	from database import notification_counters
 	if sharer_id == recipient_id:
 		raise ValueError("You cannot share a recipe with yourself.")
-	with Session(engine) as session:
+	with session_scope() as session:
 		# Check recipe exists and belongs to sharer
 		recipe = session.query(Recipes).filter(
 			Recipes.id == recipe_id,
-			getattr(Recipes, "Persons.id") == sharer_id,
+			Recipes.person_id == sharer_id,
 			Recipes.is_deleted == False,
 		).first()
 		if not recipe:
 			raise ValueError("Recipe not found.")
 		# Check not already shared with this recipient
 		existing = session.query(RecipeShares).filter(
-			getattr(RecipeShares, "Recipes.id") == recipe_id,
+			RecipeShares.recipe_id == recipe_id,
 			RecipeShares.sharer_id == sharer_id,
 			RecipeShares.recipient_id == recipient_id,
 		).first()
 		if existing:
 			raise ValueError("Recipe already shared with this friend.")
-		stmt = insert(RecipeShares.__table__).values(**{
-			"Recipes.id": recipe_id,
-			"sharer_id": sharer_id,
-			"recipient_id": recipient_id,
-		})
+		stmt = insert(RecipeShares).values(
+			recipe_id=recipe_id,
+			sharer_id=sharer_id,
+			recipient_id=recipient_id,
+		)
 		result = session.execute(stmt)
-		session.commit()
+		notification_counters.adjust(session, recipient_id, recipe_shares=1)
 		return result.inserted_primary_key[0]
 
 
@@ -733,10 +731,11 @@ def share_recipe_with_friends(recipe_id: int, sharer_id: int, recipient_ids: lis
 
 def dismiss_notification(user_id: int, notification_type: str, notification_id: int) -> bool:
 	"""Mark a notification as dismissed. Returns True if recorded (or already dismissed)."""
+	from database import notification_counters
 	notification_type = (notification_type or "").strip().lower()
 	if notification_type not in ("friend_request", "recipe_share"):
 		return False
-	with Session(engine) as session:
+	with session_scope() as session:
 		existing = session.query(DismissedNotifications).filter(
 			DismissedNotifications.user_id == user_id,
 			DismissedNotifications.notification_type == notification_type,
@@ -744,26 +743,44 @@ def dismiss_notification(user_id: int, notification_type: str, notification_id:
 		).first()
 		if existing:
 			return True
-		stmt = insert(DismissedNotifications.__table__).values(**{
-			"user_id": user_id,
-			"notification_type": notification_type,
-			"notification_id": notification_id,
-		})
+		stmt = insert(DismissedNotifications).values(
+			user_id=user_id,
+			notification_type=notification_type,
+			notification_id=notification_id,
+		)
 		session.execute(stmt)
-		session.commit()
+		# Only a notification that was still unread lowers the badge
+		if notification_type == "friend_request":
+			unread = session.query(FriendRequests.id).filter(
+				FriendRequests.id == notification_id,
+				FriendRequests.addressee_id == user_id,
+				FriendRequests.status == "pending",
+			).first()
+			if unread:
+				notification_counters.adjust(session, user_id, friend_requests=-1)
+		else:
+			unread = session.query(RecipeShares.id).join(
+				Recipes, RecipeShares.recipe_id == Recipes.id,
+			).filter(
+				RecipeShares.id == notification_id,
+				RecipeShares.recipient_id == user_id,
+				Recipes.is_deleted == False,
+			).first()
+			if unread:
+				notification_counters.adjust(session, user_id, recipe_shares=-1)
 	return True
 
 
 def add_shared_recipe_to_user(share_id: int, recipient_id: int) -> int | None:
 	"""Copy the shared recipe to the recipient's recipes. Returns new recipe id or None if invalid."""
-	with Session(engine) as session:
+	with session_scope() as session:
 		share = session.query(RecipeShares).filter(
 			RecipeShares.id == share_id,
 			RecipeShares.recipient_id == recipient_id,
 		).first()
 		if not share:
 			return None
-		recipe_id = getattr(share, "Recipes.id")
+		recipe_id = share.recipe_id
 		recipe = session.query(Recipes).filter(
 			Recipes.id == recipe_id,
 			Recipes.is_deleted == False,
@@ -779,11 +796,11 @@ def add_shared_recipe_to_user(share_id: int, recipient_id: int) -> int | None:
 			special_notes=recipe.special_notes or None,
 			source_url=recipe.source_url or None,
 			category=recipe.category or None,
-			image_url=getattr(recipe, "image_url", None) or None,
+			image_url=recipe.image_url or None,
 		)
 		# Copy RecipeImages
 		images = session.query(RecipeImages).filter(
-			getattr(RecipeImages, "Recipes.id") == recipe_id,
+			RecipeImages.recipe_id == recipe_id,
 		).order_by(RecipeImages.sort_order).all()
 		for i, img in enumerate(images):
 			create_recipe_image(new_id, img.file_path)
@@ -792,7 +809,6 @@ def add_shared_recipe_to_user(share_id: int, recipient_id: int) -> int | None:
 
 def update_person_profile(person_id: int, name: str = None, email: str = None) -> bool:
 	"""Update a user's name and/or email. Validates email uniqueness. Returns True on success."""
-	tbl = Persons.__table__
 	updates = {}
 	if name is not None:
 		updates["name"] = (name or "").strip() or None
@@ -800,13 +816,13 @@ def update_person_profile(person_id: int, name: str = None, email: str = None) -
 		updates["email"] = (email or "").strip() or None
 	if not updates:
 		return True
-	with Session(engine) as session:
+	with session_scope() as session:
 		email_val = updates.get("email")
 		if email_val is not None and email_val:
 			existing = session.query(Persons).filter(Persons.email == email_val, Persons.id != person_id).first()
 			if existing:
 				raise ValueError(f"Email '{email_val}' is already in use.")
-		stmt = update(tbl).where(tbl.c.id == person_id).values(**updates)
+		stmt = update(Persons).where(Persons.id == person_id).values(**updates)
 		session.execute(stmt)
-		session.commit()
+		user_cache.invalidate_on_commit(session, person_id)
 	return True
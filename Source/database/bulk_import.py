@@ -0,0 +1,208 @@
+"""
+Bulk "import from URL": many recipe URLs at once (e.g. a bookmarks export), with a report per URL.
+
+The URLs are first planned: blank lines are dropped, "https://" is added where the scheme is
+missing, and a URL is skipped if it is not http(s), if an earlier line or a recipe the user already
+has is the same page (http_cache.normalize_url), or past GROCERY_GURU_BULK_IMPORT_MAX_URLS. Then:
+
+  - the web app (POST /Recipes/BulkImport) queues the rest as one batch of import jobs
+    (database/import_jobs.py), whose report page polls until every job has finished; the import
+    workers bound the concurrency
+  - import_urls, behind the command line, extracts them on a pool of
+    GROCERY_GURU_BULK_IMPORT_CONCURRENCY threads and inserts the recipes
+    GROCERY_GURU_BULK_IMPORT_BATCH at a time, one transaction per batch:
+
+	cd Source
+	python3 -m database.bulk_import --user me@example.com bookmarks.txt   # "-" reads stdin
+
+Both space the requests to one host by http_cache.host_limiter without holding up other sites:
+import_urls submits the URLs round-robin by host, and an import worker whose job's host is not due
+puts the job back and takes the next one.
+
+	GROCERY_GURU_BULK_IMPORT_MAX_URLS    URLs accepted per bulk import (default 500)
+	GROCERY_GURU_BULK_IMPORT_CONCURRENCY pages extracted at once by import_urls (default 8)
+	GROCERY_GURU_BULK_IMPORT_BATCH       recipes inserted per transaction by import_urls (default 25)
+"""
+
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import chain, zip_longest
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+from sqlalchemy import select
+
+import http_cache
+from database.models import Recipes
+
+
+BULK_IMPORT_MAX_URLS = int(os.getenv("GROCERY_GURU_BULK_IMPORT_MAX_URLS", "500"))
+BULK_IMPORT_CONCURRENCY = int(os.getenv("GROCERY_GURU_BULK_IMPORT_CONCURRENCY", "8"))
+BULK_IMPORT_BATCH = int(os.getenv("GROCERY_GURU_BULK_IMPORT_BATCH", "25"))
+NO_RECIPE = "Could not extract a recipe from this URL."
+
+
+class BulkResult(NamedTuple):
+	url: str
+	status: str  # imported, failed, skipped
+	recipe_id: int | None
+	error: str | None  # why it failed or was skipped
+
+
+def _existing_keys(session, user_id: int) -> set[str]:
+	"""normalize_url keys of the source URLs of the user's live recipes (malformed ones left out)."""
+	keys = set()
+	for url in session.scalars(select(Recipes.source_url).where(
+		Recipes.person_id == user_id, Recipes.is_deleted == 0, Recipes.source_url.is_not(None),
+	)):
+		try:
+			keys.add(http_cache.normalize_url(url))
+		except ValueError:
+			pass
+	return keys
+
+
+def plan(urls, user_id: int = None, max_urls: int = None) -> list[tuple[str, str | None]]:
+	"""(url, None) for each URL to import and (url, reason) for each one to skip, in input order."""
+	from database import session_scope
+	max_urls = BULK_IMPORT_MAX_URLS if max_urls is None else max_urls
+	existing = set()
+	if user_id is not None:
+		with session_scope() as session:
+			existing = _existing_keys(session, user_id)
+	seen: dict[str, str] = {}
+	entries = []
+	for line in urls:
+		url = line.strip()
+		if not url:
+			continue
+		if "://" not in url:
+			url = "https://" + url
+		try:
+			parts = urlsplit(url)
+			key = http_cache.normalize_url(url) if parts.scheme in ("http", "https") and parts.hostname else None
+		except ValueError:  # "http://[::1", "example.com:abc/recipe"
+			entries.append((url, "Not a valid URL."))
+			continue
+		if key is None:
+			entries.append((url, "Not an http(s) URL."))
+		elif key in seen:
+			entries.append((url, f"Duplicate of {seen[key]}"))
+		elif key in existing:
+			entries.append((url, "Already in your recipes."))
+		elif len(seen) >= max_urls:
+			entries.append((url, f"Over the limit of {max_urls} URLs per import."))
+		else:
+			seen[key] = url
+			entries.append((url, None))
+	return entries
+
+
+def by_host_round_robin(items: list[tuple[int, str]]) -> list[tuple[int, str]]:
+	"""(index, url) items reordered to take one URL of each host in turn."""
+	hosts: OrderedDict[str, list] = OrderedDict()
+	for item in items:
+		hosts.setdefault(urlsplit(item[1]).hostname, []).append(item)
+	return [item for item in chain.from_iterable(zip_longest(*hosts.values())) if item is not None]
+
+
+def _extract(url: str):
+	import recipe_extractor
+	http_cache.host_limiter.wait(urlsplit(url).hostname)
+	return recipe_extractor.extract_recipe_from_url(url)
+
+
+def import_urls(user_id: int, urls, concurrency: int = None, batch_size: int = None, max_urls: int = None) -> list[BulkResult]:
+	"""Import urls for user_id now; one BulkResult per planned URL, in input order."""
+	from database import create_recipes
+	concurrency = BULK_IMPORT_CONCURRENCY if concurrency is None else concurrency
+	batch_size = BULK_IMPORT_BATCH if batch_size is None else batch_size
+	entries = plan(urls, user_id, max_urls)
+	results: dict[int, BulkResult] = {
+		i: BulkResult(url, "skipped", None, reason) for i, (url, reason) in enumerate(entries) if reason
+	}
+	pending: list[tuple[int, dict]] = []
+
+	def flush():
+		try:
+			recipe_ids = create_recipes(user_id, [_recipe_fields(data) for _, data in pending])
+		except Exception as e:
+			for i, _ in pending:
+				results[i] = BulkResult(entries[i][0], "failed", None, str(e) or type(e).__name__)
+		else:
+			for (i, _), recipe_id in zip(pending, recipe_ids):
+				results[i] = BulkResult(entries[i][0], "imported", recipe_id, None)
+		pending.clear()
+
+	todo = by_host_round_robin([(i, url) for i, (url, reason) in enumerate(entries) if not reason])
+	with ThreadPoolExecutor(max(concurrency, 1), thread_name_prefix="bulk-import") as pool:
+		futures = {pool.submit(_extract, url): (i, url) for i, url in todo}
+		for future in as_completed(futures):
+			i, url = futures[future]
+			try:
+				data = future.result()
+			except Exception as e:
+				results[i] = BulkResult(url, "failed", None, str(e) or type(e).__name__)
+				continue
+			if not data:
+				results[i] = BulkResult(url, "failed", None, NO_RECIPE)
+				continue
+			pending.append((i, data))
+			if len(pending) >= batch_size:
+				flush()
+	if pending:
+		flush()
+	return [results[i] for i in range(len(entries))]
+
+
+def _recipe_fields(data: dict) -> dict:
+	"""create_recipe keyword arguments from an extract_recipe_from_url result."""
+	return {
+		"title": data["title"],
+		"ingredients": data.get("ingredients", ""),
+		"steps": data.get("steps", ""),
+		"special_notes": data.get("special_notes", ""),
+		"source_url": data.get("source_url", ""),
+		"category": data.get("category", ""),
+		"image_url": data.get("image_url", ""),
+	}
+
+
+def submit(user_id: int, urls, max_urls: int = None) -> str:
+	"""Plan urls and queue them as one batch of import jobs. Returns the batch token."""
+	from database import import_jobs
+	return import_jobs.submit_batch(user_id, plan(urls, user_id, max_urls))
+
+
+def main(argv: list[str] = None) -> int:
+	import argparse
+	parser = argparse.ArgumentParser(description="Import recipes from a list of URLs, one per line.")
+	parser.add_argument("--user", required=True, help="Email of the account the recipes are added to")
+	parser.add_argument("files", nargs="*", default=["-"], help="Files of URLs (default: stdin)")
+	parser.add_argument("--concurrency", type=int, default=None, help="Pages extracted at once")
+	args = parser.parse_args(argv)
+	from database import Select
+	person = Select.get_Person_by_email(args.user)
+	if person is None:
+		print(f"no account for {args.user}", file=sys.stderr)
+		return 2
+	lines = []
+	for name in args.files:
+		if name == "-":
+			lines.extend(sys.stdin)
+		else:
+			with open(name, encoding="utf-8") as f:
+				lines.extend(f)
+	results = import_urls(person.id, lines, args.concurrency)
+	for r in results:
+		detail = f"recipe {r.recipe_id}" if r.recipe_id else r.error
+		print(f"{r.status:<9} {r.url}  {detail}")
+	counts = {status: sum(r.status == status for r in results) for status in ("imported", "failed", "skipped")}
+	print(", ".join(f"{n} {status}" for status, n in counts.items()))
+	return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
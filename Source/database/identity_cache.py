@@ -0,0 +1,105 @@
+"""
+In-process LRU + TTL cache of user identities for Flask-Login's user loader.
+
+Entries are slim records (id, email, name) — never the password hash. Writes that change a
+Persons row call `user_cache.invalidate_on_commit(session, person_id)`, which drops the entry
+when the write's transaction ends; a record loaded while an invalidation lands is returned but
+not cached. The TTL bounds staleness for changes made by other processes.
+
+	GROCERY_GURU_USER_CACHE_SIZE  max entries (default 1024; 0 disables the cache)
+	GROCERY_GURU_USER_CACHE_TTL   seconds an entry stays valid (default 60)
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional
+
+from sqlalchemy import event
+
+
+class UserRecord(NamedTuple):
+	id: int
+	email: Optional[str]
+	name: Optional[str]
+
+
+class IdentityCache:
+	"""Thread-safe LRU cache whose entries expire `ttl` seconds after they were loaded."""
+
+	def __init__(self, maxsize: int = 1024, ttl: float = 60.0, clock: Callable[[], float] = time.monotonic):
+		self.maxsize = maxsize
+		self.ttl = ttl
+		self._clock = clock
+		self._entries: OrderedDict[int, tuple[float, UserRecord]] = OrderedDict()
+		self._generations: dict[int, int] = {}  # per user, bumped by invalidate
+		self._lock = threading.Lock()
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+	def get(self, user_id: int, loader: Callable[[int], Optional[UserRecord]]) -> Optional[UserRecord]:
+		"""Return the cached record for user_id, calling loader(user_id) on a miss or expiry.
+		A None from the loader (unknown user) is returned but not cached, and so is a record loaded
+		while user_id was invalidated."""
+		with self._lock:
+			entry = self._entries.get(user_id)
+			if entry is not None and entry[0] > self._clock():
+				self._entries.move_to_end(user_id)
+				self.hits += 1
+				return entry[1]
+			self.misses += 1
+			generation = self._generations.get(user_id, 0)
+
+		# Load outside the lock so a slow query never blocks other requests' hits
+		record = loader(user_id)
+		if record is not None and self.maxsize > 0:
+			with self._lock:
+				if self._generations.get(user_id, 0) != generation:
+					return record
+				self._entries[user_id] = (self._clock() + self.ttl, record)
+				self._entries.move_to_end(user_id)
+				while len(self._entries) > self.maxsize:
+					self._entries.popitem(last=False)
+					self.evictions += 1
+		return record
+
+	def invalidate(self, user_id: int) -> None:
+		user_id = int(user_id)
+		with self._lock:
+			self._entries.pop(user_id, None)
+			self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+	def invalidate_on_commit(self, session, user_id: int) -> None:
+		"""Invalidate user_id once session's transaction commits (or rolls back), so no request
+		caches the row between the write and its commit."""
+		invalidate = lambda _session: self.invalidate(user_id)  # noqa: E731
+		event.listen(session, "after_commit", invalidate, once=True)
+		event.listen(session, "after_rollback", invalidate, once=True)
+
+	def clear(self) -> None:
+		"""Drop every entry and reset the counters."""
+		with self._lock:
+			self._entries.clear()
+			self._generations.clear()
+			self.hits = self.misses = self.evictions = 0
+
+	def stats(self) -> dict:
+		with self._lock:
+			lookups = self.hits + self.misses
+			return {
+				"size": len(self._entries),
+				"maxsize": self.maxsize,
+				"ttl": self.ttl,
+				"hits": self.hits,
+				"misses": self.misses,
+				"evictions": self.evictions,
+				"hit_rate": self.hits / lookups if lookups else 0.0,
+			}
+
+
+user_cache = IdentityCache(
+	maxsize=int(os.getenv("GROCERY_GURU_USER_CACHE_SIZE", "1024")),
+	ttl=float(os.getenv("GROCERY_GURU_USER_CACHE_TTL", "60")),
+)
@@ -0,0 +1,379 @@
+"""
+Background "import from URL" jobs, so a slow recipe site never holds a web worker.
+
+Add Recipe stores a RecipeImportJobs row (status "queued") and answers at once with the job's
+page, which polls its status. Worker threads claim due jobs one at a time, with one UPDATE ...
+RETURNING on the oldest due row, so any number of threads and processes can share the queue.
+A claimed job is "running" until its lease (run_after) runs out. A worker then:
+  - fetches and extracts the page (recipe_extractor) within GROCERY_GURU_IMPORT_TIMEOUT seconds
+  - on success creates the recipe and marks the job "done" with its id in one transaction, which
+    is rolled back if the attempt is no longer this worker's, so a job never imports twice
+  - when the page holds no recipe, or answers a permanent HTTP error such as 404, marks it "failed"
+  - on a network error, a 408/429/5xx answer (after the fetch layer's own retries), another
+    exception or a timeout, queues it again after GROCERY_GURU_IMPORT_RETRY_DELAY * 2**(n-1)
+    seconds, until GROCERY_GURU_IMPORT_ATTEMPTS attempts have failed; a retry refetches the page
+    even though the HTTP cache remembers it failed
+A job whose host was fetched less than GROCERY_GURU_HTTP_HOST_INTERVAL seconds ago is put back
+until its turn (http_cache.host_limiter), without using an attempt, and the worker claims
+another. A job whose worker died is claimed again once its lease has expired. A timed-out extraction
+cannot be interrupted: its thread is abandoned and ends with its HTTP read timeout, and its result
+is discarded. A bulk import (database/bulk_import.py) stores its URLs as one batch of jobs,
+skipped ones included (status "skipped"). Finished jobs are deleted GROCERY_GURU_IMPORT_JOB_TTL seconds after they finish,
+whenever a new job is submitted.
+
+The web app starts GROCERY_GURU_IMPORT_WORKERS threads the first time it queues or polls a job.
+With 0 it starts none, and a separate process runs them instead:
+
+	cd Source
+	python3 -m database.import_jobs --workers 4   # run jobs until interrupted
+	python3 -m database.import_jobs --once        # run every due job, then exit
+
+	GROCERY_GURU_IMPORT_WORKERS      worker threads in the web app (default 2)
+	GROCERY_GURU_IMPORT_ATTEMPTS     attempts before a job fails (default 3)
+	GROCERY_GURU_IMPORT_TIMEOUT      seconds one attempt may take (default 60)
+	GROCERY_GURU_IMPORT_RETRY_DELAY  seconds before the first retry, doubling after each (default 10)
+	GROCERY_GURU_IMPORT_JOB_TTL      seconds finished jobs are kept (default 86400)
+"""
+
+import math
+import os
+import secrets
+import sys
+import threading
+import traceback
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+from sqlalchemy import and_, delete, event, func, insert, select, update
+
+import http_cache
+from database.models import RecipeImportJobs
+
+
+IMPORT_WORKERS = int(os.getenv("GROCERY_GURU_IMPORT_WORKERS", "2"))
+IMPORT_ATTEMPTS = int(os.getenv("GROCERY_GURU_IMPORT_ATTEMPTS", "3"))
+IMPORT_TIMEOUT = float(os.getenv("GROCERY_GURU_IMPORT_TIMEOUT", "60"))
+IMPORT_RETRY_DELAY = float(os.getenv("GROCERY_GURU_IMPORT_RETRY_DELAY", "10"))
+IMPORT_JOB_TTL = int(os.getenv("GROCERY_GURU_IMPORT_JOB_TTL", "86400"))
+POLL_INTERVAL = 1.0  # seconds an idle worker waits for a wake-up before looking for due jobs again
+
+
+class ImportJob(NamedTuple):
+	id: int
+	person_id: int
+	url: str
+	status: str  # queued, running, done, failed, skipped
+	attempts: int
+	recipe_id: int | None
+	error: str | None
+
+
+_COLUMNS = (
+	RecipeImportJobs.id, RecipeImportJobs.person_id, RecipeImportJobs.url, RecipeImportJobs.status,
+	RecipeImportJobs.attempts, RecipeImportJobs.recipe_id, RecipeImportJobs.error,
+)
+
+
+def _now(offset: float = 0):
+	return func.datetime("now", f"{int(offset):+d} seconds") if offset else func.datetime("now")
+
+
+def purge_finished(session) -> int:
+	"""Delete jobs that finished more than IMPORT_JOB_TTL seconds ago. Returns how many."""
+	return session.execute(delete(RecipeImportJobs).where(
+		RecipeImportJobs.status.in_(("done", "failed", "skipped")),
+		RecipeImportJobs.finished_at <= _now(-IMPORT_JOB_TTL),
+	)).rowcount
+
+
+def check_url(url: str) -> None:
+	"""Raise ValueError unless url is an http(s) URL a worker can fetch."""
+	try:
+		parts = urlsplit(url)
+		parts.port  # "example.com:abc" only fails here
+	except ValueError:  # "http://[::1"
+		raise ValueError("Not a valid URL.") from None
+	if parts.scheme not in ("http", "https") or not parts.hostname:
+		raise ValueError("Not an http(s) URL.")
+
+
+def submit(user_id: int, url: str) -> int:
+	"""Queue an import of url for user_id and return the job id. Workers are woken once it is committed.
+	Raises ValueError (see check_url) without queueing anything if url cannot be fetched."""
+	from database import session_scope
+	check_url(url)
+	with session_scope() as session:
+		purge_finished(session)
+		job_id = session.execute(insert(RecipeImportJobs).values(person_id=user_id, url=url)).inserted_primary_key[0]
+		event.listen(session, "after_commit", lambda _session: workers.wake(), once=True)
+	return job_id
+
+
+def submit_batch(user_id: int, entries: list[tuple[str, str | None]]) -> str:
+	"""Queue (url, None) entries and record (url, reason) ones as skipped, in one transaction and in
+	order, as one batch of user_id's. Returns the batch token."""
+	from database import session_scope
+	batch = secrets.token_urlsafe(12)
+	with session_scope() as session:
+		purge_finished(session)
+		if entries:
+			now = session.scalar(select(_now()))
+			session.execute(insert(RecipeImportJobs), [
+				{
+					"person_id": user_id, "url": url, "batch": batch,
+					"status": "skipped" if reason else "queued", "error": reason,
+					"finished_at": now if reason else None,
+				}
+				for url, reason in entries
+			])
+		event.listen(session, "after_commit", lambda _session: workers.wake(), once=True)
+	return batch
+
+
+def batch_jobs(batch: str, user_id: int) -> list[ImportJob]:
+	"""The jobs of one of user_id's batches, in submission order."""
+	from database import session_scope
+	with session_scope() as session:
+		rows = session.execute(select(*_COLUMNS).where(
+			RecipeImportJobs.batch == batch, RecipeImportJobs.person_id == user_id,
+		).order_by(RecipeImportJobs.id)).all()
+	return [ImportJob(*row) for row in rows]
+
+
+def get(job_id: int, user_id: int) -> ImportJob | None:
+	"""The job, if it belongs to user_id."""
+	from database import session_scope
+	with session_scope() as session:
+		row = session.execute(select(*_COLUMNS).where(
+			RecipeImportJobs.id == job_id, RecipeImportJobs.person_id == user_id,
+		)).first()
+	return ImportJob(*row) if row else None
+
+
+def claim(session, timeout: float = None) -> ImportJob | None:
+	"""Mark the oldest due job running (leased for timeout seconds plus a margin) and return it.
+	Due: queued jobs whose retry delay has passed, and running jobs whose lease has expired
+	(their worker died); the latter fail instead once they have used every attempt."""
+	timeout = IMPORT_TIMEOUT if timeout is None else timeout
+	session.execute(update(RecipeImportJobs).where(
+		RecipeImportJobs.status == "running",
+		RecipeImportJobs.run_after <= _now(),
+		RecipeImportJobs.attempts >= IMPORT_ATTEMPTS,
+	).values(status="failed", error="The import did not finish in time.", finished_at=_now())
+		.execution_options(synchronize_session=False))
+	due = select(RecipeImportJobs.id).where(
+		RecipeImportJobs.status.in_(("queued", "running")),
+		RecipeImportJobs.run_after <= _now(),
+	).order_by(RecipeImportJobs.run_after, RecipeImportJobs.id).limit(1).scalar_subquery()
+	row = session.execute(update(RecipeImportJobs).where(RecipeImportJobs.id == due).values(
+		status="running",
+		attempts=RecipeImportJobs.attempts + 1,
+		run_after=_now(timeout + 30),
+	).returning(*_COLUMNS).execution_options(synchronize_session=False)).first()
+	return ImportJob(*row) if row else None
+
+
+def _owned(job: ImportJob):
+	"""Still this worker's attempt: not finished, retried or re-claimed by another worker meanwhile."""
+	return and_(
+		RecipeImportJobs.id == job.id,
+		RecipeImportJobs.status == "running",
+		RecipeImportJobs.attempts == job.attempts,
+	)
+
+
+def _finish(job: ImportJob, recipe_id: int = None, error: str = None) -> bool:
+	from database import session_scope
+	with session_scope() as session:
+		return session.execute(update(RecipeImportJobs).where(_owned(job)).values(
+			status="failed" if error else "done", recipe_id=recipe_id, error=error, finished_at=_now(),
+		).execution_options(synchronize_session=False)).rowcount == 1
+
+
+def _retry_or_fail(job: ImportJob, error: str):
+	from database import session_scope
+	if job.attempts >= IMPORT_ATTEMPTS:
+		_finish(job, error=error)
+		return
+	with session_scope() as session:
+		session.execute(update(RecipeImportJobs).where(_owned(job)).values(
+			status="queued", error=error, run_after=_now(IMPORT_RETRY_DELAY * 2 ** (job.attempts - 1)),
+		).execution_options(synchronize_session=False))
+
+
+def _defer(job: ImportJob, seconds: float):
+	"""Put job back in the queue for seconds, giving back the attempt its claim used."""
+	from database import session_scope
+	with session_scope() as session:
+		session.execute(update(RecipeImportJobs).where(_owned(job)).values(
+			status="queued", attempts=RecipeImportJobs.attempts - 1, run_after=_now(math.ceil(seconds)),
+		).execution_options(synchronize_session=False))
+
+
+def _call_with_timeout(fn, arg, timeout: float):
+	"""fn(arg) in a daemon thread; TimeoutError if it has not returned after timeout seconds."""
+	outcome = {}
+
+	def target():
+		try:
+			outcome["value"] = fn(arg)
+		except BaseException as e:
+			outcome["error"] = e
+
+	thread = threading.Thread(target=target, name="recipe-import", daemon=True)
+	thread.start()
+	thread.join(timeout)
+	if thread.is_alive():
+		raise TimeoutError(f"The import did not finish within {timeout:g} seconds.")
+	if "error" in outcome:
+		raise outcome["error"]
+	return outcome.get("value")
+
+
+def run(job: ImportJob, timeout: float = None):
+	"""Run one claimed attempt of job to its outcome (done, failed or queued for a retry)."""
+	import recipe_extractor
+	try:
+		check_url(job.url)
+	except ValueError as e:
+		_finish(job, error=str(e))
+		return
+	wait = http_cache.host_limiter.acquire(urlsplit(job.url).hostname)
+	if wait > 0:
+		_defer(job, wait)
+		return
+	try:
+		data = _call_with_timeout(
+			lambda url: recipe_extractor.extract_recipe_from_url(url, refetch_failed=job.attempts > 1),
+			job.url, IMPORT_TIMEOUT if timeout is None else timeout,
+		)
+	except http_cache.FetchError as e:
+		if e.transient:
+			_retry_or_fail(job, str(e))
+		else:
+			_finish(job, error=str(e))
+		return
+	except Exception as e:
+		_retry_or_fail(job, str(e) or type(e).__name__)
+		return
+	if not data:
+		_finish(job, error="Could not extract a recipe from this URL.")
+		return
+	try:
+		_complete(job, data)
+	except Exception as e:
+		traceback.print_exc()
+		_retry_or_fail(job, str(e) or type(e).__name__)
+
+
+def _complete(job: ImportJob, data: dict) -> int | None:
+	"""Create the recipe and mark job done in one transaction, or neither if the attempt is no
+	longer this worker's (lease expired and another worker took over). Returns the recipe id."""
+	from database import _insert_recipe, session_scope
+	with session_scope() as session:
+		recipe_id = _insert_recipe(
+			session,
+			title=data["title"],
+			Persons_id=job.person_id,
+			ingredients=data.get("ingredients", ""),
+			steps=data.get("steps", ""),
+			special_notes=data.get("special_notes", ""),
+			source_url=data.get("source_url", job.url),
+			category=data.get("category", ""),
+			image_url=data.get("image_url", ""),
+		)
+		done = session.execute(update(RecipeImportJobs).where(_owned(job)).values(
+			status="done", recipe_id=recipe_id, error=None, finished_at=_now(),
+		).execution_options(synchronize_session=False)).rowcount
+		if not done:
+			session.rollback()
+			return None
+	return recipe_id
+
+
+def run_next(timeout: float = None) -> bool:
+	"""Claim and run one due job. Returns False when none was due."""
+	from database import session_scope
+	with session_scope() as session:
+		job = claim(session, timeout)
+	if job is None:
+		return False
+	run(job, timeout)
+	return True
+
+
+def run_pending(timeout: float = None) -> int:
+	"""Run due jobs until none is left. Returns how many attempts ran."""
+	count = 0
+	while run_next(timeout):
+		count += 1
+	return count
+
+
+class ImportWorkers:
+	"""Daemon threads running due jobs; an idle one sleeps until woken or POLL_INTERVAL passes."""
+
+	def __init__(self):
+		self._threads: list[threading.Thread] = []
+		self._wake = threading.Event()
+		self._stop = threading.Event()
+		self._lock = threading.Lock()
+
+	def start(self, count: int = None) -> int:
+		"""Start count threads (default IMPORT_WORKERS) unless they are running. Returns how many run."""
+		count = IMPORT_WORKERS if count is None else count
+		with self._lock:
+			self._threads = [t for t in self._threads if t.is_alive()]
+			if not self._threads and count > 0:
+				self._stop.clear()
+				for n in range(count):
+					thread = threading.Thread(target=self._loop, name=f"recipe-import-worker-{n}", daemon=True)
+					thread.start()
+					self._threads.append(thread)
+			return len(self._threads)
+
+	def wake(self):
+		self._wake.set()
+
+	def stop(self, timeout: float = None):
+		"""Let every thread finish its current job and exit."""
+		self._stop.set()
+		self._wake.set()
+		with self._lock:
+			for thread in self._threads:
+				thread.join(timeout)
+			self._threads = [t for t in self._threads if t.is_alive()]
+
+	def _loop(self):
+		while not self._stop.is_set():
+			try:
+				if run_next():
+					continue
+			except Exception:
+				traceback.print_exc()
+			self._wake.wait(POLL_INTERVAL)
+			self._wake.clear()
+
+
+workers = ImportWorkers()
+
+
+def main(argv: list[str] = None) -> int:
+	import argparse
+	parser = argparse.ArgumentParser(description="Run queued recipe import jobs.")
+	parser.add_argument("--workers", type=int, default=max(IMPORT_WORKERS, 1), help="Worker threads (default GROCERY_GURU_IMPORT_WORKERS)")
+	parser.add_argument("--once", action="store_true", help="Run every due job, then exit")
+	args = parser.parse_args(argv)
+	if args.once:
+		print(f"ran {run_pending()} import attempts")
+		return 0
+	workers.start(args.workers)
+	try:
+		threading.Event().wait()
+	except KeyboardInterrupt:
+		workers.stop()
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Existing-ingredient suggestions: which of a user's ingredients a typed name probably means.
+
+Each user's live ingredients are kept in a trigram_index.TrigramIndex over their canonical names
+(one entry per canonical name, its oldest ingredient), so "chiken breasts" or "breast of chicken"
+suggest the existing "Chicken breast" before a near-duplicate is created. A lookup first reads
+the table's newest id (a rowid lookup) and, only when rows were added since the index last looked,
+appends the user's new ones: the app never renames or deletes Ingredients rows, so that keeps an
+index current without invalidation, also across processes.
+
+	GROCERY_GURU_SUGGEST_CACHE_SIZE  users whose indexes are kept (default 64; 0 disables the cache)
+	GROCERY_GURU_SUGGEST_THRESHOLD   minimum trigram similarity of a suggestion (default 0.5)
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from sqlalchemy import func, select
+
+import ingredient_names
+import trigram_index
+from database.models import Ingredients
+
+
+SUGGEST_THRESHOLD = float(os.getenv("GROCERY_GURU_SUGGEST_THRESHOLD", "0.5"))
+
+
+class Suggestion(NamedTuple):
+	id: int
+	name: str
+	score: float  # trigram similarity of the canonical names, in (0, 1]
+
+
+class _UserIndex:
+	"""One user's index and the newest Ingredients id (of any user) it has looked past."""
+
+	def __init__(self):
+		self.index = trigram_index.TrigramIndex()
+		self.names: dict[int, str] = {}  # ingredient id -> display name
+		self.indexed: set[str] = set()  # canonical names in the index
+		self.last_id = 0
+		self.lock = threading.Lock()
+
+	def extend(self, rows):
+		"""Add (id, name, canonical_name) rows, ordered by id, skipping canonical names already indexed."""
+		for ingredient_id, name, canonical_name in rows:
+			if canonical_name and canonical_name not in self.indexed:
+				self.indexed.add(canonical_name)
+				self.index.add(ingredient_id, canonical_name)
+				self.names[ingredient_id] = name
+
+
+class SuggestionCache:
+	"""Thread-safe LRU of _UserIndex per user."""
+
+	def __init__(self, maxsize: int = 64):
+		self.maxsize = maxsize
+		self._entries: OrderedDict[int, _UserIndex] = OrderedDict()
+		self._lock = threading.Lock()
+		self.hits = 0
+		self.misses = 0
+
+	def entry(self, user_id: int) -> _UserIndex:
+		"""The user's cached index, or a new empty one (kept if the cache is enabled)."""
+		with self._lock:
+			entry = self._entries.get(user_id)
+			if entry is not None:
+				self._entries.move_to_end(user_id)
+				self.hits += 1
+				return entry
+			self.misses += 1
+			entry = _UserIndex()
+			if self.maxsize > 0:
+				self._entries[user_id] = entry
+				while len(self._entries) > self.maxsize:
+					self._entries.popitem(last=False)
+			return entry
+
+	def clear(self) -> None:
+		"""Drop every index and reset the counters."""
+		with self._lock:
+			self._entries.clear()
+			self.hits = self.misses = 0
+
+
+suggestion_cache = SuggestionCache(maxsize=int(os.getenv("GROCERY_GURU_SUGGEST_CACHE_SIZE", "64")))
+
+
+def suggest(session, user_id: int, text: str, limit: int = 5, threshold: float = None) -> list[Suggestion]:
+	"""The user's ingredients whose canonical name is most similar to text's, best first."""
+	key = ingredient_names.canonical(text)
+	if not key:
+		return []
+	entry = suggestion_cache.entry(user_id)
+	with entry.lock:
+		newest = session.scalar(select(func.max(Ingredients.id))) or 0
+		if newest > entry.last_id:
+			entry.extend(session.execute(
+				select(Ingredients.id, Ingredients.name, Ingredients.canonical_name).where(
+					Ingredients.person_id == user_id,
+					Ingredients.is_deleted == False,
+					Ingredients.id > entry.last_id,
+				).order_by(Ingredients.id)
+			))
+			entry.last_id = newest
+		matches = entry.index.search(key, SUGGEST_THRESHOLD if threshold is None else threshold, limit)
+		return [Suggestion(match.key, entry.names[match.key], match.score) for match in matches]
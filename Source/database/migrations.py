@@ -0,0 +1,617 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Numbered schema migrations, tracked in the "schema_version" table.
+
+Importing `database` does a single version check and only applies migrations when the file is
+behind. Deploys can apply them ahead of time, before any worker starts:
+
+	python3 Source/database/migrations.py            # migrate GROCERY_GURU_DB_PATH (or the default db)
+	python3 Source/database/migrations.py --status   # print current and latest version
+
+Each migration runs on a raw sqlite3 connection inside the runner's transaction. Migrations are
+written to be safe on databases created before versioning existed (they check before creating or
+altering), so such files are simply brought up to date and stamped.
+This module only uses the standard library so the CLI never has to import the app.
+"""
+
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+def default_db_path() -> str:
+	"""SQLite path from GROCERY_GURU_DB_PATH, or Database/grocery_guru.db in the project root."""
+	return os.getenv("GROCERY_GURU_DB_PATH") or str(_PROJECT_ROOT / "Database" / "grocery_guru.db")
+
+
+def _table_exists(conn, table: str) -> bool:
+	cur = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,))
+	return cur.fetchone() is not None
+
+
+def _column_exists(conn, table: str, column: str) -> bool:
+	return column in [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+
+
+def _execute_script(conn, script: str):
+	"""Execute a multi-statement script one statement at a time (executescript would COMMIT)."""
+	statement = ""
+	for line in script.splitlines(keepends=True):
+		statement += line
+		if sqlite3.complete_statement(statement):
+			conn.execute(statement)
+			statement = ""
+	if statement.strip() and not statement.strip().startswith("--"):
+		conn.execute(statement)
+
+
+# ————————————————————————————————— Migrations ———————————————————————————————— #
+
+def _0001_base_schema(conn, db_path: str):
+	"""Create the core tables from schema.sql (next to the db file, else Database/schema.sql)."""
+	if _table_exists(conn, "Persons"):
+		return
+	schema_path = Path(db_path).parent / "schema.sql"
+	if not schema_path.exists():
+		schema_path = _PROJECT_ROOT / "Database" / "schema.sql"
+	_execute_script(conn, schema_path.read_text())
+
+
+def _0002_inventory_notes(conn, db_path: str):
+	"""Add notes column to InventoryIngredients."""
+	if not _column_exists(conn, "InventoryIngredients", "notes"):
+		conn.execute("ALTER TABLE InventoryIngredients ADD COLUMN notes TEXT")
+
+
+def _0003_recipes(conn, db_path: str):
+	"""Create Recipes table."""
+	conn.execute("""
+		CREATE TABLE IF NOT EXISTS "Recipes" (
+			"id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+			"title" TEXT NOT NULL,
+			"ingredients" TEXT NOT NULL DEFAULT '',
+			"steps" TEXT NOT NULL DEFAULT '',
+			"special_notes" TEXT DEFAULT '',
+			"source_url" TEXT,
+			"category" TEXT DEFAULT '',
+			"image_url" TEXT,
+			"Persons.id" INTEGER NOT NULL,
+			"is_deleted" INTEGER NOT NULL DEFAULT 0,
+			"date_added" TEXT NOT NULL DEFAULT (datetime('now')),
+			FOREIGN KEY ("Persons.id") REFERENCES "Persons"("id")
+		)
+	""")
+
+
+def _0004_recipes_image_url(conn, db_path: str):
+	"""Add image_url column to Recipes."""
+	if not _column_exists(conn, "Recipes", "image_url"):
+		conn.execute("ALTER TABLE Recipes ADD COLUMN image_url TEXT")
+
+
+def _0005_recipe_ratings(conn, db_path: str):
+	"""Create RecipeRatings table."""
+	conn.execute("""
+		CREATE TABLE IF NOT EXISTS "RecipeRatings" (
+			"id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+			"Recipes.id" INTEGER NOT NULL,
+			"Persons.id" INTEGER NOT NULL,
+			"rating" INTEGER NOT NULL CHECK (rating >= 1 AND rating <= 5),
+			"created_at" TEXT NOT NULL DEFAULT (datetime('now')),
+			UNIQUE ("Recipes.id", "Persons.id"),
+			FOREIGN KEY ("Recipes.id") REFERENCES "Recipes"("id"),
+			FOREIGN KEY ("Persons.id") REFERENCES "Persons"("id")
+		)
+	""")
+
+
+def _0006_recipe_comments(conn, db_path: str):
+	"""Create RecipeComments table."""
+	conn.execute("""
+		CREATE TABLE IF NOT EXISTS "RecipeComments" (
+			"id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+			"Recipes.id" INTEGER NOT NULL,
+			"Persons.id" INTEGER NOT NULL,
+			"body" TEXT NOT NULL,
+			"created_at" TEXT NOT NULL DEFAULT (datetime('now')),
+			FOREIGN KEY ("Recipes.id") REFERENCES "Recipes"("id"),
+			FOREIGN KEY ("Persons.id") REFERENCES "Persons"("id")
+		)
+	""")
+
+
+def _0007_recipe_images(conn, db_path: str):
+	"""Create RecipeImages table for multiple images per recipe."""
+	conn.execute("""
+		CREATE TABLE IF NOT EXISTS "RecipeImages" (
+			"id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+			"Recipes.id" INTEGER NOT NULL,
+			"file_path" TEXT NOT NULL,
+			"sort_order" INTEGER NOT NULL DEFAULT 0,
+			FOREIGN KEY ("Recipes.id") REFERENCES "Recipes"("id")
+		)
+	""")
+
+
+def _0008_friend_requests(conn, db_path: str):
+	"""Create FriendRequests table for friend requests and friendships."""
+	conn.execute("""
+		CREATE TABLE IF NOT EXISTS "FriendRequests" (
+			"id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+			"requester_id" INTEGER NOT NULL,
+			"addressee_id" INTEGER NOT NULL,
+			"message" TEXT DEFAULT '',
+			"status" TEXT NOT NULL DEFAULT 'pending',
+			"created_at" TEXT NOT NULL DEFAULT (datetime('now')),
+			FOREIGN KEY ("requester_id") REFERENCES "Persons"("id"),
+			FOREIGN KEY ("addressee_id") REFERENCES "Persons"("id"),
+			UNIQUE ("requester_id", "addressee_id")
+		)
+	""")
+
+
+def _0009_recipe_shares(conn, db_path: str):
+	"""Create RecipeShares table for recipe sharing between friends."""
+	conn.execute("""
+		CREATE TABLE IF NOT EXISTS "RecipeShares" (
+			"id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+			"Recipes.id" INTEGER NOT NULL,
+			"sharer_id" INTEGER NOT NULL,
+			"recipient_id" INTEGER NOT NULL,
+			"created_at" TEXT NOT NULL DEFAULT (datetime('now')),
+			FOREIGN KEY ("Recipes.id") REFERENCES "Recipes"("id"),
+			FOREIGN KEY ("sharer_id") REFERENCES "Persons"("id"),
+			FOREIGN KEY ("recipient_id") REFERENCES "Persons"("id")
+		)
+	""")
+
+
+def _0010_dismissed_notifications(conn, db_path: str):
+	"""Create DismissedNotifications table for tracking dismissed notifications."""
+	conn.execute("""
+		CREATE TABLE IF NOT EXISTS "DismissedNotifications" (
+			"id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+			"user_id" INTEGER NOT NULL,
+			"notification_type" TEXT NOT NULL,
+			"notification_id" INTEGER NOT NULL,
+			"dismissed_at" TEXT NOT NULL DEFAULT (datetime('now')),
+			UNIQUE ("user_id", "notification_type", "notification_id"),
+			FOREIGN KEY ("user_id") REFERENCES "Persons"("id")
+		)
+	""")
+
+
+# Secondary indexes matched to the lookups in Select.py and the write helpers.
+# FriendRequests(requester_id, ...) and DismissedNotifications(user_id, notification_type, ...)
+# are already covered by their UNIQUE constraints.
+_INDEXES = [
+	('ix_Lists_Persons_id_name', 'Lists', '"Persons.id", "name"'),
+	('ix_Ingredients_Persons_id_name', 'Ingredients', '"Persons.id", "name"'),
+	('ix_ListIngredients_Lists_id', 'ListIngredients', '"Lists.id", "is_deleted"'),
+	('ix_ListIngredients_Ingredients_id', 'ListIngredients', '"Ingredients.id"'),
+	('ix_InventoryIngredients_Ingredients_id', 'InventoryIngredients', '"Ingredients.id", "is_deleted"'),
+	('ix_Recipes_Persons_id_title', 'Recipes', '"Persons.id", "is_deleted", "title"'),
+	('ix_RecipeComments_Recipes_id', 'RecipeComments', '"Recipes.id", "created_at"'),
+	('ix_RecipeImages_Recipes_id', 'RecipeImages', '"Recipes.id", "sort_order"'),
+	('ix_FriendRequests_addressee_status', 'FriendRequests', '"addressee_id", "status"'),
+	('ix_RecipeShares_recipient_id', 'RecipeShares', '"recipient_id", "created_at"'),
+	('ix_RecipeShares_Recipes_id', 'RecipeShares', '"Recipes.id", "sharer_id", "recipient_id"'),
+]
+
+
+def _0011_secondary_indexes(conn, db_path: str):
+	"""Create secondary indexes on foreign keys and common filters."""
+	for name, table, columns in _INDEXES:
+		conn.execute(f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" ({columns})')
+
+
+def _0012_persons_lower_email_index(conn, db_path: str):
+	"""Index lower(email) for the case-insensitive lookup in Functions.get_user_by_email."""
+	conn.execute('CREATE INDEX IF NOT EXISTS "ix_Persons_lower_email" ON "Persons" (lower("email"))')
+
+
+def _0013_notification_counters(conn, db_path: str):
+	"""Create NotificationCounters and fill it from the current pending requests and shares."""
+	conn.execute("""
+		CREATE TABLE IF NOT EXISTS "NotificationCounters" (
+			"user_id" INTEGER NOT NULL PRIMARY KEY,
+			"friend_requests" INTEGER NOT NULL DEFAULT 0,
+			"recipe_shares" INTEGER NOT NULL DEFAULT 0,
+			FOREIGN KEY ("user_id") REFERENCES "Persons"("id")
+		)
+	""")
+	conn.execute("""
+		INSERT OR REPLACE INTO "NotificationCounters" ("user_id", "friend_requests", "recipe_shares")
+		SELECT "user_id", SUM("fr"), SUM("rs") FROM (
+			SELECT fr."addressee_id" AS "user_id", 1 AS "fr", 0 AS "rs"
+			FROM "FriendRequests" fr
+			WHERE fr."status" = 'pending' AND NOT EXISTS (
+				SELECT 1 FROM "DismissedNotifications" d
+				WHERE d."user_id" = fr."addressee_id" AND d."notification_type" = 'friend_request'
+					AND d."notification_id" = fr."id"
+			)
+			UNION ALL
+			SELECT rs."recipient_id", 0, 1
+			FROM "RecipeShares" rs JOIN "Recipes" r ON r."id" = rs."Recipes.id"
+			WHERE r."is_deleted" = 0 AND NOT EXISTS (
+				SELECT 1 FROM "DismissedNotifications" d
+				WHERE d."user_id" = rs."recipient_id" AND d."notification_type" = 'recipe_share'
+					AND d."notification_id" = rs."id"
+			)
+		)
+		GROUP BY "user_id"
+	""")
+
+
+def _0014_friend_requests_feed_index(conn, db_path: str):
+	"""Extend the addressee index with created_at for the keyset-paginated notification feed."""
+	conn.execute('DROP INDEX IF EXISTS "ix_FriendRequests_addressee_status"')
+	conn.execute(
+		'CREATE INDEX IF NOT EXISTS "ix_FriendRequests_addressee_status_created" '
+		'ON "FriendRequests" ("addressee_id", "status", "created_at")'
+	)
+
+
+def _0015_recipe_ingredients(conn, db_path: str):
+	"""Create RecipeIngredients and fill it from Recipes.ingredients (same rules as database.recipe_ingredients.parse)."""
+	conn.execute("""
+		CREATE TABLE IF NOT EXISTS "RecipeIngredients" (
+			"id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+			"Recipes.id" INTEGER NOT NULL,
+			"position" INTEGER NOT NULL,
+			"raw_text" TEXT NOT NULL,
+			"name" TEXT NOT NULL,
+			UNIQUE ("Recipes.id", "position"),
+			FOREIGN KEY ("Recipes.id") REFERENCES "Recipes"("id")
+		)
+	""")
+	conn.execute('CREATE INDEX IF NOT EXISTS "ix_RecipeIngredients_name" ON "RecipeIngredients" ("name")')
+	rows = []
+	for recipe_id, text in conn.execute(
+		'SELECT r."id", r."ingredients" FROM "Recipes" r '
+		'WHERE NOT EXISTS (SELECT 1 FROM "RecipeIngredients" ri WHERE ri."Recipes.id" = r."id")'
+	):
+		lines = [ln.strip() for ln in (text or "").splitlines() if ln.strip()]
+		rows.extend(
+			(recipe_id, position, line, " ".join(line.lower().split()))
+			for position, line in enumerate(lines)
+		)
+	conn.executemany(
+		'INSERT INTO "RecipeIngredients" ("Recipes.id", "position", "raw_text", "name") VALUES (?, ?, ?, ?)',
+		rows,
+	)
+
+
+def _0016_recipe_pantry_score(conn, db_path: str):
+	"""Create RecipePantryScore and score every live recipe (same rules as database.pantry_scores)."""
+	conn.execute("""
+		CREATE TABLE IF NOT EXISTS "RecipePantryScore" (
+			"Recipes.id" INTEGER NOT NULL PRIMARY KEY,
+			"Persons.id" INTEGER NOT NULL,
+			"matched" INTEGER NOT NULL DEFAULT 0,
+			"total" INTEGER NOT NULL DEFAULT 0,
+			FOREIGN KEY ("Recipes.id") REFERENCES "Recipes"("id"),
+			FOREIGN KEY ("Persons.id") REFERENCES "Persons"("id")
+		)
+	""")
+	conn.execute(
+		'CREATE INDEX IF NOT EXISTS "ix_RecipePantryScore_Persons_id_matched" '
+		'ON "RecipePantryScore" ("Persons.id", "matched")'
+	)
+	pantry = {}
+	for person_id, name in conn.execute(
+		'SELECT i."Persons.id", i."name" FROM "InventoryIngredients" v '
+		'JOIN "Ingredients" i ON i."id" = v."Ingredients.id" WHERE v."is_deleted" = 0'
+	):
+		name = (name or "").strip().lower()
+		if len(name) >= 2:
+			pantry.setdefault(person_id, set()).add(name)
+	lines = {}
+	for recipe_id, name in conn.execute('SELECT "Recipes.id", "name" FROM "RecipeIngredients" ORDER BY "Recipes.id", "position"'):
+		lines.setdefault(recipe_id, []).append(name)
+	rows = []
+	for recipe_id, person_id in conn.execute('SELECT "id", "Persons.id" FROM "Recipes" WHERE "is_deleted" = 0'):
+		joined = " ".join(lines.get(recipe_id, ()))
+		matched = sum(1 for name in pantry.get(person_id, ()) if name in joined)
+		rows.append((recipe_id, person_id, matched, len(lines.get(recipe_id, ()))))
+	conn.executemany(
+		'INSERT OR REPLACE INTO "RecipePantryScore" ("Recipes.id", "Persons.id", "matched", "total") VALUES (?, ?, ?, ?)',
+		rows,
+	)
+
+
+def _0017_find_recipe_result_sets(conn, db_path: str):
+	"""Create the token-keyed Find Recipe result sets that replace the ids= query string."""
+	conn.execute("""
+		CREATE TABLE IF NOT EXISTS "FindRecipeResultSets" (
+			"token" TEXT NOT NULL PRIMARY KEY,
+			"Persons.id" INTEGER NOT NULL,
+			"total" INTEGER NOT NULL,
+			"destinations" TEXT NOT NULL DEFAULT '[]',
+			"expires_at" TEXT NOT NULL,
+			FOREIGN KEY ("Persons.id") REFERENCES "Persons"("id")
+		)
+	""")
+	conn.execute(
+		'CREATE INDEX IF NOT EXISTS "ix_FindRecipeResultSets_expires_at" ON "FindRecipeResultSets" ("expires_at")'
+	)
+	conn.execute("""
+		CREATE TABLE IF NOT EXISTS "FindRecipeResultItems" (
+			"token" TEXT NOT NULL,
+			"rank" INTEGER NOT NULL,
+			"Recipes.id" INTEGER NOT NULL,
+			"matched" INTEGER NOT NULL,
+			"pantry_flags" TEXT,
+			PRIMARY KEY ("token", "rank"),
+			FOREIGN KEY ("token") REFERENCES "FindRecipeResultSets"("token"),
+			FOREIGN KEY ("Recipes.id") REFERENCES "Recipes"("id")
+		)
+	""")
+
+
+def _canonical():
+	"""ingredient_names.canonical, importing the (standard-library only) module from Source/ even when
+	this file runs as a script."""
+	source_dir = str(Path(__file__).resolve().parent.parent)
+	if source_dir not in sys.path:
+		sys.path.insert(0, source_dir)
+	from ingredient_names import canonical
+	return canonical
+
+
+def _rekey_canonical_names(conn):
+	"""Recompute Ingredients.canonical_name and RecipeIngredients.name with the current canonical()
+	and rescore RecipePantryScore against them."""
+	canonical = _canonical()
+	conn.executemany(
+		'UPDATE "Ingredients" SET "canonical_name" = ? WHERE "id" = ?',
+		[(canonical(name), ingredient_id) for ingredient_id, name in conn.execute('SELECT "id", "name" FROM "Ingredients"').fetchall()],
+	)
+	conn.executemany(
+		'UPDATE "RecipeIngredients" SET "name" = ? WHERE "id" = ?',
+		[(canonical(raw), line_id) for line_id, raw in conn.execute('SELECT "id", "raw_text" FROM "RecipeIngredients"').fetchall()],
+	)
+	pantry = {}
+	for person_id, name in conn.execute(
+		'SELECT i."Persons.id", i."canonical_name" FROM "InventoryIngredients" v '
+		'JOIN "Ingredients" i ON i."id" = v."Ingredients.id" WHERE v."is_deleted" = 0'
+	):
+		if len(name) >= 2:
+			pantry.setdefault(person_id, set()).add(name)
+	lines = {}
+	for recipe_id, name in conn.execute('SELECT "Recipes.id", "name" FROM "RecipeIngredients" ORDER BY "Recipes.id", "position"'):
+		lines.setdefault(recipe_id, []).append(name)
+	rows = []
+	for recipe_id, person_id in conn.execute('SELECT "Recipes.id", "Persons.id" FROM "RecipePantryScore"').fetchall():
+		joined = " ".join(lines.get(recipe_id, ()))
+		rows.append((sum(1 for name in pantry.get(person_id, ()) if name in joined), recipe_id))
+	conn.executemany('UPDATE "RecipePantryScore" SET "matched" = ? WHERE "Recipes.id" = ?', rows)
+
+
+def _0018_canonical_ingredient_names(conn, db_path: str):
+	"""Add Ingredients.canonical_name, re-key RecipeIngredients.name with the same canonical form and
+	rescore RecipePantryScore against the canonical pantry names."""
+	if not _column_exists(conn, "Ingredients", "canonical_name"):
+		conn.execute('ALTER TABLE "Ingredients" ADD COLUMN "canonical_name" TEXT NOT NULL DEFAULT \'\'')
+	conn.execute(
+		'CREATE INDEX IF NOT EXISTS "ix_Ingredients_Persons_id_canonical_name" '
+		'ON "Ingredients" ("Persons.id", "canonical_name")'
+	)
+	_rekey_canonical_names(conn)
+
+
+def _0019_unique_ingredient_names(conn, db_path: str):
+	"""Collapse live Ingredients rows that share ("Persons.id", lower(name)) into the oldest one,
+	repointing the rows that reference them, then enforce it with a partial unique index."""
+	survivors = dict(conn.execute("""
+		SELECT i."id", keep."id" FROM "Ingredients" i
+		JOIN (
+			SELECT "Persons.id" AS person_id, lower("name") AS lname, MIN("id") AS "id"
+			FROM "Ingredients" WHERE "is_deleted" = 0
+			GROUP BY "Persons.id", lower("name") HAVING COUNT(*) > 1
+		) keep ON keep.person_id = i."Persons.id" AND keep.lname = lower(i."name")
+		WHERE i."is_deleted" = 0 AND i."id" <> keep."id"
+	""").fetchall())
+	if survivors:
+		pairs = [(keep, duplicate) for duplicate, keep in survivors.items()]
+		for table in ("ListIngredients", "InventoryIngredients", "StorageTypes"):
+			conn.executemany(f'UPDATE "{table}" SET "Ingredients.id" = ? WHERE "Ingredients.id" = ?', pairs)
+		conn.executemany('DELETE FROM "Ingredients" WHERE "id" = ?', [(duplicate,) for duplicate in survivors])
+	conn.execute(
+		'CREATE UNIQUE INDEX IF NOT EXISTS "ix_Ingredients_Persons_id_lower_name" '
+		'ON "Ingredients" ("Persons.id", lower("name")) WHERE "is_deleted" = 0'
+	)
+
+
+def _0020_result_set_category(conn, db_path: str):
+	"""Record each Find Recipe result set's category, so ranks not stored at search time can be ranked later."""
+	if not _column_exists(conn, "FindRecipeResultSets", "category"):
+		conn.execute('ALTER TABLE "FindRecipeResultSets" ADD COLUMN "category" TEXT')
+
+
+def _0021_recipe_import_jobs(conn, db_path: str):
+	"""Create the queue of background "import from URL" jobs."""
+	conn.execute("""
+		CREATE TABLE IF NOT EXISTS "RecipeImportJobs" (
+			"id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+			"Persons.id" INTEGER NOT NULL,
+			"url" TEXT NOT NULL,
+			"status" TEXT NOT NULL DEFAULT 'queued',
+			"attempts" INTEGER NOT NULL DEFAULT 0,
+			"Recipes.id" INTEGER,
+			"error" TEXT,
+			"run_after" TEXT NOT NULL DEFAULT (datetime('now')),
+			"created_at" TEXT NOT NULL DEFAULT (datetime('now')),
+			"finished_at" TEXT,
+			FOREIGN KEY ("Persons.id") REFERENCES "Persons"("id"),
+			FOREIGN KEY ("Recipes.id") REFERENCES "Recipes"("id")
+		)
+	""")
+	conn.execute(
+		'CREATE INDEX IF NOT EXISTS "ix_RecipeImportJobs_status_run_after" ON "RecipeImportJobs" ("status", "run_after")'
+	)
+
+
+def _0022_import_job_batches(conn, db_path: str):
+	"""Group the import jobs of one bulk import under a batch token."""
+	if not _column_exists(conn, "RecipeImportJobs", "batch"):
+		conn.execute('ALTER TABLE "RecipeImportJobs" ADD COLUMN "batch" TEXT')
+	conn.execute('CREATE INDEX IF NOT EXISTS "ix_RecipeImportJobs_batch" ON "RecipeImportJobs" ("batch")')
+
+
+def _0023_recipe_versions(conn, db_path: str):
+	"""Create the per-user recipe write counters that key the cached Find Recipe matrices."""
+	conn.execute("""
+		CREATE TABLE IF NOT EXISTS "RecipeVersions" (
+			"user_id" INTEGER NOT NULL PRIMARY KEY,
+			"version" INTEGER NOT NULL DEFAULT 0,
+			FOREIGN KEY ("user_id") REFERENCES "Persons"("id")
+		)
+	""")
+
+
+def _0024_rekey_word_amounts(conn, db_path: str):
+	"""Re-key canonical names now that number words are kept unless a unit follows ("half and half")
+	and size words are dropped without a quantity ("large eggs")."""
+	_rekey_canonical_names(conn)
+
+
+def _0025_result_items_unique_recipe(conn, db_path: str):
+	"""Store each recipe at most once per Find Recipe result set: drop the later ranks of any
+	duplicate (get_page ranks the gaps again) and enforce it with a unique index."""
+	conn.execute("""
+		DELETE FROM "FindRecipeResultItems" WHERE EXISTS (
+			SELECT 1 FROM "FindRecipeResultItems" AS earlier
+			WHERE earlier."token" = "FindRecipeResultItems"."token"
+				AND earlier."Recipes.id" = "FindRecipeResultItems"."Recipes.id"
+				AND earlier."rank" < "FindRecipeResultItems"."rank"
+		)
+	""")
+	conn.execute(
+		'CREATE UNIQUE INDEX IF NOT EXISTS "ix_FindRecipeResultItems_token_Recipes_id" '
+		'ON "FindRecipeResultItems" ("token", "Recipes.id")'
+	)
+
+
+# (version, function). Append only: never renumber or edit a migration that has shipped.
+MIGRATIONS = [
+	(1, _0001_base_schema),
+	(2, _0002_inventory_notes),
+	(3, _0003_recipes),
+	(4, _0004_recipes_image_url),
+	(5, _0005_recipe_ratings),
+	(6, _0006_recipe_comments),
+	(7, _0007_recipe_images),
+	(8, _0008_friend_requests),
+	(9, _0009_recipe_shares),
+	(10, _0010_dismissed_notifications),
+	(11, _0011_secondary_indexes),
+	(12, _0012_persons_lower_email_index),
+	(13, _0013_notification_counters),
+	(14, _0014_friend_requests_feed_index),
+	(15, _0015_recipe_ingredients),
+	(16, _0016_recipe_pantry_score),
+	(17, _0017_find_recipe_result_sets),
+	(18, _0018_canonical_ingredient_names),
+	(19, _0019_unique_ingredient_names),
+	(20, _0020_result_set_category),
+	(21, _0021_recipe_import_jobs),
+	(22, _0022_import_job_batches),
+	(23, _0023_recipe_versions),
+	(24, _0024_rekey_word_amounts),
+	(25, _0025_result_items_unique_recipe),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# ————————————————————————————————— Runner ———————————————————————————————— #
+
+def _connect(db_path: str):
+	Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+	# isolation_level=None: the runner issues BEGIN/COMMIT itself
+	return sqlite3.connect(db_path, timeout=30, isolation_level=None)
+
+
+def _current_version(conn) -> int:
+	try:
+		row = conn.execute('SELECT MAX("version") FROM "schema_version"').fetchone()
+	except sqlite3.OperationalError:  # no schema_version table yet
+		return 0
+	return row[0] or 0
+
+
+def current_version(db_path: str = None) -> int:
+	"""Return the highest applied migration version (0 for a new or pre-versioning database)."""
+	db_path = db_path or default_db_path()
+	if not Path(db_path).exists():
+		return 0
+	conn = _connect(db_path)
+	try:
+		return _current_version(conn)
+	finally:
+		conn.close()
+
+
+def migrate(db_path: str = None) -> list[int]:
+	"""Apply all pending migrations in one transaction. Returns the versions applied (empty if current).
+	If any migration fails, none of them are applied."""
+	db_path = db_path or default_db_path()
+	conn = _connect(db_path)
+	try:
+		if _current_version(conn) >= LATEST_VERSION:
+			return []
+		# IMMEDIATE takes the write lock up front, so workers booting together apply migrations once
+		conn.execute("BEGIN IMMEDIATE")
+		try:
+			conn.execute("""
+				CREATE TABLE IF NOT EXISTS "schema_version" (
+					"version" INTEGER NOT NULL PRIMARY KEY,
+					"name" TEXT NOT NULL,
+					"applied_at" TEXT NOT NULL DEFAULT (datetime('now'))
+				)
+			""")
+			current = _current_version(conn)
+			applied = []
+			for version, migration in MIGRATIONS:
+				if version <= current:
+					continue
+				migration(conn, db_path)
+				conn.execute(
+					'INSERT INTO "schema_version" ("version", "name") VALUES (?, ?)',
+					(version, migration.__name__.lstrip("_")),
+				)
+				applied.append(version)
+			conn.execute("COMMIT")
+			return applied
+		except Exception:
+			conn.execute("ROLLBACK")
+			raise
+	finally:
+		conn.close()
+
+
+def main(argv: list[str] = None) -> int:
+	import argparse
+	parser = argparse.ArgumentParser(description="Apply pending GroceryGuru schema migrations.")
+	parser.add_argument("--db", default=None, help="SQLite file (default: GROCERY_GURU_DB_PATH or Database/grocery_guru.db)")
+	parser.add_argument("--status", action="store_true", help="Only print current and latest version")
+	args = parser.parse_args(argv)
+	db_path = args.db or default_db_path()
+	if args.status:
+		print(f"{db_path}: version {current_version(db_path)} (latest {LATEST_VERSION})")
+		return 0
+	applied = migrate(db_path)
+	if applied:
+		print(f"{db_path}: applied migrations {', '.join(map(str, applied))}; now at version {LATEST_VERSION}")
+	else:
+		print(f"{db_path}: already at version {LATEST_VERSION}")
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
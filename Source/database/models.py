@@ -0,0 +1,331 @@
+"""
+Declarative models for the GroceryGuru tables.
+
+Columns keep their SQLite names (including the dotted foreign keys such as "Persons.id"); the
+Python attributes get plain names (person_id, list_id, ...). Dates are stored as TEXT, as in
+schema.sql. tests/test_models.py checks these classes against a freshly migrated database, so
+update both this file and database/migrations.py when the schema changes.
+"""
+
+from sqlalchemy import CheckConstraint, ForeignKey, Index, Integer, Text, UniqueConstraint, func, text
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+
+
+_NOW = text("(datetime('now'))")
+
+
+class Base(DeclarativeBase):
+	pass
+
+
+class Persons(Base):
+	__tablename__ = "Persons"
+
+	id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+	email: Mapped[str | None] = mapped_column(Text, unique=True)
+	name: Mapped[str | None] = mapped_column(Text)
+	password: Mapped[str | None] = mapped_column(Text)  # pbkdf2:sha256 hash
+
+	lists: Mapped[list["Lists"]] = relationship(back_populates="person")
+	ingredients: Mapped[list["Ingredients"]] = relationship(back_populates="person")
+	recipes: Mapped[list["Recipes"]] = relationship(back_populates="person")
+
+	__table_args__ = (
+		Index("ix_Persons_lower_email", func.lower(email)),
+	)
+
+
+class Lists(Base):
+	__tablename__ = "Lists"
+	__table_args__ = (
+		Index("ix_Lists_Persons_id_name", "Persons.id", "name"),
+	)
+
+	id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+	name: Mapped[str] = mapped_column(Text, nullable=False)
+	person_id: Mapped[int] = mapped_column("Persons.id", Integer, ForeignKey("Persons.id"), nullable=False)
+
+	person: Mapped["Persons"] = relationship(back_populates="lists")
+	items: Mapped[list["ListIngredients"]] = relationship(back_populates="list")
+
+
+class Ingredients(Base):
+	__tablename__ = "Ingredients"
+
+	id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+	name: Mapped[str] = mapped_column(Text, nullable=False)
+	canonical_name: Mapped[str] = mapped_column(Text, nullable=False, server_default="")  # ingredient_names.canonical(name)
+	is_deleted: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+	person_id: Mapped[int] = mapped_column("Persons.id", Integer, ForeignKey("Persons.id"), nullable=False)
+
+	__table_args__ = (
+		Index("ix_Ingredients_Persons_id_name", "Persons.id", "name"),
+		Index("ix_Ingredients_Persons_id_canonical_name", "Persons.id", "canonical_name"),
+		# One live ingredient per user and case-insensitive name; get_or_create_ingredient inserts missing names with ON CONFLICT DO NOTHING
+		Index(
+			"ix_Ingredients_Persons_id_lower_name", person_id, func.lower(name),
+			unique=True, sqlite_where=is_deleted == 0,
+		),
+	)
+
+	person: Mapped["Persons"] = relationship(back_populates="ingredients")
+
+
+class StorageTypes(Base):
+	__tablename__ = "StorageTypes"
+
+	id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+	name: Mapped[str] = mapped_column(Text, nullable=False)
+	ingredient_id: Mapped[int] = mapped_column("Ingredients.id", Integer, ForeignKey("Ingredients.id"), nullable=False)
+
+
+class ListIngredients(Base):
+	__tablename__ = "ListIngredients"
+	__table_args__ = (
+		Index("ix_ListIngredients_Lists_id", "Lists.id", "is_deleted"),
+		Index("ix_ListIngredients_Ingredients_id", "Ingredients.id"),
+	)
+
+	id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+	quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+	date_added: Mapped[str] = mapped_column(Text, nullable=False, server_default=_NOW)
+	is_deleted: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+	ingredient_id: Mapped[int] = mapped_column("Ingredients.id", Integer, ForeignKey("Ingredients.id"), nullable=False)
+	list_id: Mapped[int] = mapped_column("Lists.id", Integer, ForeignKey("Lists.id"), nullable=False)
+
+	ingredient: Mapped["Ingredients"] = relationship()
+	list: Mapped["Lists"] = relationship(back_populates="items")
+
+
+class InventoryIngredients(Base):
+	__tablename__ = "InventoryIngredients"
+	__table_args__ = (
+		Index("ix_InventoryIngredients_Ingredients_id", "Ingredients.id", "is_deleted"),
+	)
+
+	id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+	count: Mapped[int] = mapped_column(Integer, nullable=False)
+	date_purchased: Mapped[str] = mapped_column(Text, nullable=False, server_default=_NOW)
+	date_expires: Mapped[str | None] = mapped_column(Text)
+	notes: Mapped[str | None] = mapped_column(Text)
+	ingredient_id: Mapped[int] = mapped_column("Ingredients.id", Integer, ForeignKey("Ingredients.id"), nullable=False)
+	list_ingredient_id: Mapped[int | None] = mapped_column("ListIngredients.id", Integer, ForeignKey("ListIngredients.id"))
+	is_deleted: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+
+	ingredient: Mapped["Ingredients"] = relationship()
+	list_ingredient: Mapped["ListIngredients | None"] = relationship()
+
+
+class Recipes(Base):
+	__tablename__ = "Recipes"
+	__table_args__ = (
+		Index("ix_Recipes_Persons_id_title", "Persons.id", "is_deleted", "title"),
+	)
+
+	id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+	title: Mapped[str] = mapped_column(Text, nullable=False)
+	ingredients: Mapped[str] = mapped_column(Text, nullable=False, server_default="")
+	steps: Mapped[str] = mapped_column(Text, nullable=False, server_default="")
+	special_notes: Mapped[str | None] = mapped_column(Text, server_default="")
+	source_url: Mapped[str | None] = mapped_column(Text)
+	category: Mapped[str | None] = mapped_column(Text, server_default="")
+	image_url: Mapped[str | None] = mapped_column(Text)
+	person_id: Mapped[int] = mapped_column("Persons.id", Integer, ForeignKey("Persons.id"), nullable=False)
+	is_deleted: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+	date_added: Mapped[str] = mapped_column(Text, nullable=False, server_default=_NOW)
+
+	person: Mapped["Persons"] = relationship(back_populates="recipes")
+	ratings: Mapped[list["RecipeRatings"]] = relationship(back_populates="recipe")
+	comments: Mapped[list["RecipeComments"]] = relationship(back_populates="recipe")
+	images: Mapped[list["RecipeImages"]] = relationship(back_populates="recipe", order_by="RecipeImages.sort_order")
+
+
+class RecipeRatings(Base):
+	__tablename__ = "RecipeRatings"
+	__table_args__ = (
+		UniqueConstraint("Recipes.id", "Persons.id"),
+		CheckConstraint("rating >= 1 AND rating <= 5"),
+	)
+
+	id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+	recipe_id: Mapped[int] = mapped_column("Recipes.id", Integer, ForeignKey("Recipes.id"), nullable=False)
+	person_id: Mapped[int] = mapped_column("Persons.id", Integer, ForeignKey("Persons.id"), nullable=False)
+	rating: Mapped[int] = mapped_column(Integer, nullable=False)
+	created_at: Mapped[str] = mapped_column(Text, nullable=False, server_default=_NOW)
+
+	recipe: Mapped["Recipes"] = relationship(back_populates="ratings")
+	person: Mapped["Persons"] = relationship()
+
+
+class RecipeComments(Base):
+	__tablename__ = "RecipeComments"
+	__table_args__ = (
+		Index("ix_RecipeComments_Recipes_id", "Recipes.id", "created_at"),
+	)
+
+	id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+	recipe_id: Mapped[int] = mapped_column("Recipes.id", Integer, ForeignKey("Recipes.id"), nullable=False)
+	person_id: Mapped[int] = mapped_column("Persons.id", Integer, ForeignKey("Persons.id"), nullable=False)
+	body: Mapped[str] = mapped_column(Text, nullable=False)
+	created_at: Mapped[str] = mapped_column(Text, nullable=False, server_default=_NOW)
+
+	recipe: Mapped["Recipes"] = relationship(back_populates="comments")
+	author: Mapped["Persons"] = relationship()
+
+
+class RecipeImages(Base):
+	__tablename__ = "RecipeImages"
+	__table_args__ = (
+		Index("ix_RecipeImages_Recipes_id", "Recipes.id", "sort_order"),
+	)
+
+	id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+	recipe_id: Mapped[int] = mapped_column("Recipes.id", Integer, ForeignKey("Recipes.id"), nullable=False)
+	file_path: Mapped[str] = mapped_column(Text, nullable=False)
+	sort_order: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+
+	recipe: Mapped["Recipes"] = relationship(back_populates="images")
+
+
+class FriendRequests(Base):
+	__tablename__ = "FriendRequests"
+	__table_args__ = (
+		UniqueConstraint("requester_id", "addressee_id"),
+		Index("ix_FriendRequests_addressee_status_created", "addressee_id", "status", "created_at"),
+	)
+
+	id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+	requester_id: Mapped[int] = mapped_column(Integer, ForeignKey("Persons.id"), nullable=False)
+	addressee_id: Mapped[int] = mapped_column(Integer, ForeignKey("Persons.id"), nullable=False)
+	message: Mapped[str | None] = mapped_column(Text, server_default="")
+	status: Mapped[str] = mapped_column(Text, nullable=False, server_default="pending")
+	created_at: Mapped[str] = mapped_column(Text, nullable=False, server_default=_NOW)
+
+	requester: Mapped["Persons"] = relationship(foreign_keys=[requester_id])
+	addressee: Mapped["Persons"] = relationship(foreign_keys=[addressee_id])
+
+
+class RecipeShares(Base):
+	__tablename__ = "RecipeShares"
+	__table_args__ = (
+		Index("ix_RecipeShares_recipient_id", "recipient_id", "created_at"),
+		Index("ix_RecipeShares_Recipes_id", "Recipes.id", "sharer_id", "recipient_id"),
+	)
+
+	id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+	recipe_id: Mapped[int] = mapped_column("Recipes.id", Integer, ForeignKey("Recipes.id"), nullable=False)
+	sharer_id: Mapped[int] = mapped_column(Integer, ForeignKey("Persons.id"), nullable=False)
+	recipient_id: Mapped[int] = mapped_column(Integer, ForeignKey("Persons.id"), nullable=False)
+	created_at: Mapped[str] = mapped_column(Text, nullable=False, server_default=_NOW)
+
+	recipe: Mapped["Recipes"] = relationship()
+	sharer: Mapped["Persons"] = relationship(foreign_keys=[sharer_id])
+	recipient: Mapped["Persons"] = relationship(foreign_keys=[recipient_id])
+
+
+class DismissedNotifications(Base):
+	__tablename__ = "DismissedNotifications"
+	__table_args__ = (
+		UniqueConstraint("user_id", "notification_type", "notification_id"),
+	)
+
+	id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+	user_id: Mapped[int] = mapped_column(Integer, ForeignKey("Persons.id"), nullable=False)
+	notification_type: Mapped[str] = mapped_column(Text, nullable=False)
+	notification_id: Mapped[int] = mapped_column(Integer, nullable=False)
+	dismissed_at: Mapped[str] = mapped_column(Text, nullable=False, server_default=_NOW)
+
+
+class NotificationCounters(Base):
+	"""Unread notification counts per user, maintained by the write helpers (see notification_counters.py)."""
+	__tablename__ = "NotificationCounters"
+
+	user_id: Mapped[int] = mapped_column(Integer, ForeignKey("Persons.id"), primary_key=True)
+	friend_requests: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+	recipe_shares: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+
+
+class RecipeVersions(Base):
+	"""Count of writes to each user's recipes, bumped in the same transaction (see recipe_matrix.py)."""
+	__tablename__ = "RecipeVersions"
+
+	user_id: Mapped[int] = mapped_column(Integer, ForeignKey("Persons.id"), primary_key=True)
+	version: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+
+
+class RecipeIngredients(Base):
+	"""One parsed ingredient line of a recipe, kept in step with Recipes.ingredients (see recipe_ingredients.py)."""
+	__tablename__ = "RecipeIngredients"
+	__table_args__ = (
+		UniqueConstraint("Recipes.id", "position"),
+		Index("ix_RecipeIngredients_name", "name"),
+	)
+
+	id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+	recipe_id: Mapped[int] = mapped_column("Recipes.id", Integer, ForeignKey("Recipes.id"), nullable=False)
+	position: Mapped[int] = mapped_column(Integer, nullable=False)
+	raw_text: Mapped[str] = mapped_column(Text, nullable=False)
+	name: Mapped[str] = mapped_column(Text, nullable=False)  # ingredient_names.canonical(raw_text)
+
+
+class RecipePantryScore(Base):
+	"""Find Recipe score of each live recipe against its owner's pantry (see pantry_scores.py)."""
+	__tablename__ = "RecipePantryScore"
+	__table_args__ = (
+		Index("ix_RecipePantryScore_Persons_id_matched", "Persons.id", "matched"),
+	)
+
+	recipe_id: Mapped[int] = mapped_column("Recipes.id", Integer, ForeignKey("Recipes.id"), primary_key=True)
+	person_id: Mapped[int] = mapped_column("Persons.id", Integer, ForeignKey("Persons.id"), nullable=False)
+	matched: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")  # distinct pantry names found
+	total: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")  # ingredient lines
+
+
+class FindRecipeResultSets(Base):
+	"""One ranked Find Recipe search, browsed by token until it expires (see result_sets.py)."""
+	__tablename__ = "FindRecipeResultSets"
+	__table_args__ = (
+		Index("ix_FindRecipeResultSets_expires_at", "expires_at"),
+	)
+
+	token: Mapped[str] = mapped_column(Text, primary_key=True)
+	person_id: Mapped[int] = mapped_column("Persons.id", Integer, ForeignKey("Persons.id"), nullable=False)
+	total: Mapped[int] = mapped_column(Integer, nullable=False)
+	category: Mapped[str | None] = mapped_column(Text)  # the search's category (None = any), for ranking later pages
+	destinations: Mapped[str] = mapped_column(Text, nullable=False, server_default="[]")  # JSON [[value, label], ...]
+	expires_at: Mapped[str] = mapped_column(Text, nullable=False)
+
+
+class FindRecipeResultItems(Base):
+	"""The recipe at one rank of a FindRecipeResultSets row."""
+	__tablename__ = "FindRecipeResultItems"
+	__table_args__ = (
+		Index("ix_FindRecipeResultItems_token_Recipes_id", "token", "Recipes.id", unique=True),
+	)
+
+	token: Mapped[str] = mapped_column(Text, ForeignKey("FindRecipeResultSets.token"), primary_key=True)
+	rank: Mapped[int] = mapped_column(Integer, primary_key=True)
+	recipe_id: Mapped[int] = mapped_column("Recipes.id", Integer, ForeignKey("Recipes.id"), nullable=False)
+	matched: Mapped[int] = mapped_column(Integer, nullable=False)
+	pantry_flags: Mapped[str | None] = mapped_column(Text)  # "1"/"0" per ingredient line, filled on first view
+
+
+class RecipeImportJobs(Base):
+	"""One "import from URL" request, run by a background worker (see import_jobs.py)."""
+	__tablename__ = "RecipeImportJobs"
+	__table_args__ = (
+		Index("ix_RecipeImportJobs_status_run_after", "status", "run_after"),
+		Index("ix_RecipeImportJobs_batch", "batch"),
+	)
+
+	id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+	person_id: Mapped[int] = mapped_column("Persons.id", Integer, ForeignKey("Persons.id"), nullable=False)
+	url: Mapped[str] = mapped_column(Text, nullable=False)
+	status: Mapped[str] = mapped_column(Text, nullable=False, server_default="queued")  # queued, running, done, failed, skipped
+	attempts: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+	recipe_id: Mapped[int | None] = mapped_column("Recipes.id", Integer, ForeignKey("Recipes.id"))  # the created recipe
+	error: Mapped[str | None] = mapped_column(Text)
+	run_after: Mapped[str] = mapped_column(Text, nullable=False, server_default=_NOW)  # queued: not before; running: lease end
+	created_at: Mapped[str] = mapped_column(Text, nullable=False, server_default=_NOW)
+	finished_at: Mapped[str | None] = mapped_column(Text)
+	batch: Mapped[str | None] = mapped_column(Text)  # token shared by the jobs of one bulk import
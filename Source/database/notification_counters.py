@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Denormalized unread-notification counts, one NotificationCounters row per user.
+
+A notification is unread while it is not dismissed and:
+  - friend_requests: the FriendRequests row addressed to the user is still "pending"
+  - recipe_shares: the RecipeShares row sent to the user points at a recipe that is not deleted
+
+The write helpers in database/__init__.py call adjust() in the same session (and so the same
+transaction) as the change that adds or removes an unread notification. Reading the bell count
+is then a primary-key lookup. reconcile() recomputes every counter from the source tables and
+reports drift; run it from Source/ with
+
+	python3 -m database.notification_counters            # recompute, fix and report drift
+	python3 -m database.notification_counters --check    # report drift only (exit 1 if any)
+"""
+
+import sys
+from typing import NamedTuple
+
+from sqlalchemy import exists, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from database.models import DismissedNotifications, FriendRequests, NotificationCounters, RecipeShares, Recipes
+
+
+class Drift(NamedTuple):
+	user_id: int
+	stored: tuple[int, int]  # (friend_requests, recipe_shares) in NotificationCounters
+	expected: tuple[int, int]  # recomputed from the source tables
+
+
+# ————————————————————————————————— Incremental updates ———————————————————————————————— #
+
+def not_dismissed(user_id, notification_type: str, notification_id):
+	"""NOT EXISTS anti-join against DismissedNotifications (an index lookup on its UNIQUE key)."""
+	return ~exists().where(
+		DismissedNotifications.user_id == user_id,
+		DismissedNotifications.notification_type == notification_type,
+		DismissedNotifications.notification_id == notification_id,
+	)
+
+
+def is_dismissed(session, user_id: int, notification_type: str, notification_id: int) -> bool:
+	return session.execute(
+		select(DismissedNotifications.id).where(
+			DismissedNotifications.user_id == user_id,
+			DismissedNotifications.notification_type == notification_type,
+			DismissedNotifications.notification_id == notification_id,
+		)
+	).first() is not None
+
+
+def adjust(session, user_id: int, friend_requests: int = 0, recipe_shares: int = 0):
+	"""Add the deltas to user_id's counters, creating the row on first use."""
+	if not friend_requests and not recipe_shares:
+		return
+	stmt = sqlite_insert(NotificationCounters).values(
+		user_id=user_id, friend_requests=friend_requests, recipe_shares=recipe_shares,
+	)
+	stmt = stmt.on_conflict_do_update(
+		index_elements=[NotificationCounters.user_id],
+		set_={
+			"friend_requests": NotificationCounters.friend_requests + friend_requests,
+			"recipe_shares": NotificationCounters.recipe_shares + recipe_shares,
+		},
+	)
+	session.execute(stmt)
+
+
+def unread_count(session, user_id: int) -> int:
+	"""Unread notifications for the bell icon (0 if the user has never had any)."""
+	row = session.get(NotificationCounters, user_id)
+	return row.friend_requests + row.recipe_shares if row else 0
+
+
+# ————————————————————————————————— Reconciliation ———————————————————————————————— #
+
+def expected_counts(session) -> dict[int, tuple[int, int]]:
+	"""{user_id: (friend_requests, recipe_shares)} recomputed from FriendRequests/RecipeShares."""
+	counts: dict[int, list[int]] = {}
+	pending = select(FriendRequests.addressee_id, func.count()).where(
+		FriendRequests.status == "pending",
+		not_dismissed(FriendRequests.addressee_id, "friend_request", FriendRequests.id),
+	).group_by(FriendRequests.addressee_id)
+	for user_id, n in session.execute(pending):
+		counts.setdefault(user_id, [0, 0])[0] = n
+	shares = select(RecipeShares.recipient_id, func.count()).join(
+		Recipes, RecipeShares.recipe_id == Recipes.id,
+	).where(
+		Recipes.is_deleted == False,
+		not_dismissed(RecipeShares.recipient_id, "recipe_share", RecipeShares.id),
+	).group_by(RecipeShares.recipient_id)
+	for user_id, n in session.execute(shares):
+		counts.setdefault(user_id, [0, 0])[1] = n
+	return {user_id: tuple(pair) for user_id, pair in counts.items()}
+
+
+def reconcile(fix: bool = True) -> list[Drift]:
+	"""Compare every stored counter with a from-scratch recount; with fix=True overwrite the drifted
+	rows. Returns the drift found (empty when the counters are consistent)."""
+	from database import session_scope
+	with session_scope() as session:
+		expected = expected_counts(session)
+		stored = {
+			row.user_id: (row.friend_requests, row.recipe_shares)
+			for row in session.scalars(select(NotificationCounters))
+		}
+		drift = [
+			Drift(user_id, stored.get(user_id, (0, 0)), expected.get(user_id, (0, 0)))
+			for user_id in sorted(expected.keys() | stored.keys())
+			if stored.get(user_id, (0, 0)) != expected.get(user_id, (0, 0))
+		]
+		if fix:
+			for d in drift:
+				stmt = sqlite_insert(NotificationCounters).values(
+					user_id=d.user_id, friend_requests=d.expected[0], recipe_shares=d.expected[1],
+				)
+				session.execute(stmt.on_conflict_do_update(
+					index_elements=[NotificationCounters.user_id],
+					set_={"friend_requests": d.expected[0], "recipe_shares": d.expected[1]},
+				))
+	return drift
+
+
+def main(argv: list[str] = None) -> int:
+	import argparse
+	parser = argparse.ArgumentParser(description="Recompute NotificationCounters and report drift.")
+	parser.add_argument("--check", action="store_true", help="Only report drift; exit 1 if any")
+	args = parser.parse_args(argv)
+	drift = reconcile(fix=not args.check)
+	for d in drift:
+		print(
+			f"user {d.user_id}: stored friend_requests={d.stored[0]} recipe_shares={d.stored[1]}, "
+			f"expected friend_requests={d.expected[0]} recipe_shares={d.expected[1]}"
+		)
+	if not drift:
+		print("NotificationCounters: no drift")
+	elif args.check:
+		print(f"NotificationCounters: {len(drift)} user(s) drifted")
+		return 1
+	else:
+		print(f"NotificationCounters: fixed {len(drift)} user(s)")
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
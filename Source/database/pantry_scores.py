@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Materialized Find Recipe scores, one RecipePantryScore row per live recipe.
+
+	matched  distinct pantry names found in the recipe's ingredient lines (the Find Recipe score)
+	total    number of ingredient lines in the recipe
+
+Matching follows pantry_matcher: a recipe's RecipeIngredients names are joined with a space and
+searched for each canonical pantry name (Ingredients.canonical_name) of two or more characters.
+
+The write helpers in database/__init__.py keep the rows current in the same session as their
+change, touching only the rows it affects:
+  - a recipe write rescores that one recipe (refresh_recipe) or drops its row (remove_recipe)
+  - a pantry write that adds or removes a name from the owner's pantry moves `matched` by one on
+    the owner's recipes containing that name (pantry_name_added / pantry_name_removed)
+Ranking is then an indexed ORDER BY matched DESC (Select.get_Recipes_ranked_by_pantry_score).
+reconcile() recomputes every score from scratch and reports drift; run it from Source/ with
+
+	python3 -m database.pantry_scores            # recompute, fix and report drift
+	python3 -m database.pantry_scores --check    # report drift only (exit 1 if any)
+"""
+
+import sys
+from itertools import groupby
+from typing import NamedTuple
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+import pantry_matcher
+from database.models import Ingredients, InventoryIngredients, RecipeIngredients, RecipePantryScore, Recipes
+
+
+class Drift(NamedTuple):
+	recipe_id: int
+	stored: tuple[int, int] | None  # (matched, total) in RecipePantryScore, None if the row is missing
+	expected: tuple[int, int] | None  # recomputed, None if the recipe should have no row
+
+
+def pantry_names(session, user_id: int) -> set[str]:
+	"""Canonical names of the user's live pantry items (the set Find Recipe matches against)."""
+	rows = session.execute(
+		select(Ingredients.canonical_name).join(
+			InventoryIngredients, InventoryIngredients.ingredient_id == Ingredients.id,
+		).where(
+			Ingredients.person_id == user_id,
+			InventoryIngredients.is_deleted == False,
+		)
+	)
+	return {name for name, in rows if name}
+
+
+def _recipe_lines(session, user_id: int = None, recipe_ids: list[int] = None):
+	"""{recipe_id: (owner_id, [normalized lines])} for live recipes, filtered by owner and/or ids."""
+	query = select(Recipes.id, Recipes.person_id, RecipeIngredients.name).outerjoin(
+		RecipeIngredients, RecipeIngredients.recipe_id == Recipes.id,
+	).where(Recipes.is_deleted == False).order_by(Recipes.id, RecipeIngredients.position)
+	if user_id is not None:
+		query = query.where(Recipes.person_id == user_id)
+	if recipe_ids is not None:
+		query = query.where(Recipes.id.in_(recipe_ids))
+	result = {}
+	for rid, rows in groupby(session.execute(query), key=lambda row: row.id):
+		rows = list(rows)
+		result[rid] = (rows[0].person_id, [row.name for row in rows if row.name is not None])
+	return result
+
+
+def _score(matcher, lines: list[str]) -> tuple[int, int]:
+	return matcher.count("\n".join(lines)), len(lines)
+
+
+# ————————————————————————————————— Incremental updates ———————————————————————————————— #
+
+def refresh_recipe(session, recipe_id: int):
+	"""Rescore one recipe against its owner's pantry (or drop its row if it is deleted or missing)."""
+	recipes = _recipe_lines(session, recipe_ids=[recipe_id])
+	if recipe_id not in recipes:
+		remove_recipe(session, recipe_id)
+		return
+	owner_id, lines = recipes[recipe_id]
+	matched, total = _score(pantry_matcher.compile_pantry(pantry_names(session, owner_id)), lines)
+	_store(session, recipe_id, owner_id, matched, total)
+
+
+def _store(session, recipe_id: int, owner_id: int, matched: int, total: int):
+	values = {RecipePantryScore.person_id: owner_id, RecipePantryScore.matched: matched, RecipePantryScore.total: total}
+	stmt = sqlite_insert(RecipePantryScore).values({RecipePantryScore.recipe_id: recipe_id, **values})
+	session.execute(stmt.on_conflict_do_update(index_elements=[RecipePantryScore.recipe_id], set_=values))
+
+
+def remove_recipe(session, recipe_id: int):
+	session.execute(delete(RecipePantryScore).where(RecipePantryScore.recipe_id == recipe_id))
+
+
+def _shift_recipes_containing(session, user_id: int, name: str, delta: int):
+	"""Add delta to `matched` of the user's recipes whose joined lines contain name."""
+	if len(name) < 2:
+		return  # ignored by the matcher
+	# Lines are joined with single spaces, so every space-free piece of name lies inside one line:
+	# recipes with a line containing its longest piece are the only candidates.
+	piece = max(name.split(" "), key=len)
+	candidates = session.execute(
+		select(RecipeIngredients.recipe_id).distinct().join(
+			Recipes, Recipes.id == RecipeIngredients.recipe_id,
+		).where(
+			Recipes.person_id == user_id,
+			Recipes.is_deleted == False,
+			func.instr(RecipeIngredients.name, piece) > 0,
+		)
+	).scalars().all()
+	if piece != name and candidates:
+		candidates = [
+			rid for rid, (_, lines) in _recipe_lines(session, recipe_ids=candidates).items()
+			if name in " ".join(lines)
+		]
+	if candidates:
+		session.execute(
+			update(RecipePantryScore)
+			.where(RecipePantryScore.recipe_id.in_(candidates))
+			.values(matched=RecipePantryScore.matched + delta)
+		)
+
+
+def pantry_name_added(session, user_id: int, name: str):
+	"""Call after a pantry write that made name part of the user's pantry."""
+	_shift_recipes_containing(session, user_id, name, +1)
+
+
+def pantry_name_removed(session, user_id: int, name: str):
+	"""Call after a pantry write that removed the last pantry item called name."""
+	_shift_recipes_containing(session, user_id, name, -1)
+
+
+# ————————————————————————————————— Reconciliation ———————————————————————————————— #
+
+def expected_scores(session) -> dict[int, tuple[int, int, int]]:
+	"""{recipe_id: (owner_id, matched, total)} recomputed for every live recipe."""
+	expected = {}
+	matchers = {}
+	for recipe_id, (owner_id, lines) in _recipe_lines(session).items():
+		if owner_id not in matchers:
+			matchers[owner_id] = pantry_matcher.PantryMatcher(pantry_names(session, owner_id))
+		expected[recipe_id] = (owner_id, *_score(matchers[owner_id], lines))
+	return expected
+
+
+def reconcile(fix: bool = True) -> list[Drift]:
+	"""Compare every stored score with a full recompute; with fix=True rewrite the drifted rows.
+	Returns the drift found (empty when the scores are consistent)."""
+	from database import session_scope
+	with session_scope() as session:
+		expected = expected_scores(session)
+		stored = {
+			row.recipe_id: (row.matched, row.total)
+			for row in session.scalars(select(RecipePantryScore))
+		}
+		drift = []
+		for recipe_id in sorted(expected.keys() | stored.keys()):
+			want = expected[recipe_id][1:] if recipe_id in expected else None
+			if stored.get(recipe_id) != want:
+				drift.append(Drift(recipe_id, stored.get(recipe_id), want))
+		if fix:
+			for d in drift:
+				if d.expected is None:
+					remove_recipe(session, d.recipe_id)
+				else:
+					_store(session, d.recipe_id, *expected[d.recipe_id])
+	return drift
+
+
+def main(argv: list[str] = None) -> int:
+	import argparse
+	parser = argparse.ArgumentParser(description="Recompute RecipePantryScore and report drift.")
+	parser.add_argument("--check", action="store_true", help="Only report drift; exit 1 if any")
+	args = parser.parse_args(argv)
+	drift = reconcile(fix=not args.check)
+	for d in drift:
+		print(f"recipe {d.recipe_id}: stored (matched, total)={d.stored}, expected {d.expected}")
+	if not drift:
+		print("RecipePantryScore: no drift")
+	elif args.check:
+		print(f"RecipePantryScore: {len(drift)} recipe(s) drifted")
+		return 1
+	else:
+		print(f"RecipePantryScore: fixed {len(drift)} recipe(s)")
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parsed ingredient lines of each recipe, stored in RecipeIngredients.
+
+create_recipe and update_recipe (and so add_shared_recipe_to_user, which copies through
+create_recipe) call replace_lines() in their own session whenever Recipes.ingredients is written,
+so views read ordered, already-split lines instead of re-parsing the text on every request.
+Each non-blank line becomes one row: position (0-based), raw_text (the stripped line as the user
+wrote it) and name (its canonical key from ingredient_names, used for matching).
+
+To rebuild the rows of existing recipes (for example after the normalization rules change), run
+from Source/:
+
+	python3 -m database.recipe_ingredients             # rebuild every recipe
+	python3 -m database.recipe_ingredients --missing   # only recipes that have no rows yet
+"""
+
+import sys
+
+from sqlalchemy import delete, exists, insert, select
+
+import ingredient_names
+from database.models import RecipeIngredients, Recipes
+
+
+BACKFILL_BATCH_SIZE = 500
+
+
+def split_lines(text: str) -> list[str]:
+	"""Non-blank lines of a recipe text field, stripped."""
+	return [ln.strip() for ln in (text or "").splitlines() if ln.strip()]
+
+
+def normalize_name(line: str) -> str:
+	"""Matching key of an ingredient line: its canonical form ("2 cups Eggs" -> "egg")."""
+	return ingredient_names.canonical(line)
+
+
+def parse(text: str) -> list[dict]:
+	"""RecipeIngredients column values (without the recipe id) for an ingredients text."""
+	return [
+		{"position": position, "raw_text": line, "name": normalize_name(line)}
+		for position, line in enumerate(split_lines(text))
+	]
+
+
+def replace_lines(session, recipe_id: int, ingredients_text: str) -> int:
+	"""Replace the recipe's RecipeIngredients rows with the parse of ingredients_text. Returns the line count."""
+	session.execute(delete(RecipeIngredients).where(RecipeIngredients.recipe_id == recipe_id))
+	rows = [{"recipe_id": recipe_id, **values} for values in parse(ingredients_text)]
+	if rows:
+		session.execute(insert(RecipeIngredients), rows)
+	return len(rows)
+
+
+# ————————————————————————————————— Backfill ———————————————————————————————— #
+
+def backfill(only_missing: bool = False, batch_size: int = BACKFILL_BATCH_SIZE) -> tuple[int, int]:
+	"""Rebuild RecipeIngredients from Recipes.ingredients, committing every batch_size recipes.
+	Returns (recipes processed, lines written)."""
+	from database import SessionLocal
+	query = select(Recipes.id, Recipes.ingredients).order_by(Recipes.id)
+	if only_missing:
+		query = query.where(~exists().where(RecipeIngredients.recipe_id == Recipes.id))
+	recipes = lines = 0
+	last_id = 0
+	while True:
+		with SessionLocal() as session:
+			batch = session.execute(query.where(Recipes.id > last_id).limit(batch_size)).all()
+			if not batch:
+				return recipes, lines
+			for recipe_id, text in batch:
+				lines += replace_lines(session, recipe_id, text)
+			session.commit()
+		recipes += len(batch)
+		last_id = batch[-1].id
+
+
+def main(argv: list[str] = None) -> int:
+	import argparse
+	parser = argparse.ArgumentParser(description="Rebuild RecipeIngredients from Recipes.ingredients.")
+	parser.add_argument("--missing", action="store_true", help="Only recipes without any RecipeIngredients rows")
+	args = parser.parse_args(argv)
+	recipes, lines = backfill(only_missing=args.missing)
+	print(f"RecipeIngredients: rebuilt {recipes} recipe(s), {lines} line(s)")
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+Sparse recipe x ingredient-name incidence matrix for ranking a user's recipes against their pantry.
+
+Rows are the user's live recipes (their RecipeIngredients names joined with a space, as in
+pantry_matcher); columns are ingredient names, each stored as an array of the row indices whose
+text contains it (a compressed sparse column layout). Scoring a pantry is the product of the
+matrix with the pantry's 0/1 vector: the columns of the pantry names are concatenated and counted
+in one C-level pass. Columns are filled lazily, the first time a name is asked for: a whole
+pantry at once with one Aho-Corasick scan over the rows, a few new names with plain substring
+searches. Later requests with the same pantry only count.
+
+Matrices are cached per user, keyed on the user's RecipeVersions counter: every recipe write
+calls recipes_changed() in its own transaction, which bumps the counter, so a matrix built before
+a write is rebuilt on the next request in every process (other web workers, the import workers),
+and a matrix built from a transaction that has not committed yet is never served after it commits.
+recipes_changed() also drops this process's matrix once the write commits or rolls back. Pantry
+changes need no invalidation because the pantry is the vector, not part of the matrix.
+
+	GROCERY_GURU_MATRIX_CACHE_SIZE  users whose matrices are kept (default 64; 0 disables the cache)
+"""
+
+import os
+import threading
+from array import array
+from collections import Counter, OrderedDict
+from itertools import chain, groupby
+from typing import Callable, Iterable
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+import pantry_matcher
+from database.models import RecipeVersions
+
+
+_SUBSTRING_FILL_LIMIT = 16  # missing names filled with `in` rather than an automaton scan
+
+
+class IncidenceMatrix:
+	"""Recipes x ingredient names, one array of row indices per name."""
+
+	def __init__(self, rows: Iterable[tuple[int, str]]):
+		"""rows: (recipe_id, lowercase joined ingredient text) pairs."""
+		rows = list(rows)
+		self.recipe_ids = [recipe_id for recipe_id, _ in rows]
+		self._texts = [text for _, text in rows]
+		self._columns: dict[str, array] = {}
+		self._lock = threading.Lock()
+
+	@classmethod
+	def from_lines(cls, lines: Iterable[tuple[int, str]]) -> "IncidenceMatrix":
+		"""Build from (recipe_id, normalized line) pairs ordered by recipe, as RecipeIngredients stores them."""
+		return cls(
+			(recipe_id, " ".join(name for _, name in group))
+			for recipe_id, group in groupby(lines, key=lambda row: row[0])
+		)
+
+	def _fill_columns(self, names: set[str]):
+		"""Add a column for each name not seen yet."""
+		with self._lock:
+			missing = names - self._columns.keys()
+			if not missing:
+				return
+			if len(missing) <= _SUBSTRING_FILL_LIMIT:
+				# A few new names (a pantry item was added): one C-level substring search per name
+				# beats a Python-level automaton scan over every row
+				hits = {
+					name: array("I", (row for row, text in enumerate(self._texts) if name in text))
+					for name in missing
+				}
+			else:
+				matcher = pantry_matcher.PantryMatcher(missing)
+				hits = {name: array("I") for name in missing}
+				for row, text in enumerate(self._texts):
+					for name in matcher.names_in(text):
+						hits[name].append(row)
+			self._columns.update(hits)
+
+	def scores(self, pantry_names: Iterable[str]) -> dict[int, int]:
+		"""{recipe_id: distinct pantry names found} for rows with at least one match."""
+		names = {n for n in pantry_names if n and len(n) >= 2}
+		self._fill_columns(names)
+		columns = self._columns
+		counts = Counter(chain.from_iterable(columns[name] for name in names))
+		recipe_ids = self.recipe_ids
+		return {recipe_ids[row]: n for row, n in counts.items()}
+
+
+class MatrixCache:
+	"""Thread-safe LRU of IncidenceMatrix per user, each stored with the recipe version it was built at."""
+
+	def __init__(self, maxsize: int = 64):
+		self.maxsize = maxsize
+		self._entries: OrderedDict[int, tuple[int, IncidenceMatrix]] = OrderedDict()
+		self._generations: dict[int, int] = {}  # per user, bumped by invalidate
+		self._lock = threading.Lock()
+		self.hits = 0
+		self.misses = 0
+
+	def get(self, user_id: int, loader: Callable[[int], IncidenceMatrix], version: int = 0) -> IncidenceMatrix:
+		"""Return the user's cached matrix if it was built at version, else build it with
+		loader(user_id). The new matrix is not kept if the user was invalidated meanwhile."""
+		with self._lock:
+			entry = self._entries.get(user_id)
+			if entry is not None and entry[0] == version:
+				self._entries.move_to_end(user_id)
+				self.hits += 1
+				return entry[1]
+			self.misses += 1
+			generation = self._generations.get(user_id, 0)
+
+		matrix = loader(user_id)
+		if self.maxsize > 0:
+			with self._lock:
+				entry = self._entries.get(user_id)
+				if self._generations.get(user_id, 0) == generation and (entry is None or entry[0] <= version):
+					self._entries[user_id] = (version, matrix)
+					self._entries.move_to_end(user_id)
+					while len(self._entries) > self.maxsize:
+						self._entries.popitem(last=False)
+		return matrix
+
+	def invalidate(self, user_id: int) -> None:
+		user_id = int(user_id)
+		with self._lock:
+			self._entries.pop(user_id, None)
+			self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+	def clear(self) -> None:
+		"""Drop every matrix and reset the counters."""
+		with self._lock:
+			self._entries.clear()
+			self._generations.clear()
+			self.hits = self.misses = 0
+
+
+matrix_cache = MatrixCache(maxsize=int(os.getenv("GROCERY_GURU_MATRIX_CACHE_SIZE", "64")))
+
+
+def recipe_version(session, user_id: int) -> int:
+	"""The user's recipe write counter (0 before their first write)."""
+	return session.scalar(select(RecipeVersions.version).where(RecipeVersions.user_id == user_id)) or 0
+
+
+def recipes_changed(session, user_id: int) -> None:
+	"""Record a write to user_id's recipes in session's transaction, and drop this process's cached
+	matrix once that transaction ends."""
+	session.execute(sqlite_insert(RecipeVersions).values(user_id=user_id, version=1).on_conflict_do_update(
+		index_elements=[RecipeVersions.user_id], set_={"version": RecipeVersions.version + 1},
+	))
+	invalidate = lambda _session: matrix_cache.invalidate(user_id)  # noqa: E731
+	event.listen(session, "after_commit", invalidate, once=True)
+	event.listen(session, "after_rollback", invalidate, once=True)
+
+
+def _load_matrix(user_id: int) -> IncidenceMatrix:
+	from database import Select
+	return IncidenceMatrix.from_lines(Select.get_recipe_ingredient_names_by_Persons_id(user_id))
+
+
+def pantry_scores(user_id: int, pantry_names: Iterable[str]) -> dict[int, int]:
+	"""{recipe_id: Find Recipe score} for the user's recipes with any match (others score 0)."""
+	from database import session_scope
+	with session_scope() as session:
+		version = recipe_version(session, user_id)  # read before the rows: a matrix is never newer than its key
+	return matrix_cache.get(user_id, _load_matrix, version).scores(pantry_names)
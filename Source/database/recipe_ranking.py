@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Top-K Find Recipe ranking over lightweight (id, title, matched) projections.
+
+Recipes rank by pantry score, most matches first, then by title and id. The order is total, so
+a page is "the K best recipes after cursor" (and the last pages "the K worst before cursor"):
+a RankedRecipe is its own keyset cursor and no page depends on an offset.
+
+Neither backend loads Recipes ORM objects or their ingredients/steps text:
+  - "stored" reads RecipePantryScore with ORDER BY ... LIMIT K, which SQLite answers with a
+    sorter bounded to K rows
+  - "matrix" streams (id, title) rows of the user's recipes (yield_per) and scores each from the
+    user's cached incidence matrix (recipe_matrix.py), keeping the best K in a heap
+so the memory a page needs grows with K, not with the size of the collection.
+"""
+
+import heapq
+from typing import Iterable, NamedTuple
+
+from sqlalchemy import and_, func, or_, select, tuple_
+
+from database.models import RecipePantryScore, Recipes
+
+
+_STREAM_BATCH = 500  # rows fetched at a time by the matrix backend
+
+
+class RankedRecipe(NamedTuple):
+	id: int
+	title: str
+	matched: int
+
+
+def rank_key(recipe: RankedRecipe) -> tuple:
+	"""Sort key of the ranking: ascending key = better rank."""
+	return -recipe.matched, recipe.title, recipe.id
+
+
+def top_k(candidates: Iterable[RankedRecipe], k: int | None, after: RankedRecipe = None,
+		before: RankedRecipe = None, from_end: bool = False) -> list[RankedRecipe]:
+	"""The best k candidates ranked strictly between after and before (either may be None), in
+	rank order; with from_end=True the worst k instead. k=None keeps them all. Holds at most k
+	candidates at a time."""
+	if after is not None:
+		low = rank_key(after)
+		candidates = (c for c in candidates if rank_key(c) > low)
+	if before is not None:
+		high = rank_key(before)
+		candidates = (c for c in candidates if rank_key(c) < high)
+	if k is None:
+		return sorted(candidates, key=rank_key)
+	if from_end:
+		return heapq.nlargest(k, candidates, key=rank_key)[::-1]
+	return heapq.nsmallest(k, candidates, key=rank_key)
+
+
+def _category_filter(category: str | None):
+	"""None or '' for all, 'Others' for uncategorized (NULL/empty), else that category."""
+	if not category or not str(category).strip():
+		return None
+	if category.strip().lower() == "others":
+		return or_(Recipes.category == None, Recipes.category == "")
+	return Recipes.category == category.strip()
+
+
+def _stored_page(session, user_id: int, category: str | None, k: int | None, after, before, from_end, exclude) -> list[RankedRecipe]:
+	matched, title, recipe_id = RecipePantryScore.matched, Recipes.title, Recipes.id
+	query = select(recipe_id, title, matched).join(
+		RecipePantryScore, RecipePantryScore.recipe_id == Recipes.id,
+	).where(
+		RecipePantryScore.person_id == user_id,
+		Recipes.is_deleted == False,
+	)
+	condition = _category_filter(category)
+	if condition is not None:
+		query = query.where(condition)
+	if exclude is not None:
+		query = query.where(Recipes.id.not_in(exclude))
+	if after is not None:
+		query = query.where(or_(
+			matched < after.matched,
+			and_(matched == after.matched, tuple_(title, recipe_id) > tuple_(after.title, after.id)),
+		))
+	if before is not None:
+		query = query.where(or_(
+			matched > before.matched,
+			and_(matched == before.matched, tuple_(title, recipe_id) < tuple_(before.title, before.id)),
+		))
+	if from_end:
+		query = query.order_by(matched, title.desc(), recipe_id.desc())
+	else:
+		query = query.order_by(matched.desc(), title, recipe_id)
+	if k is not None:
+		query = query.limit(k)
+	rows = [RankedRecipe(*row) for row in session.execute(query)]
+	return rows[::-1] if from_end else rows
+
+
+def _matrix_candidates(session, user_id: int, category: str | None, exclude=None):
+	"""Stream every recipe of the user (optionally in one category) with its matrix score."""
+	from database import pantry_scores, recipe_matrix
+	scores = recipe_matrix.pantry_scores(user_id, pantry_scores.pantry_names(session, user_id))
+	query = select(Recipes.id, Recipes.title).where(Recipes.person_id == user_id, Recipes.is_deleted == False)
+	condition = _category_filter(category)
+	if condition is not None:
+		query = query.where(condition)
+	if exclude is not None:
+		query = query.where(Recipes.id.not_in(exclude))
+	for recipe_id, title in session.execute(query.execution_options(yield_per=_STREAM_BATCH)):
+		yield RankedRecipe(recipe_id, title, scores.get(recipe_id, 0))
+
+
+def page(session, user_id: int, category: str | None, k: int | None, after: RankedRecipe = None,
+		before: RankedRecipe = None, from_end: bool = False, backend: str = "stored", exclude=None) -> list[RankedRecipe]:
+	"""One page of the user's ranking: see top_k for after, before and from_end. exclude is a SELECT
+	of recipe ids left out of the ranking. backend is "stored" (RecipePantryScore) or "matrix" (the
+	cached incidence matrix)."""
+	if backend == "matrix":
+		return top_k(_matrix_candidates(session, user_id, category, exclude), k, after, before, from_end)
+	return _stored_page(session, user_id, category, k, after, before, from_end, exclude)
+
+
+def count(session, user_id: int, category: str | None, backend: str = "stored") -> int:
+	"""Number of recipes in the user's ranking."""
+	query = select(func.count()).select_from(Recipes).where(Recipes.person_id == user_id, Recipes.is_deleted == False)
+	if backend != "matrix":
+		query = query.join(RecipePantryScore, RecipePantryScore.recipe_id == Recipes.id)
+	condition = _category_filter(category)
+	if condition is not None:
+		query = query.where(condition)
+	return session.scalar(query)
+
+
+def search(user_id: int, category: str | None, k: int | None, backend: str = "stored") -> tuple[int, list[RankedRecipe]]:
+	"""(size of the ranking, its first k recipes) in one session."""
+	from database import session_scope
+	with session_scope() as session:
+		first = page(session, user_id, category, k, backend=backend)
+		if k is None or len(first) < k:
+			return len(first), first
+		return count(session, user_id, category, backend), first
@@ -0,0 +1,160 @@
+"""
+Short-lived Find Recipe result sets, browsed by an opaque token instead of an ids= query string.
+
+A POST to Find Recipe ranks the user's recipes once and stores the ranking: one
+FindRecipeResultSets row (owner, size, the "Add to" destinations, expiry) plus one
+FindRecipeResultItems row per rank (recipe id and score). Each prev/next page is then a
+primary-key lookup of (token, rank), whatever the size of the result. The per-line pantry flags
+of a recipe are computed the first time its page is shown and stored on its item.
+
+Only the first RESULT_PAGE_SIZE ranks are stored when the search runs; the set also records the
+search's category and total. A rank that has not been stored yet is ranked when it is first asked
+for: the page of up to RESULT_PAGE_SIZE ranks next to the nearest stored rank gets the best
+recipes not stored for the set yet (or the worst, filling backwards from the bottom ranks when
+wrapping past rank 0 makes the end closer), ranked with recipe_ranking.page. Ranks filled this way
+reflect the pantry when they are filled, but no recipe is stored twice or left out however the
+scores moved since the search. A recipe is stored at most once per set (a unique index), and
+concurrent requests filling the same ranks keep whichever rows were stored first.
+
+Sets expire GROCERY_GURU_RESULT_SET_TTL seconds after they are created (default 3600); expired
+sets are never returned and are deleted whenever a new set is stored.
+
+	GROCERY_GURU_RESULT_PAGE_SIZE  ranks stored per page (default 50)
+"""
+
+import json
+import os
+import secrets
+from typing import NamedTuple
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from database.models import FindRecipeResultItems, FindRecipeResultSets
+
+
+RESULT_SET_TTL = int(os.getenv("GROCERY_GURU_RESULT_SET_TTL", "3600"))
+RESULT_PAGE_SIZE = int(os.getenv("GROCERY_GURU_RESULT_PAGE_SIZE", "50"))
+
+
+class ResultPage(NamedTuple):
+	index: int  # 0-based position, already wrapped into range
+	total: int
+	recipe_id: int
+	matched: int
+	pantry_flags: str | None  # "1"/"0" per ingredient line; None until the page is first shown
+	destinations: list[tuple[str, str]]
+
+
+def _now():
+	return func.datetime("now")
+
+
+def purge_expired(session) -> int:
+	"""Delete every expired set and its items. Returns the number of sets deleted."""
+	expired = select(FindRecipeResultSets.token).where(FindRecipeResultSets.expires_at <= _now())
+	session.execute(delete(FindRecipeResultItems).where(FindRecipeResultItems.token.in_(expired)))
+	return session.execute(delete(FindRecipeResultSets).where(FindRecipeResultSets.expires_at <= _now())).rowcount
+
+
+def create(user_id: int, ranked: list[tuple[int, int]], destinations: list[tuple[str, str]], ttl: int = None,
+		total: int = None, category: str = None) -> str:
+	"""Store ranked (recipe_id, matched) pairs for user_id and return the new set's token.
+	ranked may be the first ranks of a longer ranking of total recipes in category; the rest are
+	filled by get_page on demand."""
+	from database import session_scope
+	token = secrets.token_urlsafe(16)
+	ttl = RESULT_SET_TTL if ttl is None else ttl
+	with session_scope() as session:
+		purge_expired(session)
+		session.execute(insert(FindRecipeResultSets).values({
+			FindRecipeResultSets.token: token,
+			FindRecipeResultSets.person_id: user_id,
+			FindRecipeResultSets.total: len(ranked) if total is None else total,
+			FindRecipeResultSets.category: category,
+			FindRecipeResultSets.destinations: json.dumps(destinations),
+			FindRecipeResultSets.expires_at: func.datetime("now", f"{int(ttl):+d} seconds"),
+		}))
+		if ranked:
+			session.execute(insert(FindRecipeResultItems), [
+				{"token": token, "rank": rank, "recipe_id": recipe_id, "matched": matched}
+				for rank, (recipe_id, matched) in enumerate(ranked)
+			])
+	return token
+
+
+def get_page(token: str, user_id: int, index: int, backend: str = "stored") -> ResultPage | None:
+	"""The item at index (wrapped around the ends) of user_id's live set, or None if the token is
+	unknown, expired, another user's, or empty, or if the recipes left to rank ran out (deleted
+	since the search). backend ranks any pages still to be filled (see recipe_ranking.page)."""
+	from database import session_scope
+	if not token:
+		return None
+	with session_scope() as session:
+		header = session.execute(
+			select(FindRecipeResultSets.total, FindRecipeResultSets.category, FindRecipeResultSets.destinations).where(
+				FindRecipeResultSets.token == token,
+				FindRecipeResultSets.person_id == user_id,
+				FindRecipeResultSets.expires_at > _now(),
+			)
+		).first()
+		if header is None or not header.total:
+			return None
+		index %= header.total
+		item = _item(session, token, index)
+		if item is None and _fill(session, token, user_id, header.category, header.total, index, backend):
+			item = _item(session, token, index)
+		if item is None:
+			return None
+		destinations = [tuple(option) for option in json.loads(header.destinations)]
+		return ResultPage(index, header.total, item.recipe_id, item.matched, item.pantry_flags, destinations)
+
+
+def _item(session, token: str, index: int):
+	return session.execute(
+		select(FindRecipeResultItems.recipe_id, FindRecipeResultItems.matched, FindRecipeResultItems.pantry_flags).where(
+			FindRecipeResultItems.token == token,
+			FindRecipeResultItems.rank == index,
+		)
+	).first()
+
+
+def _fill(session, token: str, user_id: int, category: str | None, total: int, index: int, backend: str) -> bool:
+	"""Rank and store pages next to the stored ranks until index is stored. The missing index lies
+	in a gap between stored ranks (normally the run from 0 and the run ending at total - 1) and each
+	page shrinks the gap. Rows that clash with ranks or recipes another request stored meanwhile
+	are skipped, and the loop ranks what is still missing. False if a page comes back empty."""
+	from database import recipe_ranking
+	stored = select(FindRecipeResultItems.recipe_id).where(FindRecipeResultItems.token == token)
+	while _item(session, token, index) is None:
+		top = session.scalar(select(func.max(FindRecipeResultItems.rank)).where(
+			FindRecipeResultItems.token == token, FindRecipeResultItems.rank < index,
+		))
+		bottom = session.scalar(select(func.min(FindRecipeResultItems.rank)).where(
+			FindRecipeResultItems.token == token, FindRecipeResultItems.rank > index,
+		))
+		start = 0 if top is None else top + 1
+		end = total if bottom is None else bottom
+		from_end = end - index < index - start + 1
+		ranked = recipe_ranking.page(
+			session, user_id, category, min(RESULT_PAGE_SIZE, end - start), from_end=from_end, backend=backend, exclude=stored,
+		)
+		if not ranked:
+			return False
+		first = end - len(ranked) if from_end else start
+		session.execute(sqlite_insert(FindRecipeResultItems).on_conflict_do_nothing(), [
+			{"token": token, "rank": rank, "recipe_id": recipe.id, "matched": recipe.matched}
+			for rank, recipe in enumerate(ranked, first)
+		])
+	return True
+
+
+def save_pantry_flags(token: str, index: int, flags: str):
+	"""Remember the per-line pantry flags computed for the item at index."""
+	from database import session_scope
+	with session_scope() as session:
+		session.execute(
+			update(FindRecipeResultItems)
+			.where(FindRecipeResultItems.token == token, FindRecipeResultItems.rank == index)
+			.values(pantry_flags=flags)
+		)
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP fetching for recipe imports: a persistent response cache over one pooled session.
+
+Responses are stored in a SQLite file keyed by normalized URL (scheme and host lowercased, default
+port, fragment and tracking parameters such as utm_* dropped, query parameters sorted), with their
+body, encoding, ETag and Last-Modified:
+  - a fresh entry (younger than its max-age, else GROCERY_GURU_HTTP_CACHE_FRESH) is served without
+    any network I/O
+  - a stale one is revalidated with a conditional GET (If-None-Match / If-Modified-Since); a 304
+    keeps the stored body and makes it fresh again, and so does a failed revalidation (network
+    error or HTTP error status) for GROCERY_GURU_HTTP_CACHE_NEGATIVE_TTL seconds: the stale body is
+    served rather than dropped
+  - a failed fetch of a URL with no stored body is remembered for
+    GROCERY_GURU_HTTP_CACHE_NEGATIVE_TTL seconds, during which the URL fails without a request
+    (unless the caller asks to refetch failed URLs, as an import job's retry does)
+  - responses marked Cache-Control: no-store are never stored
+Bodies are evicted least recently used first once they total more than
+GROCERY_GURU_HTTP_CACHE_MAX_BYTES. Lookup outcomes are counted in the same file, so the hit rate
+covers every process sharing it:
+
+	python3 Source/http_cache.py --stats   # entries, bytes, hits, misses, hit rate
+	python3 Source/http_cache.py --clear   # drop every entry and reset the counters
+
+Requests go through one shared requests.Session (shared_session()): its adapters keep up to
+GROCERY_GURU_HTTP_POOL_MAXSIZE keep-alive connections for each of GROCERY_GURU_HTTP_POOL_HOSTS
+hosts, so back-to-back imports from one site skip the TCP and TLS handshakes, and retry connection
+errors and 429/5xx answers with exponential backoff (honouring Retry-After). Sessions are safe to
+share between threads for GETs: urllib3's pools and requests' cookie jar are locked.
+host_limiter spaces the imports of one host GROCERY_GURU_HTTP_HOST_INTERVAL seconds apart; callers
+that fetch many pages (import jobs, bulk imports) take a slot before each one.
+
+	GROCERY_GURU_HTTP_CACHE_PATH         cache file (default http_cache.db next to the database)
+	GROCERY_GURU_HTTP_CACHE_MAX_BYTES    total body size kept (default 64 MiB; 0 disables the cache)
+	GROCERY_GURU_HTTP_CACHE_FRESH        seconds a response is served without revalidation when it
+	                                     carries no max-age (default 3600)
+	GROCERY_GURU_HTTP_CACHE_NEGATIVE_TTL seconds a failed URL is not retried (default 300)
+	GROCERY_GURU_HTTP_POOL_HOSTS         hosts whose connections are pooled (default 16)
+	GROCERY_GURU_HTTP_POOL_MAXSIZE       keep-alive connections kept per host (default 8)
+	GROCERY_GURU_HTTP_RETRIES            retries of a failed GET (default 2)
+	GROCERY_GURU_HTTP_BACKOFF            backoff factor: retry n waits backoff * 2**(n-1) s (default 0.5)
+	GROCERY_GURU_HTTP_CONNECT_TIMEOUT    seconds to establish a connection (default 5)
+	GROCERY_GURU_HTTP_READ_TIMEOUT       seconds to wait for each read of the response (default 15)
+	GROCERY_GURU_HTTP_HOST_INTERVAL      minimum seconds between imports from one host (default 1; 0 = none)
+"""
+
+import codecs
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, NamedTuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+TIMEOUT = (  # (connect, read) seconds
+	float(os.getenv("GROCERY_GURU_HTTP_CONNECT_TIMEOUT", "5")),
+	float(os.getenv("GROCERY_GURU_HTTP_READ_TIMEOUT", "15")),
+)
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+_TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|igshid)$", re.I)
+_MAX_AGE = re.compile(r"max-age\s*=\s*(\d+)", re.I)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+	url TEXT NOT NULL PRIMARY KEY,
+	status INTEGER NOT NULL,
+	body BLOB,
+	encoding TEXT,
+	etag TEXT,
+	last_modified TEXT,
+	fresh_until REAL NOT NULL,
+	last_used REAL NOT NULL,
+	size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_responses_last_used ON responses (last_used);
+CREATE TABLE IF NOT EXISTS counters (
+	name TEXT NOT NULL PRIMARY KEY,
+	value INTEGER NOT NULL
+);
+"""
+
+
+class FetchError(Exception):
+	"""The page could not be fetched: a network error (status 0) or an HTTP error status."""
+
+	def __init__(self, status: int, reason: str = None):
+		self.status = status
+		detail = f"HTTP {status}" if status else (reason or "network error")
+		super().__init__(f"Could not fetch the page ({detail}).")
+
+	@property
+	def transient(self) -> bool:
+		"""Worth retrying later: a network error, a timeout, throttling or a server error."""
+		return self.status == 0 or self.status in (408, 429) or self.status >= 500
+
+
+class CacheStats(NamedTuple):
+	entries: int
+	negative_entries: int
+	bytes: int
+	hits: int  # fresh responses served without network I/O
+	revalidated: int  # stale responses confirmed by a 304
+	misses: int  # full fetches
+	negative_hits: int  # URLs failed from the negative cache
+	stale: int  # stale responses served because their revalidation failed
+
+	@property
+	def hit_rate(self) -> float:
+		"""Share of lookups answered from the cache (hits, 304 revalidations and stale responses)."""
+		lookups = self.hits + self.revalidated + self.misses + self.negative_hits + self.stale
+		return (self.hits + self.revalidated + self.stale) / lookups if lookups else 0.0
+
+
+def build_session(pool_hosts: int = None, pool_maxsize: int = None, retries: int = None, backoff: float = None) -> requests.Session:
+	"""A Session with bounded keep-alive pools and a retry policy (defaults from the environment)."""
+	retry = Retry(
+		total=int(os.getenv("GROCERY_GURU_HTTP_RETRIES", "2")) if retries is None else retries,
+		backoff_factor=float(os.getenv("GROCERY_GURU_HTTP_BACKOFF", "0.5")) if backoff is None else backoff,
+		status_forcelist=(429, 500, 502, 503, 504),
+		allowed_methods=frozenset({"GET", "HEAD"}),
+		respect_retry_after_header=True,
+		raise_on_status=False,  # the last answer is returned (and negative-cached) rather than raised
+	)
+	adapter = HTTPAdapter(
+		pool_connections=int(os.getenv("GROCERY_GURU_HTTP_POOL_HOSTS", "16")) if pool_hosts is None else pool_hosts,
+		pool_maxsize=int(os.getenv("GROCERY_GURU_HTTP_POOL_MAXSIZE", "8")) if pool_maxsize is None else pool_maxsize,
+		max_retries=retry,
+	)
+	session = requests.Session()
+	session.headers["User-Agent"] = USER_AGENT
+	session.mount("http://", adapter)
+	session.mount("https://", adapter)
+	return session
+
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def shared_session() -> requests.Session:
+	"""The process-wide Session, built on first use."""
+	global _session
+	if _session is None:
+		with _session_lock:
+			if _session is None:
+				_session = build_session()
+	return _session
+
+
+class HostRateLimiter:
+	"""Per-host request slots at least interval seconds apart (thread-safe, per process)."""
+
+	def __init__(self, interval: float, clock: Callable[[], float] = time.monotonic):
+		self.interval = interval
+		self._next: dict[str, float] = {}  # host -> earliest start of its next request
+		self._lock = threading.Lock()
+		self._clock = clock
+
+	def acquire(self, host: str) -> float:
+		"""Take host's next slot if it is due: returns 0.0. Otherwise the seconds until it is due."""
+		host = (host or "").lower()
+		with self._lock:
+			now = self._clock()
+			due = self._next.get(host, now)
+			if due > now:
+				return due - now
+			if len(self._next) > 1024:
+				self._next = {h: t for h, t in self._next.items() if t > now}
+			self._next[host] = now + self.interval
+			return 0.0
+
+	def wait(self, host: str):
+		"""Block until host's next slot is due, and take it."""
+		while (delay := self.acquire(host)) > 0:
+			time.sleep(delay)
+
+
+host_limiter = HostRateLimiter(float(os.getenv("GROCERY_GURU_HTTP_HOST_INTERVAL", "1")))
+
+
+def default_cache_path() -> str:
+	"""GROCERY_GURU_HTTP_CACHE_PATH, else http_cache.db in the database's directory."""
+	if os.getenv("GROCERY_GURU_HTTP_CACHE_PATH"):
+		return os.environ["GROCERY_GURU_HTTP_CACHE_PATH"]
+	db_path = os.getenv("GROCERY_GURU_DB_PATH")
+	directory = Path(db_path).parent if db_path else Path(__file__).resolve().parent.parent / "Database"
+	return str(directory / "http_cache.db")
+
+
+def normalize_url(url: str) -> str:
+	"""Cache key of url: equivalent spellings of one page map to the same key."""
+	parts = urlsplit(url.strip())
+	scheme = parts.scheme.lower()
+	host = (parts.hostname or "").lower()
+	if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+		host = f"{host}:{parts.port}"
+	query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _TRACKING_PARAMS.match(k))
+	return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+def _fresh_for(headers, default: float) -> float | None:
+	"""Seconds the response may be served without revalidation, or None if it must not be stored."""
+	cache_control = headers.get("Cache-Control", "")
+	if "no-store" in cache_control.lower():
+		return None
+	if "no-cache" in cache_control.lower():
+		return 0.0
+	match = _MAX_AGE.search(cache_control)
+	return float(match.group(1)) if match else default
+
+
+class HttpCache:
+	"""GET through the on-disk cache. get is the function doing the network request (shared_session().get)."""
+
+	def __init__(self, path: str = None, max_bytes: int = None, fresh_for: float = None, negative_ttl: float = None,
+			get: Callable = None, clock: Callable[[], float] = time.time):
+		self._path = path
+		self.max_bytes = int(os.getenv("GROCERY_GURU_HTTP_CACHE_MAX_BYTES", str(64 * 2**20))) if max_bytes is None else max_bytes
+		self.fresh_for = float(os.getenv("GROCERY_GURU_HTTP_CACHE_FRESH", "3600")) if fresh_for is None else fresh_for
+		self.negative_ttl = float(os.getenv("GROCERY_GURU_HTTP_CACHE_NEGATIVE_TTL", "300")) if negative_ttl is None else negative_ttl
+		self._get = get
+		self._clock = clock
+		self._ready = False
+
+	@property
+	def path(self) -> str:
+		return self._path or default_cache_path()
+
+	def _connect(self) -> sqlite3.Connection:
+		conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+		if not self._ready:
+			Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+			conn.execute("PRAGMA journal_mode=WAL")
+			for statement in _SCHEMA.split(";"):
+				if statement.strip():
+					conn.execute(statement)
+			self._ready = True
+		return conn
+
+	def _count(self, conn, name: str):
+		conn.execute(
+			"INSERT INTO counters (name, value) VALUES (?, 1) ON CONFLICT (name) DO UPDATE SET value = value + 1",
+			(name,),
+		)
+
+	def get_text(self, url: str) -> str | None:
+		"""The body of url decoded as text, or None if it cannot be fetched (now or recently)."""
+		try:
+			return self.fetch_text(url)
+		except FetchError:
+			return None
+
+	def fetch_text(self, url: str, refetch_failed: bool = False) -> str:
+		"""The body of url decoded as text (the stored body if it is stale and cannot be revalidated).
+		Raises FetchError if it cannot be fetched, or failed within the negative-cache TTL (unless
+		refetch_failed)."""
+		if self.max_bytes <= 0:
+			return self._fetch_text(url)
+		key = normalize_url(url)
+		now = self._clock()
+		conn = self._connect()
+		try:
+			row = conn.execute(
+				"SELECT status, body, encoding, etag, last_modified, fresh_until FROM responses WHERE url = ?", (key,),
+			).fetchone()
+			if row is not None and now < row[5] and not (refetch_failed and not 200 <= row[0] < 300):
+				ok = 200 <= row[0] < 300
+				with conn:
+					conn.execute("UPDATE responses SET last_used = ? WHERE url = ?", (now, key))
+					self._count(conn, "hits" if ok else "negative_hits")
+				if not ok:
+					raise FetchError(row[0], "failed recently")
+				return _decode(row[1], row[2])
+			conditional = row is not None and 200 <= row[0] < 300 and (row[3] or row[4])
+			headers = {"User-Agent": USER_AGENT}
+			if conditional and row[3]:
+				headers["If-None-Match"] = row[3]
+			if conditional and row[4]:
+				headers["If-Modified-Since"] = row[4]
+			try:
+				resp, error = (self._get or shared_session().get)(url, headers=headers, timeout=TIMEOUT), None
+			except Exception as e:
+				resp, error = None, e
+			if resp is not None and resp.status_code == 304 and conditional:
+				fresh = _fresh_for(resp.headers, self.fresh_for)
+				with conn:
+					conn.execute(
+						"UPDATE responses SET fresh_until = ?, last_used = ? WHERE url = ?",
+						(now + (fresh or 0), now, key),
+					)
+					self._count(conn, "revalidated")
+				return _decode(row[1], row[2])
+			if resp is None or not 200 <= resp.status_code < 300:
+				status = 0 if resp is None else resp.status_code
+				stale = row is not None and 200 <= row[0] < 300
+				with conn:
+					if stale:
+						self._count(conn, "stale")
+						conn.execute(
+							"UPDATE responses SET fresh_until = ?, last_used = ? WHERE url = ?",
+							(now + self.negative_ttl, now, key),
+						)
+					else:
+						self._count(conn, "misses")
+						conn.execute(
+							"INSERT OR REPLACE INTO responses (url, status, fresh_until, last_used, size) VALUES (?, ?, ?, ?, 0)",
+							(key, status, now + self.negative_ttl, now),
+						)
+				if stale:
+					return _decode(row[1], row[2])
+				raise FetchError(status, type(error).__name__ if error else None)
+			with conn:
+				self._count(conn, "misses")
+				encoding = _response_encoding(resp)
+				fresh = _fresh_for(resp.headers, self.fresh_for)
+				if fresh is None or len(resp.content) > self.max_bytes:
+					conn.execute("DELETE FROM responses WHERE url = ?", (key,))
+				else:
+					conn.execute(
+						"INSERT OR REPLACE INTO responses "
+						"(url, status, body, encoding, etag, last_modified, fresh_until, last_used, size) "
+						"VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+						(
+							key, resp.status_code, resp.content, encoding, resp.headers.get("ETag"),
+							resp.headers.get("Last-Modified"), now + fresh, now, len(resp.content),
+						),
+					)
+					self._evict(conn)
+				return _decode(resp.content, encoding)
+		finally:
+			conn.close()
+
+	def _fetch_text(self, url: str) -> str:
+		try:
+			resp = (self._get or shared_session().get)(url, headers={"User-Agent": USER_AGENT}, timeout=TIMEOUT)
+		except Exception as e:
+			raise FetchError(0, type(e).__name__) from e
+		if not 200 <= resp.status_code < 300:
+			raise FetchError(resp.status_code)
+		return _decode(resp.content, _response_encoding(resp))
+
+	def _evict(self, conn):
+		"""Drop least recently used bodies until the total fits in max_bytes."""
+		total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+		if total <= self.max_bytes:
+			return
+		doomed = []
+		for url, size in conn.execute("SELECT url, size FROM responses WHERE size > 0 ORDER BY last_used"):
+			doomed.append((url,))
+			total -= size
+			if total <= self.max_bytes:
+				break
+		conn.executemany("DELETE FROM responses WHERE url = ?", doomed)
+
+	def stats(self) -> CacheStats:
+		conn = self._connect()
+		try:
+			entries, negative, size = conn.execute(
+				"SELECT COUNT(*), COALESCE(SUM(status NOT BETWEEN 200 AND 299), 0), COALESCE(SUM(size), 0) FROM responses"
+			).fetchone()
+			counters = dict(conn.execute("SELECT name, value FROM counters"))
+		finally:
+			conn.close()
+		return CacheStats(
+			entries, negative, size,
+			counters.get("hits", 0), counters.get("revalidated", 0), counters.get("misses", 0), counters.get("negative_hits", 0),
+			counters.get("stale", 0),
+		)
+
+	def clear(self):
+		conn = self._connect()
+		try:
+			with conn:
+				conn.execute("DELETE FROM responses")
+				conn.execute("DELETE FROM counters")
+		finally:
+			conn.close()
+
+
+def _known_encoding(encoding: str | None) -> str | None:
+	"""encoding if Python has a codec for it (servers send charsets such as "utf8mb4"), else None."""
+	if not encoding:
+		return None
+	try:
+		codecs.lookup(encoding)
+	except LookupError:
+		return None
+	return encoding
+
+
+def _response_encoding(resp) -> str:
+	"""The response's declared charset, else the detected one, else utf-8: always a known codec."""
+	return _known_encoding(resp.encoding) or _known_encoding(resp.apparent_encoding) or "utf-8"
+
+
+def _decode(body: bytes, encoding: str | None) -> str:
+	return (body or b"").decode(_known_encoding(encoding) or "utf-8", errors="replace")
+
+
+def main(argv: list[str] = None) -> int:
+	import argparse
+	parser = argparse.ArgumentParser(description="Inspect or clear the recipe import HTTP cache.")
+	group = parser.add_mutually_exclusive_group(required=True)
+	group.add_argument("--stats", action="store_true", help="Print entries, size and hit rate")
+	group.add_argument("--clear", action="store_true", help="Drop every entry and reset the counters")
+	args = parser.parse_args(argv)
+	cache = HttpCache()
+	if args.clear:
+		cache.clear()
+		print(f"{cache.path}: cleared")
+		return 0
+	s = cache.stats()
+	print(f"{cache.path}: {s.entries} entries ({s.negative_entries} negative), {s.bytes} bytes")
+	print(f"hits {s.hits}, revalidated {s.revalidated}, misses {s.misses}, negative hits {s.negative_hits}, stale {s.stale}, hit rate {s.hit_rate:.1%}")
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Canonical keys for ingredient names and recipe ingredient lines.
+
+canonical() lowercases the text and splits it into word tokens (punctuation and parentheticals
+such as "(15 oz)" are dropped), then:
+  1. singularizes each word ("eggs" -> "egg", "tomatoes" -> "tomato", "leaves" -> "leaf")
+  2. strips a leading amount: quantities ("2", "1/2", "½", "a"), then any units that follow one
+     ("cup", "tbsp", "g", "can"), then "of"; size words ("large", "extra large") go with or without
+     a quantity. A number word such as "half" or "five" is an amount only before a unit or "of"
+     ("half cup milk"), so "half and half" and "five spice powder" keep their names
+  3. rewrites synonyms ("scallion" -> "green onion", "icing sugar" -> "powdered sugar"), longest
+     phrase first
+and joins the words with single spaces: "3 Large Eggs, beaten" -> "egg beaten".
+
+Pantry names (Ingredients.canonical_name) and recipe lines (RecipeIngredients.name) both store
+this key, so "Eggs" in the pantry matches "2 eggs" in a recipe and two spellings of one pantry
+item are one ingredient. The key is idempotent: canonical(canonical(x)) == canonical(x).
+
+The word rules and the synonym table are compiled once at import into dicts (the synonym table
+into a word-level prefix index); per-word results are memoized.
+"""
+
+import re
+from functools import lru_cache
+
+
+_TOKEN = re.compile(r"\d+(?:[.,/⁄]\d+)*|[^\W_]+(?:['’-][^\W_]+)*")
+_PARENTHETICAL = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+_NUMERIC = re.compile(r"[\d½⅓⅔¼¾⅕⅖⅗⅘⅙⅚⅛⅜⅝⅞.,/⁄]+")
+
+_NUMBER_WORDS = frozenset({
+	"a", "an", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
+	"eleven", "twelve", "dozen", "half", "quarter", "couple", "few", "several",
+})
+_RANGE_WORDS = frozenset({"to", "or", "and"})  # "2 to 3", "1 or 2", "1 and 1/2"
+_UNITS = frozenset({
+	"cup", "c", "tablespoon", "tbsp", "tbs", "tbl", "teaspoon", "tsp", "t",
+	"ounce", "oz", "fl", "fluid", "pound", "lb", "gram", "g", "kilogram", "kg", "mg",
+	"milliliter", "millilitre", "ml", "liter", "litre", "l", "pint", "pt", "quart", "qt", "gallon", "gal",
+	"pinch", "dash", "drop", "splash", "handful", "clove", "can", "tin", "jar", "bottle", "bag", "box",
+	"package", "pkg", "packet", "envelope", "container", "carton", "stick", "slice", "piece", "cube",
+	"bunch", "sprig", "head", "stalk", "sheet", "knob", "x",
+})
+_ARTICLES = frozenset({"a", "an"})  # never part of a name, so an amount wherever they lead
+_SIZES = frozenset({"small", "medium", "large", "big", "heaping", "heaped", "level", "scant", "generous"})
+
+# Words that look plural but are not (or whose singular would collide with another word)
+_INVARIANT = frozenset({
+	"molasses", "hummus", "couscous", "asparagus", "citrus", "octopus", "swiss", "brussels",
+	"chassis", "series", "species", "grits", "oats", "greens", "schnapps",
+})
+_IRREGULAR = {
+	"leaves": "leaf", "loaves": "loaf", "halves": "half", "calves": "calf", "knives": "knife",
+	"shelves": "shelf", "wolves": "wolf", "lives": "life", "geese": "goose", "teeth": "tooth",
+	"feet": "foot", "mice": "mouse", "children": "child", "lbs": "lb", "ozs": "oz", "tbsps": "tbsp",
+	"tsps": "tsp", "cookies": "cookie", "brownies": "brownie", "pies": "pie", "smoothies": "smoothie",
+	"veggies": "veggie", "calories": "calorie", "movies": "movie", "prairies": "prairie",
+	"anchovies": "anchovy",
+}
+
+# Phrase -> canonical phrase. Written in natural (plural or singular) form; compiled through the
+# same word rules below.
+SYNONYMS = {
+	"scallion": "green onion",
+	"spring onion": "green onion",
+	"garbanzo": "chickpea",
+	"garbanzo bean": "chickpea",
+	"icing sugar": "powdered sugar",
+	"confectioners sugar": "powdered sugar",
+	"confectioner's sugar": "powdered sugar",
+	"caster sugar": "superfine sugar",
+	"courgette": "zucchini",
+	"aubergine": "eggplant",
+	"rocket": "arugula",
+	"capsicum": "bell pepper",
+	"coriander leaf": "cilantro",
+	"cornflour": "cornstarch",
+	"corn starch": "cornstarch",
+	"plain flour": "all-purpose flour",
+	"all purpose flour": "all-purpose flour",
+	"ap flour": "all-purpose flour",
+	"double cream": "heavy cream",
+	"heavy whipping cream": "heavy cream",
+	"single cream": "light cream",
+	"prawn": "shrimp",
+	"minced beef": "ground beef",
+	"beef mince": "ground beef",
+	"bicarbonate of soda": "baking soda",
+	"bicarb soda": "baking soda",
+	"sodium bicarbonate": "baking soda",
+	"yoghurt": "yogurt",
+	"chilli": "chili",
+	"chile": "chili",
+	"mangetout": "snow pea",
+	"beetroot": "beet",
+	"swede": "rutabaga",
+	"clarified butter": "ghee",
+	"soya sauce": "soy sauce",
+}
+
+
+@lru_cache(maxsize=8192)
+def singular(word: str) -> str:
+	"""Singular form of one lowercase word (a fixed point: singular(singular(w)) == singular(w))."""
+	while True:
+		base = _singular_step(word)
+		if base == word:
+			return word
+		word = base
+
+
+def _singular_step(word: str) -> str:
+	if word in _IRREGULAR:
+		return _IRREGULAR[word]
+	if word.endswith(("'s", "’s")):
+		return word[:-2]
+	if len(word) <= 3 or word in _INVARIANT or not word.endswith("s") or word.endswith(("ss", "us", "is")):
+		return word
+	if word.endswith("ies") and len(word) > 4:
+		return word[:-3] + "y"  # berries, cherries
+	if word.endswith(("oes", "ches", "shes", "xes", "zes", "sses")):
+		return word[:-2]  # tomatoes, peaches, radishes, boxes
+	return word[:-1]
+
+
+def _compile_synonyms(table: dict[str, str]) -> dict[str, list[tuple[tuple[str, ...], tuple[str, ...]]]]:
+	"""{first word: [(phrase words, replacement words), ...] longest phrase first}."""
+	index = {}
+	for phrase, replacement in table.items():
+		key = tuple(singular(w) for w in _TOKEN.findall(phrase.lower()))
+		value = tuple(singular(w) for w in _TOKEN.findall(replacement.lower()))
+		index.setdefault(key[0], []).append((key, value))
+	for entries in index.values():
+		entries.sort(key=lambda entry: -len(entry[0]))
+	return index
+
+
+_SYNONYM_INDEX = _compile_synonyms(SYNONYMS)
+
+
+def _is_quantity(word: str) -> bool:
+	return word in _NUMBER_WORDS or _NUMERIC.fullmatch(word) is not None
+
+
+def _quantity_end(words: list[str], i: int) -> int:
+	"""End of the run of quantities starting at words[i] ("2", "1 to 2", "a few"), short of the last word."""
+	last = len(words) - 1
+	j = i
+	while j < last and (
+		_is_quantity(words[j]) or (j > i and words[j] in _RANGE_WORDS and j + 1 < last and _is_quantity(words[j + 1]))
+	):
+		j += 1
+	return j
+
+
+def _strip_amount(words: list[str]) -> list[str]:
+	"""Drop a leading amount ("2 cups", "1 to 2 large", "a pinch of", "half cup") and size words
+	("large eggs"), keeping at least one word. Number words with no numeral or article alongside are
+	kept unless a unit or "of" follows them."""
+	last = len(words) - 1
+	i = 0
+	amount = False
+	while i < last:
+		word = words[i]
+		if _is_quantity(word):
+			j = _quantity_end(words, i)
+			numeral = any(w in _ARTICLES or _NUMERIC.fullmatch(w) for w in words[i:j])
+			if not (numeral or words[j] in _UNITS or words[j] == "of"):
+				break
+			i = j
+			amount = True
+		elif word in _SIZES or (word == "extra" and words[i + 1] in _SIZES):
+			i += 1
+		elif amount and (word in _UNITS or word == "of"):
+			i += 1
+		else:
+			break
+	return words[i:]
+
+
+def _apply_synonyms(words: list[str]) -> list[str]:
+	if _SYNONYM_INDEX.keys().isdisjoint(words):
+		return words
+	out = []
+	i = 0
+	while i < len(words):
+		for phrase, replacement in _SYNONYM_INDEX.get(words[i], ()):
+			if tuple(words[i:i + len(phrase)]) == phrase:
+				out.extend(replacement)
+				i += len(phrase)
+				break
+		else:
+			out.append(words[i])
+			i += 1
+	return out
+
+
+@lru_cache(maxsize=65536)
+def canonical(text: str) -> str:
+	"""Canonical key of an ingredient name or recipe ingredient line ("" if it has no words)."""
+	words = _TOKEN.findall(_PARENTHETICAL.sub(" ", (text or "").lower()))
+	words = _strip_amount([singular(w) for w in words])
+	return " ".join(_apply_synonyms(words))
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Match pantry ingredient names against recipe ingredient text with an Aho-Corasick automaton.
+
+A PantryMatcher is compiled once per pantry snapshot (compile_pantry caches the last few) and
+then scans each recipe's ingredient text in a single pass, instead of one substring search per
+pantry name. Matching keeps the rules Find Recipe has always used: case-insensitive substring
+matches, names shorter than two characters ignored, each pantry name counted at most once per
+recipe, and lines joined with a space for the recipe-level count.
+
+match_lines(..., fuzzy=t) additionally marks a line that no name occurs in with the pantry names
+at least a fraction t of whose trigrams it contains (trigram_index.TrigramIndex.contained_in), so
+"breast of chicken" or "chiken breast" still show "chicken breast" as owned. The recipe-level
+count stays exact: it is the stored Find Recipe score.
+"""
+
+from collections import deque
+from functools import lru_cache
+from typing import Iterable, NamedTuple
+
+import trigram_index
+
+
+class PantryMatch(NamedTuple):
+	count: int  # distinct pantry names found in the recipe (lines joined with a space)
+	lines: list[tuple[str, frozenset]]  # (stripped line, pantry names found within that line)
+
+
+class PantryMatcher:
+	"""Aho-Corasick automaton over a set of lowercase pantry names."""
+
+	def __init__(self, names: Iterable[str]):
+		self.names = tuple(sorted({n for n in names if n and len(n) >= 2}))
+		self._lengths = [len(n) for n in self.names]
+		self._delta, self._out = self._compile(self.names)
+		self._trigrams = None
+
+	@staticmethod
+	def _compile(names):
+		"""Build the trie, its failure links, and then a full transition table (state -> {char: state})
+		so scanning never has to follow failure links."""
+		goto = [{}]
+		out = [()]
+		for index, name in enumerate(names):
+			state = 0
+			for ch in name:
+				nxt = goto[state].get(ch)
+				if nxt is None:
+					nxt = len(goto)
+					goto[state][ch] = nxt
+					goto.append({})
+					out.append(())
+				state = nxt
+			out[state] += (index,)
+
+		fail = [0] * len(goto)
+		order = []  # states in breadth-first order
+		queue = deque(goto[0].values())
+		while queue:
+			state = queue.popleft()
+			order.append(state)
+			for ch, nxt in goto[state].items():
+				queue.append(nxt)
+				f = fail[state]
+				while f and ch not in goto[f]:
+					f = fail[f]
+				fail[nxt] = goto[f].get(ch, 0) if state else 0
+				out[nxt] += out[fail[nxt]]
+
+		delta = [None] * len(goto)
+		delta[0] = dict(goto[0])
+		for state in order:  # a state's failure target is always shallower, so already filled in
+			delta[state] = {**delta[fail[state]], **goto[state]}
+		return delta, out
+
+	def __bool__(self):
+		return bool(self.names)
+
+	def match(self, ingredients_text: str) -> PantryMatch:
+		"""Scan the recipe's non-blank lines once; return the match count and per-line matches."""
+		lines = [ln.strip() for ln in (ingredients_text or "").splitlines() if ln.strip()]
+		return self.match_lines((line, line.lower()) for line in lines)
+
+	def fuzzy_names_in(self, text: str, threshold: float) -> set[str]:
+		"""Pantry names at least threshold of whose trigrams occur in text."""
+		if self._trigrams is None:
+			self._trigrams = trigram_index.TrigramIndex((name, name) for name in self.names)
+		return {match.key for match in self._trigrams.contained_in(text, threshold)}
+
+	def match_lines(self, lines: Iterable[tuple[str, str]], fuzzy: float = None) -> PantryMatch:
+		"""match() over already-split (display text, lowercase text to scan) pairs, such as the
+		(raw_text, name) columns of RecipeIngredients. With fuzzy, lines without an exact match
+		take the names fuzzy_names_in(scan, fuzzy) finds (the count is unaffected)."""
+		if not self.names:
+			return PantryMatch(0, [(line, frozenset()) for line, _ in lines])
+		delta, out, lengths = self._delta, self._out, self._lengths
+		found = set()
+		per_line = []
+		state = 0
+		for line_no, (line, scan) in enumerate(lines):
+			if line_no:
+				# The separator joining lines: matches ending here span two lines, so they only
+				# count towards the recipe total
+				state = delta[state].get(" ", 0)
+				found.update(out[state])
+			in_line = set()
+			for pos, ch in enumerate(scan):
+				state = delta[state].get(ch, 0)
+				if out[state]:
+					for index in out[state]:
+						found.add(index)
+						if lengths[index] <= pos + 1:
+							in_line.add(index)
+			names = frozenset(self.names[i] for i in in_line)
+			if not names and fuzzy:
+				names = frozenset(self.fuzzy_names_in(scan, fuzzy))
+			per_line.append((line, names))
+		return PantryMatch(len(found), per_line)
+
+	def count(self, ingredients_text: str) -> int:
+		"""match(...).count without the per-line bookkeeping, for ranking many recipes."""
+		if not self.names:
+			return 0
+		joined = " ".join(ln.strip() for ln in (ingredients_text or "").splitlines() if ln.strip()).lower()
+		delta, out = self._delta, self._out
+		found = set()
+		state = 0
+		for ch in joined:
+			state = delta[state].get(ch, 0)
+			if out[state]:
+				found.update(out[state])
+		return len(found)
+
+	def names_in(self, text: str) -> set[str]:
+		"""The pantry names found in text (scanned as-is: callers pass lowercase text)."""
+		delta, out = self._delta, self._out
+		found = set()
+		state = 0
+		for ch in text or "":
+			state = delta[state].get(ch, 0)
+			if out[state]:
+				found.update(out[state])
+		return {self.names[i] for i in found}
+
+	def line_matches(self, line: str) -> bool:
+		"""True if any pantry name occurs in this single line."""
+		state = 0
+		delta, out = self._delta, self._out
+		for ch in (line or "").strip().lower():
+			state = delta[state].get(ch, 0)
+			if out[state]:
+				return True
+		return False
+
+
+@lru_cache(maxsize=32)
+def _compile_cached(names: frozenset) -> PantryMatcher:
+	return PantryMatcher(names)
+
+
+def compile_pantry(names: Iterable[str]) -> PantryMatcher:
+	"""PantryMatcher for this pantry snapshot, reused while the set of names is unchanged."""
+	return _compile_cached(frozenset(names))
@@ -4,17 +4,32 @@
 Extract recipe data from URLs. Uses Schema.org Recipe JSON-LD when available,
 with fallback heuristics. Returns only ingredients, steps, and special notes.
 Category is inferred from website content when possible.
+
+The JSON-LD blocks are found by a regular expression over the raw page, so a page that has a
+Recipe block is never parsed into a DOM. Only pages without one are parsed with BeautifulSoup,
+for the heuristics, using lxml when it is installed (much faster on large pages) and
+html.parser otherwise.
 """
 
 import json
 import re
-import requests
+from collections.abc import Iterable, Iterator
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 
+import http_cache
+
+try:
+	import lxml  # noqa: F401
+	HTML_PARSER = "lxml"
+except ImportError:
+	HTML_PARSER = "html.parser"
+
 # Standard categories (empty string = Others)
 RECIPE_CATEGORIES = ["Desserts", "Dinners", "Breakfasts"]
-USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+USER_AGENT = http_cache.USER_AGENT
+# Fetched pages, on disk: a repeated import of a URL is served without network I/O (see http_cache)
+response_cache = http_cache.HttpCache()
 
 
 def _normalize_category(raw: str) -> str:
@@ -92,11 +107,25 @@ def _extract_ingredients_from_schema(obj) -> str:
 	return str(ingredients)
 
 
-def _find_recipe_schema(soup: BeautifulSoup) -> dict | None:
-	"""Find Schema.org Recipe in JSON-LD scripts."""
-	for script in soup.find_all("script", type="application/ld+json"):
+# <script ... type="application/ld+json" ...> up to its </script>; like an HTML parser, the
+# content is raw text up to the first "</script"
+_LD_JSON_SCRIPT = re.compile(
+	r"""<script\b[^>]*?\stype\s*=\s*(["']?)application/ld\+json\1(?=[\s/>])[^>]*>(.*?)</script""",
+	re.I | re.S,
+)
+
+
+def _ld_json_blocks(html: str) -> Iterator[str]:
+	"""The text of each application/ld+json script in the raw page, in document order."""
+	for match in _LD_JSON_SCRIPT.finditer(html):
+		yield match.group(2)
+
+
+def _find_recipe_schema(blocks: Iterable[str]) -> dict | None:
+	"""Find Schema.org Recipe in the text of JSON-LD scripts."""
+	for block in blocks:
 		try:
-			data = json.loads(script.string or "{}")
+			data = json.loads(block or "{}")
 		except json.JSONDecodeError:
 			continue
 		if not data:
@@ -114,7 +143,43 @@ def _find_recipe_schema(soup: BeautifulSoup) -> dict | None:
 	return None
 
 
-def extract_recipe_from_url(url: str) -> dict | None:
+def _recipe_from_schema(recipe_obj: dict, url: str) -> dict:
+	"""extract_recipe_from_url's result from a Schema.org Recipe object."""
+	title = recipe_obj.get("name") or recipe_obj.get("headline") or "Untitled Recipe"
+	if isinstance(title, list):
+		title = title[0] if title else "Untitled Recipe"
+	ingredients = _extract_ingredients_from_schema(recipe_obj)
+	steps = _extract_instructions_from_schema(recipe_obj)
+	notes_parts = []
+	if recipe_obj.get("cookTime"):
+		notes_parts.append(f"Cook time: {recipe_obj['cookTime']}")
+	if recipe_obj.get("prepTime"):
+		notes_parts.append(f"Prep time: {recipe_obj['prepTime']}")
+	if recipe_obj.get("totalTime"):
+		notes_parts.append(f"Total time: {recipe_obj['totalTime']}")
+	if recipe_obj.get("recipeYield"):
+		notes_parts.append(f"Yield: {recipe_obj['recipeYield']}")
+	special_notes = "\n".join(notes_parts) if notes_parts else ""
+	# Category from recipeCategory
+	raw_cat = recipe_obj.get("recipeCategory")
+	if isinstance(raw_cat, list) and raw_cat:
+		raw_cat = raw_cat[0]
+	category = _normalize_category(str(raw_cat) if raw_cat else "")
+	if not category:
+		category = _infer_category_from_text(title)
+	image_url = _extract_image_from_schema(recipe_obj)
+	return {
+		"title": str(title).strip(),
+		"ingredients": ingredients,
+		"steps": steps,
+		"special_notes": special_notes.strip(),
+		"category": category,
+		"source_url": url,
+		"image_url": image_url,
+	}
+
+
+def extract_recipe_from_url(url: str, refetch_failed: bool = False) -> dict | None:
 	"""
 	Fetch a URL and extract recipe data. Returns dict with:
 	  - title: str
@@ -124,53 +189,22 @@ def extract_recipe_from_url(url: str) -> dict | None:
 	  - category: str (Desserts, Dinners, Breakfasts, or '' for Others)
 	  - source_url: str
 
-	Returns None on fetch/parse failure. Only returns core recipe content,
+	Raises http_cache.FetchError when the page cannot be fetched (or failed recently, unless
+	refetch_failed); returns None when it holds no recipe. Only returns core recipe content,
 	no comments or user-generated content.
 	"""
-	try:
-		resp = requests.get(url, timeout=15, headers={"User-Agent": USER_AGENT})
-		resp.raise_for_status()
-		text = resp.text
-	except Exception:
-		return None
+	text = response_cache.fetch_text(url, refetch_failed=refetch_failed)
 
-	soup = BeautifulSoup(text, "html.parser")
+	# Prefer Schema.org Recipe, found without building a DOM
+	recipe_obj = _find_recipe_schema(_ld_json_blocks(text))
+	if recipe_obj:
+		return _recipe_from_schema(recipe_obj, url)
 
-	# Prefer Schema.org Recipe
-	recipe_obj = _find_recipe_schema(soup)
+	soup = BeautifulSoup(text, HTML_PARSER)
+	# A JSON-LD script the scan could not delimit (e.g. a ">" inside a quoted attribute)
+	recipe_obj = _find_recipe_schema(script.string for script in soup.find_all("script", type="application/ld+json"))
 	if recipe_obj:
-		title = recipe_obj.get("name") or recipe_obj.get("headline") or "Untitled Recipe"
-		if isinstance(title, list):
-			title = title[0] if title else "Untitled Recipe"
-		ingredients = _extract_ingredients_from_schema(recipe_obj)
-		steps = _extract_instructions_from_schema(recipe_obj)
-		notes_parts = []
-		if recipe_obj.get("cookTime"):
-			notes_parts.append(f"Cook time: {recipe_obj['cookTime']}")
-		if recipe_obj.get("prepTime"):
-			notes_parts.append(f"Prep time: {recipe_obj['prepTime']}")
-		if recipe_obj.get("totalTime"):
-			notes_parts.append(f"Total time: {recipe_obj['totalTime']}")
-		if recipe_obj.get("recipeYield"):
-			notes_parts.append(f"Yield: {recipe_obj['recipeYield']}")
-		special_notes = "\n".join(notes_parts) if notes_parts else ""
-		# Category from recipeCategory
-		raw_cat = recipe_obj.get("recipeCategory")
-		if isinstance(raw_cat, list) and raw_cat:
-			raw_cat = raw_cat[0]
-		category = _normalize_category(str(raw_cat) if raw_cat else "")
-		if not category:
-			category = _infer_category_from_text(title)
-		image_url = _extract_image_from_schema(recipe_obj)
-		return {
-			"title": str(title).strip(),
-			"ingredients": ingredients,
-			"steps": steps,
-			"special_notes": special_notes.strip(),
-			"category": category,
-			"source_url": url,
-			"image_url": image_url,
-		}
+		return _recipe_from_schema(recipe_obj, url)
 
 	# Fallback: look for common patterns (class names used by recipe sites)
 	title_el = soup.find("h1") or soup.find(class_=re.compile(r"recipe-title|recipe-name|entry-title", re.I))
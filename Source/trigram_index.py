@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fuzzy lookup of ingredient names through an inverted index of character trigrams.
+
+Each word of a name is padded as "  word " and cut into trigrams ("  c", " ch", "chi", ... "en "),
+as PostgreSQL's pg_trgm does, so a typo only disturbs the few trigrams around it and word order
+does not matter at all: "chicken breast" and "breast of chicken" share every trigram of the
+first. Two similarity measures are offered:
+
+	search(query)        Jaccard similarity |A & B| / |A | B|, for "is this the same item?"
+	contained_in(text)   |name & text| / |name|, for "does this recipe line mention the name?"
+
+An index maps each trigram to the rows containing it. search() probes only the postings of the
+query's rarest trigrams: a row reaching the threshold t must share at least ceil(t * |query|)
+trigrams with the query, so it must share one of the |query| - ceil(t * |query|) + 1 rarest
+(prefix filtering). Only those candidates' shared trigrams are then counted, against the postings of
+the query's remaining trigrams, before they are length-filtered and scored exactly.
+"""
+
+import math
+import re
+from array import array
+from collections import Counter
+from itertools import chain
+from typing import Hashable, Iterable, NamedTuple
+
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+class Match(NamedTuple):
+	key: Hashable
+	text: str
+	score: float
+
+
+def trigrams(text: str) -> frozenset[str]:
+	"""The set of padded word trigrams of text (case-insensitive)."""
+	grams = set()
+	for word in _WORD.findall((text or "").lower()):
+		padded = f"  {word} "
+		grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+	return frozenset(grams)
+
+
+def similarity(a: str, b: str) -> float:
+	"""Jaccard similarity of the trigram sets of a and b (0.0 when either has none)."""
+	x, y = trigrams(a), trigrams(b)
+	if not x or not y:
+		return 0.0
+	shared = len(x & y)
+	return shared / (len(x) + len(y) - shared)
+
+
+def _check_threshold(threshold: float):
+	if not 0 < threshold <= 1:
+		raise ValueError(f"threshold must be in (0, 1], got {threshold!r}")
+
+
+class TrigramIndex:
+	"""(key, text) entries indexed by trigram. Entries can be added but not removed."""
+
+	def __init__(self, entries: Iterable[tuple[Hashable, str]] = ()):
+		self.keys: list[Hashable] = []
+		self.texts: list[str] = []
+		self._gram_ids: dict[str, int] = {}
+		self._postings: list[array] = []  # gram id -> rows containing it, ascending
+		self._grams = array("I")  # gram ids of every row, concatenated
+		self._offsets = array("I", [0])  # row -> start of its gram ids in _grams
+		for key, text in entries:
+			self.add(key, text)
+
+	def __len__(self):
+		return len(self.keys)
+
+	def add(self, key: Hashable, text: str):
+		row = len(self.keys)
+		gram_ids = self._gram_ids
+		for gram in trigrams(text):
+			gid = gram_ids.get(gram)
+			if gid is None:
+				gid = gram_ids[gram] = len(self._postings)
+				self._postings.append(array("I"))
+			self._postings[gid].append(row)
+			self._grams.append(gid)
+		self._offsets.append(len(self._grams))
+		self.keys.append(key)
+		self.texts.append(text)
+
+	def _size(self, row: int) -> int:
+		return self._offsets[row + 1] - self._offsets[row]
+
+	def search(self, query: str, threshold: float = 0.5, limit: int = None) -> list[Match]:
+		"""Entries whose Jaccard similarity to query is at least threshold, most similar first."""
+		_check_threshold(threshold)
+		grams = trigrams(query)
+		size = len(grams)
+		if not size:
+			return []
+		known = sorted(
+			(self._gram_ids[g] for g in grams if g in self._gram_ids),
+			key=lambda gid: len(self._postings[gid]),
+		)
+		need = math.ceil(threshold * size - 1e-9)
+		# Trigrams the index has never seen are the rarest of all; they fill the prefix first
+		prefix = max(0, size - need + 1 - (size - len(known)))
+		postings = self._postings
+		shared = Counter(chain.from_iterable(postings[gid] for gid in known[:prefix]))
+		candidates = set(shared)
+		for gid in known[prefix:]:
+			shared.update(candidates.intersection(postings[gid]))
+		low, high = threshold * size - 1e-9, size / threshold + 1e-9
+		offsets, minimum = self._offsets, need - 1e-9
+		scored = []
+		for row, common in shared.items():
+			if common < minimum:
+				continue
+			row_size = offsets[row + 1] - offsets[row]
+			if not low <= row_size <= high:
+				continue
+			score = common / (size + row_size - common)
+			if score >= threshold:
+				scored.append((-score, self.texts[row], row))
+		scored.sort()  # ties: by text, then insertion order
+		if limit is not None:
+			scored = scored[:limit]
+		return [Match(self.keys[row], text, -score) for score, text, row in scored]
+
+	def contained_in(self, text: str, threshold: float = 0.75) -> list[Match]:
+		"""Entries at least threshold of whose trigrams occur in text, best first. Meant for small
+		indexes (a pantry): every posting of text's trigrams is counted."""
+		_check_threshold(threshold)
+		known = [self._gram_ids[g] for g in trigrams(text) if g in self._gram_ids]
+		counts = Counter(chain.from_iterable(self._postings[gid] for gid in known))
+		matches = [
+			Match(self.keys[row], self.texts[row], shared / self._size(row))
+			for row, shared in sorted(counts.items())
+			if shared >= threshold * self._size(row) - 1e-9
+		]
+		matches.sort(key=lambda m: (-m.score, m.text))  # ties: insertion order
+		return matches
@@ -0,0 +1,32 @@
+"""Shared setup for benchmarks: point the app at a throwaway SQLite database before it is imported."""
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SOURCE_DIR = PROJECT_ROOT / "Source"
+SCHEMA_PATH = PROJECT_ROOT / "Database" / "schema.sql"
+
+
+def use_temp_database(name: str = "bench.db") -> str:
+	"""Create a temp dir holding schema.sql, export GROCERY_GURU_DB_PATH to it, and return the db path.
+	Must be called before importing database or GroceryGuru."""
+	tmp_dir = Path(tempfile.mkdtemp(prefix="groceryguru_bench_"))
+	shutil.copy(SCHEMA_PATH, tmp_dir / "schema.sql")
+	db_path = str(tmp_dir / name)
+	os.environ["GROCERY_GURU_DB_PATH"] = db_path
+	os.environ.setdefault("SECRET_KEY", "bench-secret")
+	if str(SOURCE_DIR) not in sys.path:
+		sys.path.insert(0, str(SOURCE_DIR))
+	return db_path
+
+
+def percentile(samples: list[float], pct: float) -> float:
+	"""Return the pct-th percentile (0-100) of samples using nearest-rank."""
+	if not samples:
+		return 0.0
+	ordered = sorted(samples)
+	rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+	return ordered[rank]
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Find Recipe "add to list": per-line helper calls vs the bulk add_ingredients_to_list.
+
+Adds every line of a 40-line recipe to a list, N times, the way find_recipe_add_to_list does:
+  - per-line: get_or_create_ingredient + get_or_create_list + create_list_ingredient per line
+    (the route before add_ingredients_to_list)
+  - bulk:     one add_ingredients_to_list call
+Each runs outside an app context (every helper opens and commits its own Session, as scripts
+see it) and inside a request context (helpers share the request Session, one commit at
+teardown). Half the lines name ingredients that already exist; the rest are new each run.
+
+Usage: python benchmarks/bench_add_to_list.py [lines] [iterations]
+"""
+import sys
+import time
+from datetime import datetime
+
+from _env import percentile, use_temp_database
+
+use_temp_database()
+
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from GroceryGuru import app  # noqa: E402
+import database  # noqa: E402
+
+
+def _per_line(lines, list_name, user_id):
+	now = datetime.utcnow()
+	for line in lines:
+		ingredient_id = database.get_or_create_ingredient(line, user_id, canonical=False)
+		list_id = database.get_or_create_list(list_name, user_id)
+		database.create_list_ingredient(1, now, ingredient_id, list_id)
+
+
+def _bulk(lines, list_name, user_id):
+	database.add_ingredients_to_list(lines, list_name, user_id, date_added=datetime.utcnow(), canonical=False)
+
+
+def _measure(label: str, add, user_id: int, lines: int, iterations: int, in_request: bool):
+	counts = {"commits": 0, "statements": 0}
+
+	def _on_commit(*_args):
+		counts["commits"] += 1
+
+	def _on_execute(*_args):
+		counts["statements"] += 1
+
+	event.listen(Session, "after_commit", _on_commit)
+	event.listen(database.engine, "before_cursor_execute", _on_execute)
+	samples = []
+	for n in range(iterations):
+		recipe = [f"{i} cups shared item {i}" for i in range(lines // 2)]
+		recipe += [f"{i} cups {label} item {n}-{i}" for i in range(lines - lines // 2)]
+		start = time.perf_counter()
+		if in_request:
+			with app.test_request_context():
+				add(recipe, "Grocery list", user_id)
+				database.close_request_session()
+		else:
+			add(recipe, "Grocery list", user_id)
+		samples.append(time.perf_counter() - start)
+	event.remove(Session, "after_commit", _on_commit)
+	event.remove(database.engine, "before_cursor_execute", _on_execute)
+	print(
+		f"{label:<22} commits/recipe={counts['commits'] / iterations:6.1f}  "
+		f"statements/recipe={counts['statements'] / iterations:6.1f}  "
+		f"p50={percentile(samples, 50) * 1000:7.2f} ms  p99={percentile(samples, 99) * 1000:7.2f} ms"
+	)
+
+
+def main():
+	lines = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+	iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+	user_id = database.create_user("bench@example.com", "Bench", "BenchPass123")
+	database.get_or_create_list("Grocery list", user_id)
+	print(f"{lines}-line recipe, {iterations} iterations")
+	_measure("per-line (script)", _per_line, user_id, lines, iterations, in_request=False)
+	_measure("bulk (script)", _bulk, user_id, lines, iterations, in_request=False)
+	_measure("per-line (request)", _per_line, user_id, lines, iterations, in_request=True)
+	_measure("bulk (request)", _bulk, user_id, lines, iterations, in_request=True)
+
+
+if __name__ == "__main__":
+	main()
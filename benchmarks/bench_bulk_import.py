@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Bulk URL import: one URL at a time vs import_urls (thread pool, per-host spacing, batched inserts).
+
+Local HTTP servers on H loopback addresses (127.0.0.2, 127.0.0.3, ... so each is its own host to
+http_cache.host_limiter) answer every recipe page after a simulated slow-site delay. For N distinct
+URLs spread over the hosts (HTTP cache disabled, so each import fetches) this times:
+  - serial:      extract_recipe_from_url + create_recipe per URL, one after the other, with the
+                 same per-host spacing
+  - import_urls: C extraction threads, URLs submitted round-robin by host, recipes inserted
+                 B at a time
+and then the insert step alone: R recipes by create_recipe (one transaction each) vs
+create_recipes in batches of B.
+
+Usage: python benchmarks/bench_bulk_import.py [urls] [hosts] [delay ms] [host interval ms] [concurrency]
+"""
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from _env import use_temp_database
+
+use_temp_database()
+os.environ["GROCERY_GURU_HTTP_CACHE_MAX_BYTES"] = "0"
+
+import database  # noqa: E402
+import http_cache  # noqa: E402
+import recipe_extractor  # noqa: E402
+from database import bulk_import  # noqa: E402
+
+
+class _Handler(BaseHTTPRequestHandler):
+	protocol_version = "HTTP/1.1"
+	disable_nagle_algorithm = True
+	delay = 0.0
+
+	def do_GET(self):
+		time.sleep(self.delay)
+		body = (
+			f"<html><head><title>{self.path}</title><script type='application/ld+json'>"
+			f'{{"@type": "Recipe", "name": "Recipe {self.path}", "recipeIngredient": ["2 eggs", "1 cup flour"],'
+			f'"recipeInstructions": "Mix. Bake."}}</script></head><body></body></html>'
+		).encode()
+		self.send_response(200)
+		self.send_header("Content-Type", "text/html; charset=utf-8")
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, *args):
+		pass
+
+
+def _serial(user_id: int, urls: list[str]):
+	for url in urls:
+		data = bulk_import._extract(url)
+		database.create_recipe(Persons_id=user_id, **bulk_import._recipe_fields(data))
+
+
+def main():
+	count = int(sys.argv[1]) if len(sys.argv) > 1 else 48
+	host_count = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+	_Handler.delay = (float(sys.argv[3]) if len(sys.argv) > 3 else 200) / 1000
+	interval = (float(sys.argv[4]) if len(sys.argv) > 4 else 250) / 1000
+	concurrency = int(sys.argv[5]) if len(sys.argv) > 5 else 8
+	batch = bulk_import.BULK_IMPORT_BATCH
+	servers = []
+	for n in range(host_count):
+		server = ThreadingHTTPServer((f"127.0.0.{n + 2}", 0), _Handler)
+		threading.Thread(target=server.serve_forever, daemon=True).start()
+		servers.append(server)
+	print(f"{count} URLs over {host_count} hosts, {_Handler.delay * 1000:.0f} ms per page, "
+		f"{interval * 1000:.0f} ms between requests to a host, concurrency {concurrency}, batch {batch}")
+
+	def urls(tag):
+		return [f"http://127.0.0.{n % host_count + 2}:{servers[n % host_count].server_port}/{tag}/{n}" for n in range(count)]
+
+	user_id = database.create_user("bench@example.com", "Bench", "BenchPass123")
+	http_cache.host_limiter = http_cache.HostRateLimiter(interval)
+	start = time.perf_counter()
+	_serial(user_id, urls("serial"))
+	serial = time.perf_counter() - start
+	print(f"serial       {serial * 1000:8.0f} ms  {count / serial:6.1f} URLs/s")
+
+	http_cache.host_limiter = http_cache.HostRateLimiter(interval)
+	start = time.perf_counter()
+	results = bulk_import.import_urls(user_id, urls("bulk"), concurrency=concurrency)
+	bulk = time.perf_counter() - start
+	assert [r.status for r in results] == ["imported"] * count
+	print(f"import_urls  {bulk * 1000:8.0f} ms  {count / bulk:6.1f} URLs/s  ({serial / bulk:.1f}x)")
+
+	recipes = [bulk_import._recipe_fields(recipe_extractor.extract_recipe_from_url(url)) for url in urls("insert")[:batch]] * 8
+	start = time.perf_counter()
+	for fields in recipes:
+		database.create_recipe(Persons_id=user_id, **fields)
+	one = time.perf_counter() - start
+	start = time.perf_counter()
+	for i in range(0, len(recipes), batch):
+		database.create_recipes(user_id, recipes[i:i + batch])
+	batched = time.perf_counter() - start
+	print(f"insert {len(recipes)}  create_recipe {one * 1000:7.1f} ms  create_recipes x{batch} {batched * 1000:7.1f} ms  ({one / batched:.1f}x)")
+	for server in servers:
+		server.shutdown()
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""get_or_create_ingredient: SELECT-then-create vs SELECT-then-INSERT ... ON CONFLICT DO NOTHING.
+
+Outside an app context (each helper commits its own Session), N times:
+  - legacy: the old helper, a SELECT and then create_ingredient, which opens a second Session
+  - upsert: get_or_create_ingredient (canonical=False), one Session: a SELECT, then for a
+            missing name INSERT ... ON CONFLICT DO NOTHING RETURNING
+  - batch:  get_or_create_ingredients for 40 names at once
+for names that are new and names that already exist. Also races 8 threads on one new name to
+show that the partial unique index leaves a single row.
+
+Usage: python benchmarks/bench_get_or_create_ingredient.py [iterations]
+"""
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from _env import percentile, use_temp_database
+
+use_temp_database()
+
+from sqlalchemy import event, func, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+import database  # noqa: E402
+from database import Ingredients, session_scope  # noqa: E402
+
+
+def _legacy(name: str, user_id: int) -> int:
+	"""get_or_create_ingredient before the unique index."""
+	with session_scope() as session:
+		row = session.execute(
+			select(Ingredients).where(
+				Ingredients.person_id == user_id, Ingredients.name == name, Ingredients.is_deleted == False,
+			)
+		).scalars().first()
+		if row:
+			return row.id
+		return database.create_ingredient(name, user_id)
+
+
+def _measure(label: str, run, names: list, per_call: int = 1):
+	counts = {"commits": 0, "statements": 0}
+
+	def _on_commit(*_args):
+		counts["commits"] += 1
+
+	def _on_execute(*_args):
+		counts["statements"] += 1
+
+	event.listen(Session, "after_commit", _on_commit)
+	event.listen(database.engine, "before_cursor_execute", _on_execute)
+	samples = []
+	for name in names:
+		start = time.perf_counter()
+		run(name)
+		samples.append(time.perf_counter() - start)
+	event.remove(Session, "after_commit", _on_commit)
+	event.remove(database.engine, "before_cursor_execute", _on_execute)
+	calls = len(names) * per_call
+	print(
+		f"{label:<24} commits/name={counts['commits'] / calls:5.2f}  statements/name={counts['statements'] / calls:5.2f}  "
+		f"p50/call={percentile(samples, 50) * 1000:7.3f} ms"
+	)
+
+
+def main():
+	iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+	user_id = database.create_user("bench@example.com", "Bench", "BenchPass123")
+	print(f"{iterations} calls per case")
+	legacy_names = [f"legacy item {n}" for n in range(iterations)]
+	upsert_names = [f"upsert item {n}" for n in range(iterations)]
+	_measure("legacy, new name", lambda n: _legacy(n, user_id), legacy_names)
+	_measure("legacy, existing", lambda n: _legacy(n, user_id), legacy_names)
+	_measure("upsert, new name", lambda n: database.get_or_create_ingredient(n, user_id, canonical=False), upsert_names)
+	_measure("upsert, existing", lambda n: database.get_or_create_ingredient(n, user_id, canonical=False), upsert_names)
+	batches = [[f"batch {b} item {i}" for i in range(40)] for b in range(max(1, iterations // 40))]
+	_measure("batch of 40, new", lambda names: database.get_or_create_ingredients(names, user_id, canonical=False), batches, 40)
+	_measure("batch of 40, existing", lambda names: database.get_or_create_ingredients(names, user_id, canonical=False), batches, 40)
+
+	with ThreadPoolExecutor(max_workers=8) as pool:
+		ids = set(pool.map(lambda _: database.get_or_create_ingredient("Saffron", user_id, canonical=False), range(64)))
+	with session_scope() as session:
+		rows = session.scalar(select(func.count()).where(Ingredients.person_id == user_id, Ingredients.name == "Saffron"))
+	print(f"8 threads x 64 calls on one new name: {len(ids)} distinct id(s), {rows} row(s)")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Recipe imports through the on-disk HTTP cache, against a local HTTP server.
+
+Serves P recipe pages (about 140 KiB each, JSON-LD plus filler markup, with an ETag) from a
+threaded http.server on 127.0.0.1 whose handler sleeps for a simulated network delay, then
+times fetching every page through the cache (HttpCache.get_text) and importing it
+(extract_recipe_from_url: fetch plus BeautifulSoup parse):
+  - uncached:    cache disabled (GROCERY_GURU_HTTP_CACHE_MAX_BYTES=0: one GET per import)
+  - cold:        empty cache (one GET, body stored)
+  - fresh:       repeat imports within the freshness window (no request at all)
+  - revalidated: repeat imports of stale entries (conditional GET answered 304)
+with the server's request count and the cache's hit rate over each phase's fetches. The import
+phase runs after the fetch phase, so for "cold" it already hits the cache.
+
+Usage: python benchmarks/bench_http_cache.py [pages] [delay ms]
+"""
+import hashlib
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from _env import percentile, use_temp_database
+
+db_path = use_temp_database()
+
+import http_cache  # noqa: E402
+import recipe_extractor  # noqa: E402
+
+
+def _page(n: int) -> bytes:
+	filler = "".join(f"<p class='comment'>Comment {i} on recipe {n}: lovely.</p>" for i in range(2500))
+	return (
+		f"<html><head><title>Recipe {n}</title><script type='application/ld+json'>"
+		f'{{"@type": "Recipe", "name": "Recipe {n}", "recipeCategory": "Dinner",'
+		f'"recipeIngredient": ["2 cups flour", "{n} eggs", "1 tsp salt"],'
+		f'"recipeInstructions": [{{"text": "Mix."}}, {{"text": "Bake {n} minutes."}}]}}'
+		f"</script></head><body>{filler}</body></html>"
+	).encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+	pages: dict[str, bytes] = {}
+	delay = 0.0
+	requests = 0
+
+	def do_GET(self):
+		type(self).requests += 1
+		time.sleep(self.delay)
+		body = self.pages.get(self.path)
+		if body is None:
+			self.send_response(404)
+			self.end_headers()
+			return
+		etag = '"' + hashlib.md5(body).hexdigest() + '"'
+		if self.headers.get("If-None-Match") == etag:
+			self.send_response(304)
+			self.send_header("ETag", etag)
+			self.end_headers()
+			return
+		self.send_response(200)
+		self.send_header("Content-Type", "text/html; charset=utf-8")
+		self.send_header("Content-Length", str(len(body)))
+		self.send_header("ETag", etag)
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, *args):
+		pass
+
+
+def _phase(label: str, urls, cache):
+	"""Fetch every URL through cache (get_text), then import every URL (fetch + parse) through it."""
+	recipe_extractor.response_cache = cache
+	before = _Handler.requests
+	stats = cache.stats() if cache.max_bytes > 0 else None
+	fetch, imports = [], []
+	for url in urls:
+		start = time.perf_counter()
+		assert cache.get_text(url) is not None
+		fetch.append(time.perf_counter() - start)
+	requests = _Handler.requests - before
+	if stats is not None:
+		after = cache.stats()
+		hits, lookups = (after.hits + after.revalidated) - (stats.hits + stats.revalidated), sum(after[3:]) - sum(stats[3:])
+	for url in urls:
+		start = time.perf_counter()
+		assert recipe_extractor.extract_recipe_from_url(url) is not None
+		imports.append(time.perf_counter() - start)
+	line = (
+		f"{label:<12} fetch p50={percentile(fetch, 50) * 1000:8.2f} ms  p99={percentile(fetch, 99) * 1000:8.2f} ms"
+		f"  import p50={percentile(imports, 50) * 1000:8.2f} ms  requests={requests:4d}"
+	)
+	if stats is not None:
+		line += f"  hit rate={hits / lookups:6.1%}"
+	print(line)
+
+
+def main():
+	pages = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+	_Handler.delay = (float(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+	_Handler.pages = {f"/recipes/{n}": _page(n) for n in range(pages)}
+	server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+	threading.Thread(target=server.serve_forever, daemon=True).start()
+	urls = [f"http://127.0.0.1:{server.server_port}/recipes/{n}" for n in range(pages)]
+	size = sum(map(len, _Handler.pages.values())) / pages / 1024
+	print(f"{pages} pages of {size:.0f} KiB, {_Handler.delay * 1000:.0f} ms simulated server delay")
+
+	path = str(Path(db_path).parent / "http_cache.db")
+	_phase("uncached", urls, http_cache.HttpCache(path, max_bytes=0))
+	cache = http_cache.HttpCache(path, max_bytes=256 * 2**20, fresh_for=3600)
+	_phase("cold", urls, cache)
+	_phase("fresh", urls, cache)
+	later = http_cache.HttpCache(path, max_bytes=256 * 2**20, fresh_for=0, clock=lambda: time.time() + 7200)
+	_phase("revalidated", urls, later)
+	server.shutdown()
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Back-to-back recipe page fetches from one site: requests.get per page vs the shared pooled Session.
+
+Serves a 38 KiB page from a local keep-alive (HTTP/1.1) server, over plain HTTP and over TLS with a
+throwaway self-signed certificate (made with the openssl CLI; skipped when it is missing), and
+times N sequential GETs, then N GETs from 8 threads:
+  - per-request: requests.get, a new connection (TCP, TLS handshake) for every page, as
+                 extract_recipe_from_url did before the shared session
+  - session:     http_cache.shared_session(), connections kept alive in its per-host pool
+with the number of TCP connections the server accepted. The HTTP cache is not involved.
+
+Usage: python benchmarks/bench_http_session.py [requests]
+"""
+import shutil
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+from _env import percentile, use_temp_database
+
+use_temp_database()
+
+import http_cache  # noqa: E402
+
+BODY = b"<html><body>" + b"<p>recipe</p>" * 3000 + b"</body></html>"
+
+
+class _Handler(BaseHTTPRequestHandler):
+	protocol_version = "HTTP/1.1"
+	disable_nagle_algorithm = True  # headers and body are separate writes
+	connections = 0
+
+	def setup(self):
+		type(self).connections += 1
+		super().setup()
+
+	def do_GET(self):
+		self.send_response(200)
+		self.send_header("Content-Type", "text/html; charset=utf-8")
+		self.send_header("Content-Length", str(len(BODY)))
+		self.end_headers()
+		self.wfile.write(BODY)
+
+	def log_message(self, *args):
+		pass
+
+
+def _certificate(directory: Path) -> tuple[str, str] | None:
+	if not shutil.which("openssl"):
+		return None
+	cert, key = str(directory / "cert.pem"), str(directory / "key.pem")
+	subprocess.run(
+		["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", "/CN=127.0.0.1",
+			"-addext", "subjectAltName=IP:127.0.0.1", "-keyout", key, "-out", cert],
+		check=True, capture_output=True,
+	)
+	return cert, key
+
+
+def _serve(tls: tuple[str, str] | None) -> tuple[ThreadingHTTPServer, str]:
+	server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+	if tls:
+		context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+		context.load_cert_chain(*tls)
+		server.socket = context.wrap_socket(server.socket, server_side=True)
+	threading.Thread(target=server.serve_forever, daemon=True).start()
+	return server, f"{'https' if tls else 'http'}://127.0.0.1:{server.server_port}/recipe"
+
+
+def _run(label: str, get, url: str, count: int, verify):
+	def fetch(_):
+		start = time.perf_counter()
+		assert len(get(url, timeout=http_cache.TIMEOUT, verify=verify).content) == len(BODY)
+		return time.perf_counter() - start
+
+	for mode, workers in (("serial", 1), ("8 threads", 8)):
+		before = _Handler.connections
+		start = time.perf_counter()
+		with ThreadPoolExecutor(workers) as pool:
+			samples = list(pool.map(fetch, range(count)))
+		wall = time.perf_counter() - start
+		print(
+			f"  {label:<12} {mode:<9} p50={percentile(samples, 50) * 1000:7.2f} ms  p99={percentile(samples, 99) * 1000:7.2f} ms"
+			f"  total={wall * 1000:8.1f} ms  connections={_Handler.connections - before}"
+		)
+
+
+def main():
+	count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+	directory = Path(tempfile.mkdtemp(prefix="groceryguru_bench_tls_"))
+	print(f"{count} GETs of a {len(BODY) // 1024} KiB page per case")
+	certificate = _certificate(directory)
+	for tls in [None] + ([certificate] if certificate else []):
+		server, url = _serve(tls)
+		verify = tls[0] if tls else True
+		print("HTTPS (TLS 1.3, self-signed)" if tls else "HTTP")
+		_run("per-request", requests.get, url, count, verify)
+		http_cache._session = None
+		session = http_cache.shared_session()
+		_run("session", session.get, url, count, verify)
+		session.close()
+		server.shutdown()
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""URL recipe import: extraction inside the POST vs a queued job run by background workers.
+
+A local HTTP server answers every recipe page after a simulated slow-site delay. For N distinct
+URLs (HTTP cache disabled, so each import fetches) this times:
+  - inline: what POST /Recipes/Add did before the queue (extract_recipe_from_url + create_recipe
+            in the request), as the per-POST latency a web worker is held for
+  - queued: POST /Recipes/Add through the Flask test client (the job is stored, the response is a
+            redirect to the job page), then the time until W worker threads have finished all N
+            jobs
+
+Usage: python benchmarks/bench_import_jobs.py [urls] [delay ms] [workers]
+"""
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from _env import percentile, use_temp_database
+
+use_temp_database()
+os.environ["GROCERY_GURU_HTTP_CACHE_MAX_BYTES"] = "0"
+os.environ["GROCERY_GURU_IMPORT_WORKERS"] = "0"  # started below, after the POSTs are timed
+
+import database  # noqa: E402
+import recipe_extractor  # noqa: E402
+from database import import_jobs  # noqa: E402
+from GroceryGuru import app  # noqa: E402
+
+
+class _Handler(BaseHTTPRequestHandler):
+	protocol_version = "HTTP/1.1"
+	disable_nagle_algorithm = True
+	delay = 0.0
+
+	def do_GET(self):
+		time.sleep(self.delay)
+		body = (
+			f"<html><head><title>{self.path}</title><script type='application/ld+json'>"
+			f'{{"@type": "Recipe", "name": "Recipe {self.path}", "recipeIngredient": ["2 eggs", "1 cup flour"],'
+			f'"recipeInstructions": "Mix. Bake."}}</script></head><body></body></html>'
+		).encode()
+		self.send_response(200)
+		self.send_header("Content-Type", "text/html; charset=utf-8")
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, *args):
+		pass
+
+
+def _inline(url: str, user_id: int):
+	data = recipe_extractor.extract_recipe_from_url(url)
+	database.create_recipe(title=data["title"], Persons_id=user_id, ingredients=data["ingredients"], steps=data["steps"])
+
+
+def main():
+	count = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+	_Handler.delay = (float(sys.argv[2]) if len(sys.argv) > 2 else 500) / 1000
+	worker_count = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+	server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+	threading.Thread(target=server.serve_forever, daemon=True).start()
+	base = f"http://127.0.0.1:{server.server_port}"
+	print(f"{count} imports, {_Handler.delay * 1000:.0f} ms per page, {worker_count} workers")
+
+	user_id = database.create_user("bench@example.com", "Bench", "BenchPass123")
+	samples = []
+	for n in range(count):
+		start = time.perf_counter()
+		_inline(f"{base}/inline/{n}", user_id)
+		samples.append(time.perf_counter() - start)
+	print(f"inline  POST p50={percentile(samples, 50) * 1000:8.2f} ms  p99={percentile(samples, 99) * 1000:8.2f} ms  total={sum(samples) * 1000:8.0f} ms")
+
+	app.config["TESTING"] = True
+	client = app.test_client()
+	client.post("/Login", data={"email": "bench@example.com", "pass": "BenchPass123"})
+	samples = []
+	start_all = time.perf_counter()
+	for n in range(count):
+		start = time.perf_counter()
+		assert client.post("/Recipes/Add", data={"source_url": f"{base}/queued/{n}"}).status_code == 302
+		samples.append(time.perf_counter() - start)
+	print(f"queued  POST p50={percentile(samples, 50) * 1000:8.2f} ms  p99={percentile(samples, 99) * 1000:8.2f} ms  total={sum(samples) * 1000:8.0f} ms")
+	import_jobs.workers.start(worker_count)
+	with database.session_scope() as session:
+		done = lambda: session.query(database.models.RecipeImportJobs).filter_by(status="done").count()  # noqa: E731
+		while done() < count:
+			session.rollback()  # see the workers' commits
+			time.sleep(0.01)
+	print(f"queued  all {count} jobs done {(time.perf_counter() - start_all) * 1000:8.0f} ms after the first POST")
+	import_jobs.workers.stop(5)
+	server.shutdown()
+
+
+if __name__ == "__main__":
+	main()
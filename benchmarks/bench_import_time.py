@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Import-time schema check cost: legacy per-table probes vs the versioned migration runner.
+
+Builds a large database file, then reports:
+  - legacy: the ten import-time probes `database` used to run (_init_schema_if_needed plus nine
+    _migrate_*_if_needed), each opening its own sqlite3 connection to query sqlite_master or
+    PRAGMA table_info
+  - versioned: migrations.migrate() on an up-to-date file (one connection, one version query)
+  - the wall time of `import database` in a fresh interpreter, for reference
+
+Usage: python benchmarks/bench_import_time.py [recipes] [repeats]
+"""
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+
+from _env import SOURCE_DIR, use_temp_database
+
+DB_PATH = use_temp_database("large.db")
+
+from database import migrations  # noqa: E402
+
+_LEGACY_TABLE_PROBES = [
+	"Persons", "Recipes", "RecipeRatings", "RecipeComments", "RecipeImages",
+	"FriendRequests", "RecipeShares", "DismissedNotifications",
+]
+_LEGACY_COLUMN_PROBES = ["InventoryIngredients", "Recipes"]
+
+
+def _legacy_probes(db_path: str):
+	"""What importing `database` did before schema_version: one connection per probe."""
+	for table in _LEGACY_TABLE_PROBES:
+		with sqlite3.connect(db_path) as raw:
+			raw.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
+		raw.close()
+	for table in _LEGACY_COLUMN_PROBES:
+		with sqlite3.connect(db_path) as raw:
+			raw.execute(f"PRAGMA table_info({table})").fetchall()
+		raw.close()
+
+
+def _build_large_db(db_path: str, recipes: int):
+	migrations.migrate(db_path)
+	text = "\n".join(f"{i} cups ingredient number {i}" for i in range(30))
+	with sqlite3.connect(db_path) as conn:
+		conn.execute('INSERT INTO Persons (id, email, name) VALUES (1, "bench@example.com", "Bench")')
+		conn.executemany(
+			'INSERT INTO Recipes (title, ingredients, steps, "Persons.id") VALUES (?, ?, ?, 1)',
+			((f"Recipe {n}", text, text) for n in range(recipes)),
+		)
+
+
+def _time(fn, repeats: int) -> float:
+	samples = []
+	for _ in range(repeats):
+		start = time.perf_counter()
+		fn()
+		samples.append(time.perf_counter() - start)
+	return statistics.median(samples)
+
+
+def _import_wall_time(repeats: int) -> float:
+	env = dict(os.environ, PYTHONPATH=str(SOURCE_DIR))
+	code = "import time; s = time.perf_counter(); import database; print(time.perf_counter() - s)"
+	samples = [
+		float(subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout)
+		for _ in range(repeats)
+	]
+	return statistics.median(samples)
+
+
+def main():
+	recipes = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+	repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+	_build_large_db(DB_PATH, recipes)
+	size_mb = os.path.getsize(DB_PATH) / 1024 / 1024
+	print(f"database: {recipes} recipes, {size_mb:.1f} MB, schema version {migrations.current_version(DB_PATH)}")
+	legacy = _time(lambda: _legacy_probes(DB_PATH), repeats)
+	versioned = _time(lambda: migrations.migrate(DB_PATH), repeats)
+	print(f"legacy probes (10 connections): {legacy * 1000:8.3f} ms")
+	print(f"versioned check (1 connection): {versioned * 1000:8.3f} ms  ({legacy / versioned:.1f}x faster)")
+	print(f"`import database` wall time:    {_import_wall_time(max(3, repeats // 4)) * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Ingredient name canonicalization: cost at import scale, and what it buys in matching.
+
+Generates N recipe lines of "<qty> <unit> <size> <ingredient>[, <prep>]" where the ingredient is
+written in one of several spellings (singular, plural, a synonym), and a pantry holding every
+ingredient in yet another spelling. Reports:
+  - canonical() throughput with a cold cache (every line new) and warm (memoized), and
+    recipe_ingredients.parse() per 12-line recipe
+  - recall: the share of lines whose ingredient the pantry matcher finds, comparing lowercase
+    text against lowercase pantry names (before) with canonical against canonical (now)
+
+Usage: python benchmarks/bench_ingredient_names.py [lines]
+"""
+import random
+import sys
+import time
+
+from _env import use_temp_database
+
+use_temp_database()
+
+import ingredient_names  # noqa: E402
+import pantry_matcher  # noqa: E402
+from database import recipe_ingredients  # noqa: E402
+
+# (pantry spelling, spellings seen in recipes)
+INGREDIENTS = [
+	("Eggs", ["egg", "eggs", "Eggs"]),
+	("tomato", ["tomatoes", "Tomatoes", "tomato"]),
+	("Potatoes", ["potato", "potatoes"]),
+	("scallions", ["green onions", "spring onions", "scallion"]),
+	("Chickpeas", ["garbanzo beans", "chickpea", "chickpeas"]),
+	("powdered sugar", ["icing sugar", "confectioners' sugar", "powdered sugar"]),
+	("zucchini", ["courgettes", "zucchinis", "zucchini"]),
+	("basil leaves", ["basil leaf", "basil leaves"]),
+	("Cherries", ["cherry", "cherries"]),
+	("heavy cream", ["double cream", "heavy whipping cream", "heavy cream"]),
+	("shrimp", ["prawns", "shrimp"]),
+	("peaches", ["peach", "peaches"]),
+	("flour", ["flour", "plain flour"]),
+	("baking soda", ["bicarbonate of soda", "baking soda"]),
+	("Carrots", ["carrot", "carrots"]),
+]
+UNITS = ["", "cup", "cups", "tbsp", "tsp", "oz", "g", "lb", "can", "pinch of", "(15 oz) can"]
+SIZES = ["", "", "large", "medium", "small"]
+PREP = ["", "", ", chopped", ", diced", ", to taste", ", sliced thin"]
+QUANTITIES = ["1", "2", "1/2", "½", "1 1/2", "3", "a", "2 to 3", "400"]
+
+
+def _corpus(lines: int):
+	rng = random.Random(42)
+	rows = []
+	for n in range(lines):
+		index = rng.randrange(len(INGREDIENTS))
+		spelling = rng.choice(INGREDIENTS[index][1])
+		parts = [rng.choice(QUANTITIES), rng.choice(UNITS), rng.choice(SIZES), spelling]
+		# a serial number makes every line distinct, so the cold pass never hits the memo
+		rows.append((index, " ".join(p for p in parts if p) + rng.choice(PREP) + f" #{n}"))
+	return rows
+
+
+def _recall(rows, pantry_names, scan):
+	matcher = pantry_matcher.PantryMatcher(pantry_names)
+	wanted = {i: name for i, name in enumerate(pantry_names)}
+	hits = sum(1 for index, line in rows if wanted[index] in matcher.names_in(scan(line)))
+	return hits / len(rows)
+
+
+def main():
+	lines = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+	rows = _corpus(lines)
+	texts = [line for _, line in rows]
+	print(f"{lines} ingredient lines, {len(INGREDIENTS)} ingredients")
+
+	ingredient_names.canonical.cache_clear()
+	start = time.perf_counter()
+	for text in texts:
+		ingredient_names.canonical(text)
+	cold = time.perf_counter() - start
+	start = time.perf_counter()
+	for text in texts[-10_000:]:
+		ingredient_names.canonical(text)
+	warm = (time.perf_counter() - start) / min(lines, 10_000) * lines
+	recipes = ["\n".join(texts[i:i + 12]) for i in range(0, min(lines, 12_000), 12)]
+	start = time.perf_counter()
+	for text in recipes:
+		recipe_ingredients.parse(text)
+	parse = (time.perf_counter() - start) / len(recipes)
+	print(f"canonical() cold:   {cold * 1000:8.1f} ms  ({lines / cold:,.0f} lines/s)")
+	print(f"canonical() memo:   {warm * 1000:8.1f} ms  (last 10k lines, scaled)")
+	print(f"parse() per recipe: {parse * 1e6:8.1f} us  (12 lines)")
+
+	lowercase = _recall(rows, [p.lower() for p, _ in INGREDIENTS], str.lower)
+	canonical = _recall(rows, [ingredient_names.canonical(p) for p, _ in INGREDIENTS], ingredient_names.canonical)
+	print(f"recall, lowercase:  {lowercase:8.1%}")
+	print(f"recall, canonical:  {canonical:8.1%}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Model mapping cost at import: automap reflection vs the declarative models.
+
+Each variant runs in a fresh interpreter against the same migrated database:
+  - automap: automap_base().prepare(autoload_with=engine), which reflects every table with
+    PRAGMA table_info / foreign_key_list / index_list queries on each start-up
+  - declarative: executing database/models.py and configuring the mappers, no database access
+
+Usage: python benchmarks/bench_model_mapping.py [repeats]
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+from _env import SOURCE_DIR, use_temp_database
+
+DB_PATH = use_temp_database("mapping.db")
+
+from database import migrations  # noqa: E402
+
+# sqlalchemy itself is imported before the clock starts in both variants; only the mapping is timed.
+_AUTOMAP = """
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.automap import automap_base
+from sqlalchemy.orm import configure_mappers
+s = time.perf_counter()
+engine = create_engine("sqlite:///" + {db!r})
+queries = []
+event.listen(engine, "before_cursor_execute", lambda *a: queries.append(1))
+Base = automap_base()
+Base.prepare(autoload_with=engine)
+configure_mappers()
+print(time.perf_counter() - s, len(queries))
+"""
+
+_DECLARATIVE = """
+import importlib.util, time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import configure_mappers
+s = time.perf_counter()
+spec = importlib.util.spec_from_file_location("models", {models!r})
+spec.loader.exec_module(importlib.util.module_from_spec(spec))
+configure_mappers()
+print(time.perf_counter() - s, 0)
+"""
+
+
+def _run(code: str, repeats: int):
+	env = dict(os.environ, PYTHONPATH=str(SOURCE_DIR))
+	samples, queries = [], 0
+	for _ in range(repeats):
+		out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout
+		elapsed, queries = out.split()
+		samples.append(float(elapsed))
+	return statistics.median(samples), int(queries)
+
+
+def main():
+	repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+	migrations.migrate(DB_PATH)
+	automap, automap_queries = _run(_AUTOMAP.format(db=DB_PATH), repeats)
+	declarative, _ = _run(_DECLARATIVE.format(models=str(SOURCE_DIR / "database" / "models.py")), repeats)
+	print(f"automap reflection: {automap * 1000:8.1f} ms  ({automap_queries} reflection queries)")
+	print(f"declarative models: {declarative * 1000:8.1f} ms  (0 queries, {automap / declarative:.1f}x faster)")
+
+
+if __name__ == "__main__":
+	main()
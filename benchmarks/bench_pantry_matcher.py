@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Find Recipe scoring: per-name substring search vs the Aho-Corasick pantry matcher.
+
+Scores every recipe against one pantry, the work the Find Recipe ranking did per
+request (the database read is excluded):
+  - substring: the old pantry match count, one `name in text` test per pantry name per recipe
+  - automaton: pantry_matcher.compile_pantry(...) once, then one pass over each recipe's text
+Both must produce identical scores. The data is synthetic but ingredient-shaped: 12 lines of
+"<qty> <unit> <word> <word>" per recipe over a 3000-word vocabulary.
+
+Usage: python benchmarks/bench_pantry_matcher.py [pantry_items] [recipes]
+"""
+import random
+import string
+import sys
+import time
+
+from _env import SOURCE_DIR
+
+sys.path.insert(0, str(SOURCE_DIR))
+
+import pantry_matcher  # noqa: E402
+
+UNITS = ["cup", "cups", "tbsp", "tsp", "oz", "g", "lb", "pinch of"]
+
+
+def _substring_count(text: str, names) -> int:
+	"""The pantry match count before the automaton."""
+	lines = [ln.strip() for ln in (text or "").splitlines() if ln.strip()]
+	line_lower = " ".join(lines).lower()
+	return sum(1 for name in names if len(name) >= 2 and name in line_lower)
+
+
+def _dataset(pantry_items: int, recipes: int):
+	rng = random.Random(42)
+	vocabulary = list({
+		"".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10))) for _ in range(3000)
+	})
+	pantry = set(rng.sample(vocabulary, pantry_items))
+	texts = [
+		"\n".join(
+			f"{rng.randint(1, 4)} {rng.choice(UNITS)} {' '.join(rng.sample(vocabulary, 2)).title()}" for _ in range(12)
+		)
+		for _ in range(recipes)
+	]
+	return pantry, texts
+
+
+def main():
+	pantry_items = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+	recipes = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+	pantry, texts = _dataset(pantry_items, recipes)
+	print(f"{pantry_items} pantry items x {recipes} recipes ({sum(map(len, texts)) / len(texts):.0f} chars each)")
+
+	start = time.perf_counter()
+	expected = [_substring_count(t, pantry) for t in texts]
+	substring = time.perf_counter() - start
+
+	start = time.perf_counter()
+	matcher = pantry_matcher.PantryMatcher(pantry)
+	compiled = time.perf_counter() - start
+	start = time.perf_counter()
+	scores = [matcher.count(t) for t in texts]
+	automaton = time.perf_counter() - start
+
+	assert scores == expected, "automaton scores differ from substring search"
+	print(f"substring search: {substring * 1000:9.1f} ms")
+	print(f"automaton:        {automaton * 1000:9.1f} ms  (+ {compiled * 1000:.1f} ms compile, {substring / (automaton + compiled):.1f}x faster)")
+
+
+if __name__ == "__main__":
+	main()
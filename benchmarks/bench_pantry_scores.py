@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Find Recipe ranking: rescoring every recipe per POST vs the materialized RecipePantryScore.
+
+One user with R recipes and a pantry of P items:
+  - rescore: what the Find Recipe ranking did before RecipePantryScore: load every
+    recipe and the pantry, compile the matcher (cached after the first call) and score each recipe
+  - stored:  Select.get_Recipes_ranked_by_pantry_score, an indexed ORDER BY matched DESC
+The maintenance cost moves to the writes, so it is timed too: adding a new pantry name (shifts
+the recipes that contain it) and updating one recipe (rescores just that recipe).
+
+Usage: python benchmarks/bench_pantry_scores.py [recipes] [pantry_items] [iterations]
+"""
+import random
+import string
+import sys
+import time
+from datetime import datetime
+
+from _env import percentile, use_temp_database
+
+use_temp_database()
+
+import database  # noqa: E402
+import pantry_matcher  # noqa: E402
+from database import Select, pantry_scores  # noqa: E402
+
+UNITS = ["cup", "cups", "tbsp", "tsp", "oz", "g", "lb", "pinch of"]
+
+
+def _legacy_ranking(user_id: int):
+	"""The Find Recipe ranking before RecipePantryScore."""
+	recipes = Select.get_Recipes_by_Persons_id(user_id)
+	rows = Select.get_InventoryIngredients_by_Persons_id(user_id)
+	matcher = pantry_matcher.compile_pantry({ing.name.strip().lower() for _, ing in rows if ing and ing.name})
+	scored = [(r, matcher.count(r.ingredients or "")) for r in recipes]
+	scored.sort(key=lambda x: -x[1])
+	return scored
+
+
+def _timed(fn, iterations: int) -> list[float]:
+	samples = []
+	for _ in range(iterations):
+		start = time.perf_counter()
+		fn()
+		samples.append(time.perf_counter() - start)
+	return samples
+
+
+def _report(label: str, samples: list[float]):
+	print(
+		f"{label:<22} p50={percentile(samples, 50) * 1000:8.2f} ms  "
+		f"p99={percentile(samples, 99) * 1000:8.2f} ms"
+	)
+
+
+def main():
+	recipes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+	pantry_items = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+	iterations = int(sys.argv[3]) if len(sys.argv) > 3 else 30
+	rng = random.Random(42)
+	vocabulary = list({
+		"".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10))) for _ in range(3000)
+	})
+	user_id = database.create_user("bench@example.com", "Bench", "BenchPass123")
+	for name in rng.sample(vocabulary, pantry_items):
+		database.create_inventory_ingredient(1, datetime.utcnow(), None, database.get_or_create_ingredient(name, user_id))
+	recipe_ids = [
+		database.create_recipe(f"Recipe {n}", user_id, ingredients="\n".join(
+			f"{rng.randint(1, 4)} {rng.choice(UNITS)} {' '.join(rng.sample(vocabulary, 2)).title()}" for _ in range(12)
+		))
+		for n in range(recipes)
+	]
+	assert pantry_scores.reconcile(fix=False) == []
+	legacy = [n for _, n in _legacy_ranking(user_id)]
+	stored = [n for _, n in Select.get_Recipes_ranked_by_pantry_score(user_id)]
+	assert legacy == stored, "stored scores rank differently from a rescore"
+	print(f"{recipes} recipes x {pantry_items} pantry items, {iterations} iterations")
+
+	_report("rescore (full)", _timed(lambda: _legacy_ranking(user_id), iterations))
+	_report("stored (full)", _timed(lambda: Select.get_Recipes_ranked_by_pantry_score(user_id), iterations))
+	_report("stored (top 20)", _timed(lambda: Select.get_Recipes_ranked_by_pantry_score(user_id, None, 20), iterations))
+
+	new_names = iter(w for w in vocabulary if w not in {n for n in pantry_scores.pantry_names(database.SessionLocal(), user_id)})
+	_report("write: new pantry name", _timed(
+		lambda: database.create_inventory_ingredient(1, datetime.utcnow(), None, database.get_or_create_ingredient(next(new_names), user_id)),
+		iterations,
+	))
+	_report("write: update recipe", _timed(
+		lambda: database.update_recipe(rng.choice(recipe_ids), ingredients="\n".join(rng.sample(vocabulary, 12))),
+		iterations,
+	))
+	assert pantry_scores.reconcile(fix=False) == []
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Recipe extraction from large saved pages: full BeautifulSoup parse vs the JSON-LD scan.
+
+Runs extract_recipe_from_url over a corpus of pages served from memory (no network), and for each
+page times:
+  - dom:  what it did before the scan (BeautifulSoup(page, "html.parser"), then the JSON-LD
+          scripts of the tree)
+  - scan: extract_recipe_from_url now (regex scan for the JSON-LD scripts; a DOM only for pages
+          without a Recipe block, with recipe_extractor.HTML_PARSER)
+checking both give the same recipe. Pages without JSON-LD go through the heuristics either way;
+they are timed with html.parser and with lxml when it is installed.
+
+The corpus is every *.html file in DIR, or else generated: pages of 1-3 MB shaped like recipe blog
+posts (inline CSS and JS, navigation, a long comment thread), one in PLAIN without JSON-LD.
+
+Usage: python benchmarks/bench_recipe_extractor.py [DIR | pages] [plain every]
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+from _env import percentile, use_temp_database
+
+use_temp_database()
+
+import recipe_extractor  # noqa: E402
+
+LD_JSON = (
+	'<script type="application/ld+json">{{"@context": "https://schema.org", "@graph": [{{"@type": "WebPage", "name": "Recipe {n}"}},'
+	'{{"@type": "Recipe", "name": "Slow cooker stew {n}", "recipeCategory": "Dinner", "image": ["https://example.com/{n}.jpg"],'
+	'"recipeIngredient": ["2 lb beef chuck", "3 carrots", "2 cups stock", "1 tsp salt"],'
+	'"recipeInstructions": [{{"@type": "HowToStep", "text": "Brown the beef."}}, {{"@type": "HowToStep", "text": "Cook 8 hours."}}],'
+	'"prepTime": "PT20M", "cookTime": "PT8H", "recipeYield": "6"}}]}}</script>'
+)
+
+
+def _page(n: int, size: int, json_ld: bool) -> str:
+	rng = random.Random(n)
+	head = [
+		f"<!DOCTYPE html><html lang='en'><head><meta charset='utf-8'><title>Slow cooker stew {n}</title>",
+		"<style>" + "".join(f".c{i}{{margin:{i % 9}px;color:#{i:06x}}}" for i in range(3000)) + "</style>",
+		"<script>window.__STATE__ = " + "[" + ",".join(str(rng.random()) for _ in range(6000)) + "];</script>",
+		"<script type='application/ld+json'>{\"@type\": \"Organization\", \"name\": \"Example\"}</script>",
+	]
+	if json_ld:
+		head.append(LD_JSON.format(n=n))
+	body = [
+		"</head><body><nav>" + "".join(f"<a class='nav-link' href='/c/{i}'>Category {i}</a>" for i in range(200)) + "</nav>",
+		f"<article><h1 class='entry-title'>Slow cooker stew {n}</h1>",
+		"<p>" + "A long story about this stew. " * 400 + "</p><div class='wprm-recipe'><ul>",
+		"".join(f"<li class='wprm-recipe-ingredient'>{i + 1} cups of item {i}</li>" for i in range(12)),
+		"</ul><ol>" + "".join(f"<li class='wprm-recipe-instruction'>Step {i + 1}: stir.</li>" for i in range(8)) + "</ol></div></article>",
+		"<section id='comments'>",
+	]
+	page = "".join(head + body)
+	comment = 0
+	parts = [page]
+	total = len(page)
+	while total < size:
+		chunk = (
+			f"<div class='comment' id='c{comment}'><img src='/a/{comment}.png' alt=''><p><b>Reader {comment}</b> "
+			f"&mdash; {rng.choice(['Lovely!', 'Made it twice.', 'Too salty for me &amp; my kids.', 'Great &lt;3'])}</p></div>"
+		)
+		parts.append(chunk)
+		total += len(chunk)
+		comment += 1
+	parts.append("</section><footer>" + "<script>track();</script>" * 50 + "</footer></body></html>")
+	return "".join(parts)
+
+
+def _corpus(argv: list[str]) -> list[tuple[str, str]]:
+	if argv and Path(argv[0]).is_dir():
+		return [(path.name, path.read_text(encoding="utf-8", errors="replace")) for path in sorted(Path(argv[0]).glob("*.html"))]
+	count = int(argv[0]) if argv else 6
+	plain_every = int(argv[1]) if len(argv) > 1 else 3
+	rng = random.Random(0)
+	return [(f"page{n}.html", _page(n, rng.randint(1_000_000, 3_000_000), n % plain_every != plain_every - 1)) for n in range(count)]
+
+
+def _dom(html: str, url: str, parser: str = "html.parser") -> dict | None:
+	soup = recipe_extractor.BeautifulSoup(html, parser)
+	schema = recipe_extractor._find_recipe_schema(script.string for script in soup.find_all("script", type="application/ld+json"))
+	return recipe_extractor._recipe_from_schema(schema, url) if schema else None
+
+
+class _Pages:
+	"""Stands in for recipe_extractor.response_cache: the corpus, by URL."""
+
+	def __init__(self, pages: dict[str, str]):
+		self.pages = pages
+
+	def fetch_text(self, url: str, refetch_failed: bool = False) -> str:
+		return self.pages[url]
+
+
+def _timed(fn, *args):
+	start = time.perf_counter()
+	result = fn(*args)
+	return time.perf_counter() - start, result
+
+
+def _report(label: str, samples: list[float], mb: float):
+	total = sum(samples)
+	print(f"{label:<24} p50={percentile(samples, 50) * 1000:8.1f} ms  p99={percentile(samples, 99) * 1000:8.1f} ms  "
+		f"total={total * 1000:8.0f} ms  {mb / total:6.1f} MB/s")
+
+
+def main():
+	corpus = _corpus(sys.argv[1:])
+	pages = {f"https://example.com/{name}": html for name, html in corpus}
+	recipe_extractor.response_cache = _Pages(pages)
+	with_ld = [url for url, html in pages.items() if recipe_extractor._find_recipe_schema(recipe_extractor._ld_json_blocks(html))]
+	plain = [url for url in pages if url not in with_ld]
+	mb = lambda urls: sum(len(pages[url]) for url in urls) / 1e6  # noqa: E731
+	print(f"{len(pages)} pages, {mb(pages):.1f} MB ({len(with_ld)} with a JSON-LD Recipe, {len(plain)} without); "
+		f"HTML_PARSER={recipe_extractor.HTML_PARSER}")
+
+	if with_ld:
+		dom, scan = [], []
+		for url in with_ld:
+			elapsed, before = _timed(_dom, pages[url], url)
+			dom.append(elapsed)
+			elapsed, after = _timed(recipe_extractor.extract_recipe_from_url, url)
+			scan.append(elapsed)
+			assert before == after, url
+		_report("JSON-LD  dom", dom, mb(with_ld))
+		_report("JSON-LD  scan", scan, mb(with_ld))
+		print(f"JSON-LD  speedup {sum(dom) / sum(scan):.0f}x")
+	if plain:
+		parsers = ["html.parser"]
+		try:
+			import lxml  # noqa: F401
+			parsers.append("lxml")
+		except ImportError:
+			print("lxml not installed: heuristic fallback timed with html.parser only")
+		for parser in parsers:
+			recipe_extractor.HTML_PARSER = parser
+			samples = [_timed(recipe_extractor.extract_recipe_from_url, url)[0] for url in plain]
+			_report(f"fallback {parser}", samples, mb(plain))
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Find Recipe scoring: the pure-Python per-recipe loop vs the sparse incidence matrix.
+
+Scores R recipes against a pantry of P names, the work recipe_ranking.search does per request
+when it rescores (the database read is excluded):
+  - loop:   pantry_matcher.compile_pantry(...) once, then matcher.count() over every recipe
+  - matrix: database.recipe_matrix.IncidenceMatrix, cold (first request: build the rows and fill
+            the pantry's columns with one scan) and warm (cached matrix, pantry unchanged or one
+            name added)
+All must produce identical scores. Data is synthetic but ingredient-shaped, as in
+bench_pantry_matcher.py.
+
+Usage: python benchmarks/bench_recipe_matrix.py [pantry_items] [recipes] [iterations]
+"""
+import random
+import string
+import sys
+import time
+
+from _env import percentile, use_temp_database
+
+use_temp_database()
+
+import pantry_matcher  # noqa: E402
+from database.recipe_matrix import IncidenceMatrix  # noqa: E402
+
+UNITS = ["cup", "cups", "tbsp", "tsp", "oz", "g", "lb", "pinch of"]
+
+
+def _dataset(pantry_items: int, recipes: int):
+	rng = random.Random(42)
+	vocabulary = list({
+		"".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10))) for _ in range(3000)
+	})
+	pantry = set(rng.sample(vocabulary, pantry_items))
+	lines = [
+		(recipe_id, f"{rng.randint(1, 4)} {rng.choice(UNITS)} {' '.join(rng.sample(vocabulary, 2))}")
+		for recipe_id in range(recipes) for _ in range(12)
+	]
+	extra = next(w for w in vocabulary if w not in pantry)
+	return pantry, lines, extra
+
+
+def _loop_scores(lines, pantry):
+	matcher = pantry_matcher.compile_pantry(pantry)
+	texts = {}
+	for recipe_id, name in lines:
+		texts.setdefault(recipe_id, []).append(name)
+	scores = {recipe_id: matcher.count("\n".join(names)) for recipe_id, names in texts.items()}
+	return {recipe_id: n for recipe_id, n in scores.items() if n}
+
+
+def _time(fn, iterations: int):
+	samples = []
+	for _ in range(iterations):
+		start = time.perf_counter()
+		result = fn()
+		samples.append(time.perf_counter() - start)
+	return result, percentile(samples, 50)
+
+
+def main():
+	pantry_items = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+	recipes = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+	iterations = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+	pantry, lines, extra = _dataset(pantry_items, recipes)
+	print(f"{pantry_items} pantry items x {recipes} recipes, p50 of {iterations} runs")
+
+	expected, loop = _time(lambda: _loop_scores(lines, pantry), iterations)
+	cold_scores, cold = _time(lambda: IncidenceMatrix.from_lines(lines).scores(pantry), iterations)
+	matrix = IncidenceMatrix.from_lines(lines)
+	matrix.scores(pantry)
+	warm_scores, warm = _time(lambda: matrix.scores(pantry), iterations)
+	assert cold_scores == warm_scores == expected, "matrix scores differ from the loop"
+
+	grown = pantry | {extra}
+	start = time.perf_counter()
+	grown_scores = matrix.scores(grown)
+	new_name = time.perf_counter() - start
+	assert grown_scores == _loop_scores(lines, grown)
+
+	print(f"loop:                 {loop * 1000:8.1f} ms")
+	print(f"matrix cold:          {cold * 1000:8.1f} ms")
+	print(f"matrix warm:          {warm * 1000:8.1f} ms  ({loop / warm:.0f}x faster than the loop)")
+	print(f"matrix warm +1 name:  {new_name * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Find Recipe search: full ranking of Recipes objects vs a top-K page of lightweight projections.
+
+For collections of growing size (one user, 12 ingredient lines per recipe, a 200-item pantry)
+times what a Find Recipe POST does, and its Python heap peak (tracemalloc):
+  - full:  load every Recipes object (with its ingredients and steps text), sort them all and store
+           every rank in the result set (find_recipe before recipe_ranking)
+  - top-K: recipe_ranking.search for the first RESULT_PAGE_SIZE (id, title, matched) rows and store
+           only those; later pages are ranked when reached (one page fill is timed too)
+for both ranking backends ("stored" RecipePantryScore, "matrix" incidence matrix, warm cache).
+
+Usage: python benchmarks/bench_recipe_ranking.py [sizes, comma-separated] [iterations]
+"""
+import random
+import string
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from _env import percentile, use_temp_database
+
+use_temp_database()
+
+import database  # noqa: E402
+from database import pantry_scores, recipe_matrix, recipe_ranking, result_sets  # noqa: E402
+from database.models import FindRecipeResultItems  # noqa: E402
+
+UNITS = ["cup", "cups", "tbsp", "tsp", "oz", "g", "lb", "pinch of"]
+
+
+def _full(user_id: int, backend: str):
+	"""The Find Recipe POST before top-K ranking."""
+	recipes = database.Select.get_Recipes_by_Persons_id(user_id)
+	if backend == "matrix":
+		with database.session_scope() as session:
+			pantry = pantry_scores.pantry_names(session, user_id)
+		scores = recipe_matrix.pantry_scores(user_id, pantry)
+		scored = sorted(((r, scores.get(r.id, 0)) for r in recipes), key=lambda x: -x[1])
+	else:
+		scored = database.Select.get_Recipes_ranked_by_pantry_score(user_id)
+	return result_sets.create(user_id, [(r.id, n) for r, n in scored], [])
+
+
+def _top_k(user_id: int, backend: str):
+	total, ranked = recipe_ranking.search(user_id, None, result_sets.RESULT_PAGE_SIZE, backend)
+	return result_sets.create(user_id, [(r.id, r.matched) for r in ranked], [], total=total)
+
+
+def _measure(fn, iterations: int):
+	samples = []
+	for _ in range(iterations):
+		start = time.perf_counter()
+		fn()
+		samples.append(time.perf_counter() - start)
+	tracemalloc.start()
+	fn()
+	peak = tracemalloc.get_traced_memory()[1]
+	tracemalloc.stop()
+	return percentile(samples, 50), peak
+
+
+def _grow(user_id: int, rng, vocabulary, recipes: int):
+	with database.session_scope() as session:
+		existing = session.query(database.Recipes).filter(database.Recipes.person_id == user_id).count()
+	for n in range(existing, recipes):
+		database.create_recipe(f"Recipe {n}", user_id, ingredients="\n".join(
+			f"{rng.randint(1, 4)} {rng.choice(UNITS)} {' '.join(rng.sample(vocabulary, 2))}" for _ in range(12)
+		), steps="\n".join(" ".join(rng.sample(vocabulary, 12)) for _ in range(8)))
+
+
+def main():
+	sizes = [int(s) for s in (sys.argv[1] if len(sys.argv) > 1 else "1000,4000").split(",")]
+	iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+	rng = random.Random(42)
+	vocabulary = list({
+		"".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10))) for _ in range(3000)
+	})
+	user_id = database.create_user("bench@example.com", "Bench", "BenchPass123")
+	for name in rng.sample(vocabulary, 200):
+		database.create_inventory_ingredient(1, datetime.utcnow(), None, database.get_or_create_ingredient(name, user_id))
+	print(f"page size {result_sets.RESULT_PAGE_SIZE}, {iterations} searches per case")
+	for recipes in sizes:
+		_grow(user_id, rng, vocabulary, recipes)
+		for backend in ("stored", "matrix"):
+			recipe_matrix.matrix_cache.clear()
+			recipe_ranking.search(user_id, None, 1, backend)  # warm the matrix cache
+			for label, fn in (("full", _full), ("top-K", _top_k)):
+				p50, peak = _measure(lambda: fn(user_id, backend), iterations)
+				print(f"{recipes:>6} recipes  {backend:<6}  {label:<6} p50={p50 * 1000:8.2f} ms  peak={peak / 1024:8.0f} KiB")
+			token = _top_k(user_id, backend)
+			p50, peak = _measure(lambda: _refill(token, user_id, backend), iterations)
+			print(f"{recipes:>6} recipes  {backend:<6}  page 2 p50={p50 * 1000:8.2f} ms  peak={peak / 1024:8.0f} KiB")
+
+
+def _refill(token: str, user_id: int, backend: str):
+	"""Rank the second page of a set (dropping it first so every run fills it again)."""
+	size = result_sets.RESULT_PAGE_SIZE
+	with database.session_scope() as session:
+		session.query(FindRecipeResultItems).filter(
+			FindRecipeResultItems.token == token, FindRecipeResultItems.rank >= size,
+		).delete()
+	assert result_sets.get_page(token, user_id, size, backend) is not None
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Sessions, transactions and pool checkouts per request: per-call sessions vs request-scoped session.
+
+Replays the database work of the recipe detail page (recipe_detail GET) N times:
+  - per-call: helpers called outside an app context, so each opens and commits its own Session
+    (the behaviour every request had before session_scope existed)
+  - request-scoped: the same helpers inside a request context, sharing one Session that is
+    committed once at teardown
+
+Usage: python benchmarks/bench_request_sessions.py [iterations]
+"""
+import sys
+import time
+
+from _env import use_temp_database
+
+use_temp_database()
+
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from GroceryGuru import app  # noqa: E402
+import database  # noqa: E402
+from database import Select  # noqa: E402
+
+
+def _recipe_detail_queries(recipe_id: int, user_id: int):
+	"""The helper calls recipe_detail makes to render one page (excluding the login lookup)."""
+	Select.get_Recipe_by_id(recipe_id, user_id)
+	Select.get_Recipe_by_id(recipe_id, user_id)
+	Select.get_recipe_average_rating(recipe_id)
+	Select.get_recipe_rating_count(recipe_id)
+	Select.get_user_recipe_rating(recipe_id, user_id)
+	Select.get_recipe_comments(recipe_id)
+	Select.get_recipe_images(recipe_id)
+	Select.get_friends(user_id)
+	# Navbar context processors
+	Select.get_pending_friend_requests_for_user(user_id)
+	Select.get_recipe_shares_for_recipient(user_id)
+	Select.get_Lists_by_Persons_id(user_id)
+
+
+def _measure(label: str, run, iterations: int):
+	counts = {"sessions": 0, "checkouts": 0}
+
+	def _on_begin(*_args):
+		counts["sessions"] += 1
+
+	def _on_checkout(*_args):
+		counts["checkouts"] += 1
+
+	event.listen(Session, "after_begin", _on_begin)
+	event.listen(database.engine, "checkout", _on_checkout)
+	start = time.perf_counter()
+	for _ in range(iterations):
+		run()
+	elapsed = time.perf_counter() - start
+	event.remove(Session, "after_begin", _on_begin)
+	event.remove(database.engine, "checkout", _on_checkout)
+	print(
+		f"{label:<16} transactions/request={counts['sessions'] / iterations:5.1f}  "
+		f"checkouts/request={counts['checkouts'] / iterations:5.1f}  "
+		f"mean={elapsed / iterations * 1000:7.3f} ms"
+	)
+
+
+def main():
+	iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+	user_id = database.create_user("bench@example.com", "Bench", "BenchPass123")
+	recipe_id = database.create_recipe(
+		title="Bench Cake",
+		Persons_id=user_id,
+		ingredients="\n".join(f"{i} cups flour" for i in range(20)),
+		steps="Mix\nBake",
+	)
+	database.upsert_recipe_rating(recipe_id, user_id, 4)
+	database.create_recipe_comment(recipe_id, user_id, "Tasty")
+	database.create_list("Grocery list", user_id)
+
+	def per_call():
+		_recipe_detail_queries(recipe_id, user_id)
+
+	def request_scoped():
+		with app.test_request_context(f"/Recipe/{recipe_id}"):
+			_recipe_detail_queries(recipe_id, user_id)
+
+	print(f"recipe_detail replay, {iterations} iterations")
+	_measure("per-call", per_call, iterations)
+	_measure("request-scoped", request_scoped, iterations)
+
+
+if __name__ == "__main__":
+	main()
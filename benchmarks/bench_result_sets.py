@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Find Recipe results paging: the ids= query string vs token-keyed result sets.
+
+One user with R recipes and a pantry of P items; each iteration pages through one result:
+  - ids:   what find_recipe_results did before result sets: parse the comma-separated ids from
+           the URL, rebuild the "Add to" destinations and re-match the recipe's lines against
+           the pantry on every page
+  - token: result_sets.get_page (two primary-key lookups), with the pantry flags memoized on the
+           item after the first view
+The recipe, ingredient and image reads both variants share are excluded. The URL each variant
+carries is reported as well, since the ids= string grows with the result.
+
+Usage: python benchmarks/bench_result_sets.py [recipes] [pantry_items] [iterations]
+"""
+import random
+import string
+import sys
+import time
+from datetime import datetime
+
+from _env import percentile, use_temp_database
+
+use_temp_database()
+
+import database  # noqa: E402
+import pantry_matcher  # noqa: E402
+from database import Select, result_sets  # noqa: E402
+from GroceryGuru import _get_destination_options, _get_pantry_ingredient_names  # noqa: E402
+
+UNITS = ["cup", "cups", "tbsp", "tsp", "oz", "g", "lb", "pinch of"]
+
+
+def _ids_page(user_id: int, ids_param: str, idx: int):
+	recipe_ids = [int(x.strip()) for x in ids_param.split(",") if x.strip()]
+	idx %= len(recipe_ids)
+	rows = Select.get_recipe_ingredients(recipe_ids[idx])
+	pantry_matcher.compile_pantry(_get_pantry_ingredient_names(user_id)).match_lines(
+		(row.raw_text, row.name) for row in rows
+	)
+	return _get_destination_options(user_id)
+
+
+def _token_page(user_id: int, token: str, idx: int):
+	page = result_sets.get_page(token, user_id, idx)
+	if page.pantry_flags is None:
+		rows = Select.get_recipe_ingredients(page.recipe_id)
+		_, line_matches = pantry_matcher.compile_pantry(_get_pantry_ingredient_names(user_id)).match_lines(
+			(row.raw_text, row.name) for row in rows
+		)
+		result_sets.save_pantry_flags(token, page.index, "".join("1" if names else "0" for _, names in line_matches))
+	return page.destinations
+
+
+def _timed(fn, iterations: int) -> list[float]:
+	samples = []
+	for i in range(iterations):
+		start = time.perf_counter()
+		fn(i)
+		samples.append(time.perf_counter() - start)
+	return samples
+
+
+def _report(label: str, samples: list[float]):
+	print(
+		f"{label:<22} p50={percentile(samples, 50) * 1000:8.2f} ms  "
+		f"p99={percentile(samples, 99) * 1000:8.2f} ms"
+	)
+
+
+def main():
+	recipes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+	pantry_items = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+	iterations = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+	rng = random.Random(42)
+	vocabulary = list({
+		"".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10))) for _ in range(3000)
+	})
+	user_id = database.create_user("bench@example.com", "Bench", "BenchPass123")
+	for name in rng.sample(vocabulary, pantry_items):
+		database.create_inventory_ingredient(1, datetime.utcnow(), None, database.get_or_create_ingredient(name, user_id))
+	for n in range(recipes):
+		database.create_recipe(f"Recipe {n}", user_id, ingredients="\n".join(
+			f"{rng.randint(1, 4)} {rng.choice(UNITS)} {' '.join(rng.sample(vocabulary, 2)).title()}" for _ in range(12)
+		))
+	ranked = Select.get_Recipes_ranked_by_pantry_score(user_id)
+	ids_param = ",".join(str(r.id) for r, _ in ranked)
+	start = time.perf_counter()
+	token = result_sets.create(user_id, [(r.id, n) for r, n in ranked], _get_destination_options(user_id))
+	create = time.perf_counter() - start
+	print(f"{recipes} recipes x {pantry_items} pantry items, {iterations} page views")
+	print(f"URL query: ids= {len(ids_param) + 4} chars, rs= {len(token) + 3} chars")
+	print(f"result_sets.create      {create * 1000:8.2f} ms (once per search)")
+
+	_report("ids= page", _timed(lambda i: _ids_page(user_id, ids_param, i), iterations))
+	_report("token page (first)", _timed(lambda i: _token_page(user_id, token, i + iterations), iterations))
+	_report("token page (revisit)", _timed(lambda i: _token_page(user_id, token, i + iterations), iterations))
+
+
+if __name__ == "__main__":
+	main()
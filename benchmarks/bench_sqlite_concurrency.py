@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Concurrent reader/writer stress test: SQLite defaults vs the engine's tuned pragmas.
+
+Spawns reader and writer processes (standing in for gunicorn workers) against a seeded database.
+Readers run the pantry query behind the Pantry page; writers bump pantry counts the way
+add_inventory_count does and upsert ratings like upsert_recipe_rating. Reports p50/p99 latency
+and lock errors for each configuration:
+  - default: rollback journal, synchronous=FULL, sqlite3's 5 s connect timeout
+  - tuned:   database.SQLITE_PRAGMAS (WAL, synchronous=NORMAL, cache/mmap, busy_timeout)
+
+Usage: python benchmarks/bench_sqlite_concurrency.py [seconds] [readers] [writers]
+"""
+import multiprocessing
+import random
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+from _env import SCHEMA_PATH, percentile, use_temp_database
+
+use_temp_database()
+
+from database import SQLITE_PRAGMAS, apply_sqlite_pragmas  # noqa: E402
+
+USERS = 50
+INGREDIENTS_PER_USER = 40
+RECIPES_PER_USER = 20
+
+READ_SQL = """
+	SELECT InventoryIngredients.*, Ingredients.*
+	FROM InventoryIngredients JOIN Ingredients ON InventoryIngredients."Ingredients.id" = Ingredients.id
+	WHERE Ingredients."Persons.id" = ? AND InventoryIngredients.is_deleted = 0
+"""
+COUNT_SQL = 'UPDATE InventoryIngredients SET count = count + 1 WHERE id = ?'
+RATING_SQL = """
+	INSERT INTO RecipeRatings ("Recipes.id", "Persons.id", rating) VALUES (?, ?, ?)
+	ON CONFLICT ("Recipes.id", "Persons.id") DO UPDATE SET rating = excluded.rating
+"""
+
+
+def _seed(db_path: str):
+	with sqlite3.connect(db_path) as conn:
+		conn.executescript(SCHEMA_PATH.read_text())
+		conn.execute("""
+			CREATE TABLE IF NOT EXISTS "RecipeRatings" (
+				"id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+				"Recipes.id" INTEGER NOT NULL,
+				"Persons.id" INTEGER NOT NULL,
+				"rating" INTEGER NOT NULL,
+				"created_at" TEXT NOT NULL DEFAULT (datetime('now')),
+				UNIQUE ("Recipes.id", "Persons.id")
+			)
+		""")
+		for uid in range(1, USERS + 1):
+			conn.execute('INSERT INTO Persons (id, email, name) VALUES (?, ?, ?)', (uid, f"u{uid}@bench", f"u{uid}"))
+			for n in range(INGREDIENTS_PER_USER):
+				cur = conn.execute('INSERT INTO Ingredients (name, "Persons.id") VALUES (?, ?)', (f"item {n}", uid))
+				conn.execute('INSERT INTO InventoryIngredients (count, "Ingredients.id") VALUES (1, ?)', (cur.lastrowid,))
+			for n in range(RECIPES_PER_USER):
+				conn.execute('INSERT INTO Recipes (title, ingredients, "Persons.id") VALUES (?, ?, ?)', (f"r{n}", "flour\nsugar", uid))
+		conn.commit()
+
+
+def _worker(args):
+	role, db_path, pragmas, seconds, seed = args
+	rnd = random.Random(seed)
+	conn = sqlite3.connect(db_path, timeout=5.0)
+	apply_sqlite_pragmas(conn, pragmas)
+	max_inventory_id = USERS * INGREDIENTS_PER_USER
+	max_recipe_id = USERS * RECIPES_PER_USER
+	latencies, errors = [], 0
+	deadline = time.perf_counter() + seconds
+	while time.perf_counter() < deadline:
+		start = time.perf_counter()
+		try:
+			if role == "reader":
+				conn.execute(READ_SQL, (rnd.randint(1, USERS),)).fetchall()
+			else:
+				conn.execute(COUNT_SQL, (rnd.randint(1, max_inventory_id),))
+				conn.execute(RATING_SQL, (rnd.randint(1, max_recipe_id), rnd.randint(1, USERS), rnd.randint(1, 5)))
+				conn.commit()
+		except sqlite3.OperationalError:
+			errors += 1
+			conn.rollback()
+			continue
+		latencies.append(time.perf_counter() - start)
+	conn.close()
+	return role, latencies, errors
+
+
+def _run(label: str, pragmas: dict, seconds: float, readers: int, writers: int):
+	db_path = str(Path(use_temp_database(f"{label}.db")))
+	_seed(db_path)
+	with sqlite3.connect(db_path) as conn:
+		apply_sqlite_pragmas(conn, {"journal_mode": pragmas.get("journal_mode", "DELETE")})
+	jobs = [("reader", db_path, pragmas, seconds, i) for i in range(readers)]
+	jobs += [("writer", db_path, pragmas, seconds, 1000 + i) for i in range(writers)]
+	with multiprocessing.Pool(len(jobs)) as pool:
+		results = pool.map(_worker, jobs)
+	print(f"[{label}] {pragmas or 'sqlite defaults'}")
+	for role in ("reader", "writer"):
+		samples = [s for r, lat, _ in results if r == role for s in lat]
+		errors = sum(e for r, _, e in results if r == role)
+		print(
+			f"  {role}s: ops={len(samples):7d}  p50={percentile(samples, 50) * 1000:8.3f} ms  "
+			f"p99={percentile(samples, 99) * 1000:8.3f} ms  lock errors={errors}"
+		)
+
+
+def main():
+	seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+	readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+	writers = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+	_run("default", {"journal_mode": "DELETE", "synchronous": "FULL"}, seconds, readers, writers)
+	_run("tuned", dict(SQLITE_PRAGMAS), seconds, readers, writers)
+
+
+if __name__ == "__main__":
+	main()
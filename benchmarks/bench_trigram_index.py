@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Fuzzy ingredient lookup: recall and latency of the trigram index at 100k ingredient names.
+
+Builds N distinct canonical names ("smoked chicken breast", "tomato"...) and queries Q of them
+after a corruption: one typo, the words reordered with an "of" ("breast of smoked chicken"), or
+both. For each query the intended name counts as recalled when it is among the top 5 of:
+  - exact:     canonical-name equality (what get_or_create_ingredient matches)
+  - substring: the name contains the query or the query the name (first 200 queries: a full scan)
+  - trigram:   TrigramIndex.search at the suggestion threshold (prefix-filtered postings)
+  - brute:     Jaccard similarity against every name (first 50 queries: the exact answer the
+               index must reproduce)
+Then the same through suggest_ingredients for one user owning all N rows in SQLite: the first
+call (index built from the table) and warm calls (one indexed query for newer rows + search).
+
+Usage: python benchmarks/bench_trigram_index.py [names] [queries]
+"""
+import random
+import string
+import sys
+import time
+import tracemalloc
+
+from _env import percentile, use_temp_database
+
+use_temp_database()
+
+import database  # noqa: E402
+import trigram_index  # noqa: E402
+from database import ingredient_suggestions  # noqa: E402
+
+FOODS = """
+apple apricot artichoke arugula asparagus avocado bacon banana barley basil bean beef beet
+blackberry blueberry bread breast brisket broccoli broth butter buttermilk cabbage carrot cashew
+cauliflower celery chard cheddar cheese cherry chestnut chicken chickpea chili chive chocolate
+cilantro cinnamon clam coconut cod corn cornmeal crab cranberry cream cucumber cumin currant date
+dill duck egg eggplant endive fennel feta fig flour garlic ginger goat gouda grape grapefruit
+ham hazelnut honey kale ketchup kidney lamb leek lemon lentil lettuce lime lobster mackerel mango
+maple milk mint miso molasses mozzarella mushroom mussel mustard noodle nutmeg oat octopus okra
+olive onion orange oregano oyster paprika parmesan parsley parsnip pasta pea peach peanut pear
+pecan pepper pistachio plum pork potato prosciutto pumpkin quinoa radish raisin raspberry rice
+ricotta rosemary saffron sage salmon salt sardine sausage scallop sesame shallot shrimp spinach
+squash steak strawberry sugar sunflower tahini tarragon thigh thyme tofu tomato trout tuna turkey
+turmeric turnip vanilla vinegar walnut watercress wheat yam yogurt zucchini
+""".split()
+MODIFIERS = """
+baby black brown canned chopped cold crushed dark dried fat fresh frozen golden green ground
+heavy hot instant large light low mild minced organic pickled plain powdered raw red roasted
+salted sharp shredded sliced smoked soft sour sparkling spicy sweet toasted unsalted white whole
+wild yellow young
+""".split()
+
+
+def _names(count: int, rng) -> list[str]:
+	names = set()
+	while len(names) < count:
+		words = rng.sample(MODIFIERS, rng.choice([0, 1, 1, 2])) + rng.sample(FOODS, rng.choice([1, 1, 2]))
+		names.add(" ".join(words))
+	return sorted(names)
+
+
+def _typo(name: str, rng) -> str:
+	i = rng.randrange(len(name))
+	edit = rng.choice(["delete", "swap", "insert", "replace"])
+	if edit == "delete" or (edit == "swap" and i == len(name) - 1):
+		return name[:i] + name[i + 1:]
+	if edit == "swap":
+		return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+	letter = rng.choice(string.ascii_lowercase)
+	return name[:i] + letter + name[i + (edit == "replace"):]
+
+
+def _corrupt(name: str, rng) -> str:
+	kind = rng.choice(["typo", "reorder", "both"])
+	words = name.split()
+	if kind != "typo" and len(words) > 1:
+		name = f"{words[-1]} of {' '.join(words[:-1])}"
+	if kind != "reorder":
+		name = _typo(name, rng)
+	return name
+
+
+def _recall(label: str, queries, lookup, timed: bool = True):
+	samples, hits = [], 0
+	for query, target in queries:
+		start = time.perf_counter()
+		found = lookup(query)
+		samples.append(time.perf_counter() - start)
+		hits += target in found[:5]
+	line = f"{label:<10} recall@5={hits / len(queries):6.1%}  ({len(queries)} queries)"
+	if timed:
+		line += f"  p50={percentile(samples, 50) * 1000:8.3f} ms  p99={percentile(samples, 99) * 1000:8.3f} ms"
+	print(line)
+
+
+def main():
+	count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+	query_count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+	threshold = ingredient_suggestions.SUGGEST_THRESHOLD
+	rng = random.Random(42)
+	names = _names(count, rng)
+	queries = [(_corrupt(target, rng), target) for target in rng.sample(names, query_count)]
+	print(f"{count} names, {query_count} corrupted queries, threshold {threshold}")
+
+	start = time.perf_counter()
+	index = trigram_index.TrigramIndex((name, name) for name in names)
+	build = time.perf_counter() - start
+	tracemalloc.start()
+	trigram_index.TrigramIndex((name, name) for name in names)
+	memory = tracemalloc.get_traced_memory()[1]
+	tracemalloc.stop()
+	print(f"index build {build * 1000:8.1f} ms, {memory / 2**20:6.1f} MiB")
+
+	name_set = set(names)
+	_recall("exact", queries, lambda q: [q] if q in name_set else [])
+	_recall("substring", queries[:200], lambda q: [n for n in names if q in n or n in q], timed=False)
+	_recall("trigram", queries, lambda q: [m.text for m in index.search(q, threshold, 5)])
+	grams = [(name, trigram_index.trigrams(name)) for name in names]
+
+	def brute(query):
+		q = trigram_index.trigrams(query)
+		scored = ((len(q & g) / len(q | g), name) for name, g in grams)
+		return [name for score, name in sorted((s for s in scored if s[0] >= threshold), key=lambda s: (-s[0], s[1]))]
+	_recall("brute", queries[:50], brute)
+
+	user_id = database.create_user("bench@example.com", "Bench", "BenchPass123")
+	for i in range(0, count, 5000):
+		database.get_or_create_ingredients(names[i:i + 5000], user_id, canonical=False)
+	start = time.perf_counter()
+	database.suggest_ingredients("smoked chiken", user_id)
+	print(f"suggest_ingredients, first call (index built from {count} rows): {(time.perf_counter() - start) * 1000:8.1f} ms")
+	_recall("suggest", queries[:500], lambda q: [s.name for s in database.suggest_ingredients(q, user_id)])
+
+
+if __name__ == "__main__":
+	main()
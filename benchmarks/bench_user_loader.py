@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Per-request overhead of Flask-Login's user loader: private sqlite3 connection vs the shared session.
+
+load_user runs on every authenticated request. This replays a minimal authenticated request
+(user lookup plus one page query, inside a request context) N times:
+  - sqlite3: the old Functions.get_user_by_id, which opened a new sqlite3 connection (and file
+    handle) per call, outside the engine's pool and without its pragmas
+  - shared: Functions.get_user_by_id on database.session_scope(), reusing the request's session
+
+Usage: python benchmarks/bench_user_loader.py [iterations]
+"""
+import sqlite3
+import sys
+import time
+
+from _env import percentile, use_temp_database
+
+DB_PATH = use_temp_database()
+
+from GroceryGuru import app  # noqa: E402
+import database  # noqa: E402
+import Functions  # noqa: E402
+from database import Select  # noqa: E402
+from User import User  # noqa: E402
+
+
+def _legacy_get_user_by_id(user_id):
+	"""Functions.get_user_by_id before it moved onto the engine."""
+	connection = sqlite3.connect(DB_PATH)
+	connection.row_factory = sqlite3.Row
+	cursor = connection.cursor()
+	cursor.execute('SELECT * FROM "Persons" WHERE "id" = ?;', (user_id,))
+	row = dict(cursor.fetchone())
+	connection.commit()
+	cursor.close()
+	connection.close()
+	return User(row["id"], row["email"], row["name"], row["password"])
+
+
+def _measure(label: str, loader, user_id: int, iterations: int):
+	samples = []
+	for _ in range(iterations):
+		start = time.perf_counter()
+		with app.test_request_context("/Lists"):
+			loader(str(user_id))
+			Select.get_Lists_by_Persons_id(user_id)
+		samples.append(time.perf_counter() - start)
+	print(
+		f"{label:<8} p50={percentile(samples, 50) * 1000:7.3f} ms  "
+		f"p99={percentile(samples, 99) * 1000:7.3f} ms  "
+		f"mean={sum(samples) / iterations * 1000:7.3f} ms"
+	)
+
+
+def main():
+	iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+	user_id = database.create_user("bench@example.com", "Bench", "BenchPass123")
+	database.create_list("Grocery list", user_id)
+	print(f"authenticated request replay (user lookup + one page query), {iterations} iterations")
+	_measure("sqlite3", _legacy_get_user_by_id, user_id, iterations)
+	_measure("shared", Functions.get_user_by_id, user_id, iterations)
+
+
+if __name__ == "__main__":
+	main()
@@ -19,6 +19,9 @@ _test_dir = _project_root / "Database" / "_test"
 _test_dir.mkdir(parents=True, exist_ok=True)
 _test_db_path = str(_test_dir / "grocery.db")
 os.environ["GROCERY_GURU_DB_PATH"] = _test_db_path
+# Tests run import jobs themselves (import_jobs.run_pending) rather than in background threads
+os.environ["GROCERY_GURU_IMPORT_WORKERS"] = "0"
+os.environ["GROCERY_GURU_HTTP_HOST_INTERVAL"] = "0"
 
 # Copy schema to test dir so database init can find it
 shutil.copy(_schema_path, _test_dir / "schema.sql")
@@ -80,6 +83,12 @@ def logged_in_client(client, test_user):
 def _clean_db_before_test(request):
 	"""Clear test database before each test for isolation."""
 	import sqlite3
+	from database.identity_cache import user_cache
+	from database.recipe_matrix import matrix_cache
+	from database.ingredient_suggestions import suggestion_cache
+	user_cache.clear()
+	matrix_cache.clear()
+	suggestion_cache.clear()
 	if _test_db_path and Path(_test_db_path).exists():
 		with sqlite3.connect(_test_db_path) as conn:
 			try:
@@ -106,6 +115,31 @@ def _clean_db_before_test(request):
 				conn.execute("DELETE FROM DismissedNotifications")
 			except sqlite3.OperationalError:
 				pass
+			try:
+				conn.execute("DELETE FROM NotificationCounters")
+			except sqlite3.OperationalError:
+				pass
+			try:
+				conn.execute("DELETE FROM RecipeIngredients")
+			except sqlite3.OperationalError:
+				pass
+			try:
+				conn.execute("DELETE FROM RecipePantryScore")
+			except sqlite3.OperationalError:
+				pass
+			try:
+				conn.execute("DELETE FROM RecipeImportJobs")
+			except sqlite3.OperationalError:
+				pass
+			try:
+				conn.execute("DELETE FROM RecipeVersions")
+			except sqlite3.OperationalError:
+				pass
+			try:
+				conn.execute("DELETE FROM FindRecipeResultItems")
+				conn.execute("DELETE FROM FindRecipeResultSets")
+			except sqlite3.OperationalError:
+				pass
 			conn.execute("DELETE FROM Recipes")
 			conn.execute("DELETE FROM InventoryIngredients")
 			conn.execute("DELETE FROM ListIngredients")
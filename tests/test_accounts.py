@@ -0,0 +1,113 @@
+"""Unit tests for account lookup, login and registration in Functions.py."""
+import pytest
+from sqlalchemy import event
+
+from flask import g
+
+from GroceryGuru import app
+import database
+import Functions
+from database import create_user
+
+
+# ————————————————————————————————— Fixtures ————————————————————————————————— #
+
+class _FakeRequest:
+	"""Stands in for flask.request: Functions.login_user/add_new_user only read request.form."""
+
+	def __init__(self, **form):
+		self.form = form
+
+
+@pytest.fixture
+def statements():
+	"""Record every SQL statement sent through the shared engine while the test runs."""
+	captured = []
+
+	def _capture(conn, cursor, statement, *_args):
+		captured.append(statement)
+
+	event.listen(database.engine, "before_cursor_execute", _capture)
+	yield captured
+	event.remove(database.engine, "before_cursor_execute", _capture)
+
+
+# ————————————————————————————————— Lookups ————————————————————————————————— #
+
+class TestUserLookups:
+	"""Tests for Functions.get_user_by_id and get_user_by_email."""
+
+	def test_get_user_by_id(self, test_user):
+		user_id, email, _ = test_user
+		user = Functions.get_user_by_id(user_id)
+		assert (user.id, user.email, user.username) == (user_id, email, "Test User")
+
+	def test_get_user_by_id_accepts_session_string(self, test_user):
+		"""Flask-Login passes the id back as the string from get_id()."""
+		user_id, _, _ = test_user
+		assert Functions.get_user_by_id(str(user_id)).id == user_id
+
+	def test_get_user_by_id_missing_raises(self):
+		with pytest.raises(Exception, match="does not exist"):
+			Functions.get_user_by_id(999999)
+
+	def test_lookups_use_shared_engine(self, test_user, statements):
+		"""Lookups go through the pooled engine, not a private sqlite3 connection."""
+		user_id, email, _ = test_user
+		Functions.get_user_by_id(user_id)
+		Functions.get_user_by_email(email.upper())
+		assert len(statements) == 2
+		assert all('"Persons"' in sql for sql in statements)
+
+	def test_load_user_shares_request_session(self, test_user):
+		"""Inside a request the user loader reuses the request's session."""
+		user_id, _, _ = test_user
+		with app.test_request_context("/"):
+			Functions.get_user_by_id(user_id)
+			with database.session_scope() as session:
+				assert g.db_session is session
+
+
+# ————————————————————————————————— Login/Registration ————————————————————————————————— #
+
+class TestLoginAndRegistration:
+	"""Tests for Functions.login_user and Functions.add_new_user."""
+
+	def test_login_user(self, test_user):
+		user_id, email, password = test_user
+		user = Functions.login_user(_FakeRequest(email=email, **{"pass": password}))
+		assert user.id == user_id
+
+	def test_login_wrong_password(self, test_user):
+		_, email, _ = test_user
+		with pytest.raises(Exception, match="password does not match"):
+			Functions.login_user(_FakeRequest(email=email, **{"pass": "wrong"}))
+
+	def test_login_unknown_email(self):
+		with pytest.raises(Exception, match="email does not exist"):
+			Functions.login_user(_FakeRequest(email="nobody@test.com", **{"pass": "x"}))
+
+	def test_add_new_user(self):
+		form = {"email": "new_account@test.com", "name": "New", "pass": "Secret123", "confirmPass": "Secret123"}
+		user = Functions.add_new_user(_FakeRequest(**form))
+		assert Functions.get_user_by_id(user.id).email == "new_account@test.com"
+		assert Functions.login_user(_FakeRequest(email=form["email"], **{"pass": "Secret123"})).id == user.id
+
+	def test_add_new_user_duplicate_email(self):
+		create_user("taken@test.com", "Taken", "Secret123")
+		form = {"email": "taken@test.com", "name": "Dup", "pass": "Secret123", "confirmPass": "Secret123"}
+		with pytest.raises(Exception, match="already an account"):
+			Functions.add_new_user(_FakeRequest(**form))
+
+	def test_add_new_user_password_mismatch(self):
+		form = {"email": "mismatch@test.com", "name": "M", "pass": "a", "confirmPass": "b"}
+		with pytest.raises(Exception, match="do not match"):
+			Functions.add_new_user(_FakeRequest(**form))
+		assert Functions.get_user_by_email("mismatch@test.com") is None
+
+	def test_create_account_route_logs_in(self, client):
+		resp = client.post("/CreateAccount", data={
+			"email": "route_account@test.com", "name": "Route", "pass": "Secret123", "confirmPass": "Secret123",
+		})
+		assert resp.status_code == 302
+		assert client.get("/Lists").status_code == 200
@@ -0,0 +1,169 @@
+"""Unit tests for bulk URL imports (database.bulk_import) and their routes (no network calls)."""
+import pytest
+
+import database
+import recipe_extractor
+from database import Select, bulk_import, create_recipe, create_recipes, create_user, import_jobs
+
+
+@pytest.fixture
+def extract(monkeypatch):
+	"""Replace the page fetch: a recipe titled after the URL's path, None for paths containing
+	"empty", and an exception for paths containing "down"."""
+	urls = []
+
+	def fake(url, refetch_failed=False):
+		urls.append(url)
+		if "down" in url:
+			raise ConnectionError("site down")
+		if "empty" in url:
+			return None
+		return {"title": url.rsplit("/", 1)[1], "ingredients": "1 egg", "steps": "Cook.", "source_url": url}
+
+	monkeypatch.setattr(recipe_extractor, "extract_recipe_from_url", fake)
+	return urls
+
+
+class TestPlan:
+	"""plan / by_host_round_robin."""
+
+	def test_dedupes_and_skips(self):
+		me = create_user("bi_me@test.com", "Me", "Secret123")
+		create_recipe("Old", me, source_url="https://example.com/old")
+		entries = bulk_import.plan([
+			"https://example.com/a",
+			"",
+			"example.com/b",
+			"HTTPS://EXAMPLE.com/a#comments",
+			"https://example.com/a?utm_source=mail",
+			"https://example.com/old",
+			"ftp://example.com/c",
+			"  https://other.org/x  ",
+		], me)
+		assert entries == [
+			("https://example.com/a", None),
+			("https://example.com/b", None),
+			("HTTPS://EXAMPLE.com/a#comments", "Duplicate of https://example.com/a"),
+			("https://example.com/a?utm_source=mail", "Duplicate of https://example.com/a"),
+			("https://example.com/old", "Already in your recipes."),
+			("ftp://example.com/c", "Not an http(s) URL."),
+			("https://other.org/x", None),
+		]
+
+	def test_malformed_lines_skipped(self):
+		entries = bulk_import.plan(["https://example.com/a", "http://[::1", "example.com:abc/recipe", "https://example.com/b"])
+		assert entries == [
+			("https://example.com/a", None),
+			("http://[::1", "Not a valid URL."),
+			("https://example.com:abc/recipe", "Not a valid URL."),
+			("https://example.com/b", None),
+		]
+
+	def test_limit(self):
+		entries = bulk_import.plan([f"https://example.com/{n}" for n in range(4)], max_urls=2)
+		assert [reason for _, reason in entries] == [None, None] + ["Over the limit of 2 URLs per import."] * 2
+
+	def test_round_robin_by_host(self):
+		items = list(enumerate(["https://a.com/1", "https://a.com/2", "https://a.com/3", "https://b.com/1", "https://c.com/1", "https://b.com/2"]))
+		assert [url for _, url in bulk_import.by_host_round_robin(items)] == [
+			"https://a.com/1", "https://b.com/1", "https://c.com/1", "https://a.com/2", "https://b.com/2", "https://a.com/3",
+		]
+
+
+class TestImportUrls:
+	"""import_urls: thread pool, batched inserts and per-URL results."""
+
+	def test_report_in_input_order(self, extract):
+		me = create_user("bi_me@test.com", "Me", "Secret123")
+		results = bulk_import.import_urls(me, [
+			"https://example.com/pancakes", "https://example.com/empty", "https://down.org/x",
+			"https://example.com/pancakes", "https://other.org/waffles",
+		], concurrency=3)
+		assert [(r.url, r.status, r.error) for r in results] == [
+			("https://example.com/pancakes", "imported", None),
+			("https://example.com/empty", "failed", bulk_import.NO_RECIPE),
+			("https://down.org/x", "failed", "site down"),
+			("https://example.com/pancakes", "skipped", "Duplicate of https://example.com/pancakes"),
+			("https://other.org/waffles", "imported", None),
+		]
+		titles = {r.id: r.title for r in Select.get_Recipes_by_Persons_id(me)}
+		assert titles == {results[0].recipe_id: "pancakes", results[4].recipe_id: "waffles"}
+		assert len(extract) == 4
+
+	def test_inserts_batched(self, extract, monkeypatch):
+		me = create_user("bi_me@test.com", "Me", "Secret123")
+		batches = []
+		monkeypatch.setattr(database, "create_recipes", lambda user_id, recipes: batches.append(len(recipes)) or create_recipes(user_id, recipes))
+		results = bulk_import.import_urls(me, [f"https://example.com/{n}" for n in range(7)], concurrency=4, batch_size=3)
+		assert batches == [3, 3, 1]
+		assert [r.status for r in results] == ["imported"] * 7
+		assert sorted(r.title for r in Select.get_Recipes_by_Persons_id(me)) == [str(n) for n in range(7)]
+
+	def test_create_recipes_one_transaction(self):
+		me = create_user("bi_me@test.com", "Me", "Secret123")
+		ids = create_recipes(me, [{"title": "A", "ingredients": "1 egg\n2 cups flour"}, {"title": "B"}])
+		recipes = {r.id: r for r in Select.get_Recipes_by_Persons_id(me)}
+		assert [recipes[i].title for i in ids] == ["A", "B"]
+		assert [line.name for line in Select.get_recipe_ingredients(ids[0])] == ["egg", "flour"]
+
+	def test_cli(self, extract, tmp_path, capsys):
+		create_user("bi_me@test.com", "Me", "Secret123")
+		urls = tmp_path / "urls.txt"
+		urls.write_text("https://example.com/pancakes\nhttps://example.com/empty\n")
+		assert bulk_import.main(["--user", "bi_me@test.com", str(urls)]) == 1
+		out = capsys.readouterr().out
+		assert "imported  https://example.com/pancakes  recipe " in out
+		assert "1 imported, 1 failed, 0 skipped" in out
+		assert bulk_import.main(["--user", "nobody@test.com", str(urls)]) == 2
+
+
+class TestBulkImportRoutes:
+	"""/Recipes/BulkImport, its report page and /Status."""
+
+	def test_post_queues_batch_and_reports(self, logged_in_client, extract):
+		client, user_id = logged_in_client
+		resp = client.post("/Recipes/BulkImport", data={
+			"urls": "https://example.com/pancakes\nhttps://example.com/pancakes#x\nhttps://example.com/empty\n",
+		}, follow_redirects=False)
+		assert resp.status_code == 302
+		batch = resp.headers["Location"].rsplit("/", 1)[1]
+		assert extract == []  # nothing fetched inside the request
+		status = client.get(f"/Recipes/BulkImport/{batch}/Status").get_json()
+		assert status["counts"] == {"queued": 2, "running": 0, "done": 0, "failed": 0, "skipped": 1}
+
+		import_jobs.run_pending()
+		status = client.get(f"/Recipes/BulkImport/{batch}/Status").get_json()
+		assert status["counts"] == {"queued": 0, "running": 0, "done": 1, "failed": 1, "skipped": 1}
+		assert [(j["url"], j["status"]) for j in status["jobs"]] == [
+			("https://example.com/pancakes", "done"),
+			("https://example.com/pancakes#x", "skipped"),
+			("https://example.com/empty", "failed"),
+		]
+		page = client.get(f"/Recipes/BulkImport/{batch}")
+		assert page.status_code == 200
+		assert status["jobs"][0]["recipe_url"].encode() in page.data
+		assert b"Skipped: Duplicate of https://example.com/pancakes" in page.data
+
+	def test_post_with_malformed_line(self, logged_in_client, extract):
+		client, _ = logged_in_client
+		resp = client.post("/Recipes/BulkImport", data={"urls": "https://example.com/pancakes\nhttp://[::1\n"})
+		assert resp.status_code == 302
+		status = client.get(resp.headers["Location"] + "/Status").get_json()
+		assert [(j["url"], j["status"]) for j in status["jobs"]] == [
+			("https://example.com/pancakes", "queued"),
+			("http://[::1", "skipped"),
+		]
+
+	def test_empty_post_and_unknown_batch(self, logged_in_client):
+		client, _ = logged_in_client
+		assert client.get("/Recipes/BulkImport").status_code == 200
+		assert client.post("/Recipes/BulkImport", data={"urls": "  \n"}).status_code == 400
+		assert client.get("/Recipes/BulkImport/nope").status_code == 404
+		assert client.get("/Recipes/BulkImport/nope/Status").status_code == 404
+
+	def test_other_users_batch_404(self, logged_in_client, extract):
+		client, _ = logged_in_client
+		other = create_user("bi_other@test.com", "Other", "Secret123")
+		batch = bulk_import.submit(other, ["https://example.com/pancakes"])
+		assert client.get(f"/Recipes/BulkImport/{batch}").status_code == 404
+		assert client.get(f"/Recipes/BulkImport/{batch}/Status").status_code == 404
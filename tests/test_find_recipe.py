@@ -10,16 +10,14 @@ from database import (
 	get_or_create_ingredient,
 	create_list_ingredient,
 	get_or_create_list,
+	soft_delete_recipe,
 )
-from database import Select
+from database import Select, recipe_ranking, result_sets
+from ingredient_names import canonical
+from pantry_matcher import compile_pantry
 
 # Import Find Recipe helpers from the app module
-from GroceryGuru import (
-	_get_pantry_ingredient_names,
-	_count_pantry_matches,
-	_recipe_ingredient_in_pantry,
-	_get_recipes_sorted_by_pantry_match,
-)
+from GroceryGuru import _get_pantry_ingredient_names
 
 
 # ————————————————————————————————— Fixtures ————————————————————————————————— #
@@ -82,111 +80,139 @@ def user_with_recipes(test_user_id):
 
 # ————————————————————————————————— Helper functions ————————————————————————— #
 
+def _pantry(names):
+	"""Matcher over the canonical forms of names, as Find Recipe compiles a pantry."""
+	return compile_pantry(canonical(name) for name in names)
+
+
+def _count_matches(recipe_text: str, names) -> int:
+	"""Pantry names found in a recipe's ingredient lines, both sides in canonical form."""
+	return _pantry(names).count("\n".join(canonical(line) for line in recipe_text.splitlines()))
+
+
 class TestFindRecipeHelpers:
-	"""Tests for _get_pantry_ingredient_names, _count_pantry_matches, _recipe_ingredient_in_pantry."""
+	"""Tests for _get_pantry_ingredient_names and canonical pantry matching (pantry_matcher)."""
 
 	def test_get_pantry_ingredient_names_empty(self, test_user_id):
 		"""_get_pantry_ingredient_names returns empty set when pantry is empty."""
 		names = _get_pantry_ingredient_names(test_user_id)
 		assert names == set()
 
-	def test_get_pantry_ingredient_names_returns_lowercase(self, user_with_pantry):
-		"""_get_pantry_ingredient_names returns lowercase names."""
+	def test_get_pantry_ingredient_names_returns_canonical(self, user_with_pantry):
+		"""_get_pantry_ingredient_names returns canonical names (lowercase, singular)."""
 		user_id, _ = user_with_pantry
 		names = _get_pantry_ingredient_names(user_id)
-		assert "flour" in names
-		assert "sugar" in names
-		assert "eggs" in names
-		assert "Flour" not in names
+		assert names == {"flour", "sugar", "egg"}
 
-	def test_count_pantry_matches_counts_substring(self):
-		"""_count_pantry_matches counts when pantry name appears in recipe line."""
+	def test_count_matches_counts_substring(self):
+		"""A pantry name counts when pantry name appears in recipe line."""
 		pantry = {"flour", "sugar"}
 		recipe = "2 cups flour\n1 cup sugar\n1/2 cup butter"
-		assert _count_pantry_matches(recipe, pantry) == 2
+		assert _count_matches(recipe, pantry) == 2
 
-	def test_count_pantry_matches_partial_match(self):
-		"""_count_pantry_matches matches 'flour' in 'all-purpose flour'."""
+	def test_count_matches_partial_match(self):
+		"""'flour' matches in 'all-purpose flour'."""
 		pantry = {"flour"}
 		recipe = "2 cups all-purpose flour"
-		assert _count_pantry_matches(recipe, pantry) == 1
+		assert _count_matches(recipe, pantry) == 1
 
-	def test_count_pantry_matches_case_insensitive(self):
-		"""_count_pantry_matches matches when recipe has different case (pantry names are lowercased in production)."""
+	def test_count_matches_case_insensitive(self):
+		"""Names match when the recipe has different case (pantry names are lowercased in production)."""
 		pantry = {"flour"}  # _get_pantry_ingredient_names returns lowercase
 		recipe = "2 cups Flour"  # Recipe text can have any case
-		assert _count_pantry_matches(recipe, pantry) == 1
+		assert _count_matches(recipe, pantry) == 1
 
-	def test_count_pantry_matches_empty_pantry(self):
-		"""_count_pantry_matches returns 0 for empty pantry."""
-		assert _count_pantry_matches("flour and sugar", set()) == 0
+	def test_count_matches_empty_pantry(self):
+		"""An empty pantry matches nothing."""
+		assert _count_matches("flour and sugar", set()) == 0
 
-	def test_count_pantry_matches_empty_recipe(self):
-		"""_count_pantry_matches returns 0 for empty recipe."""
-		assert _count_pantry_matches("", {"flour"}) == 0
+	def test_count_matches_empty_recipe(self):
+		"""An empty recipe matches nothing."""
+		assert _count_matches("", {"flour"}) == 0
 
-	def test_recipe_ingredient_in_pantry_true(self):
-		"""_recipe_ingredient_in_pantry returns True when pantry item in line."""
+	def test_line_matches_true(self):
+		"""A line containing a pantry item matches."""
 		pantry = {"flour", "eggs"}
-		assert _recipe_ingredient_in_pantry("2 cups all-purpose flour", pantry) is True
-		assert _recipe_ingredient_in_pantry("3 large eggs", pantry) is True
+		assert _pantry(pantry).line_matches(canonical("2 cups all-purpose flour")) is True
+		assert _pantry(pantry).line_matches(canonical("3 large eggs")) is True
 
-	def test_recipe_ingredient_in_pantry_false(self):
-		"""_recipe_ingredient_in_pantry returns False when no match."""
+	def test_line_matches_false(self):
+		"""A line without one does not."""
 		pantry = {"flour"}
-		assert _recipe_ingredient_in_pantry("1 cup milk", pantry) is False
-		assert _recipe_ingredient_in_pantry("8 oz chocolate", pantry) is False
+		assert _pantry(pantry).line_matches(canonical("1 cup milk")) is False
+		assert _pantry(pantry).line_matches(canonical("8 oz chocolate")) is False
+
+	def test_line_matches_empty_line(self):
+		"""An empty line does not match."""
+		assert _pantry({"flour"}).line_matches(canonical("")) is False
 
-	def test_recipe_ingredient_in_pantry_empty_line(self):
-		"""_recipe_ingredient_in_pantry returns False for empty line."""
-		assert _recipe_ingredient_in_pantry("", {"flour"}) is False
 
+# ————————————————————————————————— recipe_ranking.search ——————————————————— #
 
-# ————————————————————————————————— _get_recipes_sorted_by_pantry_match ——————— #
+def _ranked(user_id: int, category: str = None):
+	"""The user's whole Find Recipe ranking."""
+	return recipe_ranking.search(user_id, category, None)[1]
 
-class TestGetRecipesSortedByPantryMatch:
-	"""Tests for _get_recipes_sorted_by_pantry_match."""
+
+class TestRecipeRankingSearch:
+	"""Tests for recipe_ranking.search over the stored pantry scores."""
 
 	def test_sorts_by_match_count_descending(self, user_with_pantry, user_with_recipes):
 		"""Recipes are sorted by pantry match count, highest first."""
 		user_id, _ = user_with_pantry
 		_, recipe_ids = user_with_recipes
-		scored = _get_recipes_sorted_by_pantry_match(user_id, None)
+		scored = _ranked(user_id, None)
 		# Cake has 3 matches, Sugar Cookies and Pancakes have 2, Chocolate Mousse has 0
 		assert len(scored) >= 4
 		# First should be Cake (3 matches)
-		assert scored[0][0].title == "Cake"
-		assert scored[0][1] == 3
+		assert scored[0].title == "Cake"
+		assert scored[0].matched == 3
 		# Last should be Chocolate Mousse (0 matches)
-		titles = [r.title for r, _ in scored]
+		titles = [r.title for r in scored]
 		mousse_idx = titles.index("Chocolate Mousse")
-		assert scored[mousse_idx][1] == 0
+		assert scored[mousse_idx].matched == 0
 
 	def test_filters_by_category(self, user_with_pantry, user_with_recipes):
 		"""When category=Desserts, only Desserts recipes returned."""
 		user_id, _ = user_with_pantry
 		user_with_recipes  # ensure recipes exist
-		scored = _get_recipes_sorted_by_pantry_match(user_id, "Desserts")
-		assert all((r.category or "").strip() == "Desserts" for r, _ in scored)
+		scored = _ranked(user_id, "Desserts")
+		desserts = {r.id for r in Select.get_Recipes_by_category(user_id, "Desserts")}
+		assert desserts and {r.id for r in scored} == desserts
 
 	def test_filters_by_others(self, test_user_id):
 		"""When category=Others, only uncategorized recipes returned."""
 		create_recipe("Uncategorized Recipe", test_user_id, category="")
 		create_recipe("Dessert Recipe", test_user_id, category="Desserts")
-		scored = _get_recipes_sorted_by_pantry_match(test_user_id, "Others")
-		titles = [r.title for r, _ in scored]
+		scored = _ranked(test_user_id, "Others")
+		titles = [r.title for r in scored]
 		assert "Uncategorized Recipe" in titles
 		assert "Dessert Recipe" not in titles
 
+	def test_plurals_and_synonyms_match(self, test_user_id):
+		"""Pantry names and recipe lines are compared in canonical form (singular, synonyms applied)."""
+		for name in ("Tomatoes", "Scallion", "egg"):
+			create_inventory_ingredient(1, datetime.utcnow(), None, get_or_create_ingredient(name, test_user_id), None)
+		create_recipe("Salad", test_user_id, ingredients="1 tomato\n2 spring onions, sliced\n3 large Eggs")
+		scored = _ranked(test_user_id, None)
+		assert [(r.title, r.matched) for r in scored] == [("Salad", 3)]
+
 	def test_empty_category_returns_all(self, user_with_pantry, user_with_recipes):
 		"""When category is None or empty, all recipes returned."""
 		user_id, _ = user_with_pantry
-		scored = _get_recipes_sorted_by_pantry_match(user_id, None)
+		scored = _ranked(user_id, None)
 		assert len(scored) >= 4
-		scored2 = _get_recipes_sorted_by_pantry_match(user_id, "")
+		scored2 = _ranked(user_id, "")
 		assert len(scored2) == len(scored)
 
 
+def _search(client, recipe_type: str = "") -> str:
+	"""POST the Find Recipe form and return the results URL it redirects to."""
+	resp = client.post("/FindRecipe", data={"recipe_type": recipe_type}, follow_redirects=False)
+	assert resp.status_code == 302
+	return resp.headers["Location"]
+
+
 # ————————————————————————————————— Routes: Find Recipe ————————————————————— #
 
 class TestFindRecipeRoutes:
@@ -226,7 +252,7 @@ class TestFindRecipeRoutes:
 		assert resp.status_code == 302
 		loc = resp.headers.get("Location", "")
 		assert "/FindRecipe/Results" in loc
-		assert "ids=" in loc
+		assert "rs=" in loc
 		assert "i=0" in loc
 
 	def test_find_recipe_post_no_recipes_shows_error(self, logged_in_client):
@@ -244,7 +270,7 @@ class TestFindRecipeRoutes:
 
 	def test_find_recipe_results_requires_login(self, client):
 		"""GET /FindRecipe/Results redirects when not authenticated."""
-		resp = client.get("/FindRecipe/Results?ids=1&i=0", follow_redirects=False)
+		resp = client.get("/FindRecipe/Results?rs=token&i=0", follow_redirects=False)
 		assert resp.status_code in (302, 401)
 
 	def test_find_recipe_results_shows_recipe(self, logged_in_client):
@@ -256,7 +282,7 @@ class TestFindRecipeRoutes:
 			ingredients="2 cups flour\n1 egg",
 			category="Desserts",
 		)
-		resp = client.get(f"/FindRecipe/Results?ids={rid}&i=0", follow_redirects=True)
+		resp = client.get(_search(client), follow_redirects=True)
 		assert resp.status_code == 200
 		assert b"Best Match Recipe" in resp.data
 		assert b"ingredient" in resp.data.lower()
@@ -269,22 +295,53 @@ class TestFindRecipeRoutes:
 		r1 = create_recipe("First", user_id, category="Desserts")
 		r2 = create_recipe("Second", user_id, category="Desserts")
 		# At index 0, prev should go to index 1 (last)
-		resp = client.get(f"/FindRecipe/Results?ids={r1},{r2}&i=0", follow_redirects=True)
+		resp = client.get(_search(client), follow_redirects=True)
 		assert resp.status_code == 200
 		assert b"First" in resp.data
 		# Prev link should have i=1
 		assert b"i=1" in resp.data or "i=1" in resp.data.decode()
 
 	def test_find_recipe_results_404_for_nonexistent_recipe(self, logged_in_client):
-		"""GET /FindRecipe/Results with invalid recipe id returns 404."""
+		"""GET /FindRecipe/Results for a recipe deleted since the search returns 404."""
 		client, user_id = logged_in_client
 		rid = create_recipe("Mine", user_id)
-		other_id = create_user("other@test.com", "Other", "pass")
-		# Request with our recipe id but we need to ensure 404 for wrong user - actually our user owns rid
-		# Test 404 for non-existent id
-		resp = client.get("/FindRecipe/Results?ids=99999&i=0", follow_redirects=False)
+		url = _search(client)
+		soft_delete_recipe(rid)
+		resp = client.get(url, follow_redirects=False)
 		assert resp.status_code == 404
 
+	def test_find_recipe_results_unknown_token_restarts_search(self, logged_in_client):
+		"""An unknown or expired result set token redirects back to the Find Recipe form."""
+		client, _ = logged_in_client
+		resp = client.get("/FindRecipe/Results?rs=no-such-token&i=0", follow_redirects=False)
+		assert resp.status_code == 302
+		assert resp.headers["Location"].endswith("/FindRecipe")
+
+	def test_find_recipe_results_token_is_per_user(self, logged_in_client):
+		"""Another user's token is treated as unknown."""
+		client, _ = logged_in_client
+		other_id = create_user("other@test.com", "Other", "pass")
+		create_recipe("Theirs", other_id)
+		token = result_sets.create(other_id, [(1, 0)], [])
+		resp = client.get(f"/FindRecipe/Results?rs={token}&i=0", follow_redirects=False)
+		assert resp.status_code == 302
+
+	def test_find_recipe_results_pages_wrap_and_show_pantry_flags(self, logged_in_client):
+		"""Pages come from the stored ranking; pantry flags are computed once and reused."""
+		client, user_id = logged_in_client
+		ing_id = get_or_create_ingredient("flour", user_id)
+		create_inventory_ingredient(1, datetime.utcnow(), None, ing_id, None)
+		create_recipe("Bread", user_id, ingredients="2 cups flour\nWater")
+		create_recipe("Soup", user_id, ingredients="Broth")
+		url = _search(client)
+		token = url.split("rs=")[1].split("&")[0]
+		first = client.get(url).data
+		assert b"Bread" in first and b"Recipe 1 of 2" in first
+		assert first.count(b"ingredient-in-pantry") == 1
+		assert result_sets.get_page(token, user_id, 0).pantry_flags == "10"
+		wrapped = client.get(f"/FindRecipe/Results?rs={token}&i=3").data
+		assert b"Soup" in wrapped and b"Recipe 2 of 2" in wrapped
+
 
 # ————————————————————————————————— Routes: Add to Shopping List ————————————— #
 
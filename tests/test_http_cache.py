@@ -0,0 +1,326 @@
+"""Unit tests for the on-disk HTTP cache and pooled session behind recipe imports (local server only)."""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import http_cache
+import recipe_extractor
+from http_cache import HostRateLimiter, HttpCache, build_session, normalize_url
+
+
+PAGE = b"""<html><head><title>Pancakes</title>
+<script type="application/ld+json">{"@type": "Recipe", "name": "Pancakes",
+"recipeIngredient": ["2 eggs", "1 cup flour"], "recipeInstructions": "Mix. Fry."}</script>
+</head><body></body></html>"""
+
+
+class FakeResponse:
+	def __init__(self, status_code=200, content=b"", headers=None, encoding="utf-8"):
+		self.status_code = status_code
+		self.content = content
+		self.headers = requests.structures.CaseInsensitiveDict(headers or {})
+		self.encoding = encoding
+		self.apparent_encoding = "utf-8"
+
+
+class FakeServer:
+	"""Stands in for the session's get: records every request, answers with the next queued response."""
+
+	def __init__(self, *responses):
+		self.responses = list(responses)
+		self.requests = []
+
+	def __call__(self, url, headers=None, timeout=None):
+		self.requests.append((url, dict(headers or {})))
+		response = self.responses.pop(0)
+		if isinstance(response, Exception):
+			raise response
+		return response
+
+
+class Clock:
+	def __init__(self):
+		self.now = 1000.0
+
+	def __call__(self):
+		return self.now
+
+
+@pytest.fixture
+def clock():
+	return Clock()
+
+
+def _cache(tmp_path, server, clock, **kwargs):
+	kwargs.setdefault("fresh_for", 60)
+	kwargs.setdefault("negative_ttl", 30)
+	kwargs.setdefault("max_bytes", 2**20)
+	return HttpCache(str(tmp_path / "http_cache.db"), get=server, clock=clock, **kwargs)
+
+
+class TestNormalizeUrl:
+	"""normalize_url: equivalent spellings share a key."""
+
+	def test_equivalent_urls(self):
+		key = normalize_url("https://example.com/recipes/pancakes?b=2&a=1")
+		assert normalize_url("HTTPS://Example.COM:443/recipes/pancakes?a=1&b=2#step-3") == key
+		assert normalize_url("https://example.com/recipes/pancakes?utm_source=x&a=1&b=2&fbclid=y") == key
+		assert normalize_url("https://example.com") == "https://example.com/"
+
+	def test_distinct_urls(self):
+		assert normalize_url("http://example.com/a") != normalize_url("https://example.com/a")
+		assert normalize_url("https://example.com:8443/a") == "https://example.com:8443/a"
+		assert normalize_url("https://example.com/A") != normalize_url("https://example.com/a")
+
+
+class TestHttpCache:
+	"""HttpCache.get_text: freshness, revalidation, negative caching, eviction and stats."""
+
+	def test_fresh_hit_skips_network(self, tmp_path, clock):
+		server = FakeServer(FakeResponse(content=PAGE))
+		cache = _cache(tmp_path, server, clock)
+		assert cache.get_text("https://example.com/p") == PAGE.decode()
+		clock.now += 59
+		assert cache.get_text("https://example.com/p#top") == PAGE.decode()
+		assert len(server.requests) == 1
+		stats = cache.stats()
+		assert (stats.entries, stats.hits, stats.misses, stats.bytes) == (1, 1, 1, len(PAGE))
+		assert stats.hit_rate == 0.5
+
+	def test_survives_restart(self, tmp_path, clock):
+		_cache(tmp_path, FakeServer(FakeResponse(content=PAGE)), clock).get_text("https://example.com/p")
+		server = FakeServer()
+		assert _cache(tmp_path, server, clock).get_text("https://example.com/p") == PAGE.decode()
+		assert server.requests == []
+
+	def test_stale_entry_revalidated_with_conditional_get(self, tmp_path, clock):
+		server = FakeServer(
+			FakeResponse(content=PAGE, headers={"ETag": '"v1"', "Last-Modified": "Mon, 05 Oct 2026 10:00:00 GMT"}),
+			FakeResponse(status_code=304),
+		)
+		cache = _cache(tmp_path, server, clock)
+		cache.get_text("https://example.com/p")
+		clock.now += 61
+		assert cache.get_text("https://example.com/p") == PAGE.decode()
+		headers = server.requests[1][1]
+		assert headers["If-None-Match"] == '"v1"'
+		assert headers["If-Modified-Since"] == "Mon, 05 Oct 2026 10:00:00 GMT"
+		clock.now += 30  # fresh again after the 304
+		assert cache.get_text("https://example.com/p") == PAGE.decode()
+		assert len(server.requests) == 2
+		assert cache.stats().revalidated == 1
+
+	def test_changed_page_replaces_entry(self, tmp_path, clock):
+		server = FakeServer(
+			FakeResponse(content=b"old", headers={"ETag": '"v1"'}),
+			FakeResponse(content=b"new", headers={"ETag": '"v2"'}),
+		)
+		cache = _cache(tmp_path, server, clock)
+		cache.get_text("https://example.com/p")
+		clock.now += 61
+		assert cache.get_text("https://example.com/p") == "new"
+		clock.now += 61
+		server.responses.append(FakeResponse(status_code=304))
+		cache.get_text("https://example.com/p")
+		assert server.requests[2][1]["If-None-Match"] == '"v2"'
+
+	def test_cache_control(self, tmp_path, clock):
+		server = FakeServer(
+			FakeResponse(content=b"a", headers={"Cache-Control": "public, max-age=600"}),
+			FakeResponse(content=b"b", headers={"Cache-Control": "no-store"}),
+			FakeResponse(content=b"b"),
+		)
+		cache = _cache(tmp_path, server, clock)
+		cache.get_text("https://example.com/a")
+		clock.now += 300
+		cache.get_text("https://example.com/a")  # max-age outlasts fresh_for
+		cache.get_text("https://example.com/b")
+		cache.get_text("https://example.com/b")  # no-store: fetched again
+		assert [url for url, _ in server.requests] == ["https://example.com/a", "https://example.com/b", "https://example.com/b"]
+
+	def test_failures_negative_cached(self, tmp_path, clock):
+		server = FakeServer(requests.ConnectionError("down"), FakeResponse(status_code=404), FakeResponse(content=PAGE))
+		cache = _cache(tmp_path, server, clock)
+		assert cache.get_text("https://example.com/p") is None
+		assert cache.get_text("https://example.com/p") is None
+		assert len(server.requests) == 1
+		clock.now += 31
+		assert cache.get_text("https://example.com/p") is None  # 404
+		clock.now += 31
+		assert cache.get_text("https://example.com/p") == PAGE.decode()
+		stats = cache.stats()
+		assert (stats.misses, stats.negative_hits, stats.negative_entries) == (3, 1, 0)
+
+	def test_stale_body_kept_when_revalidation_fails(self, tmp_path, clock):
+		server = FakeServer(
+			FakeResponse(content=PAGE, headers={"ETag": '"v1"'}),
+			requests.ConnectionError("down"),
+			FakeResponse(status_code=503),
+			FakeResponse(status_code=304),
+		)
+		cache = _cache(tmp_path, server, clock)
+		cache.fetch_text("https://example.com/p")
+		clock.now += 61
+		assert cache.fetch_text("https://example.com/p") == PAGE.decode()
+		assert cache.fetch_text("https://example.com/p", refetch_failed=True) == PAGE.decode()
+		assert len(server.requests) == 2  # served for the negative TTL without a request
+		clock.now += 31
+		assert cache.fetch_text("https://example.com/p") == PAGE.decode()
+		clock.now += 31
+		assert cache.fetch_text("https://example.com/p") == PAGE.decode()
+		assert server.requests[3][1]["If-None-Match"] == '"v1"'
+		stats = cache.stats()
+		assert (stats.entries, stats.negative_entries, stats.stale, stats.revalidated) == (1, 0, 2, 1)
+
+	def test_fetch_text_raises(self, tmp_path, clock):
+		server = FakeServer(requests.ConnectionError("down"), FakeResponse(status_code=503), FakeResponse(status_code=404))
+		cache = _cache(tmp_path, server, clock)
+		with pytest.raises(http_cache.FetchError) as first:
+			cache.fetch_text("https://example.com/p")
+		with pytest.raises(http_cache.FetchError) as cached:
+			cache.fetch_text("https://example.com/p")
+		assert (first.value.status, first.value.transient, cached.value.transient) == (0, True, True)
+		assert "ConnectionError" in str(first.value)
+		assert len(server.requests) == 1
+		with pytest.raises(http_cache.FetchError) as refetched:
+			cache.fetch_text("https://example.com/p", refetch_failed=True)
+		assert (refetched.value.status, refetched.value.transient) == (503, True)
+		with pytest.raises(http_cache.FetchError) as missing:
+			cache.fetch_text("https://example.com/p", refetch_failed=True)
+		assert (str(missing.value), missing.value.transient) == ("Could not fetch the page (HTTP 404).", False)
+		assert len(server.requests) == 3
+
+	def test_unknown_charset(self, tmp_path, clock):
+		"""A charset Python has no codec for falls back to the detected encoding, cached or not."""
+		body = "Crème brûlée".encode()
+		server = FakeServer(FakeResponse(content=body, encoding="utf8mb4"), FakeResponse(content=body, encoding="utf8mb4"))
+		cache = _cache(tmp_path, server, clock)
+		assert cache.fetch_text("https://example.com/p") == "Crème brûlée"
+		assert cache.fetch_text("https://example.com/p") == "Crème brûlée"  # from the cache
+		assert len(server.requests) == 1
+		assert _cache(tmp_path, server, clock, max_bytes=0).fetch_text("https://example.com/q") == "Crème brûlée"
+
+	def test_evicts_least_recently_used(self, tmp_path, clock):
+		server = FakeServer(*(FakeResponse(content=bytes(40)) for _ in range(4)))
+		cache = _cache(tmp_path, server, clock, max_bytes=100)
+		for name in "ab":
+			clock.now += 1
+			cache.get_text(f"https://example.com/{name}")
+		clock.now += 1
+		cache.get_text("https://example.com/a")  # a is now more recent than b
+		clock.now += 1
+		cache.get_text("https://example.com/c")  # 120 bytes: b goes
+		assert cache.stats().bytes == 80
+		cache.get_text("https://example.com/a")
+		cache.get_text("https://example.com/b")
+		assert [url[-1] for url, _ in server.requests] == ["a", "b", "c", "b"]
+
+	def test_disabled(self, tmp_path, clock):
+		server = FakeServer(FakeResponse(content=PAGE), FakeResponse(content=PAGE), FakeResponse(status_code=500))
+		cache = _cache(tmp_path, server, clock, max_bytes=0)
+		assert cache.get_text("https://example.com/p") == PAGE.decode()
+		assert cache.get_text("https://example.com/p") == PAGE.decode()
+		assert cache.get_text("https://example.com/p") is None
+		assert len(server.requests) == 3
+
+	def test_clear(self, tmp_path, clock):
+		cache = _cache(tmp_path, FakeServer(FakeResponse(content=PAGE)), clock)
+		cache.get_text("https://example.com/p")
+		cache.clear()
+		assert cache.stats() == (0, 0, 0, 0, 0, 0, 0, 0)
+
+
+class TestHostRateLimiter:
+	"""HostRateLimiter: one slot per host per interval."""
+
+	def test_slots_spaced_per_host(self, clock):
+		limiter = HostRateLimiter(2.0, clock=clock)
+		assert limiter.acquire("example.com") == 0.0
+		assert limiter.acquire("EXAMPLE.com") == 2.0
+		assert limiter.acquire("other.org") == 0.0
+		clock.now += 1.5
+		assert limiter.acquire("example.com") == pytest.approx(0.5)
+		clock.now += 0.5
+		assert limiter.acquire("example.com") == 0.0
+
+	def test_zero_interval_never_waits(self, clock):
+		limiter = HostRateLimiter(0, clock=clock)
+		assert [limiter.acquire("example.com") for _ in range(3)] == [0.0] * 3
+
+
+class TestExtractorUsesCache:
+	"""extract_recipe_from_url fetches through recipe_extractor.response_cache."""
+
+	def test_repeat_import_without_network(self, tmp_path, clock, monkeypatch):
+		server = FakeServer(FakeResponse(content=PAGE))
+		monkeypatch.setattr(recipe_extractor, "response_cache", _cache(tmp_path, server, clock))
+		first = recipe_extractor.extract_recipe_from_url("https://example.com/pancakes")
+		again = recipe_extractor.extract_recipe_from_url("https://example.com/pancakes?utm_source=feed")
+		assert first == {**again, "source_url": first["source_url"]}
+		assert first["ingredients"] == "2 eggs\n1 cup flour"
+		assert len(server.requests) == 1
+
+	def test_default_path_next_to_database(self, monkeypatch):
+		monkeypatch.delenv("GROCERY_GURU_HTTP_CACHE_PATH", raising=False)
+		monkeypatch.setenv("GROCERY_GURU_DB_PATH", "/srv/db/grocery.db")
+		assert http_cache.default_cache_path() == "/srv/db/http_cache.db"
+
+
+class _Handler(BaseHTTPRequestHandler):
+	protocol_version = "HTTP/1.1"  # keep-alive
+	statuses: list = []
+	clients: list = []
+
+	def do_GET(self):
+		self.clients.append(self.client_address)
+		status = self.statuses.pop(0) if self.statuses else 200
+		self.send_response(status)
+		self.send_header("Content-Length", "2")
+		self.end_headers()
+		self.wfile.write(b"ok")
+
+	def log_message(self, *args):
+		pass
+
+
+@pytest.fixture
+def local_server():
+	_Handler.statuses, _Handler.clients = [], []
+	server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+	threading.Thread(target=server.serve_forever, daemon=True).start()
+	yield f"http://127.0.0.1:{server.server_port}"
+	server.shutdown()
+	server.server_close()
+
+
+class TestSession:
+	"""build_session / shared_session: keep-alive pooling, retries and timeouts."""
+
+	def test_connections_reused(self, local_server):
+		session = build_session()
+		for n in range(5):
+			assert session.get(f"{local_server}/{n}", timeout=http_cache.TIMEOUT).text == "ok"
+		assert len(set(_Handler.clients)) == 1  # one TCP connection for all five GETs
+
+	def test_pool_bounds(self):
+		adapter = build_session(pool_hosts=3, pool_maxsize=2).get_adapter("https://example.com/")
+		assert (adapter._pool_connections, adapter._pool_maxsize) == (3, 2)
+
+	def test_retries_server_errors(self, local_server):
+		_Handler.statuses = [503, 502]
+		assert build_session(retries=2, backoff=0).get(local_server, timeout=5).status_code == 200
+		_Handler.statuses = [503, 503]
+		assert build_session(retries=1, backoff=0).get(local_server, timeout=5).status_code == 503
+		assert len(_Handler.clients) == 5
+
+	def test_cache_fetches_through_shared_session(self, tmp_path, local_server, monkeypatch):
+		calls = []
+		session = build_session()
+		monkeypatch.setattr(http_cache, "_session", session)
+		monkeypatch.setattr(session, "get", lambda url, **kwargs: calls.append(kwargs) or requests.Session.get(session, url, **kwargs))
+		cache = HttpCache(str(tmp_path / "http_cache.db"))
+		assert cache.get_text(f"{local_server}/page") == "ok"
+		assert http_cache.shared_session() is session
+		assert calls[0]["timeout"] == http_cache.TIMEOUT
@@ -0,0 +1,168 @@
+"""Unit tests for the Flask-Login identity cache (database.identity_cache)."""
+import pytest
+from sqlalchemy import event
+
+import database
+from database import create_user, update_person_profile
+from database.identity_cache import IdentityCache, UserRecord, user_cache
+
+
+# ————————————————————————————————— Fixtures ————————————————————————————————— #
+
+class _Clock:
+	def __init__(self):
+		self.now = 0.0
+
+	def __call__(self):
+		return self.now
+
+
+@pytest.fixture
+def persons_queries():
+	"""Count user lookups (statements selecting Persons.email) sent through the shared engine."""
+	counter = {"n": 0}
+
+	def _capture(conn, cursor, statement, *_args):
+		if '"Persons".email' in statement:
+			counter["n"] += 1
+
+	event.listen(database.engine, "before_cursor_execute", _capture)
+	yield counter
+	event.remove(database.engine, "before_cursor_execute", _capture)
+
+
+def _record(user_id):
+	return UserRecord(user_id, f"u{user_id}@test.com", f"User {user_id}")
+
+
+# ————————————————————————————————— IdentityCache ————————————————————————————————— #
+
+class TestIdentityCache:
+	"""LRU/TTL behaviour and counters, with a fake clock."""
+
+	def test_hit_after_miss(self):
+		cache = IdentityCache(maxsize=4, ttl=60)
+		calls = []
+		loader = lambda uid: calls.append(uid) or _record(uid)
+		assert cache.get(1, loader) == _record(1)
+		assert cache.get(1, loader) == _record(1)
+		assert calls == [1]
+		assert (cache.hits, cache.misses) == (1, 1)
+
+	def test_entries_expire_after_ttl(self):
+		clock = _Clock()
+		cache = IdentityCache(maxsize=4, ttl=10, clock=clock)
+		cache.get(1, _record)
+		clock.now = 9.9
+		cache.get(1, _record)
+		clock.now = 10.0
+		cache.get(1, _record)
+		assert (cache.hits, cache.misses) == (1, 2)
+
+	def test_least_recently_used_is_evicted(self):
+		cache = IdentityCache(maxsize=2, ttl=60)
+		cache.get(1, _record)
+		cache.get(2, _record)
+		cache.get(1, _record)  # 1 is now most recent
+		cache.get(3, _record)  # evicts 2
+		assert cache.stats()["size"] == 2
+		assert cache.evictions == 1
+		cache.get(1, _record)
+		assert cache.hits == 2
+		cache.get(2, _record)
+		assert cache.misses == 4
+
+	def test_unknown_user_not_cached(self):
+		cache = IdentityCache(maxsize=4, ttl=60)
+		assert cache.get(1, lambda uid: None) is None
+		assert cache.stats()["size"] == 0
+
+	def test_invalidate(self):
+		cache = IdentityCache(maxsize=4, ttl=60)
+		cache.get(1, _record)
+		cache.invalidate("1")
+		cache.get(1, _record)
+		assert cache.misses == 2
+
+	def test_load_overtaken_by_invalidate_not_kept(self):
+		cache = IdentityCache(maxsize=4, ttl=60)
+
+		def loader(uid):
+			cache.invalidate(uid)  # a write commits while the row is being read
+			return _record(uid)
+
+		assert cache.get(1, loader) == _record(1)
+		assert cache.stats()["size"] == 0
+		cache.get(1, _record)
+		assert cache.get(1, _record) == _record(1)
+		assert (cache.hits, cache.misses) == (1, 2)
+
+	def test_zero_maxsize_disables_cache(self):
+		cache = IdentityCache(maxsize=0, ttl=60)
+		cache.get(1, _record)
+		cache.get(1, _record)
+		assert (cache.hits, cache.misses) == (0, 2)
+
+	def test_stats(self):
+		cache = IdentityCache(maxsize=4, ttl=60)
+		cache.get(1, _record)
+		cache.get(1, _record)
+		stats = cache.stats()
+		assert stats["hits"] == 1 and stats["misses"] == 1 and stats["hit_rate"] == 0.5
+
+
+# ————————————————————————————————— Routes ————————————————————————————————— #
+
+class TestUserLoaderCache:
+	"""load_user reads through the shared user_cache."""
+
+	def test_steady_state_page_loads_skip_persons(self, logged_in_client, persons_queries):
+		"""After the first authenticated request, later ones issue no Persons query."""
+		client, _ = logged_in_client
+		assert client.get("/Lists").status_code == 200
+		persons_queries["n"] = 0
+		hits = user_cache.hits
+		for _ in range(3):
+			assert client.get("/Lists").status_code == 200
+		assert persons_queries["n"] == 0
+		assert user_cache.hits - hits == 3
+
+	def test_cached_user_has_no_password_hash(self, logged_in_client):
+		client, user_id = logged_in_client
+		client.get("/Lists")
+		record = user_cache.get(user_id, lambda uid: pytest.fail("expected a cache hit"))
+		assert not hasattr(record, "password")
+
+	def test_profile_update_invalidates(self, logged_in_client):
+		"""The profile page shows the new name right after an update."""
+		client, _ = logged_in_client
+		client.get("/Profile")
+		client.post("/Profile", data={"action": "update_profile", "name": "Renamed", "email": "renamed@test.com"})
+		resp = client.get("/Profile")
+		assert b"Renamed" in resp.data
+		assert b"renamed@test.com" in resp.data
+
+	def test_update_person_profile_invalidates(self, test_user):
+		user_id, _, _ = test_user
+		user_cache.get(user_id, _record)
+		update_person_profile(user_id, name="Fresh")
+		assert user_cache.get(user_id, lambda uid: UserRecord(uid, None, "Fresh")).name == "Fresh"
+
+	def test_profile_update_invalidates_at_commit(self, test_user):
+		"""A record cached between the write and the request's commit is dropped by the commit."""
+		from GroceryGuru import app
+		user_id, _, _ = test_user
+		with app.app_context():  # request-scoped session, committed at teardown
+			update_person_profile(user_id, name="Fresh")
+			user_cache.get(user_id, lambda uid: UserRecord(uid, None, "Stale"))  # a concurrent request
+			assert user_cache.stats()["size"] == 1
+		assert user_cache.stats()["size"] == 0
+
+	def test_create_user_invalidates(self):
+		"""A stale entry for a new account's id never survives account creation."""
+		user_id = create_user("stale@test.com", "Fresh", "Secret123")
+		user_cache.invalidate(user_id)
+		user_cache.get(user_id + 1, _record)
+		new_id = create_user("stale2@test.com", "Fresh 2", "Secret123")
+		assert new_id == user_id + 1
+		assert user_cache.stats()["size"] == 0
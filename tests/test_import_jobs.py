@@ -0,0 +1,330 @@
+"""Unit tests for background recipe imports (database.import_jobs) and their routes (no network calls)."""
+import threading
+import time
+
+import pytest
+import requests
+from sqlalchemy import update
+
+import http_cache
+import recipe_extractor
+from database import Select, create_user, import_jobs, session_scope
+from database.models import RecipeImportJobs
+
+
+RECIPE = {
+	"title": "Pancakes",
+	"ingredients": "2 eggs\n1 cup flour",
+	"steps": "Mix.\nFry.",
+	"special_notes": "",
+	"category": "Breakfasts",
+	"source_url": "https://example.com/pancakes",
+	"image_url": "",
+}
+
+
+@pytest.fixture
+def extract(monkeypatch):
+	"""Replace the page fetch: calls are recorded, and answered by extract.result (a value,
+	an exception to raise, or a callable)."""
+	class Extract:
+		def __init__(self):
+			self.result = RECIPE
+			self.urls = []
+
+		def __call__(self, url, refetch_failed=False):
+			self.urls.append(url)
+			if isinstance(self.result, Exception):
+				raise self.result
+			return self.result(url) if callable(self.result) else self.result
+
+	fake = Extract()
+	monkeypatch.setattr(recipe_extractor, "extract_recipe_from_url", fake)
+	return fake
+
+
+def _job(job_id):
+	with session_scope() as session:
+		return session.get(RecipeImportJobs, job_id)
+
+
+def _make_due(job_id):
+	"""Skip a retry delay or a lease: make the job due now."""
+	with session_scope() as session:
+		session.execute(update(RecipeImportJobs).where(RecipeImportJobs.id == job_id).values(run_after="2000-01-01 00:00:00"))
+
+
+class TestImportJobs:
+	"""submit / claim / run_pending."""
+
+	def test_import_creates_recipe(self, extract):
+		me = create_user("ij_me@test.com", "Me", "Secret123")
+		job_id = import_jobs.submit(me, "https://example.com/pancakes")
+		assert import_jobs.get(job_id, me).status == "queued"
+		assert import_jobs.run_pending() == 1
+		job = import_jobs.get(job_id, me)
+		assert (job.status, job.attempts, job.error) == ("done", 1, None)
+		recipe = Select.get_Recipe_by_id(job.recipe_id, me)
+		assert (recipe.title, recipe.person_id, recipe.category) == ("Pancakes", me, "Breakfasts")
+		assert import_jobs.run_pending() == 0
+
+	def test_other_users_job_hidden(self, extract):
+		me = create_user("ij_me@test.com", "Me", "Secret123")
+		other = create_user("ij_other@test.com", "Other", "Secret123")
+		job_id = import_jobs.submit(me, "https://example.com/pancakes")
+		assert import_jobs.get(job_id, other) is None
+		assert import_jobs.get(job_id + 1, me) is None
+
+	def test_page_without_recipe_fails_at_once(self, extract):
+		me = create_user("ij_me@test.com", "Me", "Secret123")
+		extract.result = None
+		job_id = import_jobs.submit(me, "https://example.com/nothing")
+		import_jobs.run_pending()
+		job = import_jobs.get(job_id, me)
+		assert (job.status, job.attempts, job.recipe_id) == ("failed", 1, None)
+		assert "Could not extract" in job.error
+
+	@pytest.mark.parametrize("url", ["http://[::1", "https://example.com:abc/recipe", "ftp://example.com/x", "https://"])
+	def test_submit_rejects_unfetchable_url(self, extract, url):
+		me = create_user("ij_me@test.com", "Me", "Secret123")
+		with pytest.raises(ValueError):
+			import_jobs.submit(me, url)
+		with session_scope() as session:
+			assert session.query(RecipeImportJobs).count() == 0
+
+	def test_queued_malformed_url_fails_at_once(self, extract):
+		me = create_user("ij_me@test.com", "Me", "Secret123")
+		with session_scope() as session:  # queued before submit checked URLs
+			session.add(RecipeImportJobs(person_id=me, url="http://[::1"))
+		with session_scope() as session:
+			job_id = session.query(RecipeImportJobs.id).scalar()
+		assert import_jobs.run_pending() == 1
+		job = import_jobs.get(job_id, me)
+		assert (job.status, job.error) == ("failed", "Not a valid URL.")
+		assert extract.urls == []
+
+	def test_errors_retried_with_backoff_then_fail(self, extract, monkeypatch):
+		monkeypatch.setattr(import_jobs, "IMPORT_ATTEMPTS", 2)
+		me = create_user("ij_me@test.com", "Me", "Secret123")
+		extract.result = ConnectionError("site down")
+		job_id = import_jobs.submit(me, "https://example.com/pancakes")
+		assert import_jobs.run_pending() == 1  # the retry is not due yet
+		job = import_jobs.get(job_id, me)
+		assert (job.status, job.attempts, job.error) == ("queued", 1, "site down")
+		assert _job(job_id).run_after > _job(job_id).created_at
+		_make_due(job_id)
+		assert import_jobs.run_pending() == 1
+		assert import_jobs.get(job_id, me)[3:5] == ("failed", 2)
+		assert len(extract.urls) == 2
+
+	def test_fetch_errors_retried_through_the_real_cache(self, tmp_path, monkeypatch):
+		responses = [requests.ConnectionError("dns"), None]
+
+		def get(url, headers=None, timeout=None):
+			response = responses.pop(0)
+			if isinstance(response, Exception):
+				raise response
+			return type("Response", (), {
+				"status_code": 200, "headers": {}, "encoding": "utf-8", "apparent_encoding": "utf-8",
+				"content": b'<script type="application/ld+json">{"@type": "Recipe", "name": "Pancakes"}</script>',
+			})()
+		monkeypatch.setattr(recipe_extractor, "response_cache", http_cache.HttpCache(str(tmp_path / "cache.db"), get=get))
+		me = create_user("ij_me@test.com", "Me", "Secret123")
+		job_id = import_jobs.submit(me, "https://example.com/pancakes")
+		import_jobs.run_pending()
+		job = import_jobs.get(job_id, me)
+		assert (job.status, job.attempts, job.error) == ("queued", 1, "Could not fetch the page (ConnectionError).")
+		_make_due(job_id)
+		import_jobs.run_pending()  # refetched despite the negative cache entry
+		job = import_jobs.get(job_id, me)
+		assert (job.status, job.attempts) == ("done", 2)
+		assert Select.get_Recipe_by_id(job.recipe_id, me).title == "Pancakes"
+
+	def test_permanent_http_error_fails_at_once(self, extract):
+		me = create_user("ij_me@test.com", "Me", "Secret123")
+		extract.result = http_cache.FetchError(404)
+		job_id = import_jobs.submit(me, "https://example.com/gone")
+		import_jobs.run_pending()
+		assert import_jobs.get(job_id, me)[3:7] == ("failed", 1, None, "Could not fetch the page (HTTP 404).")
+
+	def test_retry_succeeds(self, extract):
+		me = create_user("ij_me@test.com", "Me", "Secret123")
+		outcomes = [TimeoutError("slow"), RECIPE]
+
+		def flaky(url):
+			outcome = outcomes.pop(0)
+			if isinstance(outcome, Exception):
+				raise outcome
+			return outcome
+		extract.result = flaky
+		job_id = import_jobs.submit(me, "https://example.com/pancakes")
+		import_jobs.run_pending()
+		_make_due(job_id)
+		import_jobs.run_pending()
+		job = import_jobs.get(job_id, me)
+		assert (job.status, job.attempts) == ("done", 2)
+		assert len(Select.get_Recipes_by_Persons_id(me)) == 1
+
+	def test_timeout(self, extract, monkeypatch):
+		monkeypatch.setattr(import_jobs, "IMPORT_ATTEMPTS", 1)
+		me = create_user("ij_me@test.com", "Me", "Secret123")
+		release = threading.Event()
+		extract.result = lambda url: release.wait(5) and RECIPE
+		job_id = import_jobs.submit(me, "https://example.com/slow")
+		import_jobs.run_pending(timeout=0.1)
+		release.set()
+		job = import_jobs.get(job_id, me)
+		assert job.status == "failed"
+		assert "did not finish within 0.1 seconds" in job.error
+		assert Select.get_Recipes_by_Persons_id(me) == []
+
+	def test_expired_lease_reclaimed(self, extract, monkeypatch):
+		monkeypatch.setattr(import_jobs, "IMPORT_ATTEMPTS", 2)
+		me = create_user("ij_me@test.com", "Me", "Secret123")
+		job_id = import_jobs.submit(me, "https://example.com/pancakes")
+		with session_scope() as session:
+			crashed = import_jobs.claim(session)  # a worker that never reports back
+		with session_scope() as session:
+			assert import_jobs.claim(session) is None  # leased
+		_make_due(job_id)
+		assert import_jobs.run_pending() == 1
+		assert import_jobs.get(job_id, me)[3:5] == ("done", 2)
+		import_jobs.run(crashed)  # the lost worker finishing late changes nothing
+		assert len(Select.get_Recipes_by_Persons_id(me)) == 1
+		assert import_jobs.get(job_id, me).status == "done"
+
+	def test_late_worker_creates_no_recipe(self, extract):
+		me = create_user("ij_me@test.com", "Me", "Secret123")
+		job_id = import_jobs.submit(me, "https://example.com/pancakes")
+		with session_scope() as session:
+			lost = import_jobs.claim(session)
+		_make_due(job_id)
+		import_jobs.run_pending()
+		assert import_jobs._complete(lost, RECIPE) is None
+		assert [r.id for r in Select.get_Recipes_by_Persons_id(me)] == [import_jobs.get(job_id, me).recipe_id]
+
+	def test_failed_insert_rolled_back_and_retried(self, extract, monkeypatch):
+		from database import pantry_scores
+		me = create_user("ij_me@test.com", "Me", "Secret123")
+		refresh = pantry_scores.refresh_recipe
+		calls = []
+
+		def flaky_refresh(session, recipe_id):
+			calls.append(recipe_id)
+			if len(calls) == 1:
+				raise RuntimeError("disk I/O error")
+			return refresh(session, recipe_id)
+		monkeypatch.setattr(pantry_scores, "refresh_recipe", flaky_refresh)
+		job_id = import_jobs.submit(me, "https://example.com/pancakes")
+		import_jobs.run_pending()
+		assert import_jobs.get(job_id, me)[3:7] == ("queued", 1, None, "disk I/O error")
+		assert Select.get_Recipes_by_Persons_id(me) == []  # the recipe row was rolled back with the job update
+		_make_due(job_id)
+		import_jobs.run_pending()
+		assert import_jobs.get(job_id, me)[3:5] == ("done", 2)
+		assert len(Select.get_Recipes_by_Persons_id(me)) == 1
+
+	def test_expired_lease_after_last_attempt_fails(self, extract, monkeypatch):
+		monkeypatch.setattr(import_jobs, "IMPORT_ATTEMPTS", 1)
+		me = create_user("ij_me@test.com", "Me", "Secret123")
+		job_id = import_jobs.submit(me, "https://example.com/pancakes")
+		with session_scope() as session:
+			import_jobs.claim(session)
+		_make_due(job_id)
+		assert import_jobs.run_pending() == 0
+		assert import_jobs.get(job_id, me)[3:5] == ("failed", 1)
+
+	def test_host_not_due_deferred_without_using_an_attempt(self, extract, monkeypatch):
+		monkeypatch.setattr(http_cache, "host_limiter", http_cache.HostRateLimiter(60))
+		me = create_user("ij_me@test.com", "Me", "Secret123")
+		first, second = (import_jobs.submit(me, f"https://example.com/{n}") for n in range(2))
+		other = import_jobs.submit(me, "https://other.org/1")
+		import_jobs.run_pending()
+		assert [import_jobs.get(j, me)[3:5] for j in (first, second, other)] == [("done", 1), ("queued", 0), ("done", 1)]
+		assert _job(second).run_after > _job(second).created_at
+		assert extract.urls == ["https://example.com/0", "https://other.org/1"]
+
+	def test_batch(self, extract):
+		me = create_user("ij_me@test.com", "Me", "Secret123")
+		batch = import_jobs.submit_batch(me, [("https://example.com/a", None), ("ftp://x", "Not an http(s) URL.")])
+		import_jobs.run_pending()
+		jobs = import_jobs.batch_jobs(batch, me)
+		assert [(j.url, j.status, j.error) for j in jobs] == [
+			("https://example.com/a", "done", None), ("ftp://x", "skipped", "Not an http(s) URL."),
+		]
+		assert _job(jobs[1].id).finished_at is not None
+		assert import_jobs.batch_jobs(batch, create_user("ij_other@test.com", "Other", "Secret123")) == []
+
+	def test_finished_jobs_purged(self, extract, monkeypatch):
+		me = create_user("ij_me@test.com", "Me", "Secret123")
+		old = import_jobs.submit(me, "https://example.com/a")
+		import_jobs.run_pending()
+		monkeypatch.setattr(import_jobs, "IMPORT_JOB_TTL", -1)
+		import_jobs.submit(me, "https://example.com/b")
+		assert import_jobs.get(old, me) is None
+
+	def test_worker_threads(self, extract, monkeypatch):
+		me = create_user("ij_me@test.com", "Me", "Secret123")
+		workers = import_jobs.ImportWorkers()
+		monkeypatch.setattr(import_jobs, "workers", workers)  # submit wakes this pool
+		try:
+			assert workers.start(2) == 2
+			assert workers.start(2) == 2  # already running
+			job_ids = [import_jobs.submit(me, f"https://example.com/{n}") for n in range(4)]
+			deadline = time.monotonic() + 10
+			while time.monotonic() < deadline and any(import_jobs.get(j, me).status != "done" for j in job_ids):
+				time.sleep(0.02)
+			assert [import_jobs.get(j, me).status for j in job_ids] == ["done"] * 4
+		finally:
+			workers.stop(5)
+		assert sorted(extract.urls) == [f"https://example.com/{n}" for n in range(4)]
+
+
+class TestImportRoutes:
+	"""POST /Recipes/Add with a URL, /Recipes/Import/<id> and its /Status."""
+
+	def test_post_returns_job_page_at_once(self, logged_in_client, extract):
+		client, user_id = logged_in_client
+		resp = client.post("/Recipes/Add", data={"source_url": "example.com/pancakes"}, follow_redirects=False)
+		assert resp.status_code == 302
+		job_id = int(resp.headers["Location"].rsplit("/", 1)[1])
+		assert extract.urls == []  # nothing fetched inside the request
+		assert import_jobs.get(job_id, user_id).url == "https://example.com/pancakes"
+		page = client.get(f"/Recipes/Import/{job_id}")
+		assert page.status_code == 200 and b"Importing recipe" in page.data
+		assert client.get(f"/Recipes/Import/{job_id}/Status").get_json()["status"] == "queued"
+
+		import_jobs.run_pending()
+		status = client.get(f"/Recipes/Import/{job_id}/Status").get_json()
+		recipe_id = import_jobs.get(job_id, user_id).recipe_id
+		assert status == {"id": job_id, "status": "done", "attempts": 1, "error": None, "recipe_url": f"/Recipe/{recipe_id}"}
+		resp = client.get(f"/Recipes/Import/{job_id}", follow_redirects=False)
+		assert resp.status_code == 302 and resp.headers["Location"].endswith(f"/Recipe/{recipe_id}")
+
+	def test_post_malformed_url_shows_form_error(self, logged_in_client, extract):
+		client, _ = logged_in_client
+		resp = client.post("/Recipes/Add", data={"source_url": "http://[::1", "category": "Dinners"})
+		assert resp.status_code == 400
+		assert b"Not a valid URL." in resp.data and b"Dinners" in resp.data
+		with session_scope() as session:
+			assert session.query(RecipeImportJobs).count() == 0
+
+	def test_failed_job_links_manual_form(self, logged_in_client, extract):
+		client, user_id = logged_in_client
+		extract.result = None
+		client.post("/Recipes/Add", data={"source_url": "https://example.com/x"})
+		import_jobs.run_pending()
+		with session_scope() as session:
+			job_id = session.query(RecipeImportJobs.id).scalar()
+		page = client.get(f"/Recipes/Import/{job_id}")
+		assert b"Could not extract" in page.data
+		assert b"/Recipes/Add?source_url=https" in page.data
+		form = client.get("/Recipes/Add?source_url=https://example.com/x")
+		assert b'value="https://example.com/x"' in form.data
+
+	def test_other_users_job_404(self, logged_in_client, extract):
+		client, _ = logged_in_client
+		other = create_user("ij_other@test.com", "Other", "Secret123")
+		job_id = import_jobs.submit(other, "https://example.com/pancakes")
+		assert client.get(f"/Recipes/Import/{job_id}").status_code == 404
+		assert client.get(f"/Recipes/Import/{job_id}/Status").status_code == 404
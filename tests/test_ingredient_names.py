@@ -0,0 +1,98 @@
+"""Unit tests for the ingredient name canonicalization shared by pantry items and recipe lines."""
+import pytest
+
+from ingredient_names import SYNONYMS, canonical, singular
+from pantry_matcher import compile_pantry
+
+
+# ————————————————————————————————— singular ————————————————————————————————— #
+
+class TestSingular:
+	"""Word-level singularization rules."""
+
+	@pytest.mark.parametrize("word, expected", [
+		("eggs", "egg"), ("tomatoes", "tomato"), ("berries", "berry"), ("peaches", "peach"),
+		("radishes", "radish"), ("leaves", "leaf"), ("olives", "olive"), ("cookies", "cookie"),
+		("glasses", "glass"), ("cheeses", "cheese"), ("baker's", "baker"), ("lbs", "lb"),
+	])
+	def test_plurals(self, word, expected):
+		assert singular(word) == expected
+
+	@pytest.mark.parametrize("word", ["hummus", "molasses", "couscous", "asparagus", "swiss", "gas", "egg"])
+	def test_unchanged(self, word):
+		assert singular(word) == word
+
+
+# ————————————————————————————————— canonical ————————————————————————————————— #
+
+class TestCanonical:
+	"""canonical() strips amounts, singularizes and applies synonyms."""
+
+	@pytest.mark.parametrize("text, expected", [
+		("Eggs", "egg"),
+		("3 Large Eggs, beaten", "egg beaten"),
+		("2 cups all-purpose flour", "all-purpose flour"),
+		("1 1/2 cups sugar", "sugar"),
+		("½ cup butter", "butter"),
+		("400g chickpeas", "chickpea"),
+		("1 (15 oz) can garbanzo beans", "chickpea"),
+		("2 to 3 medium potatoes", "potato"),
+		("a pinch of salt", "salt"),
+		("2 cloves garlic, minced", "garlic minced"),
+		("Scallions", "green onion"),
+		("1 cup confectioners' sugar", "powdered sugar"),
+	])
+	def test_examples(self, text, expected):
+		assert canonical(text) == expected
+
+	def test_amount_only_keeps_last_word(self):
+		"""A line that is all amount keeps its last word rather than becoming empty."""
+		assert canonical("2 cups") == "cup"
+		assert canonical("Cloves") == "clove"
+
+	def test_units_only_stripped_after_a_quantity(self):
+		assert canonical("can of tomatoes") == "can of tomato"
+
+	@pytest.mark.parametrize("text, expected", [
+		("large eggs", "egg"),
+		("1 large egg", "egg"),
+		("Extra large eggs", "egg"),
+		("2 tbsp extra virgin olive oil", "extra virgin olive oil"),
+	])
+	def test_size_words_stripped_with_or_without_a_quantity(self, text, expected):
+		assert canonical(text) == expected
+
+	@pytest.mark.parametrize("text", ["half and half", "five spice powder", "quarter pounder", "1 cup half and half"])
+	def test_number_words_kept_in_names(self, text):
+		"""A number word is an amount only before a unit or "of"."""
+		assert canonical(text) == text.removeprefix("1 cup ")
+
+	@pytest.mark.parametrize("text, expected", [
+		("half cup sugar", "sugar"),
+		("half a cup of milk", "milk"),
+		("two cups of flour", "flour"),
+		("a dozen eggs", "egg"),
+		("1 and 1/2 cups flour", "flour"),
+	])
+	def test_number_words_as_amounts(self, text, expected):
+		assert canonical(text) == expected
+
+	def test_half_and_half_not_matched_by_half(self):
+		pantry = compile_pantry([canonical("Half and half")])
+		assert pantry.count(canonical("2 avocados, cut in half")) == 0
+		assert pantry.count(canonical("1 cup half and half")) == 1
+
+	def test_no_words(self):
+		assert canonical("") == canonical(None) == canonical("!!!") == ""
+
+	@pytest.mark.parametrize("text", [
+		"3 Large Eggs, beaten", "2 cups", "1 cup 7 up", "half and half", "extra large eggs", "Lenses", "Brussels sprouts", "1 lbs ground beef",
+		*SYNONYMS, *SYNONYMS.values(),
+	])
+	def test_idempotent(self, text):
+		key = canonical(text)
+		assert canonical(key) == key
+
+	def test_synonym_values_are_canonical(self):
+		for phrase, replacement in SYNONYMS.items():
+			assert canonical(phrase) == canonical(replacement), phrase
@@ -9,6 +9,7 @@ from database import (
 	create_list_ingredient,
 	get_or_create_list,
 	get_or_create_ingredient,
+	add_ingredients_to_list,
 	update_list_ingredient,
 	soft_delete_list_ingredient,
 	update_list,
@@ -124,6 +125,44 @@ class TestAddListItem:
 		assert list_ing.quantity == 5
 
 
+class TestAddIngredientsToList:
+	"""add_ingredients_to_list: one transaction for a batch of list items."""
+
+	def _names(self, list_id, user_id):
+		return [ing.name for _, ing in Select.get_ListIngredients_by_Lists_id(list_id, user_id)]
+
+	def test_creates_list_ingredients_and_items_in_order(self, test_user_id):
+		ids = add_ingredients_to_list(["Eggs", "Milk", "", "Eggs"], "Party", test_user_id, quantity=2)
+		assert len(ids) == 3
+		lists = [l for l in Select.get_Lists_by_Persons_id(test_user_id) if l.name == "Party"]
+		assert len(lists) == 1
+		rows = Select.get_ListIngredients_by_Lists_id(lists[0].id, test_user_id)
+		assert sorted(li.id for li, _ in rows) == ids
+		assert sorted(ing.name for _, ing in rows) == ["Eggs", "Eggs", "Milk"]
+		assert {li.quantity for li, _ in rows} == {2}
+		assert len({ing.id for _, ing in rows}) == 2  # the repeated name shares one ingredient
+
+	def test_reuses_existing_list_and_ingredients(self, test_user_id, test_list):
+		list_id, list_name = test_list
+		egg_id = get_or_create_ingredient("egg", test_user_id)
+		add_ingredients_to_list(["2 Eggs", "Flour"], list_name, test_user_id)
+		rows = Select.get_ListIngredients_by_Lists_id(list_id, test_user_id)
+		assert {ing.name for _, ing in rows} == {"egg", "Flour"}
+		assert egg_id in {ing.id for _, ing in rows}
+		assert get_or_create_ingredient("flour", test_user_id) in {ing.id for _, ing in rows}
+
+	def test_exact_names(self, test_user_id, test_list):
+		list_id, list_name = test_list
+		get_or_create_ingredient("egg", test_user_id)
+		add_ingredients_to_list(["2 Eggs", "2 Eggs"], list_name, test_user_id, canonical=False)
+		assert self._names(list_id, test_user_id) == ["2 Eggs", "2 Eggs"]
+		assert get_or_create_ingredient("2 Eggs", test_user_id, canonical=False) == get_or_create_ingredient("2 Eggs", test_user_id, canonical=False)
+
+	def test_nothing_to_add(self, test_user_id):
+		assert add_ingredients_to_list(["", ""], "Empty", test_user_id) == []
+		assert not [l for l in Select.get_Lists_by_Persons_id(test_user_id) if l.name == "Empty"]
+
+
 # ————————————————————————————————— Edit list item —————————————————————————— #
 
 class TestEditListItem:
@@ -0,0 +1,271 @@
+"""Unit tests for the versioned migration runner (database.migrations)."""
+import shutil
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from database import migrations
+
+
+_SCHEMA_PATH = Path(__file__).resolve().parent.parent / "Database" / "schema.sql"
+
+
+# ————————————————————————————————— Fixtures ————————————————————————————————— #
+
+@pytest.fixture
+def db_path(tmp_path):
+	"""Path to a not-yet-created database with schema.sql next to it."""
+	shutil.copy(_SCHEMA_PATH, tmp_path / "schema.sql")
+	return str(tmp_path / "migrate.db")
+
+
+def _tables(db_path):
+	with sqlite3.connect(db_path) as conn:
+		return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+
+
+def _columns(db_path, table):
+	with sqlite3.connect(db_path) as conn:
+		return {row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')}
+
+
+# ————————————————————————————————— Tests ————————————————————————————————— #
+
+class TestMigrate:
+	"""Tests for migrations.migrate and current_version."""
+
+	def test_current_version_of_missing_file_is_zero(self, db_path):
+		"""current_version does not create the database file."""
+		assert migrations.current_version(db_path) == 0
+		assert not Path(db_path).exists()
+
+	def test_new_database_gets_every_migration(self, db_path):
+		"""A new file is created, fully migrated and stamped with the latest version."""
+		applied = migrations.migrate(db_path)
+		assert applied == [v for v, _ in migrations.MIGRATIONS]
+		assert migrations.current_version(db_path) == migrations.LATEST_VERSION
+		assert {"Persons", "Recipes", "FriendRequests", "DismissedNotifications", "schema_version"} <= _tables(db_path)
+
+	def test_second_run_is_a_no_op(self, db_path):
+		"""Running migrate on a current database applies nothing."""
+		migrations.migrate(db_path)
+		assert migrations.migrate(db_path) == []
+
+	def test_pre_versioning_database_is_upgraded_in_place(self, db_path):
+		"""A database created before versioning keeps its data and gains the missing columns/tables."""
+		with sqlite3.connect(db_path) as conn:
+			conn.executescript(_SCHEMA_PATH.read_text())
+			conn.execute('ALTER TABLE "InventoryIngredients" DROP COLUMN "notes"')
+			conn.execute('INSERT INTO "Persons" ("email", "name") VALUES (?, ?)', ("old@test.com", "Old"))
+		migrations.migrate(db_path)
+		assert "notes" in _columns(db_path, "InventoryIngredients")
+		assert "RecipeShares" in _tables(db_path)
+		with sqlite3.connect(db_path) as conn:
+			assert conn.execute('SELECT "email" FROM "Persons"').fetchall() == [("old@test.com",)]
+
+	def test_notification_counters_backfilled(self, db_path, monkeypatch):
+		"""Migration 13 fills NotificationCounters from the pending requests and live shares."""
+		monkeypatch.setattr(migrations, "MIGRATIONS", [m for m in migrations.MIGRATIONS if m[0] < 13])
+		monkeypatch.setattr(migrations, "LATEST_VERSION", 12)
+		migrations.migrate(db_path)
+		with sqlite3.connect(db_path) as conn:
+			conn.executemany('INSERT INTO "Persons" ("id", "email") VALUES (?, ?)', [(n, f"u{n}@test.com") for n in (1, 2, 3)])
+			conn.executemany(
+				'INSERT INTO "FriendRequests" ("id", "requester_id", "addressee_id", "status") VALUES (?, ?, ?, ?)',
+				[(1, 2, 1, "pending"), (2, 3, 1, "pending"), (3, 3, 2, "accepted")],
+			)
+			conn.executemany(
+				'INSERT INTO "Recipes" ("id", "title", "Persons.id", "is_deleted") VALUES (?, ?, 2, ?)',
+				[(1, "Live", 0), (2, "Deleted", 1)],
+			)
+			conn.executemany(
+				'INSERT INTO "RecipeShares" ("id", "Recipes.id", "sharer_id", "recipient_id") VALUES (?, ?, 2, ?)',
+				[(1, 1, 1), (2, 2, 1), (3, 1, 3)],
+			)
+			conn.execute(
+				'INSERT INTO "DismissedNotifications" ("user_id", "notification_type", "notification_id") VALUES (1, ?, 2)',
+				("friend_request",),
+			)
+		monkeypatch.undo()
+		assert 13 in migrations.migrate(db_path)
+		with sqlite3.connect(db_path) as conn:
+			rows = conn.execute('SELECT * FROM "NotificationCounters" ORDER BY "user_id"').fetchall()
+		assert rows == [(1, 1, 1), (3, 0, 1)]
+
+	def test_recipe_ingredients_backfilled(self, db_path, monkeypatch):
+		"""Migration 15 splits existing Recipes.ingredients into RecipeIngredients rows."""
+		monkeypatch.setattr(migrations, "MIGRATIONS", [m for m in migrations.MIGRATIONS if m[0] < 15])
+		monkeypatch.setattr(migrations, "LATEST_VERSION", 14)
+		migrations.migrate(db_path)
+		with sqlite3.connect(db_path) as conn:
+			conn.execute('INSERT INTO "Persons" ("id", "email") VALUES (1, ?)', ("u1@test.com",))
+			conn.executemany(
+				'INSERT INTO "Recipes" ("id", "title", "ingredients", "Persons.id") VALUES (?, ?, ?, 1)',
+				[(1, "Soup", "  2 Cups  Broth \n\n1 onion\n"), (2, "Empty", "")],
+			)
+		monkeypatch.undo()
+		monkeypatch.setattr(migrations, "MIGRATIONS", [m for m in migrations.MIGRATIONS if m[0] <= 15])
+		monkeypatch.setattr(migrations, "LATEST_VERSION", 15)
+		assert migrations.migrate(db_path) == [15]
+		with sqlite3.connect(db_path) as conn:
+			rows = conn.execute(
+				'SELECT "Recipes.id", "position", "raw_text", "name" FROM "RecipeIngredients" ORDER BY "id"'
+			).fetchall()
+		assert rows == [(1, 0, "2 Cups  Broth", "2 cups broth"), (1, 1, "1 onion", "1 onion")]
+
+	def test_recipe_pantry_score_backfilled(self, db_path, monkeypatch):
+		"""Migration 16 scores every live recipe against its owner's pantry."""
+		monkeypatch.setattr(migrations, "MIGRATIONS", [m for m in migrations.MIGRATIONS if m[0] < 16])
+		monkeypatch.setattr(migrations, "LATEST_VERSION", 15)
+		migrations.migrate(db_path)
+		with sqlite3.connect(db_path) as conn:
+			conn.executemany('INSERT INTO "Persons" ("id", "email") VALUES (?, ?)', [(1, "u1@test.com"), (2, "u2@test.com")])
+			conn.executemany(
+				'INSERT INTO "Ingredients" ("id", "name", "Persons.id") VALUES (?, ?, ?)',
+				[(1, " Flour", 1), (2, "sugar", 1), (3, "salt", 2)],
+			)
+			conn.executemany(
+				'INSERT INTO "InventoryIngredients" ("count", "Ingredients.id", "is_deleted") VALUES (1, ?, ?)',
+				[(1, 0), (2, 1), (3, 0)],
+			)
+			conn.executemany(
+				'INSERT INTO "Recipes" ("id", "title", "Persons.id", "is_deleted") VALUES (?, ?, 1, ?)',
+				[(1, "Cake", 0), (2, "Deleted", 1)],
+			)
+			conn.executemany(
+				'INSERT INTO "RecipeIngredients" ("Recipes.id", "position", "raw_text", "name") VALUES (?, ?, ?, ?)',
+				[(1, 0, "Flour", "flour"), (1, 1, "Sugar", "sugar"), (1, 2, "Salt", "salt"), (2, 0, "Flour", "flour")],
+			)
+		monkeypatch.undo()
+		assert 16 in migrations.migrate(db_path)
+		with sqlite3.connect(db_path) as conn:
+			rows = conn.execute('SELECT * FROM "RecipePantryScore"').fetchall()
+		assert rows == [(1, 1, 1, 3)]
+
+	def test_ingredient_names_canonicalized(self, db_path, monkeypatch):
+		"""Migration 18 fills Ingredients.canonical_name, re-keys RecipeIngredients.name and rescores."""
+		monkeypatch.setattr(migrations, "MIGRATIONS", [m for m in migrations.MIGRATIONS if m[0] < 18])
+		monkeypatch.setattr(migrations, "LATEST_VERSION", 17)
+		migrations.migrate(db_path)
+		with sqlite3.connect(db_path) as conn:
+			conn.execute('INSERT INTO "Persons" ("id", "email") VALUES (1, ?)', ("u1@test.com",))
+			conn.executemany(
+				'INSERT INTO "Ingredients" ("id", "name", "Persons.id") VALUES (?, ?, 1)',
+				[(1, "Eggs"), (2, "Tomatoes")],
+			)
+			conn.executemany('INSERT INTO "InventoryIngredients" ("count", "Ingredients.id") VALUES (1, ?)', [(1,), (2,)])
+			conn.execute('INSERT INTO "Recipes" ("id", "title", "Persons.id") VALUES (1, "Omelette", 1)')
+			conn.executemany(
+				'INSERT INTO "RecipeIngredients" ("Recipes.id", "position", "raw_text", "name") VALUES (1, ?, ?, ?)',
+				[(0, "3 large eggs", "3 large eggs"), (1, "1 Tomato", "1 tomato")],
+			)
+			conn.execute('INSERT INTO "RecipePantryScore" VALUES (1, 1, 1, 2)')
+		monkeypatch.undo()
+		assert 18 in migrations.migrate(db_path)
+		with sqlite3.connect(db_path) as conn:
+			assert conn.execute('SELECT "canonical_name" FROM "Ingredients" ORDER BY "id"').fetchall() == [("egg",), ("tomato",)]
+			assert conn.execute('SELECT "name" FROM "RecipeIngredients" ORDER BY "position"').fetchall() == [("egg",), ("tomato",)]
+			assert conn.execute('SELECT * FROM "RecipePantryScore"').fetchall() == [(1, 1, 2, 2)]
+
+	def test_word_amounts_rekeyed(self, db_path, monkeypatch):
+		"""Migration 24 re-keys names stored before number words were kept ("half and half") and
+		size words dropped without a quantity, and rescores."""
+		monkeypatch.setattr(migrations, "MIGRATIONS", [m for m in migrations.MIGRATIONS if m[0] < 24])
+		monkeypatch.setattr(migrations, "LATEST_VERSION", 23)
+		migrations.migrate(db_path)
+		with sqlite3.connect(db_path) as conn:
+			conn.execute('INSERT INTO "Persons" ("id", "email") VALUES (1, ?)', ("u1@test.com",))
+			conn.execute('INSERT INTO "Ingredients" ("id", "name", "canonical_name", "Persons.id") VALUES (1, "Half and half", "half", 1)')
+			conn.execute('INSERT INTO "InventoryIngredients" ("count", "Ingredients.id") VALUES (1, 1)')
+			conn.execute('INSERT INTO "Recipes" ("id", "title", "Persons.id") VALUES (1, "Guacamole", 1)')
+			conn.executemany(
+				'INSERT INTO "RecipeIngredients" ("Recipes.id", "position", "raw_text", "name") VALUES (1, ?, ?, ?)',
+				[(0, "2 avocados, cut in half", "avocado cut in half"), (1, "large onions", "large onion")],
+			)
+			conn.execute('INSERT INTO "RecipePantryScore" VALUES (1, 1, 1, 2)')
+		monkeypatch.undo()
+		assert 24 in migrations.migrate(db_path)
+		with sqlite3.connect(db_path) as conn:
+			assert conn.execute('SELECT "canonical_name" FROM "Ingredients"').fetchall() == [("half and half",)]
+			assert conn.execute('SELECT "name" FROM "RecipeIngredients" ORDER BY "position"').fetchall() == [("avocado cut in half",), ("onion",)]
+			assert conn.execute('SELECT * FROM "RecipePantryScore"').fetchall() == [(1, 1, 0, 2)]
+
+	def test_result_item_duplicates_dropped(self, db_path, monkeypatch):
+		"""Migration 25 keeps the first rank of a recipe stored twice in a result set and makes it unique."""
+		monkeypatch.setattr(migrations, "MIGRATIONS", [m for m in migrations.MIGRATIONS if m[0] < 25])
+		monkeypatch.setattr(migrations, "LATEST_VERSION", 24)
+		migrations.migrate(db_path)
+		with sqlite3.connect(db_path) as conn:
+			conn.execute('INSERT INTO "Persons" ("id", "email") VALUES (1, ?)', ("u1@test.com",))
+			conn.execute('INSERT INTO "FindRecipeResultSets" ("token", "Persons.id", "total", "expires_at") VALUES ("t", 1, 3, "9999")')
+			conn.executemany(
+				'INSERT INTO "FindRecipeResultItems" ("token", "rank", "Recipes.id", "matched") VALUES ("t", ?, ?, 0)',
+				[(0, 10), (1, 11), (2, 10)],
+			)
+		monkeypatch.undo()
+		assert 25 in migrations.migrate(db_path)
+		with sqlite3.connect(db_path) as conn:
+			assert conn.execute('SELECT "rank", "Recipes.id" FROM "FindRecipeResultItems" ORDER BY "rank"').fetchall() == [(0, 10), (1, 11)]
+			with pytest.raises(sqlite3.IntegrityError):
+				conn.execute('INSERT INTO "FindRecipeResultItems" ("token", "rank", "Recipes.id", "matched") VALUES ("t", 2, 11, 0)')
+
+	def test_duplicate_ingredients_collapsed(self, db_path, monkeypatch):
+		"""Migration 19 merges live case-variant duplicates into the oldest row and repoints references."""
+		monkeypatch.setattr(migrations, "MIGRATIONS", [m for m in migrations.MIGRATIONS if m[0] < 19])
+		monkeypatch.setattr(migrations, "LATEST_VERSION", 18)
+		migrations.migrate(db_path)
+		with sqlite3.connect(db_path) as conn:
+			conn.executemany('INSERT INTO "Persons" ("id", "email") VALUES (?, ?)', [(1, "u1@test.com"), (2, "u2@test.com")])
+			conn.executemany(
+				'INSERT INTO "Ingredients" ("id", "name", "Persons.id", "is_deleted") VALUES (?, ?, ?, ?)',
+				[(1, "Flour", 1, 0), (2, "flour", 1, 0), (3, "FLOUR", 1, 0), (4, "flour", 1, 1), (5, "flour", 2, 0), (6, "Sugar", 1, 0)],
+			)
+			conn.execute('INSERT INTO "Lists" ("id", "name", "Persons.id") VALUES (1, "Grocery list", 1)')
+			conn.executemany('INSERT INTO "ListIngredients" ("quantity", "Ingredients.id", "Lists.id") VALUES (1, ?, 1)', [(2,), (6,)])
+			conn.executemany('INSERT INTO "InventoryIngredients" ("count", "Ingredients.id") VALUES (1, ?)', [(3,), (4,)])
+		monkeypatch.undo()
+		assert 19 in migrations.migrate(db_path)
+		with sqlite3.connect(db_path) as conn:
+			assert [row[0] for row in conn.execute('SELECT "id" FROM "Ingredients" ORDER BY "id"')] == [1, 4, 5, 6]
+			assert conn.execute('SELECT "Ingredients.id" FROM "ListIngredients" ORDER BY "id"').fetchall() == [(1,), (6,)]
+			assert conn.execute('SELECT "Ingredients.id" FROM "InventoryIngredients" ORDER BY "id"').fetchall() == [(1,), (4,)]
+			with pytest.raises(sqlite3.IntegrityError):
+				conn.execute('INSERT INTO "Ingredients" ("name", "Persons.id") VALUES ("fLoUr", 1)')
+			conn.execute('INSERT INTO "Ingredients" ("name", "Persons.id", "is_deleted") VALUES ("fLoUr", 1, 1)')
+
+	def test_only_pending_migrations_run(self, db_path, monkeypatch):
+		"""Migrations at or below the stored version are skipped."""
+		migrations.migrate(db_path)
+		calls = []
+		extra = lambda conn, path: calls.append(path)
+		monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS + [(999, extra)])
+		monkeypatch.setattr(migrations, "LATEST_VERSION", 999)
+		assert migrations.migrate(db_path) == [999]
+		assert calls == [db_path]
+		assert migrations.current_version(db_path) == 999
+
+	def test_failure_rolls_back_the_whole_batch(self, db_path, monkeypatch):
+		"""If one migration fails, none of the pending ones are applied."""
+		def _broken(conn, path):
+			raise sqlite3.OperationalError("broken migration")
+
+		monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS + [(999, _broken)])
+		monkeypatch.setattr(migrations, "LATEST_VERSION", 999)
+		with pytest.raises(sqlite3.OperationalError):
+			migrations.migrate(db_path)
+		assert migrations.current_version(db_path) == 0
+		assert "Persons" not in _tables(db_path)
+
+
+class TestMigrationsCli:
+	"""Tests for the command-line entry point."""
+
+	def test_cli_migrates_given_db(self, db_path, capsys):
+		assert migrations.main(["--db", db_path]) == 0
+		assert f"now at version {migrations.LATEST_VERSION}" in capsys.readouterr().out
+		assert migrations.current_version(db_path) == migrations.LATEST_VERSION
+
+	def test_cli_status_reports_versions(self, db_path, capsys):
+		migrations.main(["--db", db_path, "--status"])
+		assert f"version 0 (latest {migrations.LATEST_VERSION})" in capsys.readouterr().out
@@ -0,0 +1,107 @@
+"""Tests that the declarative models in database.models match the schema built by schema.sql + migrations."""
+import shutil
+import sqlite3
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import sqlite
+
+from database import migrations
+from database.models import Base
+
+
+_SCHEMA_PATH = Path(__file__).resolve().parent.parent / "Database" / "schema.sql"
+_BOOKKEEPING_TABLES = {"schema_version", "sqlite_sequence", "sqlite_stat1"}
+
+
+# ————————————————————————————————— Fixtures ————————————————————————————————— #
+
+@pytest.fixture(scope="module")
+def migrated_db(tmp_path_factory):
+	"""A new database built the way production builds it: schema.sql plus every migration."""
+	tmp = tmp_path_factory.mktemp("models")
+	shutil.copy(_SCHEMA_PATH, tmp / "schema.sql")
+	db_path = str(tmp / "models.db")
+	migrations.migrate(db_path)
+	conn = sqlite3.connect(db_path)
+	yield conn
+	conn.close()
+
+
+def _db_columns(conn, table):
+	"""{name: (declared type, notnull, pk)} from PRAGMA table_info."""
+	return {
+		row[1]: (row[2].upper(), bool(row[3]), bool(row[5]))
+		for row in conn.execute(f'PRAGMA table_info("{table}")')
+	}
+
+
+def _model_columns(table):
+	return {
+		col.name: (col.type.compile(dialect=sqlite.dialect()).upper(), not col.nullable, col.primary_key)
+		for col in table.columns
+	}
+
+
+# ————————————————————————————————— Tests ————————————————————————————————— #
+
+class TestModelsMatchSchema:
+	"""Every table and column in the migrated schema has a matching model attribute."""
+
+	def test_every_table_has_a_model(self, migrated_db):
+		tables = {
+			row[0] for row in migrated_db.execute("SELECT name FROM sqlite_master WHERE type='table'")
+		} - _BOOKKEEPING_TABLES
+		assert tables == set(Base.metadata.tables)
+
+	@pytest.mark.parametrize("table_name", sorted(Base.metadata.tables))
+	def test_columns_match(self, migrated_db, table_name):
+		"""Column names, declared types, NOT NULL and primary keys agree."""
+		table = Base.metadata.tables[table_name]
+		assert _model_columns(table) == _db_columns(migrated_db, table_name)
+
+	@pytest.mark.parametrize("table_name", sorted(Base.metadata.tables))
+	def test_indexes_match(self, migrated_db, table_name):
+		"""Named secondary indexes declared on the model exist with the same columns."""
+		table = Base.metadata.tables[table_name]
+		# expression indexes (e.g. lower(email)) have no column name; compare them as "<expr>"
+		model_indexes = {
+			idx.name: [getattr(expr, "name", None) if hasattr(expr, "table") else "<expr>" for expr in idx.expressions]
+			for idx in table.indexes
+		}
+		db_indexes = {
+			row[1]: [info[2] or "<expr>" for info in migrated_db.execute(f'PRAGMA index_info("{row[1]}")')]
+			for row in migrated_db.execute(f'PRAGMA index_list("{table_name}")')
+			if row[3] == "c"  # created by CREATE INDEX (not UNIQUE/PK autoindexes)
+		}
+		assert model_indexes == db_indexes
+
+	def test_create_all_reproduces_schema(self, migrated_db):
+		"""Base.metadata.create_all builds the same columns as schema.sql + migrations."""
+		engine = create_engine("sqlite://")
+		Base.metadata.create_all(engine)
+		with engine.connect() as conn:
+			raw = conn.connection.dbapi_connection
+			for table_name in Base.metadata.tables:
+				assert _db_columns(raw, table_name) == _db_columns(migrated_db, table_name), table_name
+
+
+class TestModelAttributes:
+	"""Dotted column names are exposed as plain Python attributes."""
+
+	def test_foreign_keys_have_plain_attribute_names(self):
+		from database import Recipes, ListIngredients, InventoryIngredients
+		assert Recipes.person_id.property.columns[0].name == "Persons.id"
+		assert ListIngredients.list_id.property.columns[0].name == "Lists.id"
+		assert InventoryIngredients.list_ingredient_id.property.columns[0].name == "ListIngredients.id"
+
+	def test_relationships_support_eager_loading(self):
+		"""Recipes -> ratings/comments/images can be eager loaded in one query."""
+		from sqlalchemy import select
+		from sqlalchemy.orm import selectinload
+		from database import Recipes
+		stmt = select(Recipes).options(
+			selectinload(Recipes.ratings), selectinload(Recipes.comments), selectinload(Recipes.images),
+		)
+		assert "Recipes" in str(stmt)
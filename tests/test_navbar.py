@@ -0,0 +1,106 @@
+"""Unit tests for the navbar summary query (bell count and lists dropdown)."""
+import pytest
+from sqlalchemy import event
+
+import database
+from database import (
+	create_user,
+	create_list,
+	create_recipe,
+	soft_delete_recipe,
+	create_friend_request,
+	accept_friend_request,
+	create_recipe_share,
+	dismiss_notification,
+)
+from database import Select
+
+
+# ————————————————————————————————— Fixtures ————————————————————————————————— #
+
+@pytest.fixture
+def statements():
+	"""Record every SQL statement sent through the shared engine while the test runs."""
+	captured = []
+
+	def _capture(conn, cursor, statement, *_args):
+		captured.append(statement)
+
+	event.listen(database.engine, "before_cursor_execute", _capture)
+	yield captured
+	event.remove(database.engine, "before_cursor_execute", _capture)
+
+
+def _make_friends(a, b):
+	request_id = create_friend_request(a, b)
+	accept_friend_request(request_id, b)
+
+
+# ————————————————————————————————— get_navbar_summary ————————————————————————————————— #
+
+class TestNavbarSummary:
+	"""Tests for Select.get_navbar_summary."""
+
+	def test_new_user(self):
+		user_id = create_user("nav_new@test.com", "New", "Secret123")
+		assert Select.get_navbar_summary(user_id) == (0, [])
+
+	def test_lists_grocery_first_then_by_name(self):
+		user_id = create_user("nav_lists@test.com", "Lists", "Secret123")
+		for name in ["Party", "Grocery list", "BBQ", "Camping"]:
+			create_list(name, user_id)
+		count, lists = Select.get_navbar_summary(user_id)
+		assert count == 0
+		assert [l.name for l in lists] == ["Grocery list", "BBQ", "Camping", "Party"]
+		assert all(l.id for l in lists)
+
+	def test_counts_pending_requests_and_shares(self):
+		me = create_user("nav_me@test.com", "Me", "Secret123")
+		friend = create_user("nav_friend@test.com", "Friend", "Secret123")
+		stranger = create_user("nav_stranger@test.com", "Stranger", "Secret123")
+		create_list("Grocery list", me)
+		create_friend_request(stranger, me)
+		_make_friends(friend, me)
+		create_recipe_share(create_recipe("Soup", friend), friend, me)
+		count, lists = Select.get_navbar_summary(me)
+		assert count == 2
+		assert [l.name for l in lists] == ["Grocery list"]
+
+	def test_matches_notification_rows(self):
+		"""The count equals what the notifications page lists, minus dismissed and deleted."""
+		me = create_user("nav_match@test.com", "Me", "Secret123")
+		friend = create_user("nav_match_friend@test.com", "Friend", "Secret123")
+		others = [create_user(f"nav_other{n}@test.com", f"O{n}", "Secret123") for n in range(3)]
+		request_ids = [create_friend_request(o, me) for o in others]
+		_make_friends(friend, me)
+		share_ids = [create_recipe_share(create_recipe(f"R{n}", friend), friend, me) for n in range(3)]
+		dismiss_notification(me, "friend_request", request_ids[0])
+		dismiss_notification(me, "recipe_share", share_ids[0])
+		soft_delete_recipe(Select.get_recipe_share_by_id(share_ids[1], me)[1].id)
+		expected = len(Select.get_pending_friend_requests_for_user(me)) + len(Select.get_recipe_shares_for_recipient(me))
+		assert expected == 3
+		assert Select.get_navbar_summary(me)[0] == expected
+
+
+# ————————————————————————————————— Routes ————————————————————————————————— #
+
+class TestNavbarRender:
+	"""Page renders run one navbar statement and never load notification rows."""
+
+	def test_page_issues_single_navbar_query(self, logged_in_client, statements):
+		client, user_id = logged_in_client
+		create_list("Grocery list", user_id)
+		client.get("/Lists")
+		statements.clear()
+		resp = client.get("/Recipes")
+		assert resp.status_code == 200
+		assert sum('"Lists"' in sql for sql in statements) == 1
+		# the notification row queries select these columns; the navbar count does not
+		assert not any('"FriendRequests".message' in sql or '"RecipeShares".created_at' in sql for sql in statements)
+
+	def test_bell_count_rendered(self, logged_in_client):
+		client, user_id = logged_in_client
+		other = create_user("nav_bell@test.com", "Bell", "Secret123")
+		create_friend_request(other, user_id)
+		resp = client.get("/Recipes")
+		assert b'<span class="notification-badge">1</span>' in resp.data
@@ -0,0 +1,173 @@
+"""Unit tests for the denormalized NotificationCounters and their reconciliation."""
+import sqlite3
+
+import pytest
+
+import database
+from database import (
+	create_user,
+	create_recipe,
+	soft_delete_recipe,
+	create_friend_request,
+	accept_friend_request,
+	decline_friend_request,
+	create_recipe_share,
+	dismiss_notification,
+	notification_counters,
+	session_scope,
+)
+from database import Select
+
+
+# ————————————————————————————————— Fixtures ————————————————————————————————— #
+
+@pytest.fixture
+def users():
+	"""(me, friend, stranger) user ids; friend and me are already friends."""
+	me = create_user("nc_me@test.com", "Me", "Secret123")
+	friend = create_user("nc_friend@test.com", "Friend", "Secret123")
+	stranger = create_user("nc_stranger@test.com", "Stranger", "Secret123")
+	accept_friend_request(create_friend_request(friend, me), me)
+	return me, friend, stranger
+
+
+def _counters(user_id):
+	"""(friend_requests, recipe_shares) as stored."""
+	with session_scope() as session:
+		row = session.get(database.NotificationCounters, user_id)
+		return (row.friend_requests, row.recipe_shares) if row else (0, 0)
+
+
+def _assert_consistent():
+	"""Stored counters match a from-scratch recount."""
+	assert notification_counters.reconcile(fix=False) == []
+
+
+# ————————————————————————————————— Incremental maintenance ————————————————————————————————— #
+
+class TestCounterMaintenance:
+	"""Each write helper keeps the counters equal to a recount."""
+
+	def test_accepted_request_leaves_no_unread(self, users):
+		me, _, _ = users
+		assert _counters(me) == (0, 0)
+		_assert_consistent()
+
+	def test_create_friend_request(self, users):
+		me, _, stranger = users
+		create_friend_request(stranger, me)
+		assert _counters(me) == (1, 0)
+		_assert_consistent()
+
+	def test_decline_friend_request(self, users):
+		me, _, stranger = users
+		request_id = create_friend_request(stranger, me)
+		assert decline_friend_request(request_id, me)
+		assert _counters(me) == (0, 0)
+		_assert_consistent()
+
+	def test_re_request_after_decline(self, users):
+		me, _, stranger = users
+		decline_friend_request(create_friend_request(stranger, me), me)
+		create_friend_request(stranger, me)
+		assert _counters(me) == (1, 0)
+		_assert_consistent()
+
+	def test_reverse_request_accepts_pending(self, users):
+		"""Sending a request to someone who already asked you accepts theirs."""
+		me, _, stranger = users
+		create_friend_request(stranger, me)
+		create_friend_request(me, stranger)
+		assert _counters(me) == (0, 0)
+		assert _counters(stranger) == (0, 0)
+		_assert_consistent()
+
+	def test_dismissed_request_then_accepted(self, users):
+		"""Accepting a dismissed request does not decrement twice."""
+		me, _, stranger = users
+		request_id = create_friend_request(stranger, me)
+		dismiss_notification(me, "friend_request", request_id)
+		assert _counters(me) == (0, 0)
+		accept_friend_request(request_id, me)
+		assert _counters(me) == (0, 0)
+		_assert_consistent()
+
+	def test_recipe_share_and_dismiss(self, users):
+		me, friend, _ = users
+		share_id = create_recipe_share(create_recipe("Soup", friend), friend, me)
+		assert _counters(me) == (0, 1)
+		dismiss_notification(me, "recipe_share", share_id)
+		dismiss_notification(me, "recipe_share", share_id)  # already dismissed: no change
+		assert _counters(me) == (0, 0)
+		_assert_consistent()
+
+	def test_dismiss_someone_elses_notification_is_ignored(self, users):
+		me, friend, stranger = users
+		share_id = create_recipe_share(create_recipe("Soup", friend), friend, me)
+		dismiss_notification(stranger, "recipe_share", share_id)
+		assert _counters(me) == (0, 1)
+		assert _counters(stranger) == (0, 0)
+		_assert_consistent()
+
+	def test_soft_delete_recipe(self, users):
+		me, friend, stranger = users
+		accept_friend_request(create_friend_request(friend, stranger), stranger)
+		recipe_id = create_recipe("Stew", friend)
+		create_recipe_share(recipe_id, friend, me)
+		dismissed = create_recipe_share(recipe_id, friend, stranger)
+		dismiss_notification(stranger, "recipe_share", dismissed)
+		soft_delete_recipe(recipe_id)
+		soft_delete_recipe(recipe_id)  # already deleted: no change
+		assert _counters(me) == (0, 0)
+		assert _counters(stranger) == (0, 0)
+		_assert_consistent()
+
+	def test_navbar_reads_counters(self, users):
+		me, friend, stranger = users
+		create_friend_request(stranger, me)
+		create_recipe_share(create_recipe("Soup", friend), friend, me)
+		assert Select.get_navbar_summary(me)[0] == 2
+
+
+# ————————————————————————————————— Reconciliation ————————————————————————————————— #
+
+class TestReconcile:
+	"""Tests for notification_counters.reconcile and its command line."""
+
+	def test_reports_and_fixes_drift(self, users):
+		me, _, stranger = users
+		create_friend_request(stranger, me)
+		with sqlite3.connect(database._db_path) as conn:
+			conn.execute('UPDATE "NotificationCounters" SET "friend_requests" = 7 WHERE "user_id" = ?', (me,))
+			conn.execute('INSERT INTO "NotificationCounters" ("user_id", "recipe_shares") VALUES (?, 3)', (stranger,))
+		drift = notification_counters.reconcile(fix=False)
+		assert drift == [
+			notification_counters.Drift(me, (7, 0), (1, 0)),
+			notification_counters.Drift(stranger, (0, 3), (0, 0)),
+		]
+		assert _counters(me) == (7, 0)  # check only
+		assert notification_counters.reconcile() == drift
+		assert _counters(me) == (1, 0)
+		assert _counters(stranger) == (0, 0)
+		_assert_consistent()
+
+	def test_rebuilds_missing_rows(self, users):
+		me, _, stranger = users
+		create_friend_request(stranger, me)
+		with sqlite3.connect(database._db_path) as conn:
+			conn.execute('DELETE FROM "NotificationCounters"')
+		assert notification_counters.reconcile() == [notification_counters.Drift(me, (0, 0), (1, 0))]
+		assert _counters(me) == (1, 0)
+
+	def test_cli_check_exit_code(self, users, capsys):
+		me, _, stranger = users
+		create_friend_request(stranger, me)
+		assert notification_counters.main(["--check"]) == 0
+		assert "no drift" in capsys.readouterr().out
+		with sqlite3.connect(database._db_path) as conn:
+			conn.execute('UPDATE "NotificationCounters" SET "friend_requests" = 0')
+		assert notification_counters.main(["--check"]) == 1
+		assert f"user {me}: stored friend_requests=0" in capsys.readouterr().out
+		assert notification_counters.main([]) == 0
+		assert "fixed 1 user(s)" in capsys.readouterr().out
+		_assert_consistent()
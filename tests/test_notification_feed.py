@@ -0,0 +1,141 @@
+"""Unit tests for the merged, keyset-paginated notification feed."""
+import sqlite3
+
+import pytest
+
+import database
+from database import (
+	create_user,
+	create_recipe,
+	soft_delete_recipe,
+	create_friend_request,
+	accept_friend_request,
+	create_recipe_share,
+	dismiss_notification,
+)
+from database import Select
+
+
+# ————————————————————————————————— Fixtures ————————————————————————————————— #
+
+@pytest.fixture
+def inbox():
+	"""A user with 12 pending friend requests and 12 recipe shares. Returns (me, sharer)."""
+	me = create_user("feed_me@test.com", "Me", "Secret123")
+	sharer = create_user("feed_sharer@test.com", "Sharer", "Secret123")
+	accept_friend_request(create_friend_request(sharer, me), me)
+	for n in range(12):
+		create_friend_request(create_user(f"feed_req{n}@test.com", f"Req {n}", "Secret123"), me)
+		create_recipe_share(create_recipe(f"Feed recipe {n}", sharer), sharer, me)
+	return me, sharer
+
+
+def _set_created_at(table, row_id, value):
+	with sqlite3.connect(database._db_path) as conn:
+		conn.execute(f'UPDATE "{table}" SET "created_at" = ? WHERE "id" = ?', (value, row_id))
+
+
+def _all_pages(user_id, limit):
+	"""Follow next_cursor to the end; returns the list of pages."""
+	pages, cursor = [], None
+	while True:
+		items, cursor = Select.get_notification_feed(user_id, limit=limit, before=cursor)
+		pages.append(items)
+		if cursor is None:
+			return pages
+
+
+# ————————————————————————————————— get_notification_feed ————————————————————————————————— #
+
+class TestNotificationFeed:
+	"""Tests for Select.get_notification_feed."""
+
+	def test_merges_both_kinds_newest_first(self):
+		me = create_user("feed_order@test.com", "Me", "Secret123")
+		friend = create_user("feed_order_friend@test.com", "Friend", "Secret123")
+		accept_friend_request(create_friend_request(friend, me), me)
+		old_share = create_recipe_share(create_recipe("Old", friend), friend, me)
+		request_id = create_friend_request(create_user("feed_order_req@test.com", "Req", "Secret123"), me)
+		new_share = create_recipe_share(create_recipe("New", friend), friend, me)
+		_set_created_at("RecipeShares", old_share, "2024-01-01 00:00:00")
+		_set_created_at("FriendRequests", request_id, "2024-01-02 00:00:00")
+		_set_created_at("RecipeShares", new_share, "2024-01-03 00:00:00")
+		items, cursor = Select.get_notification_feed(me)
+		assert [(i.kind, i.id) for i in items] == [
+			("recipe_share", new_share), ("friend_request", request_id), ("recipe_share", old_share),
+		]
+		assert cursor is None
+		assert items[0].recipe_title == "New" and items[0].actor_name == "Friend"
+		assert items[1].actor_email == "feed_order_req@test.com" and items[1].recipe_title is None
+
+	def test_pages_cover_feed_exactly_once(self, inbox):
+		"""Keyset pages have no gaps or duplicates, even with equal created_at values."""
+		me, _ = inbox
+		full, _ = Select.get_notification_feed(me, limit=100)
+		assert len(full) == 24
+		pages = _all_pages(me, limit=5)
+		assert [len(p) for p in pages] == [5, 5, 5, 5, 4]
+		assert [(i.kind, i.id) for p in pages for i in p] == [(i.kind, i.id) for i in full]
+
+	def test_exact_multiple_of_page_size(self, inbox):
+		me, _ = inbox
+		pages = _all_pages(me, limit=12)
+		assert [len(p) for p in pages] == [12, 12]
+
+	def test_excludes_dismissed_and_deleted(self, inbox):
+		me, sharer = inbox
+		items, _ = Select.get_notification_feed(me, limit=100)
+		request = next(i for i in items if i.kind == "friend_request")
+		share = next(i for i in items if i.kind == "recipe_share")
+		dismiss_notification(me, "friend_request", request.id)
+		dismiss_notification(me, "recipe_share", share.id)
+		deleted_title = next(i for i in items if i.kind == "recipe_share" and i.id != share.id).recipe_title
+		deleted_recipe = next(r for r in Select.get_Recipes_by_Persons_id(sharer) if r.title == deleted_title)
+		soft_delete_recipe(deleted_recipe.id)
+		after, _ = Select.get_notification_feed(me, limit=100)
+		assert len(after) == 21
+		assert (request.kind, request.id) not in [(i.kind, i.id) for i in after]
+		assert deleted_title not in [i.recipe_title for i in after]
+		assert len(after) == Select.get_navbar_summary(me)[0]
+
+	def test_legacy_getters_agree_with_feed(self, inbox):
+		me, _ = inbox
+		dismiss_notification(me, "friend_request", Select.get_pending_friend_requests_for_user(me)[0][0].id)
+		items, _ = Select.get_notification_feed(me, limit=100)
+		assert sum(i.kind == "friend_request" for i in items) == len(Select.get_pending_friend_requests_for_user(me)) == 11
+		assert sum(i.kind == "recipe_share" for i in items) == len(Select.get_recipe_shares_for_recipient(me)) == 12
+
+
+# ————————————————————————————————— Route ————————————————————————————————— #
+
+class TestNotificationsPage:
+	"""GET /Friends/Notifications pages through the feed."""
+
+	def _login(self, client, email):
+		client.post("/Login", data={"email": email, "pass": "Secret123"}, follow_redirects=True)
+
+	def test_first_page_links_to_older(self, client, inbox, monkeypatch):
+		import GroceryGuru
+		monkeypatch.setattr(GroceryGuru, "NOTIFICATIONS_PAGE_SIZE", 10)
+		self._login(client, "feed_me@test.com")
+		resp = client.get("/Friends/Notifications")
+		assert resp.status_code == 200
+		assert resp.data.count(b'class="notification-item"') == 10
+		assert b"Older" in resp.data and b"?before=" in resp.data
+
+	def test_follow_cursor_to_last_page(self, client, inbox, monkeypatch):
+		import GroceryGuru
+		monkeypatch.setattr(GroceryGuru, "NOTIFICATIONS_PAGE_SIZE", 10)
+		me, _ = inbox
+		self._login(client, "feed_me@test.com")
+		_, cursor = Select.get_notification_feed(me, limit=20)
+		resp = client.get("/Friends/Notifications", query_string={"before": GroceryGuru._encode_feed_cursor(cursor)})
+		assert resp.data.count(b'class="notification-item"') == 4
+		assert b"Older" not in resp.data
+		assert b"Newest" in resp.data
+
+	def test_malformed_cursor_shows_first_page(self, client, inbox):
+		self._login(client, "feed_me@test.com")
+		resp = client.get("/Friends/Notifications?before=garbage")
+		assert resp.status_code == 200
+		assert resp.data.count(b'class="notification-item"') == 20
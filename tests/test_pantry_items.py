@@ -7,10 +7,14 @@ from database import (
 	create_user,
 	create_inventory_ingredient,
 	get_or_create_ingredient,
+	get_or_create_ingredients,
+	suggest_ingredients,
 	update_inventory_ingredient,
 	soft_delete_inventory_ingredient,
 	find_matching_inventory_item,
 	add_inventory_count,
+	session_scope,
+	Ingredients,
 )
 from database import Select
 
@@ -125,6 +129,57 @@ class TestAddPantryItem:
 		assert ingredient.name == "Flour"
 		assert inv_item.count == 5
 
+	def test_get_or_create_ingredient_matches_canonical_name(self, test_user_id):
+		"""Spellings with the same canonical name reuse one ingredient; canonical=False matches exactly."""
+		ingredient_id = get_or_create_ingredient("Tomatoes", test_user_id)
+		assert get_or_create_ingredient("tomato", test_user_id) == ingredient_id
+		assert get_or_create_ingredient(" 2 TOMATOES ", test_user_id) == ingredient_id
+		assert get_or_create_ingredient("2 tomatoes", test_user_id, canonical=False) != ingredient_id
+		assert get_or_create_ingredient("Tomatoes", test_user_id, canonical=False) == ingredient_id
+
+	def test_get_or_create_ingredient_exact_is_case_insensitive(self, test_user_id):
+		"""canonical=False matches lower(name), the key of the unique index, instead of failing on it."""
+		ingredient_id = get_or_create_ingredient("2 cups Flour", test_user_id, canonical=False)
+		assert get_or_create_ingredient("2 CUPS flour", test_user_id, canonical=False) == ingredient_id
+
+	def test_get_or_create_ingredients_batch(self, test_user_id):
+		"""Ids come back in input order; repeats and existing names share one row."""
+		egg_id = get_or_create_ingredient("egg", test_user_id)
+		ids = get_or_create_ingredients(["Milk", "Eggs", "milk", "Butter"], test_user_id)
+		assert ids[1] == egg_id
+		assert ids[0] == ids[2] != ids[3]
+		assert get_or_create_ingredients(["Butter", "Milk"], test_user_id) == [ids[3], ids[0]]
+		assert get_or_create_ingredients([], test_user_id) == []
+
+	def test_get_or_create_ingredient_concurrent_calls_create_one_row(self, test_user_id):
+		"""Racing callers get the same id; the unique index turns the losing inserts into no-ops."""
+		from concurrent.futures import ThreadPoolExecutor
+		with ThreadPoolExecutor(max_workers=8) as pool:
+			ids = set(pool.map(lambda _: get_or_create_ingredient("Saffron", test_user_id, canonical=False), range(16)))
+		assert len(ids) == 1
+		with session_scope() as session:
+			assert session.query(Ingredients).filter_by(person_id=test_user_id, name="Saffron").count() == 1
+
+	def test_suggest_ingredients_finds_near_duplicates(self, test_user_id):
+		"""Typos and reordered words suggest the existing ingredient; new rows are picked up."""
+		chicken = get_or_create_ingredient("Chicken Breasts", test_user_id)
+		get_or_create_ingredient("Tomatoes", test_user_id)
+		assert [s.id for s in suggest_ingredients("chiken breast", test_user_id)] == [chicken]
+		assert suggest_ingredients("breast of chicken", test_user_id)[0].name == "Chicken Breasts"
+		assert suggest_ingredients("saffron", test_user_id) == []
+		saffron = get_or_create_ingredient("Saffron", test_user_id)
+		assert [s.id for s in suggest_ingredients("safron", test_user_id)] == [saffron]
+		other = create_user("pantry_other@test.com", "Other", "TestPass123")
+		assert suggest_ingredients("chicken breast", other) == []
+
+	def test_suggest_route(self, logged_in_client):
+		"""GET /Ingredients/Suggest returns the current user's similar ingredients as JSON."""
+		client, user_id = logged_in_client
+		get_or_create_ingredient("Broccoli", user_id)
+		data = client.get("/Ingredients/Suggest?q=brocoli").get_json()
+		assert [s["name"] for s in data["suggestions"]] == ["Broccoli"]
+		assert client.get("/Ingredients/Suggest?q=b").get_json() == {"suggestions": []}
+
 	def test_find_matching_inventory_item_finds_same_expiration(self, test_user_id):
 		"""find_matching_inventory_item returns id when same ingredient and expiration."""
 		ingredient_id = get_or_create_ingredient("Yogurt", test_user_id)
@@ -0,0 +1,117 @@
+"""Unit tests for the Aho-Corasick pantry matcher used by Find Recipe."""
+import random
+import string
+
+import pytest
+
+from pantry_matcher import PantryMatcher, compile_pantry
+
+
+def _naive_count(text, names):
+	"""The substring-per-name scoring Find Recipe used before the automaton."""
+	joined = " ".join(ln.strip() for ln in (text or "").splitlines() if ln.strip()).lower()
+	return sum(1 for n in names if len(n) >= 2 and n in joined)
+
+
+def _naive_line(line, names):
+	line = (line or "").strip().lower()
+	return bool(line) and any(len(n) >= 2 and n in line for n in names)
+
+
+# ————————————————————————————————— PantryMatcher ————————————————————————————————— #
+
+class TestPantryMatcher:
+	"""Tests for PantryMatcher.match / count / line_matches."""
+
+	def test_count_and_lines(self):
+		matcher = PantryMatcher({"flour", "sugar", "eggs"})
+		result = matcher.match("2 cups Flour\n\n 1 cup sugar \n1/2 cup butter")
+		assert result.count == 2
+		assert result.lines == [
+			("2 cups Flour", frozenset({"flour"})),
+			("1 cup sugar", frozenset({"sugar"})),
+			("1/2 cup butter", frozenset()),
+		]
+
+	def test_each_name_counted_once(self):
+		assert PantryMatcher({"salt"}).count("salt\nmore salt\nsalt") == 1
+
+	def test_overlapping_and_nested_names(self):
+		"""Names that are substrings of each other, or overlap, are all found."""
+		matcher = PantryMatcher({"oil", "olive oil", "live", "boil"})
+		result = matcher.match("2 tbsp olive oil\nbring to a boil")
+		assert result.count == 4
+		assert result.lines[0][1] == {"oil", "olive oil", "live"}
+		assert result.lines[1][1] == {"oil", "boil"}
+
+	def test_match_across_lines_counts_but_marks_no_line(self):
+		"""Lines are joined with a space for the count, as before; a name spanning two lines is in neither."""
+		result = PantryMatcher({"brown sugar"}).match("1 cup brown\nsugar, to taste")
+		assert result.count == 1
+		assert [names for _, names in result.lines] == [frozenset(), frozenset()]
+
+	def test_short_names_ignored(self):
+		matcher = PantryMatcher({"a", "", "ab"})
+		assert matcher.names == ("ab",)
+		assert matcher.count("a cab") == 1
+
+	def test_empty_pantry_and_text(self):
+		assert PantryMatcher(set()).match("1 egg\n") == (0, [("1 egg", frozenset())])
+		assert PantryMatcher({"egg"}).match("") == (0, [])
+		assert PantryMatcher({"egg"}).line_matches("   ") is False
+
+	def test_line_matches(self):
+		matcher = PantryMatcher({"flour", "eggs"})
+		assert matcher.line_matches("2 cups all-purpose FLOUR") is True
+		assert matcher.line_matches("1 cup milk") is False
+
+	def test_match_lines_scans_given_text_and_returns_display_text(self):
+		matcher = PantryMatcher({"olive oil", "salt"})
+		lines = [("2 Tbsp Olive  Oil", "2 tbsp olive oil"), ("Salt", "salt")]
+		assert matcher.match_lines(lines) == (2, [
+			("2 Tbsp Olive  Oil", frozenset({"olive oil"})), ("Salt", frozenset({"salt"})),
+		])
+
+	def test_names_in(self):
+		matcher = PantryMatcher({"olive oil", "oil", "salt"})
+		assert matcher.names_in("2 tbsp olive oil") == {"olive oil", "oil"}
+		assert matcher.names_in("") == set()
+
+	@pytest.mark.parametrize("seed", range(5))
+	def test_agrees_with_substring_search(self, seed):
+		"""Random pantries and recipes score exactly as the per-name substring search did."""
+		rng = random.Random(seed)
+		alphabet = "abcde "  # small alphabet: lots of overlaps and partial matches
+		names = {"".join(rng.choice(alphabet) for _ in range(rng.randint(1, 5))).strip() for _ in range(40)}
+		matcher = PantryMatcher(names)
+		for _ in range(50):
+			text = "\n".join("".join(rng.choice(alphabet + string.ascii_uppercase[:3]) for _ in range(rng.randint(0, 30))) for _ in range(rng.randint(0, 6)))
+			result = matcher.match(text)
+			assert result.count == matcher.count(text) == _naive_count(text, names)
+			for line, found in result.lines:
+				assert bool(found) == _naive_line(line, names) == matcher.line_matches(line)
+				assert found == {n for n in names if len(n) >= 2 and n in line.lower()}
+
+
+class TestCompilePantry:
+	"""compile_pantry reuses the automaton for an unchanged pantry snapshot."""
+
+	def test_same_names_reuse_matcher(self):
+		assert compile_pantry({"flour", "sugar"}) is compile_pantry(["sugar", "flour"])
+
+	def test_changed_pantry_recompiles(self):
+		assert compile_pantry({"flour"}) is not compile_pantry({"flour", "sugar"})
+
+
+class TestFuzzyLines:
+	"""match_lines(..., fuzzy=t) for lines the exact match misses."""
+
+	def test_reordered_and_misspelled_lines(self):
+		matcher = PantryMatcher({"chicken breast", "flour"})
+		lines = [(line, line) for line in ["breast of chicken", "chiken breast", "2 cups flour", "water"]]
+		result = matcher.match_lines(lines, fuzzy=0.75)
+		assert [names for _, names in result.lines] == [
+			{"chicken breast"}, {"chicken breast"}, {"flour"}, frozenset(),
+		]
+		assert result.count == 1  # the count stays exact
+		assert [names for _, names in matcher.match_lines(lines).lines][:2] == [frozenset(), frozenset()]
@@ -0,0 +1,164 @@
+"""Unit tests for the materialized RecipePantryScore rows and their reconciliation."""
+from datetime import datetime
+
+import pytest
+
+from database import (
+	create_user,
+	create_recipe,
+	update_recipe,
+	soft_delete_recipe,
+	get_or_create_ingredient,
+	create_inventory_ingredient,
+	add_inventory_count,
+	soft_delete_inventory_ingredient,
+	pantry_scores,
+	session_scope,
+	RecipePantryScore,
+)
+from database import Select
+
+
+# ————————————————————————————————— Fixtures ————————————————————————————————— #
+
+@pytest.fixture
+def me():
+	return create_user("ps_me@test.com", "Me", "Secret123")
+
+
+def _stock(user_id, name):
+	"""Add a pantry item called name; returns the inventory id."""
+	return create_inventory_ingredient(1, datetime.utcnow(), None, get_or_create_ingredient(name, user_id), None)
+
+
+def _score(recipe_id):
+	"""(matched, total) as stored, None if the recipe has no row."""
+	with session_scope() as session:
+		row = session.get(RecipePantryScore, recipe_id)
+		return (row.matched, row.total) if row else None
+
+
+def _assert_consistent():
+	"""Stored scores match a full recompute."""
+	assert pantry_scores.reconcile(fix=False) == []
+
+
+# ————————————————————————————————— Incremental maintenance ————————————————————————————————— #
+
+class TestRecipeWrites:
+	"""create_recipe, update_recipe and soft_delete_recipe score the one recipe they touch."""
+
+	def test_create_scores_against_pantry(self, me):
+		_stock(me, "Flour")
+		rid = create_recipe("Bread", me, ingredients="2 cups flour\nWater\n\nSalt")
+		assert _score(rid) == (1, 3)
+		_assert_consistent()
+
+	def test_update_rescores(self, me):
+		_stock(me, "flour")
+		_stock(me, "salt")
+		rid = create_recipe("Bread", me, ingredients="Water")
+		update_recipe(rid, ingredients="Flour\nSalt")
+		assert _score(rid) == (2, 2)
+		_assert_consistent()
+
+	def test_soft_delete_drops_row(self, me):
+		rid = create_recipe("Bread", me, ingredients="Flour")
+		soft_delete_recipe(rid)
+		assert _score(rid) is None
+		_assert_consistent()
+
+
+class TestPantryWrites:
+	"""Pantry writes shift `matched` only on recipes containing the added or removed name."""
+
+	def test_new_name_increments_matching_recipes_only(self, me):
+		bread = create_recipe("Bread", me, ingredients="Flour\nWater")
+		soup = create_recipe("Soup", me, ingredients="Broth")
+		_stock(me, "FLOUR ")
+		assert (_score(bread), _score(soup)) == ((1, 2), (0, 1))
+		_assert_consistent()
+
+	def test_second_item_with_same_name_changes_nothing(self, me):
+		rid = create_recipe("Bread", me, ingredients="Flour")
+		_stock(me, "flour")
+		_stock(me, "Flour")
+		assert _score(rid) == (1, 1)
+		_assert_consistent()
+
+	def test_removing_last_item_decrements(self, me):
+		rid = create_recipe("Bread", me, ingredients="Flour")
+		first, second = _stock(me, "flour"), _stock(me, "flour")
+		soft_delete_inventory_ingredient(first)
+		assert _score(rid) == (1, 1)
+		soft_delete_inventory_ingredient(second)
+		soft_delete_inventory_ingredient(second)  # already deleted: no second decrement
+		assert _score(rid) == (0, 1)
+		_assert_consistent()
+
+	def test_add_count_keeps_scores(self, me):
+		rid = create_recipe("Bread", me, ingredients="Flour")
+		add_inventory_count(_stock(me, "flour"), 3)
+		assert _score(rid) == (1, 1)
+		_assert_consistent()
+
+	def test_other_users_recipes_untouched(self, me):
+		other = create_user("ps_other@test.com", "Other", "Secret123")
+		rid = create_recipe("Bread", other, ingredients="Flour")
+		_stock(me, "flour")
+		assert _score(rid) == (0, 1)
+		_assert_consistent()
+
+	def test_name_spanning_two_lines_counts(self, me):
+		"""Lines are joined with a space, as in pantry_matcher."""
+		rid = create_recipe("Salad", me, ingredients="Olive\nOil")
+		_stock(me, "olive oil")
+		assert _score(rid) == (1, 2)
+		_assert_consistent()
+
+
+# ————————————————————————————————— Ranking ————————————————————————————————— #
+
+class TestRanking:
+	"""Select.get_Recipes_ranked_by_pantry_score orders by stored score."""
+
+	def test_order_category_and_limit(self, me):
+		_stock(me, "flour")
+		_stock(me, "sugar")
+		create_recipe("Water", me, ingredients="Water", category="Drinks")
+		create_recipe("Cake", me, ingredients="Flour\nSugar", category="Desserts")
+		create_recipe("Bread", me, ingredients="Flour")
+		ranked = Select.get_Recipes_ranked_by_pantry_score(me)
+		assert [(r.title, n) for r, n in ranked] == [("Cake", 2), ("Bread", 1), ("Water", 0)]
+		assert [r.title for r, _ in Select.get_Recipes_ranked_by_pantry_score(me, "Others")] == ["Bread"]
+		assert [r.title for r, _ in Select.get_Recipes_ranked_by_pantry_score(me, None, 1)] == ["Cake"]
+
+
+# ————————————————————————————————— Reconciliation ————————————————————————————————— #
+
+class TestReconcile:
+	"""reconcile / main report and repair drift."""
+
+	def test_drift_reported_and_fixed(self, me):
+		_stock(me, "flour")
+		rid = create_recipe("Bread", me, ingredients="Flour")
+		gone = create_recipe("Gone", me, ingredients="Flour")
+		with session_scope() as session:
+			session.query(RecipePantryScore).filter(RecipePantryScore.recipe_id == rid).update({"matched": 7})
+			session.query(RecipePantryScore).filter(RecipePantryScore.recipe_id == gone).delete()
+		drift = pantry_scores.reconcile(fix=True)
+		assert drift == [
+			pantry_scores.Drift(rid, (7, 1), (1, 1)),
+			pantry_scores.Drift(gone, None, (1, 1)),
+		]
+		_assert_consistent()
+
+	def test_main_check_exit_code(self, me, capsys):
+		rid = create_recipe("Bread", me, ingredients="Flour")
+		assert pantry_scores.main(["--check"]) == 0
+		with session_scope() as session:
+			session.query(RecipePantryScore).filter(RecipePantryScore.recipe_id == rid).update({"total": 0})
+		assert pantry_scores.main(["--check"]) == 1
+		assert "1 recipe(s) drifted" in capsys.readouterr().out
+		assert pantry_scores.main([]) == 0
+		_assert_consistent()
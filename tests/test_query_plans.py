@@ -0,0 +1,160 @@
+"""Query-plan regression tests: every Select query must be answered through an index, never a full table scan."""
+import re
+import sqlite3
+
+import pytest
+from sqlalchemy import event
+
+import database
+from database import Select
+
+
+USERS = 300
+ROWS_PER_USER = 30
+ME = 1
+FRIEND = 2
+
+
+# ————————————————————————————————— Fixtures ————————————————————————————————— #
+
+def _seed(conn):
+	"""Bulk-insert a synthetic dataset: USERS users, each with ROWS_PER_USER of everything."""
+	conn.executemany(
+		'INSERT INTO Persons (id, email, name, password) VALUES (?, ?, ?, ?)',
+		[(u, f"plan{u}@test.com", f"User {u}", "x") for u in range(1, USERS + 1)],
+	)
+	conn.executemany(
+		'INSERT INTO Lists (id, name, "Persons.id") VALUES (?, ?, ?)',
+		[(u * 10 + n, f"List {n}", u) for u in range(1, USERS + 1) for n in range(3)],
+	)
+	ingredients, list_items, pantry, recipes = [], [], [], []
+	for u in range(1, USERS + 1):
+		for n in range(ROWS_PER_USER):
+			iid = u * 1000 + n
+			ingredients.append((iid, f"item {n}", u))
+			list_items.append((iid, 1, iid, u * 10 + n % 3))
+			pantry.append((iid, 1, iid))
+			recipes.append((iid, f"Recipe {n}", "flour\nsugar", ["Desserts", "Dinners", "", None][n % 4], u))
+	conn.executemany('INSERT INTO Ingredients (id, name, "Persons.id") VALUES (?, ?, ?)', ingredients)
+	conn.executemany('INSERT INTO ListIngredients (id, quantity, "Ingredients.id", "Lists.id") VALUES (?, ?, ?, ?)', list_items)
+	conn.executemany('INSERT INTO InventoryIngredients (id, count, "Ingredients.id") VALUES (?, ?, ?)', pantry)
+	conn.executemany('INSERT INTO Recipes (id, title, ingredients, category, "Persons.id") VALUES (?, ?, ?, ?, ?)', recipes)
+	conn.executemany(
+		'INSERT INTO RecipeRatings ("Recipes.id", "Persons.id", rating) VALUES (?, ?, ?)',
+		[(r[0], u, 1 + u % 5) for r in recipes[:2000] for u in (ME, FRIEND)],
+	)
+	conn.executemany(
+		'INSERT INTO RecipeComments ("Recipes.id", "Persons.id", body) VALUES (?, ?, ?)',
+		[(r[0], FRIEND, "nice") for r in recipes[:2000]],
+	)
+	conn.executemany(
+		'INSERT INTO RecipeImages ("Recipes.id", file_path, sort_order) VALUES (?, ?, ?)',
+		[(r[0], f"uploads/{r[0]}.jpg", 0) for r in recipes[:2000]],
+	)
+	# ME is friends with FRIEND (accepted) and has pending requests from everyone else
+	requests = [(ME, FRIEND, "accepted")] + [(u, ME, "pending") for u in range(3, USERS + 1)]
+	requests += [(u, u + 1, "accepted") for u in range(3, USERS)]
+	conn.executemany('INSERT INTO FriendRequests (requester_id, addressee_id, status) VALUES (?, ?, ?)', requests)
+	conn.executemany(
+		'INSERT INTO RecipeShares ("Recipes.id", sharer_id, recipient_id) VALUES (?, ?, ?)',
+		[(u * 1000, u, ME) for u in range(2, USERS + 1)] + [(u * 1000, u, u + 1) for u in range(2, USERS)],
+	)
+	conn.executemany(
+		'INSERT INTO DismissedNotifications (user_id, notification_type, notification_id) VALUES (?, ?, ?)',
+		[(ME, "friend_request", n) for n in range(1, 50)] + [(ME, "recipe_share", n) for n in range(1, 50)],
+	)
+
+
+@pytest.fixture
+def large_dataset():
+	"""Seed the test database and gather planner statistics; statistics are dropped afterwards."""
+	with sqlite3.connect(database._db_path) as conn:
+		_seed(conn)
+		conn.execute("ANALYZE")
+	yield
+	with sqlite3.connect(database._db_path) as conn:
+		conn.execute("DELETE FROM sqlite_stat1")
+		conn.execute("ANALYZE sqlite_schema")
+
+
+def _captured_statements(fn, *args):
+	"""Call fn(*args) and return the (sql, params) of every statement it executed."""
+	captured = []
+
+	def _capture(conn, cursor, statement, parameters, context, executemany):
+		captured.append((statement, parameters))
+
+	event.listen(database.engine, "before_cursor_execute", _capture)
+	try:
+		fn(*args)
+	finally:
+		event.remove(database.engine, "before_cursor_execute", _capture)
+	return captured
+
+
+# Scans of a derived table (SQLAlchemy's anon_N subqueries, SQLite's co-routines) read rows the
+# subquery already produced through its own, separately checked plan; they are not table scans.
+_DERIVED_TABLE_SCAN = re.compile(r"SCAN (anon_\d+|\(subquery-\d+\))$")
+
+
+def _full_scans(statement, parameters):
+	"""Return the EXPLAIN QUERY PLAN lines that scan a whole table or index."""
+	with database.engine.connect() as conn:
+		plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+	return [row[-1] for row in plan if row[-1].startswith("SCAN") and not _DERIVED_TABLE_SCAN.match(row[-1])]
+
+
+SELECT_CALLS = [
+	("get_ListIngredients_by_Persons_id", (ME,)),
+	("get_InventoryIngredients_by_Persons_id", (ME,)),
+	("get_InventoryIngredient_by_id", (ME * 1000, ME)),
+	("get_Lists_by_Persons_id", (ME,)),
+	("get_List_by_id", (ME * 10, ME)),
+	("get_ListIngredients_by_Lists_id", (ME * 10, ME)),
+	("get_ListIngredient_by_id", (ME * 1000, ME)),
+	("get_Recipes_by_Persons_id", (ME,)),
+	("get_Recipes_by_category", (ME, "Desserts")),
+	("get_Recipes_by_category", (ME, "Others")),
+	("get_Recipe_by_id", (ME * 1000, ME)),
+	("get_Recipes_ranked_by_pantry_score", (ME,)),
+	("get_Recipes_ranked_by_pantry_score", (ME, "Others", 10)),
+	("get_recipe_ingredients", (ME * 1000,)),
+	("get_recipe_ingredient_names_by_Persons_id", (ME,)),
+	("get_recipe_average_rating", (ME * 1000,)),
+	("get_recipe_rating_count", (ME * 1000,)),
+	("get_user_recipe_rating", (ME * 1000, ME)),
+	("get_recipe_comments", (ME * 1000,)),
+	("get_recipe_images", (ME * 1000,)),
+	("get_Person_by_email", ("plan7@test.com",)),
+	("get_pending_friend_requests_for_user", (ME,)),
+	("get_friends", (ME,)),
+	("get_friend_request_by_id", (60, ME)),
+	("get_recipe_shares_for_recipient", (ME,)),
+	("get_recipe_share_by_id", (60, ME)),
+	("get_navbar_summary", (ME,)),
+	("get_notification_feed", (ME,)),
+	("get_notification_feed", (ME, 20, ("9999-12-31 00:00:00", "recipe_share", 10**9))),
+]
+
+
+# ————————————————————————————————— Tests ————————————————————————————————— #
+
+class TestSelectQueryPlans:
+	"""EXPLAIN QUERY PLAN for every query issued by database.Select."""
+
+	@pytest.mark.parametrize("name,args", SELECT_CALLS, ids=[name for name, _ in SELECT_CALLS])
+	def test_select_uses_indexes(self, large_dataset, name, args):
+		"""No statement issued by the Select helper falls back to a full scan."""
+		statements = _captured_statements(getattr(Select, name), *args)
+		assert statements, f"{name} issued no SQL"
+		for statement, parameters in statements:
+			assert _full_scans(statement, parameters) == [], statement
+
+	def test_every_select_helper_is_covered(self):
+		"""Adding a getter to Select.py requires adding it to SELECT_CALLS."""
+		helpers = {
+			name for name in dir(Select)
+			if name.startswith("get_") and callable(getattr(Select, name))
+			and name != "get_friend_count"  # wraps get_friends
+		}
+		assert helpers == {name for name, _ in SELECT_CALLS}
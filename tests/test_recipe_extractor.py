@@ -0,0 +1,107 @@
+"""Unit tests for recipe_extractor: the JSON-LD scan and the DOM fallback (no network calls)."""
+import pytest
+
+import recipe_extractor
+
+
+def _ld(body: str, attrs: str = 'type="application/ld+json"') -> str:
+	return f"<script {attrs}>{body}</script>"
+
+
+RECIPE_LD = _ld('{"@type": "Recipe", "name": "Pancakes", "recipeIngredient": ["2 eggs", "1 cup flour"], "recipeInstructions": "Mix."}')
+
+
+@pytest.fixture
+def page(monkeypatch):
+	"""Serve extract_recipe_from_url the HTML set with page(html)."""
+	pages = {}
+
+	class Cache:
+		def fetch_text(self, url, refetch_failed=False):
+			return pages["html"]
+
+	monkeypatch.setattr(recipe_extractor, "response_cache", Cache())
+	return lambda html: pages.__setitem__("html", html)
+
+
+@pytest.fixture
+def no_dom(monkeypatch):
+	"""Fail the test if BeautifulSoup is used."""
+	def fail(*args, **kwargs):
+		raise AssertionError("page parsed into a DOM")
+	monkeypatch.setattr(recipe_extractor, "BeautifulSoup", fail)
+
+
+class TestLdJsonBlocks:
+	"""_ld_json_blocks: script elements found in the raw page."""
+
+	@pytest.mark.parametrize("attrs", [
+		'type="application/ld+json"',
+		"type='application/ld+json'",
+		"type=application/ld+json",
+		'TYPE="Application/LD+JSON"',
+		'id="schema" type = "application/ld+json" class="yoast-schema-graph"',
+		'type="application/ld+json" data-nscript="beforeInteractive"',
+	])
+	def test_attribute_spellings(self, attrs):
+		assert list(recipe_extractor._ld_json_blocks(f"<head>{_ld('{}', attrs)}</head>")) == ["{}"]
+
+	def test_other_scripts_ignored(self):
+		html = (
+			'<script>var t = "application/ld+json";</script>'
+			'<script type="application/ld+jsonx">{}</script>'
+			'<script data-type="application/ld+json">{}</script>'
+			'<script src="a.js"></script>'
+			+ _ld("[1]") + "<p>text</p>" + _ld("\n[2]\n")
+		)
+		assert list(recipe_extractor._ld_json_blocks(html)) == ["[1]", "\n[2]\n"]
+
+	def test_content_is_raw_text_up_to_end_tag(self):
+		body = '{"name": "<b>Fish &amp; chips</b>"}'
+		assert list(recipe_extractor._ld_json_blocks(_ld(body) + "</script>")) == [body]
+
+
+class TestFindRecipeSchema:
+	"""_find_recipe_schema over JSON-LD texts."""
+
+	def test_graph_and_type_list(self):
+		blocks = [
+			"not json",
+			"",
+			'{"@type": "WebSite"}',
+			'{"@graph": [{"@type": "Organization"}, {"@type": ["Recipe", "NewsArticle"], "name": "Stew"}]}',
+		]
+		assert recipe_extractor._find_recipe_schema(blocks)["name"] == "Stew"
+
+	def test_none(self):
+		assert recipe_extractor._find_recipe_schema(['[{"@type": "Recipe"}]', "{}"]) is None
+
+
+class TestExtractRecipeFromUrl:
+	"""extract_recipe_from_url: JSON-LD without a DOM, BeautifulSoup for the rest."""
+
+	def test_json_ld_page_not_parsed(self, page, no_dom):
+		page(f"<html><head>{_ld('{broken')}{RECIPE_LD}</head><body><h1>Other</h1></body></html>")
+		recipe = recipe_extractor.extract_recipe_from_url("https://example.com/pancakes")
+		assert (recipe["title"], recipe["ingredients"], recipe["steps"]) == ("Pancakes", "2 eggs\n1 cup flour", "Mix.")
+
+	def test_heuristics_without_json_ld(self, page):
+		page(
+			"<html><body><h1>Toast</h1><ul>"
+			"<li class='ingredient'>1 slice bread</li><li class='ingredient'>butter</li></ul>"
+			"<div class='instruction'>Toast it.</div></body></html>"
+		)
+		recipe = recipe_extractor.extract_recipe_from_url("https://example.com/toast")
+		assert (recipe["title"], recipe["ingredients"], recipe["steps"]) == ("Toast", "1 slice bread\nbutter", "Toast it.")
+
+	def test_dom_finds_json_ld_the_scan_cannot_delimit(self, page):
+		page("<html><head>" + RECIPE_LD.replace("<script ", '<script data-note="a>b" ') + "</head></html>")
+		assert recipe_extractor.extract_recipe_from_url("https://example.com/pancakes")["title"] == "Pancakes"
+
+	def test_same_result_as_dom_scan(self, page):
+		html = f"<html><head><script>var x = '</scr' + 'ipt>';</script>{RECIPE_LD}</head><body><h1>Other</h1></body></html>"
+		page(html)
+		fast = recipe_extractor.extract_recipe_from_url("https://example.com/pancakes")
+		soup = recipe_extractor.BeautifulSoup(html, "html.parser")
+		schema = recipe_extractor._find_recipe_schema(s.string for s in soup.find_all("script", type="application/ld+json"))
+		assert fast == recipe_extractor._recipe_from_schema(schema, "https://example.com/pancakes")
@@ -0,0 +1,97 @@
+"""Unit tests for the parsed RecipeIngredients lines and their backfill."""
+import pytest
+
+from database import (
+	create_user,
+	create_recipe,
+	update_recipe,
+	create_recipe_share,
+	add_shared_recipe_to_user,
+	accept_friend_request,
+	create_friend_request,
+	recipe_ingredients,
+	session_scope,
+	RecipeIngredients,
+)
+from database import Select
+
+
+def _lines(recipe_id):
+	return [tuple(row) for row in Select.get_recipe_ingredients(recipe_id)]
+
+
+# ————————————————————————————————— Parsing ————————————————————————————————— #
+
+class TestParse:
+	"""recipe_ingredients.parse splits and normalizes ingredient text."""
+
+	def test_blank_lines_skipped_and_positions_dense(self):
+		rows = recipe_ingredients.parse("\n  Flour \n\n\t\nSugar\n")
+		assert [(r["position"], r["raw_text"]) for r in rows] == [(0, "Flour"), (1, "Sugar")]
+
+	def test_name_is_canonical(self):
+		assert recipe_ingredients.normalize_name("  2  Cups\tOlive   OIL ") == "olive oil"
+		assert recipe_ingredients.normalize_name("3 large Eggs, beaten") == "egg beaten"
+
+	def test_empty_text(self):
+		assert recipe_ingredients.parse("") == []
+		assert recipe_ingredients.parse(None) == []
+
+
+# ————————————————————————————————— Write helpers ————————————————————————————————— #
+
+class TestMaintenance:
+	"""create_recipe, update_recipe and add_shared_recipe_to_user keep the rows in step."""
+
+	def test_create_recipe(self):
+		me = create_user("ri_me@test.com", "Me", "Secret123")
+		rid = create_recipe("Pancakes", me, ingredients="2 Eggs\n\nMilk")
+		assert _lines(rid) == [(0, "2 Eggs", "egg"), (1, "Milk", "milk")]
+
+	def test_update_recipe_replaces_lines(self):
+		me = create_user("ri_me@test.com", "Me", "Secret123")
+		rid = create_recipe("Pancakes", me, ingredients="2 Eggs\nMilk\nFlour")
+		update_recipe(rid, ingredients="Butter")
+		assert _lines(rid) == [(0, "Butter", "butter")]
+
+	def test_update_without_ingredients_keeps_lines(self):
+		me = create_user("ri_me@test.com", "Me", "Secret123")
+		rid = create_recipe("Pancakes", me, ingredients="Eggs")
+		update_recipe(rid, title="Crepes")
+		assert _lines(rid) == [(0, "Eggs", "egg")]
+
+	def test_shared_copy_gets_its_own_lines(self):
+		me = create_user("ri_me@test.com", "Me", "Secret123")
+		friend = create_user("ri_friend@test.com", "Friend", "Secret123")
+		accept_friend_request(create_friend_request(friend, me), me)
+		rid = create_recipe("Soup", friend, ingredients="Broth\nOnion")
+		share_id = create_recipe_share(rid, friend, me)
+		copy_id = add_shared_recipe_to_user(share_id, me)
+		assert copy_id != rid
+		assert _lines(copy_id) == _lines(rid) == [(0, "Broth", "broth"), (1, "Onion", "onion")]
+
+
+# ————————————————————————————————— Backfill ————————————————————————————————— #
+
+class TestBackfill:
+	"""recipe_ingredients.backfill / main rebuild rows from Recipes.ingredients."""
+
+	@pytest.fixture
+	def recipes(self):
+		me = create_user("ri_me@test.com", "Me", "Secret123")
+		ids = [create_recipe(f"R{n}", me, ingredients=f"Item {n}\nSalt") for n in range(5)]
+		with session_scope() as session:
+			session.query(RecipeIngredients).filter(RecipeIngredients.recipe_id.in_(ids[:3])).delete()
+		return ids
+
+	def test_rebuild_all(self, recipes):
+		assert recipe_ingredients.backfill(batch_size=2) == (5, 10)
+		assert all(len(_lines(rid)) == 2 for rid in recipes)
+
+	def test_only_missing(self, recipes):
+		assert recipe_ingredients.backfill(only_missing=True) == (3, 6)
+		assert _lines(recipes[0]) == [(0, "Item 0", "item 0"), (1, "Salt", "salt")]
+
+	def test_main(self, recipes, capsys):
+		assert recipe_ingredients.main(["--missing"]) == 0
+		assert "rebuilt 3 recipe(s), 6 line(s)" in capsys.readouterr().out
@@ -0,0 +1,153 @@
+"""Unit tests for the sparse incidence-matrix ranking backend (database.recipe_matrix)."""
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import pytest
+
+import GroceryGuru
+from database import (
+	create_user,
+	create_recipe,
+	update_recipe,
+	soft_delete_recipe,
+	get_or_create_ingredient,
+	create_inventory_ingredient,
+	recipe_matrix,
+	recipe_ranking,
+)
+from database.recipe_matrix import IncidenceMatrix, MatrixCache, matrix_cache
+
+
+# ————————————————————————————————— IncidenceMatrix ————————————————————————————————— #
+
+class TestIncidenceMatrix:
+	"""Scores equal the pantry matcher's count for every row."""
+
+	def test_scores(self):
+		matrix = IncidenceMatrix.from_lines([
+			(1, "2 cups flour"), (1, "sugar"),
+			(2, "olive"), (2, "oil"),
+			(3, "water"),
+		])
+		assert matrix.scores({"flour", "sugar", "olive oil", "x"}) == {1: 2, 2: 1}
+
+	def test_columns_filled_once(self):
+		matrix = IncidenceMatrix([(1, "flour sugar")])
+		assert matrix.scores({"flour"}) == {1: 1}
+		assert set(matrix._columns) == {"flour"}
+		assert matrix.scores({"flour", "sugar", "salt"}) == {1: 2}
+		assert set(matrix._columns) == {"flour", "sugar", "salt"}
+
+	def test_empty(self):
+		assert IncidenceMatrix([]).scores({"flour"}) == {}
+		assert IncidenceMatrix([(1, "flour")]).scores(set()) == {}
+
+
+class TestMatrixCache:
+	"""LRU of matrices per user."""
+
+	def test_hit_miss_invalidate_evict(self):
+		cache = MatrixCache(maxsize=2)
+		built = []
+		loader = lambda uid: built.append(uid) or IncidenceMatrix([])
+		first = cache.get(1, loader)
+		assert cache.get(1, loader) is first
+		cache.invalidate(1)
+		assert cache.get(1, loader) is not first
+		cache.get(2, loader)
+		cache.get(3, loader)  # evicts 1
+		cache.get(1, loader)
+		assert built == [1, 1, 2, 3, 1]
+		assert (cache.hits, cache.misses) == (1, 5)
+
+
+	def test_keyed_on_version(self):
+		cache = MatrixCache(maxsize=2)
+		built = []
+		loader = lambda uid: built.append(uid) or IncidenceMatrix([])
+		first = cache.get(1, loader, version=3)
+		assert cache.get(1, loader, version=3) is first
+		second = cache.get(1, loader, version=4)
+		assert second is not first
+		assert cache.get(1, loader, version=3) is not second  # a reader of an older snapshot...
+		assert cache.get(1, loader, version=4) is second  # ...does not replace the newer matrix
+		assert built == [1, 1, 1]
+
+	def test_load_spanning_invalidate_not_kept(self):
+		cache = MatrixCache()
+
+		def loader(uid):
+			cache.invalidate(uid)  # a write commits while the matrix is being built
+			return IncidenceMatrix([])
+		cache.get(1, loader)
+		assert cache.get(1, lambda uid: IncidenceMatrix([])) is not None
+		assert cache.misses == 2
+
+
+# ————————————————————————————————— Backend ————————————————————————————————— #
+
+def _stock(user_id, name):
+	create_inventory_ingredient(1, datetime.utcnow(), None, get_or_create_ingredient(name, user_id), None)
+
+
+class TestMatrixBackend:
+	"""recipe_ranking.search with backend="matrix"."""
+
+	def test_same_ranking_as_stored_scores(self):
+		me = create_user("rm_me@test.com", "Me", "Secret123")
+		for name in ("flour", "sugar", "eggs"):
+			_stock(me, name)
+		create_recipe("Cake", me, ingredients="Flour\nSugar\nEggs", category="Desserts")
+		create_recipe("Bread", me, ingredients="Flour\nWater")
+		create_recipe("Soup", me, ingredients="Broth")
+		ranked = [(r.title, r.matched) for r in recipe_ranking.search(me, None, None, "matrix")[1]]
+		assert ranked == [("Cake", 3), ("Bread", 1), ("Soup", 0)]
+		stored = [(r.title, n) for r, n in GroceryGuru.database.Select.get_Recipes_ranked_by_pantry_score(me)]
+		assert ranked == stored
+		desserts = recipe_ranking.search(me, "Desserts", None, "matrix")[1]
+		assert [r.title for r in desserts] == ["Cake"]
+
+	def test_pantry_change_needs_no_rebuild(self):
+		me = create_user("rm_me@test.com", "Me", "Secret123")
+		rid = create_recipe("Bread", me, ingredients="Flour")
+		assert recipe_matrix.pantry_scores(me, set()) == {}
+		_stock(me, "flour")
+		misses = matrix_cache.misses
+		assert recipe_matrix.pantry_scores(me, {"flour"}) == {rid: 1}
+		assert matrix_cache.misses == misses
+
+	def test_write_from_another_process_rebuilds(self):
+		me = create_user("rm_me@test.com", "Me", "Secret123")
+		rid = create_recipe("Bread", me, ingredients="Water")
+		assert recipe_matrix.pantry_scores(me, {"flour"}) == {}
+		# Another process (web worker, import worker) writes: this process's cache is not told
+		with sqlite3.connect(os.environ["GROCERY_GURU_DB_PATH"]) as conn:
+			conn.execute('UPDATE "RecipeIngredients" SET "name" = \'flour\' WHERE "Recipes.id" = ?', (rid,))
+			conn.execute('UPDATE "RecipeVersions" SET "version" = "version" + 1 WHERE "user_id" = ?', (me,))
+		assert recipe_matrix.pantry_scores(me, {"flour"}) == {rid: 1}
+
+	def test_uncommitted_write_not_cached_past_commit(self):
+		me = create_user("rm_me@test.com", "Me", "Secret123")
+		assert recipe_matrix.pantry_scores(me, {"flour"}) == {}
+		with GroceryGuru.app.app_context():  # request-scoped session, committed at teardown
+			rid = create_recipe("Bread", me, ingredients="Flour")
+			# a concurrent request (its own session) ranks from the committed data meanwhile
+			seen = []
+			reader = threading.Thread(target=lambda: seen.append(recipe_matrix.pantry_scores(me, {"flour"})))
+			reader.start()
+			reader.join()
+			assert seen == [{}]
+		assert recipe_matrix.pantry_scores(me, {"flour"}) == {rid: 1}
+
+	def test_recipe_writes_invalidate(self):
+		me = create_user("rm_me@test.com", "Me", "Secret123")
+		rid = create_recipe("Bread", me, ingredients="Water")
+		assert recipe_matrix.pantry_scores(me, {"flour"}) == {}
+		update_recipe(rid, ingredients="Flour")
+		assert recipe_matrix.pantry_scores(me, {"flour"}) == {rid: 1}
+		other = create_recipe("Cake", me, ingredients="Flour")
+		assert recipe_matrix.pantry_scores(me, {"flour"}) == {rid: 1, other: 1}
+		soft_delete_recipe(rid)
+		assert recipe_matrix.pantry_scores(me, {"flour"}) == {other: 1}
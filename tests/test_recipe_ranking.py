@@ -0,0 +1,86 @@
+"""Unit tests for top-K Find Recipe ranking (database.recipe_ranking)."""
+import random
+from datetime import datetime
+
+import pytest
+
+from database import (
+	create_user, create_recipe, create_inventory_ingredient, get_or_create_ingredient, recipe_ranking, session_scope,
+)
+from database.recipe_matrix import matrix_cache
+from database.recipe_ranking import RankedRecipe
+
+
+@pytest.fixture(autouse=True)
+def _fresh_matrix_cache():
+	matrix_cache.clear()
+	yield
+	matrix_cache.clear()
+
+
+@pytest.fixture
+def kitchen():
+	"""A user with flour, sugar and eggs in the pantry and 12 recipes, several tied on score."""
+	me = create_user("rank_me@test.com", "Me", "Secret123")
+	for name in ("flour", "sugar", "eggs"):
+		create_inventory_ingredient(1, datetime.utcnow(), None, get_or_create_ingredient(name, me), None)
+	lines = ["flour", "sugar", "eggs", "water", "salt"]
+	rng = random.Random(7)
+	for n in range(12):
+		chosen = rng.sample(lines, rng.randint(1, 4))
+		create_recipe(f"Recipe {n % 5}", me, ingredients="\n".join(chosen), category="Desserts" if n % 3 else "")
+	return me
+
+
+def _page(me, k, backend, category=None, **cursors):
+	with session_scope() as session:
+		return recipe_ranking.page(session, me, category, k, backend=backend, **cursors)
+
+
+class TestTopK:
+	"""top_k over in-memory candidates."""
+
+	CANDIDATES = [RankedRecipe(i, f"t{i % 4}", i % 3) for i in range(20)]
+
+	def test_matches_a_full_sort(self):
+		ordered = sorted(self.CANDIDATES, key=recipe_ranking.rank_key)
+		assert recipe_ranking.top_k(iter(self.CANDIDATES), 5) == ordered[:5]
+		assert recipe_ranking.top_k(iter(self.CANDIDATES), None) == ordered
+		assert recipe_ranking.top_k(iter(self.CANDIDATES), 5, from_end=True) == ordered[-5:]
+
+	def test_cursors_are_exclusive(self):
+		ordered = sorted(self.CANDIDATES, key=recipe_ranking.rank_key)
+		assert recipe_ranking.top_k(self.CANDIDATES, 3, after=ordered[4]) == ordered[5:8]
+		assert recipe_ranking.top_k(self.CANDIDATES, 3, before=ordered[10], from_end=True) == ordered[7:10]
+		assert recipe_ranking.top_k(self.CANDIDATES, 9, after=ordered[4], before=ordered[7]) == ordered[5:7]
+
+
+class TestPages:
+	"""page / count / search against the database, for both backends."""
+
+	@pytest.mark.parametrize("backend", ["stored", "matrix"])
+	def test_keyset_pages_cover_the_ranking(self, kitchen, backend):
+		full = _page(kitchen, None, backend)
+		assert len(full) == 12
+		assert full == sorted(full, key=recipe_ranking.rank_key)
+		pages, cursor = [], None
+		while True:
+			page = _page(kitchen, 5, backend, after=cursor)
+			if not page:
+				break
+			pages += page
+			cursor = page[-1]
+		assert pages == full
+		assert _page(kitchen, 5, backend, from_end=True) == full[-5:]
+		assert _page(kitchen, 5, backend, after=full[2], before=full[6]) == full[3:6]
+
+	def test_backends_agree(self, kitchen):
+		assert _page(kitchen, None, "matrix") == _page(kitchen, None, "stored")
+		assert _page(kitchen, 4, "matrix", "Others") == _page(kitchen, 4, "stored", "Others")
+
+	@pytest.mark.parametrize("backend", ["stored", "matrix"])
+	def test_search_counts_only_when_truncated(self, kitchen, backend):
+		total, first = recipe_ranking.search(kitchen, "Desserts", 3, backend)
+		assert (total, len(first)) == (8, 3)
+		total, first = recipe_ranking.search(kitchen, "Others", 10, backend)
+		assert (total, len(first)) == (4, 4)
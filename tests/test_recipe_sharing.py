@@ -158,6 +158,21 @@ class TestShareRecipeWithFriends:
 		assert "already shared" in errors[0].lower()
 
 
+	def test_partial_share_in_one_request_saves_every_valid_share(
+		self, sharer_id, recipient_id, second_recipient_id, shared_recipe
+	):
+		"""In a request's unit of work, an already-shared friend does not undo the shares around it."""
+		from GroceryGuru import app
+		create_recipe_share(shared_recipe, sharer_id, second_recipient_id)
+		third_id = create_user(f"third_{id(object())}@test.com", "Third", "pass")
+		with app.app_context():
+			success_count, errors = share_recipe_with_friends(
+				shared_recipe, sharer_id, [recipient_id, second_recipient_id, third_id]
+			)
+		assert (success_count, errors) == (2, ["Recipe already shared with this friend."])
+		for rid in (recipient_id, second_recipient_id, third_id):
+			assert [share.recipe_id for share, *_ in Select.get_recipe_shares_for_recipient(rid)] == [shared_recipe]
+
 # ————————————————————————————————— Database: add_shared_recipe_to_user —————— #
 
 class TestAddSharedRecipeToUser:
@@ -621,7 +636,7 @@ class TestNotificationsRecipeShares:
 
 		resp = client.get("/Friends/Notifications", follow_redirects=True)
 		assert resp.status_code == 200
-		assert b"Shared recipes" in resp.data
+		assert b"Shared recipe" in resp.data
 		assert b"Notif Shared Recipe" in resp.data
 		assert b"View recipe" in resp.data
 		assert b"notification-dismiss" in resp.data or b"aria-label=\"Dismiss\"" in resp.data
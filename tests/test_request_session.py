@@ -0,0 +1,138 @@
+"""Unit tests for the request-scoped database session (one unit of work per request)."""
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+
+from GroceryGuru import app
+import database
+from database import (
+	create_user,
+	create_recipe,
+	create_list,
+	upsert_recipe_rating,
+	create_recipe_comment,
+)
+from database import Select
+
+
+# ————————————————————————————————— Fixtures ————————————————————————————————— #
+
+@pytest.fixture
+def checkouts():
+	"""Count connection checkouts from the engine pool while the test runs."""
+	counter = {"n": 0}
+
+	def _on_checkout(*_args):
+		counter["n"] += 1
+
+	event.listen(database.engine, "checkout", _on_checkout)
+	yield counter
+	event.remove(database.engine, "checkout", _on_checkout)
+
+
+# ————————————————————————————————— session_scope ————————————————————————————— #
+
+class TestSessionScope:
+	"""Tests for database.session_scope and close_request_session."""
+
+	def test_helpers_share_one_session_in_app_context(self):
+		"""Inside an app context every helper gets the same Session."""
+		with app.app_context():
+			with database.session_scope() as first:
+				pass
+			with database.session_scope() as second:
+				pass
+			assert first is second
+
+	def test_outside_app_context_uses_fresh_sessions(self):
+		"""Outside an app context each helper gets its own short-lived Session."""
+		with database.session_scope() as first:
+			pass
+		with database.session_scope() as second:
+			pass
+		assert first is not second
+
+	def test_writes_committed_at_teardown(self):
+		"""Writes made inside an app context are visible after it is torn down."""
+		user_id = create_user("scope_commit@test.com", "Scope", "TestPass123")
+		with app.app_context():
+			list_id = create_list("Party", user_id)
+		assert Select.get_List_by_id(list_id, user_id) is not None
+
+	def test_failed_request_rolls_back_all_writes(self):
+		"""An exception escaping the app context rolls back every write in the unit of work."""
+		user_id = create_user("scope_rollback@test.com", "Scope", "TestPass123")
+		with pytest.raises(RuntimeError):
+			with app.app_context():
+				rid = create_recipe(title="Half written", Persons_id=user_id)
+				upsert_recipe_rating(rid, user_id, 4)
+				create_recipe_comment(rid, user_id, "never saved")
+				raise RuntimeError("boom")
+		assert Select.get_Recipes_by_Persons_id(user_id) == []
+
+	def test_caught_helper_error_rolls_back_request(self):
+		"""A view that catches a helper's failed write does not get the request's earlier writes committed."""
+		user_id = create_user("scope_caught@test.com", "Scope", "TestPass123")
+		with app.app_context():
+			list_id = create_list("Party", user_id)
+			with pytest.raises(IntegrityError):
+				create_user("scope_caught@test.com", "Again", "TestPass123")
+		assert Select.get_List_by_id(list_id, user_id) is None
+
+	def test_caught_validation_error_keeps_request(self):
+		"""A helper's ValueError is raised before it writes, so the request's other writes are kept."""
+		user_id = create_user("scope_valid@test.com", "Scope", "TestPass123")
+		create_user("scope_taken@test.com", "Taken", "TestPass123")
+		with app.app_context():
+			create_list("Party", user_id)
+			with pytest.raises(ValueError):
+				database.update_person_profile(user_id, email="scope_taken@test.com")
+			create_list("Picnic", user_id)
+		assert sorted(lst.name for lst in Select.get_Lists_by_Persons_id(user_id)) == ["Party", "Picnic"]
+
+	def test_caught_database_error_does_not_fail_teardown(self):
+		"""After a failed flush the teardown rolls back instead of raising PendingRollbackError."""
+		create_user("scope_dup@test.com", "Scope", "TestPass123")
+		with app.app_context():
+			with pytest.raises(IntegrityError):
+				create_user("scope_dup@test.com", "Again", "TestPass123")
+		assert database.get_user_count() == 1
+
+	def test_inactive_transaction_not_committed(self):
+		"""close_request_session rolls back a session whose transaction can no longer commit."""
+		user_id = create_user("scope_inactive@test.com", "Scope", "TestPass123")
+		with app.app_context():
+			create_list("Party", user_id)
+			session = database.g.db_session
+			with pytest.raises(IntegrityError):
+				session.add(database.Persons(email="scope_inactive@test.com", name="Again", password="x"))
+				session.flush()  # fails outside session_scope: the transaction is left inactive
+			assert not session.is_active
+		assert Select.get_Lists_by_Persons_id(user_id) == []
+
+
+# ————————————————————————————————— Routes ————————————————————————————————— #
+
+class TestRequestCheckouts:
+	"""A page render uses a single pooled connection however many helpers it calls."""
+
+	def test_recipe_detail_checks_out_one_connection(self, logged_in_client, checkouts):
+		"""GET /Recipe/<id> runs all its queries on one connection."""
+		client, user_id = logged_in_client
+		rid = create_recipe(title="Toast", Persons_id=user_id, ingredients="bread\nbutter")
+		upsert_recipe_rating(rid, user_id, 5)
+		create_recipe_comment(rid, user_id, "Crunchy")
+		checkouts["n"] = 0
+		resp = client.get(f"/Recipe/{rid}")
+		assert resp.status_code == 200
+		assert checkouts["n"] == 1
+
+	def test_post_then_read_in_same_request_sees_write(self, logged_in_client):
+		"""A write and the page data rendered after it share one transaction."""
+		client, user_id = logged_in_client
+		resp = client.get("/Lists")
+		assert resp.status_code == 200
+		# lists_index creates the default list and re-reads it within the same request
+		assert b"Grocery list" in resp.data
+		lists = Select.get_Lists_by_Persons_id(user_id)
+		assert [l.name for l in lists] == ["Grocery list"]
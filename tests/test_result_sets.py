@@ -0,0 +1,131 @@
+"""Unit tests for the token-keyed Find Recipe result sets (database.result_sets)."""
+from datetime import datetime
+
+import pytest
+
+from database import (
+	create_inventory_ingredient,
+	create_recipe,
+	create_user,
+	get_or_create_ingredient,
+	recipe_ranking,
+	result_sets,
+	session_scope,
+	soft_delete_recipe,
+)
+from database.models import FindRecipeResultItems, FindRecipeResultSets
+
+
+def _count(model):
+	with session_scope() as session:
+		return session.query(model).count()
+
+
+class TestResultSets:
+	"""create / get_page / save_pantry_flags / purge_expired."""
+
+	def test_pages_wrap_around(self):
+		me = create_user("rs_me@test.com", "Me", "Secret123")
+		token = result_sets.create(me, [(10, 3), (11, 1), (12, 0)], [("pantry", "My pantry")])
+		page = result_sets.get_page(token, me, -1)
+		assert page == result_sets.ResultPage(2, 3, 12, 0, None, [("pantry", "My pantry")])
+		assert result_sets.get_page(token, me, 4).recipe_id == 11
+
+	def test_unknown_other_user_and_empty(self):
+		me = create_user("rs_me@test.com", "Me", "Secret123")
+		other = create_user("rs_other@test.com", "Other", "Secret123")
+		token = result_sets.create(me, [(10, 3)], [])
+		assert result_sets.get_page(token, other, 0) is None
+		assert result_sets.get_page("nope", me, 0) is None
+		assert result_sets.get_page("", me, 0) is None
+		assert result_sets.get_page(result_sets.create(me, [], []), me, 0) is None
+
+	def test_pantry_flags_saved(self):
+		me = create_user("rs_me@test.com", "Me", "Secret123")
+		token = result_sets.create(me, [(10, 3), (11, 1)], [])
+		result_sets.save_pantry_flags(token, 1, "101")
+		assert result_sets.get_page(token, me, 1).pantry_flags == "101"
+		assert result_sets.get_page(token, me, 0).pantry_flags is None
+
+	def test_expired_sets_hidden_and_purged(self):
+		me = create_user("rs_me@test.com", "Me", "Secret123")
+		expired = result_sets.create(me, [(10, 3), (11, 1)], [], ttl=-1)
+		assert result_sets.get_page(expired, me, 0) is None
+		live = result_sets.create(me, [(12, 0)], [])  # creating a set purges expired ones
+		assert result_sets.get_page(live, me, 0).recipe_id == 12
+		assert (_count(FindRecipeResultSets), _count(FindRecipeResultItems)) == (1, 1)
+
+
+class TestPagesFilledOnDemand:
+	"""Sets that store only the first page rank the rest when they are reached."""
+
+	@pytest.fixture
+	def ranked(self, monkeypatch):
+		"""A user with 9 recipes; returns (user_id, recipe ids in rank order)."""
+		monkeypatch.setattr(result_sets, "RESULT_PAGE_SIZE", 2)
+		me = create_user("rs_me@test.com", "Me", "Secret123")
+		for n in range(9):
+			create_recipe(f"Recipe {n}", me)
+		total, first = recipe_ranking.search(me, None, None)
+		return me, [r.id for r in first]
+
+	def _create(self, me, order):
+		total, first = recipe_ranking.search(me, None, result_sets.RESULT_PAGE_SIZE)
+		assert total == len(order)
+		return result_sets.create(me, [(r.id, r.matched) for r in first], [], total=total)
+
+	def test_forward_pages(self, ranked):
+		me, order = ranked
+		token = self._create(me, order)
+		assert _count(FindRecipeResultItems) == 2
+		assert [result_sets.get_page(token, me, i).recipe_id for i in range(9)] == order
+		assert _count(FindRecipeResultItems) == 9
+
+	def test_wrapping_back_fills_from_the_end(self, ranked):
+		me, order = ranked
+		token = self._create(me, order)
+		assert [result_sets.get_page(token, me, i).recipe_id for i in (-1, -2, -3)] == order[:-4:-1]
+		assert _count(FindRecipeResultItems) == 2 + 4
+		assert [result_sets.get_page(token, me, i).recipe_id for i in range(9)] == order
+
+	def test_recipes_gone_since_the_search(self, ranked):
+		me, order = ranked
+		token = self._create(me, order)
+		for recipe_id in order[2:]:
+			soft_delete_recipe(recipe_id)
+		assert result_sets.get_page(token, me, 1).recipe_id == order[1]
+		assert result_sets.get_page(token, me, 5) is None
+
+	@pytest.mark.parametrize("backend", ["stored", "matrix"])
+	def test_scores_changed_since_the_search(self, monkeypatch, backend):
+		"""Ranks filled after the pantry changed still show every recipe exactly once."""
+		monkeypatch.setattr(result_sets, "RESULT_PAGE_SIZE", 2)
+		me = create_user("rs_me@test.com", "Me", "Secret123")
+		foods = ["apple", "bean", "carrot", "date", "egg", "fig", "grape"]
+		ids = [create_recipe(f"Recipe {n}", me, ingredients=f"1 {food}") for n, food in enumerate(foods)]
+		total, first = recipe_ranking.search(me, None, 2, backend)
+		token = result_sets.create(me, [(r.id, r.matched) for r in first], [], total=total)
+		create_inventory_ingredient(1, datetime.utcnow(), None, get_or_create_ingredient("fig", me), None)
+		shown = [result_sets.get_page(token, me, i, backend).recipe_id for i in range(total)]
+		assert shown == ids[:2] + [ids[5]] + ids[2:5] + [ids[6]]
+
+	def test_concurrent_fill_of_the_same_ranks(self, monkeypatch):
+		"""A request whose page another request stored meanwhile keeps the stored rows."""
+		monkeypatch.setattr(result_sets, "RESULT_PAGE_SIZE", 2)
+		me = create_user("rs_me@test.com", "Me", "Secret123")
+		for n in range(5):
+			create_recipe(f"Recipe {n}", me)
+		total, order = recipe_ranking.search(me, None, None)
+		token = result_sets.create(me, [(r.id, r.matched) for r in order[:2]], [], total=total)
+		ranked_page = recipe_ranking.page
+
+		def racing_page(*args, **kwargs):
+			ranked = ranked_page(*args, **kwargs)
+			monkeypatch.setattr(recipe_ranking, "page", ranked_page)
+			result_sets.get_page(token, me, 4)  # stores ranks 3 and 4 before this page is stored
+			return ranked
+
+		monkeypatch.setattr(recipe_ranking, "page", racing_page)
+		assert result_sets.get_page(token, me, 2).recipe_id == order[2].id
+		assert [result_sets.get_page(token, me, i).recipe_id for i in range(5)] == [r.id for r in order]
+		assert _count(FindRecipeResultItems) == 5
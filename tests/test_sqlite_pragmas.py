@@ -0,0 +1,41 @@
+"""Unit tests for the SQLite pragmas applied to every engine connection."""
+import sqlite3
+
+import database
+from database import SQLITE_PRAGMAS, apply_sqlite_pragmas
+
+
+def _pragma(conn, name):
+	return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+class TestEnginePragmas:
+	"""Connections checked out from the shared engine carry the tuned settings."""
+
+	def test_journal_mode_is_wal(self):
+		with database.engine.connect() as conn:
+			assert _pragma(conn, "journal_mode").lower() == "wal"
+
+	def test_synchronous_normal(self):
+		with database.engine.connect() as conn:
+			assert _pragma(conn, "synchronous") == 1  # NORMAL
+
+	def test_temp_store_memory(self):
+		with database.engine.connect() as conn:
+			assert _pragma(conn, "temp_store") == 2  # MEMORY
+
+	def test_busy_timeout_and_cache_size_from_config(self):
+		with database.engine.connect() as conn:
+			assert _pragma(conn, "busy_timeout") == SQLITE_PRAGMAS["busy_timeout"]
+			assert _pragma(conn, "cache_size") == SQLITE_PRAGMAS["cache_size"]
+
+
+class TestApplySqlitePragmas:
+	"""Tests for apply_sqlite_pragmas on raw connections."""
+
+	def test_applies_given_pragmas_only(self):
+		conn = sqlite3.connect(":memory:")
+		apply_sqlite_pragmas(conn, {"cache_size": -1234})
+		assert conn.execute("PRAGMA cache_size").fetchone()[0] == -1234
+		assert conn.execute("PRAGMA temp_store").fetchone()[0] == 0  # untouched default
+		conn.close()
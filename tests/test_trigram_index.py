@@ -0,0 +1,72 @@
+"""Unit tests for the trigram index behind fuzzy ingredient matching."""
+import random
+import string
+
+import pytest
+
+from trigram_index import TrigramIndex, similarity, trigrams
+
+
+def _naive_search(entries, query, threshold):
+	"""Score every entry: what the index must return, without its prefix filtering."""
+	found = [(key, text, similarity(query, text)) for key, text in entries]
+	return sorted(((k, t, s) for k, t, s in found if s >= threshold), key=lambda m: (-m[2], m[1]))
+
+
+class TestTrigrams:
+	"""trigrams / similarity."""
+
+	def test_padded_word_trigrams(self):
+		assert trigrams("Egg") == {"  e", " eg", "egg", "gg "}
+		assert trigrams("egg, egg!") == trigrams("egg")
+		assert trigrams("") == frozenset()
+
+	def test_word_order_and_typos(self):
+		assert similarity("chicken breast", "breast chicken") == 1.0
+		assert similarity("chicken breast", "chiken breast") > 0.7
+		assert similarity("broccoli", "brocoli") > 0.6
+		assert similarity("flour", "sugar") == 0.0
+		assert similarity("", "flour") == 0.0
+
+
+class TestTrigramIndex:
+	"""TrigramIndex.search / contained_in."""
+
+	def test_search_ranks_by_similarity(self):
+		index = TrigramIndex(enumerate(["chicken breast", "chicken thigh", "beef brisket", "tomato"]))
+		assert [m.text for m in index.search("breast of chicken", 0.5)] == ["chicken breast"]
+		assert [m.key for m in index.search("chiken", 0.25)] == [1, 0]  # the shorter name shares more
+		assert index.search("tomatoe", 0.6)[0].text == "tomato"
+		assert index.search("zzz", 0.3) == []
+		assert index.search("", 0.3) == []
+		assert len(index.search("chicken", 0.1, limit=1)) == 1
+
+	def test_same_results_as_scoring_everything(self):
+		rng = random.Random(3)
+		words = ["".join(rng.choice("abcdeo") for _ in range(rng.randint(2, 7))) for _ in range(60)]
+		entries = [(n, " ".join(rng.sample(words, rng.randint(1, 3)))) for n in range(400)]
+		index = TrigramIndex(entries)
+		for _ in range(60):
+			query = " ".join(rng.sample(words, rng.randint(1, 3)))
+			if rng.random() < 0.5:
+				i = rng.randrange(len(query))
+				query = query[:i] + rng.choice(string.ascii_lowercase) + query[i + 1:]
+			for threshold in (0.2, 0.5, 0.8):
+				assert [tuple(m) for m in index.search(query, threshold)] == _naive_search(entries, query, threshold)
+
+	def test_contained_in(self):
+		index = TrigramIndex((name, name) for name in ["chicken breast", "egg", "rice"])
+		assert [m.key for m in index.contained_in("boneless breast of chicken, diced")] == ["chicken breast"]
+		assert [m.key for m in index.contained_in("2 chiken breast", 0.75)] == ["chicken breast"]
+		assert index.contained_in("licorice", 0.75) == []
+
+	def test_added_entries_are_searchable(self):
+		index = TrigramIndex()
+		index.add(7, "green onion")
+		assert len(index) == 1
+		assert index.search("onion green", 0.9)[0].key == 7
+
+	@pytest.mark.parametrize("threshold", [0, -0.5, 1.5])
+	def test_threshold_out_of_range(self, threshold):
+		with pytest.raises(ValueError):
+			TrigramIndex().search("egg", threshold)